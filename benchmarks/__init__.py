@@ -0,0 +1,5 @@
+"""
+Benchmarks for the Excel MCP server tools.
+
+Run ``python -m benchmarks.run --help`` from the project root.
+"""
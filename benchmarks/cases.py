@@ -0,0 +1,163 @@
+"""
+Benchmark arguments for each registered tool.
+
+Every case runs against a fresh copy of the fixture files, so mutating
+tools see the same workbook on each iteration. ``before`` calls set up
+state a tool needs (a pivot to refresh, a merge to undo) and are not
+timed. ``user_id`` is added by the runner.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from .workbooks import DATA_SHEET, SUMMARY_MERGES, SUMMARY_SHEET, TABLE_NAME, Workload
+
+WORKBOOK = "bench.xlsx"
+
+# Rows returned or written by tools whose cost depends on the range rather than the workbook
+SLICE_ROWS = 1000
+
+Arguments = Callable[[Workload], Dict[str, Any]]
+
+
+@dataclass
+class Case:
+    tool: str
+    arguments: Arguments
+    before: List[Tuple[str, Arguments]] = field(default_factory=list)
+    # Optional packages the tool needs; the case is skipped without them
+    requires: Tuple[str, ...] = ()
+
+
+def _slice_end(w: Workload) -> int:
+    return min(w.last_row, SLICE_ROWS + 1)
+
+
+def _data(**extra) -> Arguments:
+    def arguments(w: Workload) -> Dict[str, Any]:
+        return {"file_name": WORKBOOK, "sheet_name": DATA_SHEET, **extra}
+    return arguments
+
+
+def _pivot(w: Workload) -> Dict[str, Any]:
+    return {
+        "file_name": WORKBOOK,
+        "sheet_name": DATA_SHEET,
+        "data_range": w.data_range,
+        "rows": ["Region"],
+        "values": ["Qty", "Price"],
+        "agg_func": "sum",
+    }
+
+
+CASES: List[Case] = [
+    # Read tools
+    Case("read_data_from_excel", lambda w: {**_data()(w), "start_cell": "A1", "end_cell": f"J{_slice_end(w)}"}),
+    Case("describe_range", lambda w: {**_data()(w), "start_cell": "A1", "end_cell": f"J{w.last_row}"}),
+    Case("list_tables", lambda w: {"file_name": WORKBOOK}),
+    Case("query_table", lambda w: {
+        "file_name": WORKBOOK,
+        "table_name": TABLE_NAME,
+        "columns": ["ID", "Region", "Qty"],
+        "filters": [{"column": "Region", "op": "=", "value": "North"}, {"column": "Qty", "op": ">", "value": 250}],
+        "order_by": "Qty",
+        "descending": True,
+        "limit": 100,
+    }),
+    Case("export_range", lambda w: {**_data()(w), "file_format": "csv", "output_file": "bench_export.csv"}),
+    Case("validate_formula_syntax", lambda w: {**_data()(w), "cell": "L2", "formula": f"=SUM(F2:F{w.last_row})"}),
+    Case("validate_excel_range", lambda w: {**_data()(w), "start_cell": "A1", "end_cell": f"J{w.last_row}"}),
+    Case("get_data_validation_info", _data()),
+    Case("get_merged_cells", lambda w: {"file_name": WORKBOOK, "sheet_name": SUMMARY_SHEET}),
+    Case("get_workbook_metadata", lambda w: {"file_name": WORKBOOK, "include_ranges": True}),
+    Case("diff_workbooks", lambda w: {"file_name": WORKBOOK, "other_file_name": "bench_other.xlsx"}),
+    Case(
+        "render_chart_preview",
+        lambda w: {**_data()(w), "data_range": f"F1:G{w.last_row}", "chart_type": "line"},
+        requires=("matplotlib",),
+    ),
+    # Charts, pivots and tables
+    Case("create_chart", lambda w: {
+        **_data()(w),
+        "data_range": f"F1:G{w.last_row}",
+        "chart_type": "line",
+        "target_cell": "L2",
+        "downsample": "lttb",
+    }),
+    Case("create_charts", lambda w: {
+        "file_name": WORKBOOK,
+        "charts": [
+            {"sheet_name": DATA_SHEET, "data_range": f"F1:G{_slice_end(w)}", "chart_type": "bar", "target_cell": "L2"},
+            {"sheet_name": SUMMARY_SHEET, "data_range": "A3:B11", "chart_type": "pie", "target_cell": "H2"},
+        ],
+    }),
+    Case("create_pivot_table", _pivot),
+    Case("refresh_pivot", lambda w: {"file_name": WORKBOOK, "pivot_sheet": f"{DATA_SHEET}_pivot"},
+         before=[("create_pivot_table", _pivot)]),
+    Case("create_table", lambda w: {
+        "file_name": WORKBOOK,
+        "sheet_name": SUMMARY_SHEET,
+        "data_range": "A3:C11",
+        "table_name": "CategoryTotals",
+    }),
+    # Writes
+    Case("write_data_to_excel", lambda w: {
+        **_data()(w),
+        "data": [[w.rows + i, f"Item {w.rows + i}", "Other", "North", None, i, 1.5, None, True, ""] for i in range(100)],
+        "start_cell": f"A{w.last_row + 1}",
+    }),
+    Case("import_delimited", lambda w: {"file_name": WORKBOOK, "source_file": "bench.csv", "sheet_name": "Imported"}),
+    Case("apply_formula", lambda w: {**_data()(w), "cell": "L2", "formula": f"=SUM(F2:F{w.last_row})"}),
+    Case("apply_formulas", lambda w: {
+        **_data()(w),
+        "formulas": [{"cell": f"L{row}", "formula": f"=F{row}*2"} for row in range(2, 102)],
+    }),
+    Case("format_range", lambda w: {
+        **_data()(w),
+        "start_cell": "F2",
+        "end_cell": f"F{w.last_row}",
+        "bg_color": "FFF2CC",
+        "number_format": "#,##0",
+        "border_style": "thin",
+    }),
+    # Structure
+    Case("copy_range", lambda w: {
+        **_data()(w),
+        "source_start": "A1",
+        "source_end": f"J{_slice_end(w)}",
+        "target_start": "H1",
+        "target_sheet": SUMMARY_SHEET,
+    }),
+    Case("delete_range", lambda w: {
+        **_data()(w),
+        "start_cell": f"A{w.last_row - 99}",
+        "end_cell": f"J{w.last_row}",
+        "shift_direction": "up",
+    }),
+    Case("copy_worksheet", lambda w: {"file_name": WORKBOOK, "source_sheet": DATA_SHEET, "target_sheet": "Data Copy"}),
+    Case("delete_worksheet", lambda w: {"file_name": WORKBOOK, "sheet_name": SUMMARY_SHEET}),
+    Case("rename_worksheet", lambda w: {"file_name": WORKBOOK, "old_name": SUMMARY_SHEET, "new_name": "Overview"}),
+    Case("merge_cells", lambda w: {
+        "file_name": WORKBOOK, "sheet_name": SUMMARY_SHEET, "start_cell": "A20", "end_cell": "D21",
+    }),
+    Case("unmerge_cells", lambda w: {
+        "file_name": WORKBOOK, "sheet_name": SUMMARY_SHEET, "start_cell": "A1", "end_cell": "F1",
+    }),
+    Case("merge_cell_ranges", lambda w: {
+        "file_name": WORKBOOK, "sheet_name": SUMMARY_SHEET, "ranges": ["A20:B21", "C20:D21", "E20:F21"],
+    }),
+    Case("unmerge_cell_ranges", lambda w: {
+        "file_name": WORKBOOK, "sheet_name": SUMMARY_SHEET, "ranges": list(SUMMARY_MERGES),
+    }),
+    Case("insert_rows", _data(start_row=2, count=10)),
+    Case("insert_columns", _data(start_col=2, count=2)),
+    Case("delete_sheet_rows", _data(start_row=2, count=10)),
+    Case("delete_sheet_columns", _data(start_col=10, count=1)),
+    # Workbooks and storage
+    Case("create_workbook", lambda w: {"file_name": "bench_new.xlsx"}),
+    Case("create_worksheet", lambda w: {"file_name": WORKBOOK, "sheet_name": "Extra"}),
+    Case("list_minio_files", lambda w: {}),
+    Case("pull_minio_file", lambda w: {"file_name": "remote.xlsx"}),
+    Case("push_minio_file", lambda w: {"file_name": WORKBOOK}),
+    Case("get_sync_status", lambda w: {}),
+]
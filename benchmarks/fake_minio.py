@@ -0,0 +1,274 @@
+"""
+A local stand-in for MinIO covering the S3 calls the storage tools make.
+
+Implements bucket location, ListObjectsV2 (with paging), HEAD/GET/PUT object and
+multipart uploads over plain HTTP, ignoring request signatures. Objects
+are kept on disk so large workbooks do not count against the memory of
+the process being measured.
+"""
+
+import hashlib
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+S3_NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class _Object:
+    def __init__(self, path: Path, size: int, etag: str, modified: float):
+        self.path = path
+        self.size = size
+        self.etag = etag
+        self.modified = modified
+
+
+class FakeMinio:
+    """An S3-compatible server on 127.0.0.1 for benchmarks.
+
+    Use ``endpoint`` in the server's MINIO_CONFIG, ``put`` to seed objects
+    and ``reset`` to return to the seeded state between iterations.
+    """
+
+    def __init__(self, port: int = 0):
+        self._root = Path(tempfile.mkdtemp(prefix="fake-minio-"))
+        self._lock = threading.Lock()
+        self._objects: Dict[Tuple[str, str], _Object] = {}
+        self._seeded: Dict[Tuple[str, str], _Object] = {}
+        self._uploads: Dict[str, Dict[int, Path]] = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-minio", daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeMinio":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        shutil.rmtree(self._root, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def put(self, bucket: str, key: str, source: Path) -> None:
+        """Seed an object; seeded objects survive ``reset``."""
+        with open(source, "rb") as f:
+            obj = self._store(f, Path(source).stat().st_size)
+        with self._lock:
+            self._objects[(bucket, key)] = obj
+            self._seeded[(bucket, key)] = obj
+
+    def reset(self) -> None:
+        """Drop everything written since seeding."""
+        with self._lock:
+            self._objects = dict(self._seeded)
+            self._uploads.clear()
+
+    def _store(self, stream, length: int) -> _Object:
+        path = self._root / uuid.uuid4().hex
+        digest = hashlib.md5()
+        remaining = length
+        with open(path, "wb") as out:
+            while remaining > 0:
+                chunk = stream.read(min(COPY_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                remaining -= len(chunk)
+        return _Object(path, length - remaining, digest.hexdigest(), time.time())
+
+    def _handler(self):
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _target(self):
+                parts = urlsplit(self.path)
+                bucket, _, key = parts.path.lstrip("/").partition("/")
+                query = {name: values[0] for name, values in parse_qs(parts.query, keep_blank_values=True).items()}
+                return bucket, unquote(key), query
+
+            def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if body or "Content-Length" not in (headers or {}):
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body and self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _xml(self, body: str, status: int = 200):
+                data = ('<?xml version="1.0" encoding="UTF-8"?>' + body).encode("utf-8")
+                self._send(status, data, {"Content-Type": "application/xml"})
+
+            def _not_found(self, bucket: str, key: str):
+                self._xml(
+                    f"<Error><Code>NoSuchKey</Code><Message>The specified key does not exist.</Message>"
+                    f"<Key>{escape(key)}</Key><BucketName>{escape(bucket)}</BucketName>"
+                    f"<Resource>/{escape(bucket)}/{escape(key)}</Resource>"
+                    f"<RequestId>0</RequestId><HostId>fake-minio</HostId></Error>",
+                    404,
+                )
+
+            def _object_headers(self, obj: _Object) -> Dict[str, str]:
+                return {
+                    "Content-Length": str(obj.size),
+                    "Content-Type": "application/octet-stream",
+                    "ETag": f'"{obj.etag}"',
+                    "Last-Modified": formatdate(obj.modified, usegmt=True),
+                }
+
+            def do_HEAD(self):
+                bucket, key, _ = self._target()
+                obj = store._objects.get((bucket, key))
+                if obj is None:
+                    self._send(404)
+                    return
+                self._send(200, headers=self._object_headers(obj))
+
+            def do_GET(self):
+                bucket, key, query = self._target()
+                if not key:
+                    if "location" in query:
+                        self._xml(f'<LocationConstraint xmlns="{S3_NAMESPACE}"></LocationConstraint>')
+                    else:
+                        self._list(bucket, query)
+                    return
+                obj = store._objects.get((bucket, key))
+                if obj is None:
+                    self._not_found(bucket, key)
+                    return
+                self.send_response(200)
+                for name, value in self._object_headers(obj).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                with open(obj.path, "rb") as f:
+                    shutil.copyfileobj(f, self.wfile, COPY_CHUNK_SIZE)
+
+            def _list(self, bucket: str, query: Dict[str, str]):
+                prefix = query.get("prefix", "")
+                delimiter = query.get("delimiter", "")
+                # Keys are their own continuation tokens
+                after = max(query.get("start-after", ""), query.get("continuation-token", ""))
+                max_keys = int(query.get("max-keys", 1000))
+                with store._lock:
+                    keys = sorted(
+                        key for (name, key) in store._objects
+                        if name == bucket and key.startswith(prefix) and key > after
+                    )
+                    objects = {key: store._objects[(bucket, key)] for key in keys}
+                contents, prefixes = [], []
+                truncated, last_key = False, ""
+                for key in keys:
+                    if len(contents) + len(prefixes) >= max_keys:
+                        truncated = True
+                        break
+                    last_key = key
+                    rest = key[len(prefix):]
+                    if delimiter and delimiter in rest:
+                        common = prefix + rest.split(delimiter, 1)[0] + delimiter
+                        if common not in prefixes:
+                            prefixes.append(common)
+                        continue
+                    obj = objects[key]
+                    modified = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(obj.modified))
+                    contents.append(
+                        f"<Contents><Key>{escape(key)}</Key><LastModified>{modified}</LastModified>"
+                        f'<ETag>"{obj.etag}"</ETag><Size>{obj.size}</Size>'
+                        f"<StorageClass>STANDARD</StorageClass></Contents>"
+                    )
+                common_xml = "".join(f"<CommonPrefixes><Prefix>{escape(p)}</Prefix></CommonPrefixes>" for p in prefixes)
+                next_token = f"<NextContinuationToken>{escape(last_key)}</NextContinuationToken>" if truncated else ""
+                self._xml(
+                    f'<ListBucketResult xmlns="{S3_NAMESPACE}"><Name>{escape(bucket)}</Name>'
+                    f"<Prefix>{escape(prefix)}</Prefix><KeyCount>{len(contents) + len(prefixes)}</KeyCount>"
+                    f"<MaxKeys>{max_keys}</MaxKeys><Delimiter>{escape(delimiter)}</Delimiter>"
+                    f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>{next_token}"
+                    f"{''.join(contents)}{common_xml}</ListBucketResult>"
+                )
+
+            def do_PUT(self):
+                bucket, key, query = self._target()
+                length = int(self.headers.get("Content-Length", 0))
+                obj = store._store(self.rfile, length)
+                if "uploadId" in query:
+                    with store._lock:
+                        store._uploads.setdefault(query["uploadId"], {})[int(query["partNumber"])] = obj.path
+                else:
+                    with store._lock:
+                        store._objects[(bucket, key)] = obj
+                self._send(200, headers={"ETag": f'"{obj.etag}"'})
+
+            def do_POST(self):
+                bucket, key, query = self._target()
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length) if length else b""
+                if "uploads" in query:
+                    upload_id = uuid.uuid4().hex
+                    with store._lock:
+                        store._uploads[upload_id] = {}
+                    self._xml(
+                        f'<InitiateMultipartUploadResult xmlns="{S3_NAMESPACE}"><Bucket>{escape(bucket)}</Bucket>'
+                        f"<Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+                    )
+                    return
+                upload_id = query.get("uploadId")
+                with store._lock:
+                    parts = store._uploads.pop(upload_id, None)
+                if parts is None:
+                    self._xml("<Error><Code>NoSuchUpload</Code><Message>Unknown upload.</Message></Error>", 404)
+                    return
+                numbers = [
+                    int(element.text)
+                    for element in ET.fromstring(body).iter()
+                    if element.tag.rsplit("}", 1)[-1] == "PartNumber"
+                ]
+                combined = store._root / uuid.uuid4().hex
+                with open(combined, "wb") as out:
+                    for number in numbers:
+                        with open(parts[number], "rb") as part:
+                            shutil.copyfileobj(part, out, COPY_CHUNK_SIZE)
+                with open(combined, "rb") as f:
+                    obj = store._store(f, combined.stat().st_size)
+                combined.unlink()
+                with store._lock:
+                    store._objects[(bucket, key)] = obj
+                self._xml(
+                    f'<CompleteMultipartUploadResult xmlns="{S3_NAMESPACE}"><Location>/{escape(bucket)}/{escape(key)}'
+                    f"</Location><Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key>"
+                    f'<ETag>"{obj.etag}"</ETag></CompleteMultipartUploadResult>'
+                )
+
+            def do_DELETE(self):
+                bucket, key, _ = self._target()
+                with store._lock:
+                    store._objects.pop((bucket, key), None)
+                self._send(204)
+
+        return Handler
+
@@ -0,0 +1,262 @@
+"""
+Replay recorded tool call traces against a running server.
+
+Reads the JSONL written by the server's trace recorder (TRACE_CONFIG) and
+re-issues the calls over HTTP at each requested concurrency level. Calls
+keep their recorded spacing divided by ``--speedup``, or run back to back
+with ``--speedup 0``. ``--fanout`` replays the trace once per virtual user
+so load grows with the user count. The report holds throughput and
+latency per level, overall and per tool. It also names the level where
+throughput stopped improving (the saturation point).
+
+    python -m benchmarks.replay traces/tool_calls.jsonl --url http://127.0.0.1:3210/mcp \\
+        --concurrency 1,2,4,8,16 --speedup 10 --fanout 4
+"""
+
+import argparse
+import asyncio
+import json
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastmcp import Client
+
+from src.core.trace_recorder import expand_value
+
+# A level saturates when its throughput is less than this much above the previous level's
+SATURATION_GAIN = 0.10
+
+
+def load_trace(path: Path, tools: Optional[set] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    calls = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if tools and entry["tool"] not in tools:
+                continue
+            calls.append(entry)
+            if limit and len(calls) >= limit:
+                break
+    calls.sort(key=lambda entry: entry["ts"])
+    return calls
+
+
+def virtual_user(user_id: str, copy: int) -> str:
+    return user_id if copy == 0 else f"{user_id}-r{copy}"
+
+
+def fan_out(calls: List[Dict[str, Any]], fanout: int) -> List[Dict[str, Any]]:
+    """One copy of the trace per virtual user, interleaved by timestamp."""
+    expanded = []
+    for copy in range(fanout):
+        for entry in calls:
+            args = expand_value(entry["args"])
+            recorded_user = args.get("user_id")
+            if recorded_user is not None:
+                args["user_id"] = virtual_user(str(recorded_user), copy)
+            expanded.append({"ts": entry["ts"], "tool": entry["tool"], "args": args, "recorded_user": recorded_user})
+    expanded.sort(key=lambda entry: entry["ts"])
+    return expanded
+
+
+def seed_files(calls: List[Dict[str, Any]], seed_dir: Path, config_path: str) -> int:
+    """Copy seed workbooks into each virtual user's directory on the server's file store.
+
+    ``seed_dir/<user_id>/`` is used for a recorded user when present,
+    otherwise files directly in ``seed_dir`` are given to every user.
+    """
+    from src.core.config import load_config
+    from src.core.file_manager import FileManager
+
+    file_manager = FileManager(load_config(config_path))
+    shared = [path for path in seed_dir.iterdir() if path.is_file()]
+    copied = 0
+    users = {(entry["args"]["user_id"], str(entry["recorded_user"])) for entry in calls if entry["recorded_user"]}
+    for user_id, recorded in sorted(users):
+        own = seed_dir / recorded
+        sources = [path for path in own.iterdir() if path.is_file()] if own.is_dir() else shared
+        target = file_manager.get_user_directory(user_id)
+        for path in sources:
+            shutil.copyfile(path, target / path.name)
+            copied += 1
+    return copied
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return round(ordered[index], 3)
+
+
+def _summary(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    latencies = [sample["latency_ms"] for sample in samples]
+    return {
+        "calls": len(samples),
+        "errors": sum(1 for sample in samples if sample["error"]),
+        "throughput": round(len(samples) / elapsed, 3) if elapsed else None,
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else None,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+    }
+
+
+async def _call(client: Client, entry: Dict[str, Any]) -> Optional[str]:
+    try:
+        result = await client.call_tool(entry["tool"], entry["args"], raise_on_error=False)
+    except Exception as e:
+        return str(e) or type(e).__name__
+    text = result.content[0].text if result.content and hasattr(result.content[0], "text") else ""
+    if result.is_error or text[:32].split(":", 1)[0].endswith("Error"):
+        return text or "tool error"
+    return None
+
+
+async def run_level(url: str, calls: List[Dict[str, Any]], concurrency: int, speedup: float) -> Dict[str, Any]:
+    """Replay ``calls`` with ``concurrency`` workers and summarize latency and throughput."""
+    queue: asyncio.Queue = asyncio.Queue()
+    samples: List[Dict[str, Any]] = []
+
+    async def worker():
+        async with Client(url) as client:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                entry, due = item
+                if due is None:
+                    due = time.perf_counter()
+                error = await _call(client, entry)
+                samples.append({
+                    "tool": entry["tool"],
+                    "latency_ms": (time.perf_counter() - due) * 1000,
+                    "error": error,
+                })
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    start = time.perf_counter()
+    first_ts = calls[0]["ts"] if calls else 0.0
+    for entry in calls:
+        # Back to back, latency is service time; on the recorded schedule it
+        # also counts time spent waiting for a free worker
+        due = None
+        if speedup > 0:
+            due = start + (entry["ts"] - first_ts) / speedup
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await queue.put((entry, due))
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - start
+
+    by_tool: Dict[str, List[Dict[str, Any]]] = {}
+    for sample in samples:
+        by_tool.setdefault(sample["tool"], []).append(sample)
+    errors = [sample["error"] for sample in samples if sample["error"]]
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        **_summary(samples, elapsed),
+        "tools": {tool: _summary(items, elapsed) for tool, items in sorted(by_tool.items())},
+        "sample_errors": sorted(set(error[:200] for error in errors))[:10],
+    }
+
+
+def saturation_point(levels: List[Dict[str, Any]], tool: Optional[str] = None) -> Optional[int]:
+    """Concurrency after which throughput grew by less than SATURATION_GAIN, if any."""
+    previous = None
+    for level in levels:
+        stats = level["tools"].get(tool) if tool else level
+        throughput = stats.get("throughput") if stats else None
+        if throughput is None:
+            continue
+        if previous is not None and throughput < previous[1] * (1 + SATURATION_GAIN):
+            return previous[0]
+        previous = (level["concurrency"], throughput)
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded tool call traces against a server.")
+    parser.add_argument("trace", help="JSONL trace written by the server (TRACE_CONFIG)")
+    parser.add_argument("--url", default="http://127.0.0.1:3210/mcp", help="MCP endpoint of the server")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--speedup", type=float, default=0.0,
+                        help="Divide recorded gaps between calls by this factor; 0 replays back to back")
+    parser.add_argument("--fanout", type=int, default=1, help="Replay the trace once per virtual user")
+    parser.add_argument("--tools", help="Only replay these tools (comma-separated)")
+    parser.add_argument("--limit", type=int, help="Only replay the first N recorded calls")
+    parser.add_argument("--seed-dir", help="Copy these workbooks into each virtual user's directory first")
+    parser.add_argument("--config", help="Server config, to locate user directories for --seed-dir")
+    parser.add_argument("--output", help="Write the report as JSON")
+    return parser.parse_args(argv)
+
+
+async def _main(args) -> int:
+    tools = {name.strip() for name in args.tools.split(",")} if args.tools else None
+    recorded = load_trace(Path(args.trace), tools, args.limit)
+    if not recorded:
+        print("No calls to replay")
+        return 1
+    calls = fan_out(recorded, max(args.fanout, 1))
+    if args.seed_dir:
+        if not args.config:
+            raise SystemExit("--seed-dir needs --config to locate the server's user directories")
+        print(f"Seeded {seed_files(calls, Path(args.seed_dir), args.config)} files")
+
+    levels = []
+    for concurrency in [int(level) for level in args.concurrency.split(",")]:
+        level = await run_level(args.url, calls, concurrency, args.speedup)
+        levels.append(level)
+        print(
+            f"concurrency {concurrency:>3}: {level['calls']} calls in {level['elapsed_s']}s,"
+            f" {level['throughput']} calls/s, p50 {level['p50_ms']} ms, p95 {level['p95_ms']} ms,"
+            f" {level['errors']} errors",
+            flush=True,
+        )
+
+    tool_names = sorted({tool for level in levels for tool in level["tools"]})
+    report = {
+        "trace": str(args.trace),
+        "recorded_calls": len(recorded),
+        "fanout": args.fanout,
+        "speedup": args.speedup,
+        "levels": levels,
+        "saturation": {
+            "overall": saturation_point(levels),
+            "tools": {tool: saturation_point(levels, tool) for tool in tool_names},
+        },
+    }
+    print("\nPer tool (throughput calls/s / p95 ms by concurrency):")
+    for tool in tool_names:
+        cells = []
+        for level in levels:
+            stats = level["tools"].get(tool)
+            cells.append(f"{level['concurrency']}: {stats['throughput']}/{stats['p95_ms']}" if stats else "-")
+        saturated = report["saturation"]["tools"][tool]
+        print(f"  {tool:<26} {'  '.join(cells)}  saturates at {saturated if saturated else 'n/a'}")
+    overall = report["saturation"]["overall"]
+    print(f"Overall saturation at concurrency {overall}" if overall else "No saturation within the tested levels")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.output}")
+    return 0
+
+
+def main(argv=None) -> int:
+    return asyncio.run(_main(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,478 @@
+"""
+Time every registered tool against synthetic workbooks of increasing size.
+
+Each tool is called in-process through the FastMCP client and, optionally,
+over the HTTP transport against a server subprocess. Latency, peak RSS of
+the serving process and (in-process) tracemalloc peak and net block count
+are written to JSON and can be compared against a stored baseline.
+
+    python -m benchmarks.run --sizes 1k,10k,100k --output bench.json
+    python -m benchmarks.run --baseline bench.json --latency-threshold 0.2
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import openpyxl
+import yaml
+from fastmcp import Client
+
+from .cases import CASES, WORKBOOK, Case
+from .fake_minio import FakeMinio
+from .workbooks import Workload, build_workload, parse_size, size_label
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+USER_ID = "benchmark"
+BUCKET = "benchmark"
+TRANSPORTS = ("inprocess", "http")
+
+# Seconds between RSS samples while a call runs
+RSS_INTERVAL = 0.002
+
+# Seconds to wait for the HTTP server subprocess to accept connections
+SERVER_START_TIMEOUT = 60.0
+
+
+class RssSampler:
+    """Track the peak resident set size of a process while a call runs."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def rss(self) -> Optional[int]:
+        try:
+            with open(f"/proc/{self.pid}/statm") as f:
+                return int(f.read().split()[1]) * self._page_size
+        except OSError:
+            if self.pid == os.getpid():
+                # No /proc: fall back to the process high-water mark
+                scale = 1 if sys.platform == "darwin" else 1024
+                return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+            return None
+
+    def __enter__(self):
+        self.peak = self.rss() or 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.rss() or 0)
+
+    def _run(self):
+        while not self._stop.wait(RSS_INTERVAL):
+            self.peak = max(self.peak, self.rss() or 0)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _write_config(workdir: Path, minio: FakeMinio) -> Path:
+    config = {
+        "MCP_CONFIG": {
+            "EXCEL_FILES_PATH": str(workdir / "excel_files"),
+            "HOST": "127.0.0.1",
+            "PORT": 3210,
+            "LOG_LEVEL": "warning",
+        },
+        "MINIO_CONFIG": {
+            "MINIO_ENDPOINT": minio.endpoint,
+            "MINIO_ACCESS_KEY": "benchmark",
+            "MINIO_SECRET_KEY": "benchmark",
+            "MINIO_BUCKET": BUCKET,
+            "MINIO_SECURE": False,
+        },
+        # Keep the file log, as a deployed server does, but not the console one
+        "LOGGING_CONFIG": {"CONSOLE": False},
+    }
+    path = workdir / "configs.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return path
+
+
+class Target:
+    """A server to call tools on, in-process or over HTTP."""
+
+    name = ""
+
+    def __init__(self, config_path: Path):
+        self.config_path = config_path
+        self.pid = os.getpid()
+        self.client: Optional[Client] = None
+
+    async def __aenter__(self):
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.__aexit__(*exc)
+
+    async def tool_names(self) -> List[str]:
+        return [tool.name for tool in await self.client.list_tools()]
+
+    async def call(self, tool: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Call a tool; return an error message, or None on success."""
+        result = await self.client.call_tool(tool, arguments, raise_on_error=False)
+        text = result.content[0].text if result.content and hasattr(result.content[0], "text") else ""
+        if result.is_error:
+            return text or "tool error"
+        if text[:32].split(":", 1)[0].endswith("Error"):
+            return text
+        return None
+
+
+class InProcessTarget(Target):
+    name = "inprocess"
+
+    def __init__(self, config_path: Path):
+        super().__init__(config_path)
+        from src.core.mcp_server import SimpleFastMCP
+
+        self.server = SimpleFastMCP("Excel MCP benchmark", config_path=str(config_path))
+        self.client = Client(self.server._mcp)
+
+
+class HttpTarget(Target):
+    name = "http"
+
+    def __init__(self, config_path: Path):
+        super().__init__(config_path)
+        self.port = _free_port()
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "server.py",
+                "--config", str(config_path),
+                "--host", "127.0.0.1",
+                "--port", str(self.port),
+                "--log-level", "warning",
+            ],
+            cwd=PROJECT_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.pid = self.process.pid
+        self.client = Client(f"http://127.0.0.1:{self.port}/mcp")
+
+    async def __aenter__(self):
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {self.process.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Server did not start listening in time")
+                await asyncio.sleep(0.2)
+        return await super().__aenter__()
+
+    async def __aexit__(self, *exc):
+        try:
+            await super().__aexit__(*exc)
+        finally:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+
+
+def _restore(user_dir: Path, workload: Workload, minio: FakeMinio) -> None:
+    """Reset the user's directory and storage to the fixture files."""
+    for item in user_dir.iterdir():
+        if item.is_dir():
+            shutil.rmtree(item)
+        else:
+            item.unlink()
+    for name, path in workload.files().items():
+        # copyfile gives a fresh mtime, so per-version caches miss as they would after an edit
+        shutil.copyfile(path, user_dir / name)
+    minio.reset()
+
+
+def _seed_minio(minio: FakeMinio, workload: Workload) -> None:
+    minio.put(BUCKET, f"private/{USER_ID}/remote.xlsx", workload.directory / WORKBOOK)
+    minio.put(BUCKET, f"private/{USER_ID}/archive/2024.xlsx", workload.directory / "bench_other.xlsx")
+
+
+async def _prepare(target: Target, case: Case, workload: Workload, user_dir: Path, minio: FakeMinio) -> Dict[str, Any]:
+    """Restore the fixtures, run the case's setup calls and return its arguments."""
+    _restore(user_dir, workload, minio)
+    for tool, arguments in case.before:
+        error = await target.call(tool, {"user_id": USER_ID, **arguments(workload)})
+        if error:
+            raise RuntimeError(f"setup call {tool} failed: {error}")
+    return {"user_id": USER_ID, **case.arguments(workload)}
+
+
+async def _time_case(
+    target: Target, case: Case, workload: Workload, user_dir: Path, minio: FakeMinio, repeat: int
+) -> Dict[str, Any]:
+    missing = [name for name in case.requires if importlib.util.find_spec(name) is None]
+    if missing:
+        return {"status": "skipped", "message": f"requires {', '.join(missing)}"}
+    latencies, peaks = [], []
+    error = None
+    sampler = RssSampler(target.pid)
+    for _ in range(repeat):
+        try:
+            arguments = await _prepare(target, case, workload, user_dir, minio)
+        except RuntimeError as e:
+            return {"status": "error", "message": str(e)[:500]}
+        with sampler:
+            start = time.perf_counter()
+            error = await target.call(case.tool, arguments)
+            latencies.append((time.perf_counter() - start) * 1000)
+        peaks.append(sampler.peak)
+
+    result = {
+        "status": "error" if error else "ok",
+        "latency_ms": [round(value, 3) for value in latencies],
+        "median_ms": round(statistics.median(latencies), 3),
+        "min_ms": round(min(latencies), 3),
+        "peak_rss_mb": round(max(peaks) / 2**20, 2) if any(peaks) else None,
+    }
+    if error:
+        result["message"] = error[:500]
+    return result
+
+
+async def _trace_case(
+    target: Target, case: Case, workload: Workload, user_dir: Path, minio: FakeMinio
+) -> Dict[str, Any]:
+    """Peak traced memory and net block count of one call; tracemalloc must be running."""
+    arguments = await _prepare(target, case, workload, user_dir, minio)
+    before = tracemalloc.take_snapshot()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    await target.call(case.tool, arguments)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    return {
+        "alloc_peak_mb": round(max(peak - baseline, 0) / 2**20, 2),
+        "alloc_net_blocks": sum(stat.count_diff for stat in after.compare_to(before, "filename")),
+    }
+
+
+async def _run_target(
+    target: Target,
+    workloads: List[Workload],
+    cases: List[Case],
+    minio: FakeMinio,
+    repeat: int,
+    trace_allocations: bool,
+) -> Dict[str, Any]:
+    from src.core.config import load_config
+    from src.core.file_manager import FileManager
+
+    user_dir = FileManager(load_config(str(target.config_path))).get_user_directory(USER_ID)
+    results: Dict[str, Any] = {}
+    async with target:
+        registered = set(await target.tool_names())
+        uncovered = sorted(registered - {case.tool for case in CASES})
+        if uncovered:
+            print(f"No benchmark case for: {', '.join(uncovered)}", flush=True)
+        cases = [case for case in cases if case.tool in registered]
+        for workload in workloads:
+            _seed_minio(minio, workload)
+            label = size_label(workload.cells)
+            for case in cases:
+                outcome = await _time_case(target, case, workload, user_dir, minio, repeat)
+                results.setdefault(case.tool, {})[label] = outcome
+                print(_format_row(target.name, case.tool, label, outcome), flush=True)
+
+        if trace_allocations:
+            # One tracing session for all calls: tracing slows calls down, so it
+            # cannot share the timed pass, and toggling it per call races with
+            # the fake MinIO threads on some Python versions
+            tracemalloc.start()
+            try:
+                for workload in workloads:
+                    _seed_minio(minio, workload)
+                    label = size_label(workload.cells)
+                    for case in cases:
+                        outcome = results[case.tool][label]
+                        if outcome["status"] != "ok":
+                            continue
+                        outcome.update(await _trace_case(target, case, workload, user_dir, minio))
+                        print(
+                            f"{target.name:<10} {case.tool:<26} {label:>5} {outcome['alloc_peak_mb']:>11} MB"
+                            f" allocated at peak, {outcome['alloc_net_blocks']} net blocks",
+                            flush=True,
+                        )
+            finally:
+                tracemalloc.stop()
+    return {"tools": results, "uncovered": uncovered}
+
+
+def _format_row(transport: str, tool: str, label: str, outcome: Dict[str, Any]) -> str:
+    if outcome["status"] == "skipped":
+        return f"{transport:<10} {tool:<26} {label:>5}  skipped ({outcome['message']})"
+    if "median_ms" not in outcome:
+        return f"{transport:<10} {tool:<26} {label:>5}  ERROR {outcome['message'][:80]}"
+    rss = outcome.get("peak_rss_mb")
+    line = (
+        f"{transport:<10} {tool:<26} {label:>5} {outcome['median_ms']:>11.1f} ms"
+        f" {rss if rss is not None else '-':>9} MB peak RSS"
+    )
+    if outcome["status"] == "error":
+        line += f"  ERROR {outcome['message'][:80]}"
+    return line
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    latency_threshold: float,
+    memory_threshold: float,
+    min_latency_ms: float,
+    min_memory_mb: float,
+) -> List[str]:
+    """List regressions of ``current`` against ``baseline``.
+
+    A metric regresses when it grows by more than its relative threshold
+    and by more than the absolute floor, which keeps noise on tiny values
+    from failing the run.
+    """
+    checks = (
+        ("median_ms", latency_threshold, min_latency_ms, "ms"),
+        ("peak_rss_mb", memory_threshold, min_memory_mb, "MB"),
+        ("alloc_peak_mb", memory_threshold, min_memory_mb, "MB"),
+    )
+    regressions = []
+    for transport, tools in current.get("results", {}).items():
+        for tool, sizes in tools.items():
+            for label, outcome in sizes.items():
+                previous = baseline.get("results", {}).get(transport, {}).get(tool, {}).get(label)
+                if previous is None:
+                    continue
+                if outcome["status"] == "error" and previous["status"] == "ok":
+                    regressions.append(f"{transport} {tool} {label}: now fails ({outcome.get('message', '')[:80]})")
+                    continue
+                for metric, threshold, floor, unit in checks:
+                    new, old = outcome.get(metric), previous.get(metric)
+                    if new is None or old is None:
+                        continue
+                    if new > old * (1 + threshold) and new - old > floor:
+                        change = (new / old - 1) * 100 if old else float("inf")
+                        regressions.append(
+                            f"{transport} {tool} {label}: {metric} {old:g} -> {new:g} {unit} (+{change:.0f}%)"
+                        )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Excel MCP server tools.")
+    parser.add_argument("--sizes", default="1k,10k,100k", help="Workbook sizes in cells, e.g. 1k,10k,100k,1m")
+    parser.add_argument("--transports", default="inprocess", help=f"Comma-separated: {', '.join(TRANSPORTS)}")
+    parser.add_argument("--tools", help="Only run these tools (comma-separated)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per tool and size")
+    parser.add_argument("--no-allocations", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--cache-dir", default=str(PROJECT_ROOT / ".benchmarks" / "workbooks"),
+                        help="Where generated workbooks are cached")
+    parser.add_argument("--output", default=str(PROJECT_ROOT / ".benchmarks" / "results.json"),
+                        help="Results file")
+    parser.add_argument("--baseline", help="Compare against this results file and fail on regressions")
+    parser.add_argument("--latency-threshold", type=float, default=0.25,
+                        help="Allowed relative latency growth (0.25 = 25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="Allowed relative growth of peak RSS and allocations")
+    parser.add_argument("--min-latency-delta", type=float, default=5.0,
+                        help="Ignore latency growth below this many milliseconds")
+    parser.add_argument("--min-memory-delta", type=float, default=2.0,
+                        help="Ignore memory growth below this many MB")
+    return parser.parse_args(argv)
+
+
+async def _main(args) -> int:
+    transports = [name.strip() for name in args.transports.split(",") if name.strip()]
+    unknown = set(transports) - set(TRANSPORTS)
+    if unknown:
+        raise SystemExit(f"Unknown transport(s): {', '.join(sorted(unknown))}")
+    cases = CASES
+    if args.tools:
+        wanted = {name.strip() for name in args.tools.split(",")}
+        cases = [case for case in CASES if case.tool in wanted]
+
+    sizes = sorted(parse_size(size) for size in args.sizes.split(","))
+    workloads = []
+    for cells in sizes:
+        start = time.perf_counter()
+        workloads.append(build_workload(cells, Path(args.cache_dir)))
+        print(f"Workbook {size_label(cells)} ready in {time.perf_counter() - start:.1f}s", flush=True)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "openpyxl": openpyxl.__version__,
+            "sizes": [size_label(cells) for cells in sizes],
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    with FakeMinio() as minio, tempfile.TemporaryDirectory(prefix="excel-mcp-bench-") as workdir:
+        config_path = _write_config(Path(workdir), minio)
+        for transport in transports:
+            target = InProcessTarget(config_path) if transport == "inprocess" else HttpTarget(config_path)
+            trace = transport == "inprocess" and not args.no_allocations
+            run = await _run_target(target, workloads, cases, minio, args.repeat, trace)
+            report["results"][transport] = run["tools"]
+            if run["uncovered"]:
+                report["meta"]["uncovered_tools"] = run["uncovered"]
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(
+            report,
+            baseline,
+            args.latency_threshold,
+            args.memory_threshold,
+            args.min_latency_delta,
+            args.min_memory_delta,
+        )
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+def main(argv=None) -> int:
+    return asyncio.run(_main(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Synthetic workbooks for the benchmarks.
+
+Workbooks are written in openpyxl's write-only mode so that the 1M cell
+fixture can be generated without holding it in memory. Generated files are
+cached by size and generator version.
+"""
+
+import csv
+import random
+import shutil
+import warnings
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.worksheet.table import Table, TableStyleInfo
+
+# Bump when the fixture layout changes so cached files are regenerated
+GENERATOR_VERSION = 1
+
+COLUMNS = ["ID", "Name", "Category", "Region", "Date", "Qty", "Price", "Amount", "Active", "Note"]
+CATEGORIES = ["Hardware", "Software", "Services", "Support", "Training", "Licenses", "Cloud", "Other"]
+REGIONS = ["North", "South", "East", "West"]
+
+DATA_SHEET = "Data"
+SUMMARY_SHEET = "Summary"
+TABLE_NAME = "Sales"
+
+# Summary sheet merges: a title, a subtitle and a notes block
+SUMMARY_MERGES = ["A1:F1", "A2:F2", "E4:F12"]
+
+# Rows changed in the "other" workbook used by diff_workbooks
+DIFF_EVERY = 997
+
+
+@dataclass
+class Workload:
+    """A generated fixture set for one size."""
+    cells: int
+    rows: int
+    directory: Path
+
+    @property
+    def last_row(self) -> int:
+        return self.rows + 1
+
+    @property
+    def last_col(self) -> str:
+        return chr(ord("A") + len(COLUMNS) - 1)
+
+    @property
+    def data_range(self) -> str:
+        return f"A1:{self.last_col}{self.last_row}"
+
+    def files(self) -> Dict[str, Path]:
+        return {
+            path.name: path
+            for path in self.directory.iterdir()
+            if path.is_file() and not path.name.startswith(".")
+        }
+
+
+def parse_size(text: str) -> int:
+    """Parse '1k', '250k' or '1m' into a cell count."""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if multiplier > 1 else text
+    return int(float(number) * multiplier)
+
+
+def size_label(cells: int) -> str:
+    if cells % 1_000_000 == 0:
+        return f"{cells // 1_000_000}m"
+    if cells % 1_000 == 0:
+        return f"{cells // 1_000}k"
+    return str(cells)
+
+
+def _row_values(index: int, rng: random.Random, variant: bool):
+    qty = rng.randint(1, 500)
+    if variant and index % DIFF_EVERY == 0:
+        qty += 1
+    return [
+        index,
+        f"Item {index:07d}",
+        CATEGORIES[index % len(CATEGORIES)],
+        REGIONS[rng.randrange(len(REGIONS))],
+        date(2023, 1, 1) + timedelta(days=index % 730),
+        qty,
+        round(rng.uniform(1, 2000), 2),
+        f"=F{index + 1}*G{index + 1}",
+        index % 3 != 0,
+        "" if index % 5 else f"Follow up on order {index}",
+    ]
+
+
+def _write_workbook(path: Path, rows: int, variant: bool = False) -> None:
+    rng = random.Random(rows)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(DATA_SHEET)
+    ws.freeze_panes = "A2"
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill("solid", fgColor="305496")
+    header_border = Border(bottom=Side(style="thin", color="000000"))
+    header = []
+    for name in COLUMNS:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.border = header_border
+        cell.alignment = Alignment(horizontal="center")
+        header.append(cell)
+    ws.append(header)
+
+    money_font = Font(color="1F4E78")
+    for index in range(1, rows + 1):
+        values = _row_values(index, rng, variant)
+        row = list(values)
+        row[4] = WriteOnlyCell(ws, value=values[4])
+        row[4].number_format = "yyyy-mm-dd"
+        row[6] = WriteOnlyCell(ws, value=values[6])
+        row[6].number_format = "#,##0.00"
+        row[7] = WriteOnlyCell(ws, value=values[7])
+        row[7].number_format = "#,##0.00"
+        row[7].font = money_font
+        ws.append(row)
+
+    last_row = rows + 1
+    category = DataValidation(type="list", formula1='"' + ",".join(CATEGORIES) + '"', allow_blank=True)
+    category.add(f"C2:C{last_row}")
+    ws.data_validations.append(category)
+    quantity = DataValidation(type="whole", operator="between", formula1="0", formula2="100000")
+    quantity.add(f"F2:F{last_row}")
+    ws.data_validations.append(quantity)
+
+    table = Table(displayName=TABLE_NAME, ref=f"A1:J{last_row}")
+    table._initialise_columns()
+    for column, name in zip(table.tableColumns, COLUMNS):
+        column.name = name
+    table.tableStyleInfo = TableStyleInfo(name="TableStyleMedium2", showRowStripes=True)
+    with warnings.catch_warnings():
+        # Columns are filled in above; openpyxl warns in write-only mode regardless
+        warnings.simplefilter("ignore", UserWarning)
+        ws.add_table(table)
+
+    summary = wb.create_sheet(SUMMARY_SHEET)
+    title = WriteOnlyCell(summary, value="Sales summary")
+    title.font = Font(bold=True, size=16)
+    summary.append([title])
+    summary.append([f"{rows} orders"])
+    summary.append(["Category", "Qty", "Amount", None, "Notes"])
+    for offset, name in enumerate(CATEGORIES):
+        row_number = offset + 4
+        summary.append([
+            name,
+            f'=SUMIF(Data!C2:C{last_row},A{row_number},Data!F2:F{last_row})',
+            f'=SUMIF(Data!C2:C{last_row},A{row_number},Data!H2:H{last_row})',
+        ])
+    for merged in SUMMARY_MERGES:
+        summary.merged_cells.add(merged)
+
+    wb.save(path)
+
+
+def _write_csv(path: Path, rows: int) -> None:
+    rng = random.Random(rows)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for index in range(1, rows + 1):
+            values = _row_values(index, rng, False)
+            values[4] = values[4].isoformat()
+            values[7] = round(values[5] * values[6], 2)
+            writer.writerow(values)
+
+
+def build_workload(cells: int, cache_dir: Path) -> Workload:
+    """Generate (or reuse) the fixture files for a workbook of about ``cells`` cells."""
+    rows = max(cells // len(COLUMNS) - 1, 10)
+    directory = Path(cache_dir) / f"v{GENERATOR_VERSION}-{size_label(cells)}"
+    marker = directory / ".complete"
+    if not marker.exists():
+        if directory.exists():
+            shutil.rmtree(directory)
+        directory.mkdir(parents=True)
+        _write_workbook(directory / "bench.xlsx", rows)
+        _write_workbook(directory / "bench_other.xlsx", rows, variant=True)
+        _write_csv(directory / "bench.csv", rows)
+        marker.touch()
+    return Workload(cells=cells, rows=rows, directory=directory)
@@ -5,8 +5,8 @@ Configuration management for the FastMCP Excel server.
 import os
 import yaml
 from pathlib import Path
-from typing import Dict, Any
-from dataclasses import dataclass
+from typing import Dict, Any, List
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -16,6 +16,9 @@ class MCPConfig:
     port: int = 3210
     host: str = "0.0.0.0"
     log_level: str = "info"
+    metrics_enabled: bool = True
+    warmup: bool = True
+    storage_layout: str = "sharded"
 
 
 @dataclass  
@@ -26,6 +29,65 @@ class MinIOConfig:
     secret_key: str
     bucket: str
     secure: bool = False
+    list_cache_seconds: float = 10.0
+
+
+@dataclass
+class ProfilingConfig:
+    """Opt-in tool call profiling configuration."""
+    enabled: bool = False
+    tools: List[str] = field(default_factory=list)
+    users: List[str] = field(default_factory=list)
+    sample_rate: float = 0.0
+    mode: str = "cprofile"
+    min_seconds: float = 0.0
+    keep: int = 20
+    sample_interval: float = 0.005
+    # Bearer token required by the /debug routes; they are not served without one
+    admin_token: str = ""
+
+
+@dataclass
+class TraceConfig:
+    """Tool call trace recording configuration."""
+    enabled: bool = False
+    path: str = "./traces/tool_calls.jsonl"
+    sample_rate: float = 1.0
+    max_mb: float = 512.0
+    verbatim_args: bool = False
+
+
+@dataclass
+class LoggingConfig:
+    """Server log file and queue configuration."""
+    format: str = "json"
+    max_mb: float = 50.0
+    backup_count: int = 5
+    console: bool = True
+    queue_size: int = 10000
+    rate_limit: int = 100
+
+
+@dataclass
+class JanitorConfig:
+    """Local file tier quotas and cleanup configuration."""
+    enabled: bool = True
+    interval_seconds: float = 300.0
+    user_quota_mb: float = 0.0
+    global_quota_mb: float = 0.0
+    min_idle_seconds: float = 600.0
+    clean_on_shutdown: bool = True
+
+
+@dataclass
+class SyncConfig:
+    """Write-behind upload of edited files to MinIO."""
+    enabled: bool = False
+    debounce_seconds: float = 5.0
+    max_delay_seconds: float = 60.0
+    concurrency: int = 4
+    scan_interval_seconds: float = 60.0
+    flush_timeout_seconds: float = 30.0
 
 
 @dataclass
@@ -33,6 +95,11 @@ class ServerConfig:
     """Complete server configuration."""
     mcp: MCPConfig
     minio: MinIOConfig
+    profiling: ProfilingConfig = field(default_factory=ProfilingConfig)
+    trace: TraceConfig = field(default_factory=TraceConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    janitor: JanitorConfig = field(default_factory=JanitorConfig)
+    sync: SyncConfig = field(default_factory=SyncConfig)
 
 
 def load_config(config_path: str = None) -> ServerConfig:
@@ -59,7 +126,10 @@ def load_config(config_path: str = None) -> ServerConfig:
         excel_files_path=mcp_data.get('EXCEL_FILES_PATH', './excel_files'),
         port=mcp_data.get('PORT', 3210),
         host=mcp_data.get('HOST', '0.0.0.0'),
-        log_level=mcp_data.get('LOG_LEVEL', 'info')
+        log_level=mcp_data.get('LOG_LEVEL', 'info'),
+        metrics_enabled=bool(mcp_data.get('METRICS_ENABLED', True)),
+        warmup=bool(mcp_data.get('WARMUP', True)),
+        storage_layout=mcp_data.get('STORAGE_LAYOUT', 'sharded')
     )
     
     # Parse MinIO config
@@ -75,7 +145,73 @@ def load_config(config_path: str = None) -> ServerConfig:
         access_key=minio_data['MINIO_ACCESS_KEY'],
         secret_key=minio_data['MINIO_SECRET_KEY'],
         bucket=minio_data['MINIO_BUCKET'],
-        secure=bool(secure_flag)
+        secure=bool(secure_flag),
+        list_cache_seconds=float(minio_data.get('MINIO_LIST_CACHE_SECONDS', 10))
+    )
+    
+    # Parse profiling config (optional section)
+    profiling_data = config_data.get('PROFILING_CONFIG') or {}
+    profiling_config = ProfilingConfig(
+        enabled=bool(profiling_data.get('ENABLED', False)),
+        tools=list(profiling_data.get('TOOLS') or []),
+        users=[str(user) for user in profiling_data.get('USERS') or []],
+        sample_rate=float(profiling_data.get('SAMPLE_RATE', 0.0)),
+        mode=profiling_data.get('MODE', 'cprofile'),
+        min_seconds=float(profiling_data.get('MIN_SECONDS', 0.0)),
+        keep=int(profiling_data.get('KEEP', 20)),
+        sample_interval=float(profiling_data.get('SAMPLE_INTERVAL', 0.005)),
+        admin_token=str(profiling_data.get('ADMIN_TOKEN') or '')
+    )
+    
+    # Parse trace recording config (optional section)
+    trace_data = config_data.get('TRACE_CONFIG') or {}
+    trace_config = TraceConfig(
+        enabled=bool(trace_data.get('ENABLED', False)),
+        path=trace_data.get('PATH', './traces/tool_calls.jsonl'),
+        sample_rate=float(trace_data.get('SAMPLE_RATE', 1.0)),
+        max_mb=float(trace_data.get('MAX_MB', 512)),
+        verbatim_args=bool(trace_data.get('VERBATIM_ARGS', False))
+    )
+    
+    # Parse logging config (optional section)
+    logging_data = config_data.get('LOGGING_CONFIG') or {}
+    logging_config = LoggingConfig(
+        format=logging_data.get('FORMAT', 'json'),
+        max_mb=float(logging_data.get('MAX_MB', 50)),
+        backup_count=int(logging_data.get('BACKUP_COUNT', 5)),
+        console=bool(logging_data.get('CONSOLE', True)),
+        queue_size=int(logging_data.get('QUEUE_SIZE', 10000)),
+        rate_limit=int(logging_data.get('RATE_LIMIT', 100))
+    )
+    
+    # Parse local file janitor config (optional section)
+    janitor_data = config_data.get('JANITOR_CONFIG') or {}
+    janitor_config = JanitorConfig(
+        enabled=bool(janitor_data.get('ENABLED', True)),
+        interval_seconds=float(janitor_data.get('INTERVAL_SECONDS', 300)),
+        user_quota_mb=float(janitor_data.get('USER_QUOTA_MB', 0)),
+        global_quota_mb=float(janitor_data.get('GLOBAL_QUOTA_MB', 0)),
+        min_idle_seconds=float(janitor_data.get('MIN_IDLE_SECONDS', 600)),
+        clean_on_shutdown=bool(janitor_data.get('CLEAN_ON_SHUTDOWN', True))
+    )
+
+    # Parse write-behind sync config (optional section)
+    sync_data = config_data.get('SYNC_CONFIG') or {}
+    sync_config = SyncConfig(
+        enabled=bool(sync_data.get('ENABLED', False)),
+        debounce_seconds=float(sync_data.get('DEBOUNCE_SECONDS', 5)),
+        max_delay_seconds=float(sync_data.get('MAX_DELAY_SECONDS', 60)),
+        concurrency=int(sync_data.get('CONCURRENCY', 4)),
+        scan_interval_seconds=float(sync_data.get('SCAN_INTERVAL_SECONDS', 60)),
+        flush_timeout_seconds=float(sync_data.get('FLUSH_TIMEOUT_SECONDS', 30))
     )
     
-    return ServerConfig(mcp=mcp_config, minio=minio_config)
\ No newline at end of file
+    return ServerConfig(
+        mcp=mcp_config,
+        minio=minio_config,
+        profiling=profiling_config,
+        trace=trace_config,
+        logging=logging_config,
+        janitor=janitor_config,
+        sync=sync_config
+    )
\ No newline at end of file
@@ -2,11 +2,33 @@
 File management utilities with concurrent access protection.
 """
 
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
 from pathlib import Path
-from typing import Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from contextlib import contextmanager
 import filelock
 from .config import ServerConfig
+from .metrics import phase
+
+logger = logging.getLogger("excel-mcp")
+
+# Sidecar files kept next to each workbook
+LOCK_SUFFIX = ".lock"
+SYNC_SUFFIX = ".synced"
+
+STORAGE_LAYOUTS = ("sharded", "flat")
+
+# Records the layout of excel_files once it is sharded
+LAYOUT_MARKER = ".layout"
+
+# Hex characters of the user ID hash naming each shard (256 shards)
+SHARD_WIDTH = 2
 
 
 class FileManager:
@@ -16,12 +38,41 @@ class FileManager:
     
     def __init__(self, config: ServerConfig):
         self.config = config
+        self.base_path = Path(config.mcp.excel_files_path)
+        self.layout = config.mcp.storage_layout
+        if self.layout not in STORAGE_LAYOUTS:
+            raise ValueError(
+                f"Unknown storage layout '{self.layout}'; expected one of {', '.join(STORAGE_LAYOUTS)}"
+            )
+        # User directories known to exist, so resolving a path is a lookup
+        self._user_dirs: Dict[str, Path] = {}
+        # Last use of each file by a tool, for LRU eviction (falls back to mtime)
+        self._last_used: Dict[str, float] = {}
+        # Threads holding or waiting for each file lock in this process
+        self._lock_users: Dict[str, int] = {}
+        self._lock_users_lock = threading.Lock()
         self._ensure_base_directory()
     
     def _ensure_base_directory(self):
-        """Ensure the base excel files directory exists."""
-        base_path = Path(self.config.mcp.excel_files_path)
-        base_path.mkdir(parents=True, exist_ok=True)
+        """Ensure the base excel files directory exists, in the configured layout."""
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        marker = self.base_path / LAYOUT_MARKER
+        if self.layout == "sharded":
+            if not marker.exists():
+                self.migrate_to_sharded()
+                marker.write_text("sharded\n")
+        elif marker.exists():
+            raise ValueError(
+                f"{self.base_path} uses the sharded layout; set STORAGE_LAYOUT: sharded"
+            )
+    
+    def _shard(self, user_id: str) -> str:
+        return hashlib.blake2b(user_id.encode("utf-8"), digest_size=8).hexdigest()[:SHARD_WIDTH]
+    
+    def _user_directory_path(self, user_id: str) -> Path:
+        if self.layout == "sharded":
+            return self.base_path / self._shard(user_id) / user_id
+        return self.base_path / user_id
     
     def get_user_directory(self, user_id: str) -> Path:
         """
@@ -33,8 +84,11 @@ class FileManager:
         Returns:
             Path object for user directory
         """
-        user_dir = Path(self.config.mcp.excel_files_path) / user_id
-        user_dir.mkdir(parents=True, exist_ok=True)
+        user_dir = self._user_dirs.get(user_id)
+        if user_dir is None:
+            user_dir = self._user_directory_path(user_id)
+            user_dir.mkdir(parents=True, exist_ok=True)
+            self._user_dirs[user_id] = user_dir
         return user_dir
     
     def get_file_path(self, file_name: str, user_id: str) -> Path:
@@ -50,7 +104,211 @@ class FileManager:
         """
         # Extract just the file_name from any path input to avoid confusion
         file_name = Path(file_name).name
-        return self.get_user_directory(user_id) / file_name
+        file_path = self.get_user_directory(user_id) / file_name
+        self._last_used[str(file_path)] = time.time()
+        return file_path
+
+    def iter_user_directories(self) -> Iterator[Tuple[str, Path]]:
+        """Yield (user_id, directory) for every user with local files."""
+        if not self.base_path.is_dir():
+            return
+        for entry in self._subdirectories(self.base_path):
+            if self.layout == "flat":
+                yield entry.name, Path(entry.path)
+                continue
+            if not self._is_shard_name(entry.name):
+                # Left over from a migration with name clashes
+                continue
+            for user_entry in self._subdirectories(Path(entry.path)):
+                yield user_entry.name, Path(user_entry.path)
+
+    def _subdirectories(self, directory: Path) -> Iterator[os.DirEntry]:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith("."):
+                    yield entry
+
+    def _is_shard_name(self, name: str) -> bool:
+        return len(name) == SHARD_WIDTH and all(c in "0123456789abcdef" for c in name)
+
+    def _is_shard_directory(self, directory: Path) -> bool:
+        """A shard holds only user directories that hash to its name."""
+        if not self._is_shard_name(directory.name):
+            return False
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if not entry.is_dir(follow_symlinks=False) or self._shard(entry.name) != directory.name:
+                    return False
+        return True
+
+    def migrate_to_sharded(self) -> int:
+        """Move user directories from the flat layout into their shards.
+
+        Resumes an interrupted migration: directories already moved are
+        recognised as shards. Where a user already has a sharded directory,
+        files are merged into it and name clashes are left in place.
+
+        Returns:
+            Number of user directories moved or merged
+        """
+        start = time.perf_counter()
+        moved = 0
+        for entry in list(self._subdirectories(self.base_path)):
+            source = Path(entry.path)
+            if self._is_shard_directory(source):
+                continue
+            target = self.base_path / self._shard(entry.name) / entry.name
+            if target.parent == source:
+                # The user ID is its own shard name; move it aside first
+                source = source.rename(self.base_path / f".migrating-{entry.name}")
+            target.parent.mkdir(exist_ok=True)
+            if not target.exists():
+                source.rename(target)
+            else:
+                for child in list(source.iterdir()):
+                    if (target / child.name).exists():
+                        logger.warning("Not migrating %s: %s already exists", child, target / child.name)
+                        continue
+                    shutil.move(str(child), str(target / child.name))
+                try:
+                    source.rmdir()
+                except OSError:
+                    pass
+            moved += 1
+        if moved:
+            logger.info(
+                "Migrated %d user directories to the sharded layout in %.1f s",
+                moved, time.perf_counter() - start,
+            )
+        return moved
+
+    def list_user_files(self, user_id: str) -> List[Path]:
+        """A user's local files, without lock and sync records or hidden caches."""
+        files = []
+        with os.scandir(self.get_user_directory(user_id)) as entries:
+            for entry in entries:
+                if (
+                    entry.is_file(follow_symlinks=False)
+                    and not entry.name.startswith(".")
+                    and not entry.name.endswith((LOCK_SUFFIX, SYNC_SUFFIX))
+                ):
+                    files.append(Path(entry.path))
+        return sorted(files)
+
+    def last_used(self, file_path: Union[str, Path]) -> float:
+        """When a tool last asked for the file, or its mtime if not since startup."""
+        used = self._last_used.get(str(file_path))
+        if used is not None:
+            return used
+        try:
+            return Path(file_path).stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def mark_synced(self, file_path: Union[str, Path], object_name: str, stat: Optional[os.stat_result] = None) -> None:
+        """Record that the file's current contents are stored in MinIO as ``object_name``.
+
+        Call while holding the file's lock, right after the transfer, or pass
+        the ``stat`` of the file taken when the uploaded copy was made.
+        """
+        path = Path(file_path)
+        stat = stat or path.stat()
+        record = {
+            "object": object_name,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "synced_at": time.time(),
+        }
+        sync_path = self._sync_path(path)
+        temp_path = sync_path.with_name(sync_path.name + ".tmp")
+        temp_path.write_text(json.dumps(record))
+        temp_path.replace(sync_path)
+
+    def sync_record(self, file_path: Union[str, Path]) -> Optional[Dict]:
+        """The last ``mark_synced`` record for the file, if any."""
+        try:
+            return json.loads(self._sync_path(Path(file_path)).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def is_clean(self, file_path: Union[str, Path]) -> bool:
+        """Whether the file is unchanged since it was last synced with MinIO.
+
+        Any save changes the file's mtime, so edits made after a sync make
+        it dirty without the write tools having to report them.
+        """
+        record = self.sync_record(file_path)
+        if record is None:
+            return False
+        try:
+            stat = Path(file_path).stat()
+        except OSError:
+            return False
+        return stat.st_size == record.get("size") and stat.st_mtime_ns == record.get("mtime_ns")
+
+    def clear_sync_record(self, file_path: Union[str, Path]) -> None:
+        """Forget the file's sync record, after the file itself was deleted."""
+        self._sync_path(Path(file_path)).unlink(missing_ok=True)
+
+    def remove_file(self, file_path: Union[str, Path], only_if_clean: bool = True) -> bool:
+        """Delete a local file and its sidecars unless it is in use (or dirty).
+
+        Returns:
+            True if the file was removed
+        """
+        path = Path(file_path)
+        try:
+            with self.lock_file(path, timeout=0):
+                if only_if_clean and not self.is_clean(path):
+                    return False
+                path.unlink(missing_ok=True)
+                self._sync_path(path).unlink(missing_ok=True)
+                self._last_used.pop(str(path), None)
+        except filelock.Timeout:
+            return False
+        self.remove_orphan_lock(self._lock_path(path))
+        return True
+
+    def remove_orphan_lock(self, lock_path: Union[str, Path]) -> bool:
+        """Delete a lock file whose workbook is gone, if no one holds or waits for it.
+
+        Returns:
+            True if the lock file was removed
+        """
+        lock_path = Path(lock_path)
+        file_path = lock_path.with_name(lock_path.name[:-len(LOCK_SUFFIX)])
+        with self._lock_users_lock:
+            # Holding this lock keeps lock_file from opening the lock file meanwhile
+            if self._lock_users.get(str(file_path)) or file_path.exists():
+                return False
+            lock = filelock.FileLock(lock_path, timeout=0)
+            try:
+                lock.acquire()
+            except filelock.Timeout:
+                # Held by another process
+                return False
+            try:
+                lock_path.unlink(missing_ok=True)
+            finally:
+                lock.release()
+        return True
+
+    def _lock_path(self, file_path: Path) -> Path:
+        return Path(str(file_path) + LOCK_SUFFIX)
+
+    def _sync_path(self, file_path: Path) -> Path:
+        return Path(str(file_path) + SYNC_SUFFIX)
+
+    def _track_lock_user(self, file_path: Union[str, Path], delta: int) -> None:
+        key = str(file_path)
+        with self._lock_users_lock:
+            count = self._lock_users.get(key, 0) + delta
+            if count > 0:
+                self._lock_users[key] = count
+            else:
+                self._lock_users.pop(key, None)
     
     @contextmanager
     def lock_file(self, file_path: Union[str, Path], timeout: float = 30.0):
@@ -64,17 +322,20 @@ class FileManager:
         Raises:
             TimeoutError: If lock cannot be acquired within timeout
         """
-        lock_path = Path(str(file_path) + '.lock')
+        lock_path = self._lock_path(Path(file_path))
         lock = filelock.FileLock(lock_path, timeout=timeout)
         lock_acquired = False
 
+        self._track_lock_user(file_path, 1)
         try:
-            lock.acquire()
+            with phase("lock_wait"):
+                lock.acquire()
             lock_acquired = True
             yield file_path
         finally:
             if lock_acquired:
                 lock.release()
+            self._track_lock_user(file_path, -1)
 
 
 def get_safe_file_name(file_name: str) -> str:
@@ -0,0 +1,219 @@
+"""
+Background lifecycle management of the local file tier (excel_files).
+
+Local files are a working copy; MinIO holds the durable one. The janitor
+periodically enforces per-user and global byte quotas by evicting clean
+files (unchanged since their last sync with MinIO) in least-recently-used
+order. It also removes lock and sync records whose workbook is gone.
+Files with unsynced changes are never evicted. At shutdown, clean files
+are removed and unsynced ones are kept for the next start.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from .config import JanitorConfig
+from .file_manager import LOCK_SUFFIX, SYNC_SUFFIX
+from .metrics import REGISTRY
+
+logger = logging.getLogger("excel-mcp")
+
+# Evict down to this fraction of a quota, so each pass frees some headroom
+LOW_WATERMARK = 0.9
+
+local_bytes = REGISTRY.gauge(
+    "excel_mcp_local_bytes", "Bytes of local files by sync state (clean, dirty, cache).", ("state",)
+)
+local_files = REGISTRY.gauge(
+    "excel_mcp_local_files", "Local files by sync state (clean, dirty, cache).", ("state",)
+)
+users_over_quota = REGISTRY.gauge(
+    "excel_mcp_users_over_quota", "Users still over their local quota after eviction (unsynced files)."
+)
+evictions = REGISTRY.counter(
+    "excel_mcp_evictions_total", "Local files evicted, by reason (user_quota, global_quota, shutdown).", ("reason",)
+)
+evicted_bytes = REGISTRY.counter(
+    "excel_mcp_evicted_bytes_total", "Bytes of local files evicted, by reason.", ("reason",)
+)
+orphans_removed = REGISTRY.counter(
+    "excel_mcp_orphans_removed_total", "Lock and sync records removed after their workbook was gone.", ("kind",)
+)
+janitor_seconds = REGISTRY.histogram("excel_mcp_janitor_seconds", "Duration of janitor passes in seconds.")
+
+
+@dataclass
+class LocalFile:
+    path: Path
+    user_id: str
+    size: int
+    last_used: float
+    # clean: synced with MinIO; dirty: unsynced changes; cache: derived (chart previews)
+    state: str
+
+
+def _walk(directory: Path, derived: bool = False) -> Iterator[Tuple[os.DirEntry, bool]]:
+    """Regular files under a user directory; hidden subdirectories hold derived caches."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk(Path(entry.path), derived or entry.name.startswith("."))
+            elif entry.is_file(follow_symlinks=False):
+                yield entry, derived
+
+
+class Janitor:
+    """Quota enforcement, LRU eviction and orphan cleanup for local files."""
+
+    def __init__(self, config: JanitorConfig, file_manager):
+        self.config = config
+        self.file_manager = file_manager
+        self.user_quota = int(config.user_quota_mb * 1024 * 1024)
+        self.global_quota = int(config.global_quota_mb * 1024 * 1024)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="excel-mcp-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.config.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Janitor pass failed: {e}")
+
+    def scan(self) -> List[LocalFile]:
+        """Local workbooks and caches, after removing orphaned lock and sync records."""
+        files = []
+        now = time.time()
+        for user_id, directory in self.file_manager.iter_user_directories():
+            try:
+                entries = list(_walk(directory))
+            except OSError:
+                # Removed while scanning
+                continue
+            for entry, derived in entries:
+                path = Path(entry.path)
+                if entry.name.endswith(LOCK_SUFFIX) or entry.name.endswith(SYNC_SUFFIX):
+                    self._remove_if_orphan(path, now)
+                    continue
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+                if derived:
+                    state = "cache"
+                else:
+                    state = "clean" if self.file_manager.is_clean(path) else "dirty"
+                files.append(LocalFile(path, user_id, size, self.file_manager.last_used(path), state))
+        return files
+
+    def _remove_if_orphan(self, path: Path, now: float) -> None:
+        suffix = LOCK_SUFFIX if path.name.endswith(LOCK_SUFFIX) else SYNC_SUFFIX
+        if path.with_name(path.name[:-len(suffix)]).exists():
+            return
+        try:
+            if now - path.stat().st_mtime < self.config.min_idle_seconds:
+                return
+        except OSError:
+            return
+        if suffix == LOCK_SUFFIX:
+            if self.file_manager.remove_orphan_lock(path):
+                orphans_removed.inc("lock")
+        else:
+            path.unlink(missing_ok=True)
+            orphans_removed.inc("sync_record")
+
+    def _evict(self, candidates: List[LocalFile], excess: int, reason: str) -> int:
+        """Evict least recently used candidates until ``excess`` bytes are freed; returns bytes freed."""
+        freed = 0
+        for item in sorted(candidates, key=lambda item: item.last_used):
+            if freed >= excess:
+                break
+            if item.state == "cache":
+                try:
+                    item.path.unlink()
+                except OSError:
+                    continue
+            elif not self.file_manager.remove_file(item.path):
+                # Locked, or written since the scan
+                continue
+            item.state = "evicted"
+            freed += item.size
+            evictions.inc(reason)
+            evicted_bytes.inc(reason, amount=item.size)
+        return freed
+
+    def run_once(self) -> Dict[str, int]:
+        """One pass: orphan cleanup, then per-user and global quota enforcement."""
+        start = time.perf_counter()
+        files = self.scan()
+        idle_before = time.time() - self.config.min_idle_seconds
+        candidates = [item for item in files if item.state in ("clean", "cache") and item.last_used <= idle_before]
+
+        by_user: Dict[str, List[LocalFile]] = {}
+        for item in files:
+            by_user.setdefault(item.user_id, []).append(item)
+        over_quota = 0
+        if self.user_quota:
+            for user_id, items in by_user.items():
+                total = sum(item.size for item in items)
+                if total <= self.user_quota:
+                    continue
+                excess = total - int(self.user_quota * LOW_WATERMARK)
+                freed = self._evict([item for item in candidates if item.user_id == user_id], excess, "user_quota")
+                if total - freed > self.user_quota:
+                    over_quota += 1
+        if self.global_quota:
+            total = sum(item.size for item in files if item.state != "evicted")
+            if total > self.global_quota:
+                remaining = [item for item in candidates if item.state != "evicted"]
+                freed = self._evict(remaining, total - int(self.global_quota * LOW_WATERMARK), "global_quota")
+                if total - freed > self.global_quota:
+                    logger.warning(
+                        "Local files use %d bytes, over the %d byte quota; the rest are unsynced or in use",
+                        total - freed, self.global_quota,
+                    )
+
+        summary = self._report(files)
+        users_over_quota.set(value=over_quota)
+        summary["users_over_quota"] = over_quota
+        janitor_seconds.observe(time.perf_counter() - start)
+        return summary
+
+    def _report(self, files: List[LocalFile]) -> Dict[str, int]:
+        summary = {}
+        for state in ("clean", "dirty", "cache"):
+            items = [item for item in files if item.state == state]
+            local_files.set(state, value=len(items))
+            local_bytes.set(state, value=sum(item.size for item in items))
+            summary[f"{state}_files"] = len(items)
+        summary["evicted_files"] = sum(1 for item in files if item.state == "evicted")
+        return summary
+
+    def shutdown(self) -> Dict[str, int]:
+        """Remove clean files and caches, keeping files with unsynced changes."""
+        self.stop()
+        files = self.scan()
+        self._evict([item for item in files if item.state in ("clean", "cache")], float("inf"), "shutdown")
+        summary = self._report(files)
+        dirty = [item for item in files if item.state == "dirty"]
+        if dirty:
+            logger.info(
+                "Kept %d local files with unsynced changes (%d bytes) for %d users",
+                len(dirty), sum(item.size for item in dirty), len({item.user_id for item in dirty}),
+            )
+        return summary
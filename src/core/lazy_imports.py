@@ -0,0 +1,151 @@
+"""
+Deferred imports of tool implementations, and background warm-up.
+
+Tool modules bind their implementations through ``lazy`` stubs, so
+registering tools does not import openpyxl, MinIO or the workbook
+utilities. Each stub imports its module on first call. ``start_warmup``
+preloads the same modules in a background thread once the server accepts
+connections, so the first real call does not pay for them either.
+"""
+
+import importlib
+import importlib.util
+import logging
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .metrics import import_seconds
+
+logger = logging.getLogger("excel-mcp")
+
+# Seconds the warm-up thread waits for the server to accept connections
+WARMUP_WAIT_SECONDS = 60.0
+
+# Modules behind lazy stubs, in registration order
+DEFERRED_MODULES: Dict[str, None] = {}
+
+_hooks: Dict[str, List[Callable]] = {}
+_hooks_lock = threading.Lock()
+
+
+def when_imported(name: str, callback: Callable) -> None:
+    """Call ``callback(module)`` once ``name`` is imported, or now if it already is.
+
+    Hooks fire after the first call of a ``lazy`` stub and during warm-up,
+    which are the paths that load the deferred libraries.
+    """
+    with _hooks_lock:
+        if name not in sys.modules:
+            _hooks.setdefault(name, []).append(callback)
+            return
+    callback(sys.modules[name])
+
+
+def _run_hooks() -> None:
+    with _hooks_lock:
+        ready = [name for name in _hooks if name in sys.modules]
+        callbacks = [(name, callback) for name in ready for callback in _hooks.pop(name)]
+    for name, callback in callbacks:
+        callback(sys.modules[name])
+
+
+def import_deferred(name: str, reason: str = "first use") -> object:
+    """Import a deferred module, recording how long it took if it was not loaded yet."""
+    if name in sys.modules:
+        # Still go through importlib, which waits for an import in progress elsewhere
+        module = importlib.import_module(name)
+        if _hooks:
+            _run_hooks()
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed = time.perf_counter() - start
+    import_seconds.set(name, value=elapsed)
+    # Warm-up reports one summary line instead
+    logger.log(
+        logging.DEBUG if reason == "warm-up" else logging.INFO,
+        "Imported %s on %s in %.1f ms", name, reason, elapsed * 1000,
+    )
+    _run_hooks()
+    return module
+
+
+def lazy(module: str, attribute: str, package: Optional[str] = None) -> Callable:
+    """Stand-in for ``from module import attribute`` that imports on first call.
+
+    ``module`` may be relative to ``package``, as in an import statement.
+    Only callables can be deferred; exception classes used in ``except``
+    clauses must be imported directly.
+    """
+    name = importlib.util.resolve_name(module, package) if module.startswith(".") else module
+    DEFERRED_MODULES[name] = None
+    target = None
+
+    def stub(*args, **kwargs):
+        nonlocal target
+        if target is None:
+            target = getattr(import_deferred(name), attribute)
+        return target(*args, **kwargs)
+
+    stub.__name__ = stub.__qualname__ = attribute
+    stub.__doc__ = f"Deferred {name}.{attribute}"
+    return stub
+
+
+def preload() -> Dict[str, float]:
+    """Import every deferred module now; returns seconds added by each.
+
+    Third-party libraries load first so their cost is not attributed to
+    the first utility module that happens to import them.
+    """
+    timings = {}
+    for name in sorted(DEFERRED_MODULES, key=lambda module: module.startswith(__name__.split(".")[0] + ".")):
+        start = time.perf_counter()
+        try:
+            import_deferred(name, reason="warm-up")
+        except Exception as e:
+            logger.error(f"Warm-up failed to import {name}: {e}")
+            continue
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def _wait_for_port(host: str, port: int, timeout: float) -> bool:
+    if host in ("", "0.0.0.0"):
+        host = "127.0.0.1"
+    elif host == "::":
+        host = "::1"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1.0):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def start_warmup(host: str, port: int, timeout: float = WARMUP_WAIT_SECONDS) -> threading.Thread:
+    """Preload deferred modules in the background once ``host:port`` accepts connections."""
+    def run():
+        if not _wait_for_port(host, port, timeout):
+            logger.warning("Skipping warm-up: server did not accept connections within %.0f s", timeout)
+            return
+        start = time.perf_counter()
+        timings = preload()
+        breakdown = ", ".join(
+            f"{name} {seconds * 1000:.0f} ms"
+            for name, seconds in sorted(timings.items(), key=lambda item: item[1], reverse=True)
+            if seconds >= 0.001
+        )
+        logger.info(
+            "Warm-up loaded %d modules in %.0f ms (%s)",
+            len(timings), (time.perf_counter() - start) * 1000, breakdown or "all already loaded",
+        )
+
+    thread = threading.Thread(target=run, name="excel-mcp-warmup", daemon=True)
+    thread.start()
+    return thread
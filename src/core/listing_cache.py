@@ -0,0 +1,77 @@
+"""
+Short-lived cache of users' MinIO object listings.
+
+``list_minio_files`` filters, sorts and pages a user's cached listing
+instead of listing the bucket on every call. Entries expire after a few
+seconds, so changes made by other clients show up quickly, and this
+server's own uploads and downloads drop the user's entry right away. A
+listing that was started before such a change is not stored.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import REGISTRY
+
+# Users whose listing is kept; the least recently listed are dropped first
+MAX_CACHED_USERS = 1024
+
+# (key under the user's prefix, size, last modified in ISO format or None)
+ListingEntry = Tuple[str, int, Optional[str]]
+
+listing_cache_lookups = REGISTRY.counter(
+    "excel_mcp_listing_cache_total", "MinIO listing cache lookups by result (hit, miss).", ("result",)
+)
+
+
+class ListingCache:
+    """Per-user object listings with a TTL and explicit invalidation."""
+
+    def __init__(self, ttl_seconds: float, max_users: int = MAX_CACHED_USERS):
+        self.ttl = ttl_seconds
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._listings: "OrderedDict[str, Tuple[float, List[ListingEntry]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, user_id: str) -> Optional[List[ListingEntry]]:
+        """The user's listing if it is still fresh, else None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            cached = self._listings.get(user_id)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                self._listings.move_to_end(user_id)
+                listing_cache_lookups.inc("hit")
+                return cached[1]
+            self._listings.pop(user_id, None)
+        listing_cache_lookups.inc("miss")
+        return None
+
+    def generation(self, user_id: str) -> int:
+        """Take before listing; pass to ``put`` so a listing overtaken by a change is dropped."""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, user_id: str, entries: List[ListingEntry], generation: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            self._listings[user_id] = (time.monotonic(), entries)
+            self._listings.move_to_end(user_id)
+            while len(self._listings) > self.max_users:
+                self._listings.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop the user's listing after this server changed their objects."""
+        with self._lock:
+            self._listings.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
@@ -0,0 +1,210 @@
+"""
+Asynchronous logging for the MCP server.
+
+Tool threads only put records on a bounded queue. A listener thread
+formats them and does the file and console I/O, so a slow disk never
+stalls a tool call. The log file rotates by size and holds one JSON
+object per line. When the queue is full, records are dropped and
+counted rather than blocking the caller, and a message template that
+repeats too often is rate-limited.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .config import LoggingConfig
+from .metrics import NO_TOOL, REGISTRY, current_tool
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+LOG_FORMATS = ("json", "text")
+
+# Items logged per loop by ItemSampler before the rest are only counted
+ITEM_LOG_LIMIT = 20
+
+# Seconds over which RATE_LIMIT records per message template are let through
+RATE_LIMIT_WINDOW = 60.0
+
+# LogRecord attributes that are not ``extra=`` fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "tool"}
+
+log_records_dropped = REGISTRY.counter(
+    "excel_mcp_log_records_dropped_total",
+    "Log records dropped because the log queue was full or the message was rate-limited.",
+    ("reason",),
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the tool that logged it and any ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        tool = getattr(record, "tool", NO_TOOL)
+        if tool != NO_TOOL:
+            entry["tool"] = tool
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most ``limit`` records per message template through per window.
+
+    Templates are keyed on the unformatted message, so ``%s`` arguments
+    group repeats of the same log line; the first record after a window
+    with suppressed repeats carries a ``suppressed`` count.
+    """
+
+    def __init__(self, limit: int, window: float = RATE_LIMIT_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._windows: Dict[Tuple[str, int, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if state[1] < self.limit:
+                state[1] += 1
+                return True
+            state[2] += 1
+        log_records_dropped.inc("rate_limited")
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records unformatted, dropping them when the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; only capture what is
+        # bound to the calling context
+        record.tool = current_tool()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc("queue_full")
+
+
+class ItemSampler:
+    """Log the first ``limit`` items of a loop, then a count of the rest.
+
+        items = ItemSampler(logger)
+        for obj in objects:
+            items.log("Found file: %s", obj.name)
+        items.finish("files")
+    """
+
+    def __init__(self, logger: logging.Logger, level: int = logging.DEBUG, limit: int = ITEM_LOG_LIMIT):
+        self.logger = logger
+        self.level = level
+        self.limit = limit
+        self.count = 0
+        self._enabled = logger.isEnabledFor(level)
+
+    def log(self, msg: str, *args) -> None:
+        self.count += 1
+        if self._enabled and self.count <= self.limit:
+            self.logger.log(self.level, msg, *args)
+
+    def finish(self, noun: str = "items") -> None:
+        if self._enabled and self.count > self.limit:
+            self.logger.log(self.level, "... %d more %s not logged", self.count - self.limit, noun)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def _build_handlers(log_file: Path, config: LoggingConfig):
+    if config.format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format '{config.format}'; expected one of {', '.join(LOG_FORMATS)}")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=int(config.max_mb * 1024 * 1024),
+        backupCount=config.backup_count,
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(JsonFormatter() if config.format == "json" else logging.Formatter(TEXT_FORMAT))
+    handlers = [file_handler]
+    if config.console:
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(console)
+    return handlers
+
+
+def configure_logging(log_file: Path, config: Optional[LoggingConfig] = None, level: int = logging.INFO) -> None:
+    """Route the root logger through a queue to rotating file and console handlers.
+
+    Calling it again replaces the previous pipeline, flushing its queue first.
+    """
+    global _listener, _queue_handler
+    config = config or LoggingConfig()
+    handlers = _build_handlers(Path(log_file), config)
+    previous = (_listener, _queue_handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=max(config.queue_size, 0))
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RateLimitFilter(config.rate_limit))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    _queue_handler = handler
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler)
+    _shutdown(*previous)
+
+
+def _shutdown(listener, handler) -> None:
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+        for target in listener.handlers:
+            target.close()
+
+
+def stop_logging() -> None:
+    """Flush queued records and close the file and console handlers."""
+    global _listener, _queue_handler
+    previous = (_listener, _queue_handler)
+    _listener = _queue_handler = None
+    _shutdown(*previous)
+
+
+atexit.register(stop_logging)
@@ -2,31 +2,43 @@
 Main FastMCP 2.0 Excel Server.
 """
 
+import hmac
 import logging
 import os
+import time
+from functools import wraps
 from pathlib import Path
 from typing import Dict, List, Set, Any, Optional
 
+_imports_started = time.perf_counter()
+
 # Core components
 from .config import load_config
 from .file_manager import FileManager
+from .janitor import Janitor
+from .lazy_imports import DEFERRED_MODULES, start_warmup
+from .listing_cache import ListingCache
+from .logging_setup import configure_logging
+from .metrics import REGISTRY, instrument_libraries, startup_seconds, track_tool
+from .profiling import Profiler
+from .sync import WriteBehindSync
+from .trace_recorder import TraceRecorder
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 
 # Tool registration modules
 from ..tools.excel_read import register_excel_read_tools
 from ..tools.excel_write import register_excel_write_tools
-from ..tools.minio_tools import register_minio_tools
+from ..tools.minio_tools import _get_minio_client, _get_unique_file_name, register_minio_tools
+from ..utils.internal_sheets import guard_internal_sheets
+
+# Framework and tool module imports; tool implementations are deferred (see lazy_imports)
+IMPORT_SECONDS = time.perf_counter() - _imports_started
 
 # Setup logging
 LOG_FILE = Path(__file__).parent.parent / "excel-mcp.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()  # Also log to console
-    ],
-)
+configure_logging(LOG_FILE)
 logger = logging.getLogger("excel-mcp")
 
 
@@ -43,10 +55,62 @@ class SimpleFastMCP:
             name: Name of the server
             config_path: Path to configuration file (optional)
         """
+        started = time.perf_counter()
         self.config = load_config(config_path)
+        configure_logging(LOG_FILE, self.config.logging)
+        configured = time.perf_counter()
         self._mcp = FastMCP(name)
         self.file_manager = FileManager(self.config)
+        self.janitor = Janitor(self.config.janitor, self.file_manager)
+        self.listing_cache = ListingCache(self.config.minio.list_cache_seconds)
+        self.sync = None
+        if self.config.sync.enabled:
+            self.sync = WriteBehindSync(
+                self.config.sync,
+                self.file_manager,
+                client_factory=lambda: _get_minio_client(self.config),
+                bucket=self.config.minio.bucket,
+                unique_name=lambda client, user_id, file_name: _get_unique_file_name(
+                    client, self.config.minio.bucket, user_id, file_name
+                ),
+                listing_cache=self.listing_cache,
+            )
+        self.metrics_enabled = self.config.mcp.metrics_enabled
+        if self.metrics_enabled:
+            instrument_libraries()
+            self._register_metrics_route()
+        self.profiler = None
+        if self.config.profiling.enabled:
+            self.profiler = Profiler(self.config.profiling)
+            if self.config.profiling.admin_token:
+                self._register_profiling_routes()
+            else:
+                logger.warning("Profiling is enabled without ADMIN_TOKEN; the /debug routes are not served")
+        self.trace_recorder = None
+        if self.config.trace.enabled:
+            self.trace_recorder = TraceRecorder(self.config.trace, self.file_manager)
+            logger.info("Recording tool call traces to %s", self.config.trace.path)
+        set_up = time.perf_counter()
         self._register_all_tools()
+        self.startup_timings = {
+            "imports": IMPORT_SECONDS,
+            "config": configured - started,
+            "setup": set_up - configured,
+            "tools": time.perf_counter() - set_up,
+        }
+        self._report_startup()
+    
+    def _report_startup(self):
+        """Log and export how long each startup phase took."""
+        for phase_name, seconds in self.startup_timings.items():
+            startup_seconds.set(phase_name, value=seconds)
+        logger.info(
+            "Startup took %.0f ms (%s); %d tool modules deferred to %s",
+            sum(self.startup_timings.values()) * 1000,
+            ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.startup_timings.items()),
+            len(DEFERRED_MODULES),
+            "warm-up" if self.config.mcp.warmup else "first use",
+        )
     
     def _register_all_tools(self):
         """Register all tool modules with the MCP server."""
@@ -58,6 +122,80 @@ class SimpleFastMCP:
         register_minio_tools(self)
         
         logger.info("Registered tools")
+
+    def _register_metrics_route(self):
+        """Serve metrics at /metrics (Prometheus text, or JSON with ?format=json)."""
+        @self._mcp.custom_route("/metrics", methods=["GET"])
+        async def metrics(request: Request):
+            if request.query_params.get("format") == "json":
+                return JSONResponse(REGISTRY.snapshot())
+            return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    def _register_profiling_routes(self):
+        """Serve captured tool profiles and the profiling selection under /debug.
+
+        Every request must carry ``Authorization: Bearer <ADMIN_TOKEN>``.
+        """
+        profiler = self.profiler
+        expected = f"Bearer {self.config.profiling.admin_token}".encode("utf-8")
+
+        def admin_only(handler):
+            @wraps(handler)
+            async def wrapper(request: Request):
+                given = request.headers.get("authorization", "").encode("utf-8")
+                if not hmac.compare_digest(given, expected):
+                    return JSONResponse({"error": "Unauthorized"}, status_code=401)
+                return await handler(request)
+            return wrapper
+
+        @self._mcp.custom_route("/debug/profiles", methods=["GET", "DELETE"])
+        @admin_only
+        async def list_profiles(request: Request):
+            if request.method == "DELETE":
+                profiler.clear()
+            return JSONResponse([capture.summary() for capture in profiler.profiles()])
+
+        @self._mcp.custom_route("/debug/profiles/{profile_id:int}", methods=["GET"])
+        @admin_only
+        async def download_profile(request: Request):
+            capture = profiler.get(request.path_params["profile_id"])
+            if capture is None:
+                return JSONResponse({"error": "Profile not found"}, status_code=404)
+            fmt = request.query_params.get("format", capture.formats()[0])
+            if fmt not in capture.formats():
+                return JSONResponse(
+                    {"error": f"Format must be one of {', '.join(capture.formats())}"}, status_code=400
+                )
+            if fmt == "text":
+                return PlainTextResponse(capture.text)
+            if fmt == "pstats":
+                body, extension = capture.pstats_data, "pstats"
+            else:
+                body, extension = capture.collapsed.encode("utf-8"), "folded"
+            filename = f"{capture.tool}-{capture.profile_id}.{extension}"
+            return Response(
+                body,
+                media_type="application/octet-stream",
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            )
+
+        @self._mcp.custom_route("/debug/profiling", methods=["GET", "POST"])
+        @admin_only
+        async def profiling_settings(request: Request):
+            if request.method == "POST":
+                try:
+                    body = await request.json()
+                    profiler.update(
+                        tools=body.get("tools"),
+                        users=body.get("users"),
+                        sample_rate=body.get("sample_rate"),
+                        mode=body.get("mode"),
+                        min_seconds=body.get("min_seconds"),
+                    )
+                except (ValueError, TypeError, AttributeError) as e:
+                    return JSONResponse({"error": str(e)}, status_code=400)
+                logger.info("Profiling selection changed: %s", profiler.settings.as_dict())
+            return JSONResponse(profiler.settings.as_dict())
     
     def tool(self, **kwargs):
         """
@@ -67,6 +205,17 @@ class SimpleFastMCP:
             **kwargs: Arguments passed to FastMCP tool decorator
         """
         def decorator(func):
+            name = kwargs.get("name") or func.__name__
+            if "write" in kwargs.get("tags", ()):
+                func = guard_internal_sheets(func)
+            if self.sync is not None and "write" in kwargs.get("tags", ()):
+                func = self.sync.wrap(name, func)
+            if self.profiler is not None:
+                func = self.profiler.wrap(name, func)
+            if self.metrics_enabled:
+                func = track_tool(name, func)
+            if self.trace_recorder is not None:
+                func = self.trace_recorder.wrap(name, func)
             # Register with FastMCP
             decorated_func = self._mcp.tool(**kwargs)(func)
             return decorated_func
@@ -93,11 +242,19 @@ class SimpleFastMCP:
         # Set up directory
         os.makedirs(self.config.mcp.excel_files_path, exist_ok=True)
         
+        # Preload tool implementations once the port is bound
+        if self.config.mcp.warmup:
+            start_warmup(host, port)
+        if self.config.janitor.enabled:
+            self.janitor.start()
+        if self.sync is not None:
+            self.sync.start()
+        
         try:
-            logger.info(f"Starting Excel MCP server (files directory: {self.config.mcp.excel_files_path})")
-            logger.info(f"Host: {host}")
-            logger.info(f"Port: {port}")
-            logger.info(f"Log level: {log_level}")
+            logger.info("Starting Excel MCP server (files directory: %s)", self.config.mcp.excel_files_path)
+            logger.info("Host: %s", host)
+            logger.info("Port: %s", port)
+            logger.info("Log level: %s", log_level)
             
             self._mcp.run(
                 transport="http",
@@ -107,25 +264,28 @@ class SimpleFastMCP:
             )
         except KeyboardInterrupt:
             logger.info("Server stopped by user")
-            # Clean up temporary files
-            try:
-                import shutil
-                if hasattr(self, 'config') and hasattr(self.config, 'mcp') and hasattr(self.config.mcp, 'excel_files_path'):
-                    excel_files_dir = Path(self.config.mcp.excel_files_path)
-                    if excel_files_dir.exists():
-                        # Remove all user directories under excel_files_path
-                        for item in excel_files_dir.iterdir():
-                            if item.is_dir():
-                                shutil.rmtree(item)
-                                logger.info(f"Removed temporary directory: {item}")
-            except Exception as cleanup_error:
-                logger.error(f"Error during cleanup: {cleanup_error}")
         except Exception as e:
             logger.error(f"Server failed: {e}")
             raise
         finally:
+            self._shutdown_local_files()
             logger.info("Server shutdown complete")
 
+    def _shutdown_local_files(self):
+        """Flush write-behind uploads, then remove synced local files, keeping unsynced work."""
+        try:
+            if self.sync is not None:
+                self.sync.stop(flush=True)
+            self.janitor.stop()
+            if self.config.janitor.clean_on_shutdown:
+                summary = self.janitor.shutdown()
+                logger.info(
+                    "Removed %d synced local files; kept %d with unsynced changes",
+                    summary["evicted_files"], summary["dirty_files"],
+                )
+        except Exception as cleanup_error:
+            logger.error(f"Error during cleanup: {cleanup_error}")
+
 
 def main():
     """Main entry point for the server."""
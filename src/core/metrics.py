@@ -0,0 +1,403 @@
+"""
+Process-wide metrics for the MCP server, rendered in the Prometheus text format.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; tool calls range from sub-millisecond reads to multi-minute imports
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+# Phase label used for time that is not lock wait, load, save or MinIO transfer
+OPERATION_PHASE = "operation"
+
+# Tool label for work done outside any tool call (startup, background tasks)
+NO_TOOL = "none"
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], lock: threading.RLock):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = lock
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"/".join(labels): value for labels, value in sorted(self._values.items())}
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set.
+
+    Quantiles are estimated from the buckets the same way Prometheus'
+    histogram_quantile does, by interpolating within the bucket that holds
+    the requested rank.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Labels, List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def quantile(self, q: float, *labels: str) -> Optional[float]:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None or series[2] == 0:
+                return None
+            counts, _, total = list(series[0]), series[1], series[2]
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if index == len(self.buckets):
+                    # Above the last bound: the best estimate is that bound
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, (counts, total_sum, total_count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.label_names, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{label_text} {total_count}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            keys = sorted(self._series)
+        result = {}
+        for labels in keys:
+            _, total_sum, total_count = self._series[labels]
+            result["/".join(labels)] = {
+                "count": total_count,
+                "sum": total_sum,
+                "p50": self.quantile(0.5, *labels),
+                "p95": self.quantile(0.95, *labels),
+                "p99": self.quantile(0.99, *labels),
+            }
+        return result
+
+
+class MetricsRegistry:
+    """A set of metrics rendered together."""
+
+    def __init__(self):
+        # Reentrant: rendering a histogram snapshot computes quantiles under the same lock
+        self._lock = threading.RLock()
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labels, self._lock))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help_text, labels, self._lock))
+
+    def histogram(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, help_text, labels, self._lock, buckets=buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view, with p50/p95/p99 for histograms."""
+        with self._lock:
+            return {metric.name: metric.snapshot() for metric in self._metrics}
+
+
+REGISTRY = MetricsRegistry()
+
+tool_calls = REGISTRY.counter(
+    "excel_mcp_tool_calls_total", "Tool calls by outcome (ok, error, exception).", ("tool", "outcome")
+)
+tool_in_flight = REGISTRY.gauge("excel_mcp_tool_in_flight", "Tool calls currently running.", ("tool",))
+tool_seconds = REGISTRY.histogram("excel_mcp_tool_seconds", "Tool call latency in seconds.", ("tool",))
+phase_seconds = REGISTRY.histogram(
+    "excel_mcp_tool_phase_seconds",
+    "Time per tool call spent in each phase (lock_wait, load, save, minio, operation).",
+    ("tool", "phase"),
+)
+bytes_read = REGISTRY.counter(
+    "excel_mcp_bytes_read_total", "Bytes read from workbooks and MinIO.", ("tool", "source")
+)
+bytes_written = REGISTRY.counter(
+    "excel_mcp_bytes_written_total", "Bytes written to workbooks and MinIO.", ("tool", "target")
+)
+cells_touched = REGISTRY.counter(
+    "excel_mcp_cells_total", "Cells materialized by workbook loads and saves.", ("tool", "direction")
+)
+startup_seconds = REGISTRY.gauge(
+    "excel_mcp_startup_seconds", "Time spent in each server startup phase.", ("phase",)
+)
+import_seconds = REGISTRY.gauge(
+    "excel_mcp_import_seconds", "Time to import each deferred tool module (on warm-up or first use).", ("module",)
+)
+
+
+class _ToolCall:
+    """Phase timings of the tool call running in the current context."""
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.phases: Dict[str, float] = {}
+        self.depth = 0
+
+
+_current_call: ContextVar[Optional[_ToolCall]] = ContextVar("excel_mcp_tool_call", default=None)
+
+
+def current_tool() -> str:
+    call = _current_call.get()
+    return call.tool if call is not None else NO_TOOL
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a block as one phase of the current tool call.
+
+    Phases do not nest: a load inside a timed MinIO transfer counts as
+    transfer time only.
+    """
+    call = _current_call.get()
+    if call is not None and call.depth:
+        yield
+        return
+    if call is not None:
+        call.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if call is None:
+            phase_seconds.observe(elapsed, NO_TOOL, name)
+        else:
+            call.depth -= 1
+            call.phases[name] = call.phases.get(name, 0.0) + elapsed
+
+
+def tool_outcome(result: Any) -> str:
+    # Tools report domain errors as "Error: ..." (or "Pivot Error: ...") strings
+    if isinstance(result, str) and result[:32].split(":", 1)[0].endswith("Error"):
+        return "error"
+    return "ok"
+
+
+def track_tool(name: str, func: Callable) -> Callable:
+    """Wrap a tool function to record its latency, phases, outcome and in-flight count."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        call = _ToolCall(name)
+        token = _current_call.set(call)
+        tool_in_flight.inc(name)
+        start = time.perf_counter()
+        outcome = "exception"
+        try:
+            result = func(*args, **kwargs)
+            outcome = tool_outcome(result)
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_call.reset(token)
+            tool_in_flight.dec(name)
+            tool_calls.inc(name, outcome)
+            tool_seconds.observe(elapsed, name)
+            for phase_name, seconds in call.phases.items():
+                phase_seconds.observe(seconds, name, phase_name)
+            phase_seconds.observe(max(elapsed - sum(call.phases.values()), 0.0), name, OPERATION_PHASE)
+    return wrapper
+
+
+def _file_size(path: Any) -> int:
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return 0
+
+
+def _cell_count(wb) -> int:
+    return sum(len(getattr(ws, "_cells", ())) for ws in wb.worksheets)
+
+
+def _wrap_once(owner: type, attribute: str, make_wrapper: Callable[[Callable], Callable]) -> None:
+    original = getattr(owner, attribute)
+    if getattr(original, "_excel_mcp_metrics", False):
+        return
+    wrapper = wraps(original)(make_wrapper(original))
+    wrapper._excel_mcp_metrics = True
+    setattr(owner, attribute, wrapper)
+
+
+def instrument_libraries() -> None:
+    """Time workbook loads and saves and MinIO transfers wherever they happen.
+
+    Tools call openpyxl and MinIO from many modules, so the phases are
+    measured on the library entry points rather than at each call site.
+    Both libraries are imported lazily, so each is patched once it loads.
+    """
+    from .lazy_imports import when_imported
+
+    when_imported("openpyxl", _instrument_openpyxl)
+    when_imported("minio", _instrument_minio)
+
+
+def _instrument_openpyxl(_module) -> None:
+    from openpyxl.reader.excel import ExcelReader
+    from openpyxl.workbook.workbook import Workbook
+
+    from ..utils.package import Package
+
+    def reader_read(original):
+        def read(self, *args, **kwargs):
+            with phase("load"):
+                result = original(self, *args, **kwargs)
+            tool = current_tool()
+            bytes_read.inc(tool, "workbook", amount=_file_size(getattr(self.archive, "filename", None)))
+            cells_touched.inc(tool, "loaded", amount=_cell_count(self.wb))
+            return result
+        return read
+
+    def workbook_save(original):
+        def save(self, filename, *args, **kwargs):
+            with phase("save"):
+                result = original(self, filename, *args, **kwargs)
+            tool = current_tool()
+            bytes_written.inc(tool, "workbook", amount=_file_size(filename))
+            cells_touched.inc(tool, "saved", amount=_cell_count(self))
+            return result
+        return save
+
+    def package_save(original):
+        def save(self, *args, **kwargs):
+            with phase("save"):
+                result = original(self, *args, **kwargs)
+            bytes_written.inc(current_tool(), "workbook", amount=_file_size(self.path))
+            return result
+        return save
+
+    _wrap_once(ExcelReader, "read", reader_read)
+    _wrap_once(Workbook, "save", workbook_save)
+    _wrap_once(Package, "save", package_save)
+
+
+def _instrument_minio(_module) -> None:
+    from minio import Minio
+
+    def minio_get(original):
+        def fget_object(self, bucket_name, object_name, file_path, *args, **kwargs):
+            with phase("minio"):
+                result = original(self, bucket_name, object_name, file_path, *args, **kwargs)
+            bytes_read.inc(current_tool(), "minio", amount=_file_size(file_path))
+            return result
+        return fget_object
+
+    def minio_put(original):
+        def fput_object(self, bucket_name, object_name, file_path, *args, **kwargs):
+            with phase("minio"):
+                result = original(self, bucket_name, object_name, file_path, *args, **kwargs)
+            bytes_written.inc(current_tool(), "minio", amount=_file_size(file_path))
+            return result
+        return fput_object
+
+    _wrap_once(Minio, "fget_object", minio_get)
+    _wrap_once(Minio, "fput_object", minio_put)
@@ -0,0 +1,278 @@
+"""
+Opt-in profiling of individual tool calls.
+
+Calls are selected by tool name, by user or at a sampling rate, profiled
+with cProfile or a stack sampler, and the slowest ones are kept in memory
+for download as pstats or collapsed-stack (flamegraph) files.
+"""
+
+import cProfile
+import heapq
+import inspect
+import io
+import itertools
+import logging
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .config import ProfilingConfig
+from .metrics import tool_outcome
+from .redaction import MAX_ARG_CHARS, REDACTED, is_secret
+
+logger = logging.getLogger("excel-mcp")
+
+PROFILE_MODES = ("cprofile", "sample")
+
+# Rows shown in the text view of a cProfile capture
+TEXT_ROWS = 40
+
+
+def redact_arguments(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep identifiers and small scalars, reduce payloads to their shape."""
+    redacted = {}
+    for name, value in arguments.items():
+        if is_secret(name):
+            redacted[name] = REDACTED
+        elif value is None or isinstance(value, (bool, int, float)):
+            redacted[name] = value
+        elif isinstance(value, str):
+            redacted[name] = value if len(value) <= MAX_ARG_CHARS else f"<str len={len(value)}>"
+        elif isinstance(value, (list, tuple, dict, set)):
+            redacted[name] = f"<{type(value).__name__} len={len(value)}>"
+        else:
+            redacted[name] = f"<{type(value).__name__}>"
+    return redacted
+
+
+class StackSampler:
+    """Sample one thread's Python stack at a fixed interval into collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="excel-mcp-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+@dataclass
+class CapturedProfile:
+    """One profiled tool call."""
+    profile_id: int
+    tool: str
+    user_id: Optional[str]
+    mode: str
+    started: float
+    seconds: float
+    arguments: Dict[str, Any]
+    outcome: str
+    pstats_data: bytes = b""
+    collapsed: str = ""
+    text: str = ""
+
+    def formats(self) -> List[str]:
+        return ["pstats", "text"] if self.mode == "cprofile" else ["collapsed", "text"]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.profile_id,
+            "tool": self.tool,
+            "user_id": self.user_id,
+            "mode": self.mode,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "seconds": round(self.seconds, 6),
+            "outcome": self.outcome,
+            "arguments": self.arguments,
+            "formats": self.formats(),
+        }
+
+
+@dataclass
+class ProfilingSettings:
+    """Which calls are profiled; adjustable at runtime through the admin route."""
+    tools: List[str] = field(default_factory=list)
+    users: List[str] = field(default_factory=list)
+    sample_rate: float = 0.0
+    mode: str = "cprofile"
+    min_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "tools": sorted(self.tools),
+            "users": sorted(self.users),
+            "sample_rate": self.sample_rate,
+            "mode": self.mode,
+            "min_seconds": self.min_seconds,
+        }
+
+
+class Profiler:
+    """Decides which tool calls to profile and keeps the slowest captures."""
+
+    def __init__(self, config: ProfilingConfig):
+        self.keep = max(int(config.keep), 1)
+        self.sample_interval = config.sample_interval
+        self.settings = ProfilingSettings()
+        self.update(
+            tools=config.tools,
+            users=config.users,
+            sample_rate=config.sample_rate,
+            mode=config.mode,
+            min_seconds=config.min_seconds,
+        )
+        self._lock = threading.Lock()
+        # Min-heap on duration so the fastest capture is evicted first
+        self._heap: List[tuple] = []
+        self._ids = itertools.count(1)
+
+    def update(
+        self,
+        tools: Optional[Iterable[str]] = None,
+        users: Optional[Iterable[str]] = None,
+        sample_rate: Optional[float] = None,
+        mode: Optional[str] = None,
+        min_seconds: Optional[float] = None,
+    ) -> ProfilingSettings:
+        """Change the selection; arguments left as None keep their value."""
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Profile mode must be one of {', '.join(PROFILE_MODES)}")
+        if sample_rate is not None and not 0.0 <= float(sample_rate) <= 1.0:
+            raise ValueError("Sample rate must be between 0 and 1")
+        if min_seconds is not None and float(min_seconds) < 0:
+            raise ValueError("Minimum seconds cannot be negative")
+        current = self.settings
+        self.settings = ProfilingSettings(
+            tools=list(tools) if tools is not None else current.tools,
+            users=list(users) if users is not None else current.users,
+            sample_rate=float(sample_rate) if sample_rate is not None else current.sample_rate,
+            mode=mode or current.mode,
+            min_seconds=float(min_seconds) if min_seconds is not None else current.min_seconds,
+        )
+        return self.settings
+
+    def should_profile(self, tool: str, user_id: Optional[str]) -> bool:
+        settings = self.settings
+        if tool in settings.tools or (user_id is not None and user_id in settings.users):
+            return True
+        return settings.sample_rate > 0 and random.random() < settings.sample_rate
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Wrap a tool function so selected calls run under a profiler."""
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            user_id = kwargs.get("user_id")
+            if not self.should_profile(name, user_id):
+                return func(*args, **kwargs)
+            try:
+                bound = signature.bind_partial(*args, **kwargs)
+                arguments = redact_arguments(bound.arguments)
+            except TypeError:
+                arguments = {}
+            return self._run(name, user_id, arguments, func, args, kwargs)
+        return wrapper
+
+    def _run(self, name, user_id, arguments, func, args, kwargs):
+        mode = self.settings.mode
+        profile = sampler = None
+        if mode == "cprofile":
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Only one cProfile may be active per interpreter on 3.12+
+                logger.info("Skipping profile of %s: another profile is running", name)
+                return func(*args, **kwargs)
+        else:
+            sampler = StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+        started = time.time()
+        start = time.perf_counter()
+        outcome = "exception"
+        try:
+            result = func(*args, **kwargs)
+            outcome = tool_outcome(result)
+            return result
+        finally:
+            seconds = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            else:
+                sampler.stop()
+            if seconds >= self.settings.min_seconds:
+                capture = CapturedProfile(
+                    profile_id=next(self._ids),
+                    tool=name,
+                    user_id=user_id,
+                    mode=mode,
+                    started=started,
+                    seconds=seconds,
+                    arguments=arguments,
+                    outcome=outcome,
+                )
+                if profile is not None:
+                    text = io.StringIO()
+                    stats = pstats.Stats(profile, stream=text)
+                    capture.pstats_data = marshal.dumps(stats.stats)
+                    stats.sort_stats("cumulative").print_stats(TEXT_ROWS)
+                    capture.text = text.getvalue()
+                else:
+                    capture.collapsed = sampler.collapsed()
+                    capture.text = capture.collapsed
+                self._store(capture)
+
+    def _store(self, capture: CapturedProfile) -> None:
+        entry = (capture.seconds, capture.profile_id, capture)
+        with self._lock:
+            if len(self._heap) < self.keep:
+                heapq.heappush(self._heap, entry)
+            elif capture.seconds > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def profiles(self) -> List[CapturedProfile]:
+        """Kept captures, slowest first."""
+        with self._lock:
+            entries = list(self._heap)
+        return [capture for _, _, capture in sorted(entries, key=lambda entry: entry[0], reverse=True)]
+
+    def get(self, profile_id: int) -> Optional[CapturedProfile]:
+        with self._lock:
+            for _, entry_id, capture in self._heap:
+                if entry_id == profile_id:
+                    return capture
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap.clear()
@@ -0,0 +1,17 @@
+"""
+Argument redaction shared by the profiler and the trace recorder.
+"""
+
+# Argument names whose values are never stored
+SECRET_MARKERS = ("secret", "password", "token", "access_key", "credential")
+
+# Longest string argument stored as-is; longer ones are reduced to their length
+MAX_ARG_CHARS = 64
+
+REDACTED = "<redacted>"
+
+
+def is_secret(name: str) -> bool:
+    """Whether an argument's name marks its value as a credential."""
+    lowered = name.lower()
+    return any(marker in lowered for marker in SECRET_MARKERS)
@@ -0,0 +1,291 @@
+"""
+Write-behind sync of edited workbooks to MinIO.
+
+Write tools only mark their workbook dirty and return. A scheduler thread
+uploads dirty files once they have been quiet for the debounce interval,
+or at the latest ``max_delay_seconds`` after the first unsynced edit.
+Repeated edits coalesce into one upload, and a bounded pool limits
+concurrent uploads. A snapshot copy is uploaded, so edits do not wait for
+the transfer, and the local copy stays in place for the next call. A
+periodic scan picks up files changed outside the tool hooks and work left
+over from a previous run.
+"""
+
+import logging
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import SyncConfig
+from .metrics import REGISTRY
+
+logger = logging.getLogger("excel-mcp")
+
+# Tool arguments naming a local file the tool may have written
+FILE_ARGUMENTS = ("file_name", "output_file")
+
+# Snapshots being uploaded, under the excel_files directory
+SNAPSHOT_DIRECTORY = ".sync-snapshots"
+
+sync_pending = REGISTRY.gauge("excel_mcp_sync_pending", "Dirty files waiting for or in write-behind upload.")
+sync_uploads = REGISTRY.counter(
+    "excel_mcp_sync_uploads_total", "Write-behind uploads by outcome (ok, error).", ("outcome",)
+)
+sync_lag_seconds = REGISTRY.histogram(
+    "excel_mcp_sync_lag_seconds", "Time from a file's first unsynced edit to its upload completing."
+)
+
+
+def object_name_for(user_id: str, file_name: str) -> str:
+    return f"private/{user_id}/{file_name}"
+
+
+@dataclass
+class SyncEntry:
+    user_id: str
+    path: Path
+    # Monotonic times
+    dirty_since: float
+    due: float
+    attempts: int = 0
+    last_error: Optional[str] = None
+    uploading: bool = False
+    # Edited again while an upload was running
+    redirtied: bool = False
+
+
+class WriteBehindSync:
+    """Debounced, coalesced background uploads of dirty local files.
+
+    ``unique_name(client, user_id, file_name)`` returns a file name that no
+    object in the user's folder uses yet; files never synced before are
+    uploaded under it.
+    """
+
+    def __init__(self, config: SyncConfig, file_manager, client_factory: Callable[[], Any], bucket: str,
+                 unique_name: Callable[[Any, str, str], str], listing_cache=None):
+        self.config = config
+        self.file_manager = file_manager
+        self.bucket = bucket
+        self.listing_cache = listing_cache
+        self._client_factory = client_factory
+        self._unique_name = unique_name
+        self._client = None
+        self._entries: Dict[str, SyncEntry] = {}
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=max(config.concurrency, 1), thread_name_prefix="excel-mcp-sync")
+        self._snapshots = file_manager.base_path / SNAPSHOT_DIRECTORY
+
+    def start(self) -> None:
+        self._snapshots.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._schedule, name="excel-mcp-sync-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> int:
+        """Stop scheduling; with ``flush``, upload pending files first (up to the flush timeout).
+
+        Returns:
+            Number of files still unsynced
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        if flush:
+            with self._cond:
+                for entry in self._entries.values():
+                    if not entry.uploading:
+                        entry.uploading = True
+                        self._executor.submit(self._upload, entry)
+            deadline = time.monotonic() + self.config.flush_timeout_seconds
+            with self._cond:
+                while self._entries and time.monotonic() < deadline:
+                    self._cond.wait(deadline - time.monotonic())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._cond:
+            remaining = len(self._entries)
+        if remaining:
+            logger.warning("%d files were not synced to MinIO before shutdown; they stay on local disk", remaining)
+        return remaining
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Wrap a write tool so the files it names are scheduled for upload."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            user_id = kwargs.get("user_id")
+            if isinstance(user_id, str):
+                for argument in FILE_ARGUMENTS:
+                    file_name = kwargs.get(argument)
+                    if isinstance(file_name, str) and file_name:
+                        self.mark_dirty(user_id, self.file_manager.get_file_path(file_name, user_id))
+            return result
+        return wrapper
+
+    def mark_dirty(self, user_id: str, path: Path) -> None:
+        """Schedule ``path`` for upload unless it is missing or already synced."""
+        if not path.is_file() or self.file_manager.is_clean(path):
+            return
+        now = time.monotonic()
+        with self._cond:
+            entry = self._entries.get(str(path))
+            if entry is None:
+                self._entries[str(path)] = SyncEntry(user_id, path, now, now + self.config.debounce_seconds)
+                sync_pending.set(value=len(self._entries))
+            elif entry.uploading:
+                entry.redirtied = True
+            elif entry.attempts == 0:
+                # Debounce, but never past the durability window
+                entry.due = min(now + self.config.debounce_seconds, entry.dirty_since + self.config.max_delay_seconds)
+            self._cond.notify()
+
+    def reconcile(self) -> int:
+        """Schedule every unsynced local file; returns how many were found."""
+        found = 0
+        for user_id, _ in self.file_manager.iter_user_directories():
+            try:
+                paths = self.file_manager.list_user_files(user_id)
+            except OSError:
+                continue
+            for path in paths:
+                if not self.file_manager.is_clean(path):
+                    self.mark_dirty(user_id, path)
+                    found += 1
+        return found
+
+    def _schedule(self) -> None:
+        next_scan = time.monotonic()
+        while True:
+            if time.monotonic() >= next_scan:
+                try:
+                    self.reconcile()
+                except Exception as e:
+                    logger.error(f"Write-behind scan failed: {e}")
+                next_scan = time.monotonic() + self.config.scan_interval_seconds
+            with self._cond:
+                if self._stopping:
+                    return
+                now = time.monotonic()
+                for entry in self._entries.values():
+                    if not entry.uploading and entry.due <= now:
+                        entry.uploading = True
+                        self._executor.submit(self._upload, entry)
+                waiting = [entry.due for entry in self._entries.values() if not entry.uploading]
+                wake = min(waiting + [next_scan])
+                self._cond.wait(max(wake - now, 0.01))
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def _upload(self, entry: SyncEntry) -> None:
+        path = entry.path
+        started = time.monotonic()
+        dirty_since = entry.dirty_since
+        done = False
+        snapshot = self._snapshots / uuid.uuid4().hex
+        try:
+            if not path.is_file() or self.file_manager.is_clean(path):
+                # Removed, pushed or pulled since it was scheduled
+                done = True
+                return
+            client = self._get_client()
+            record = self.file_manager.sync_record(path)
+            if record and record.get("object"):
+                object_name = record["object"]
+            else:
+                # Never synced: never overwrite an object this file did not come from.
+                # The chosen name is kept in the sync record for later uploads.
+                object_name = object_name_for(entry.user_id, self._unique_name(client, entry.user_id, path.name))
+            self._snapshots.mkdir(parents=True, exist_ok=True)
+            with self.file_manager.lock_file(path):
+                stat = path.stat()
+                shutil.copyfile(path, snapshot)
+            client.fput_object(self.bucket, object_name, str(snapshot))
+            if self.listing_cache is not None:
+                self.listing_cache.invalidate(entry.user_id)
+            self.file_manager.mark_synced(path, object_name, stat=stat)
+            sync_uploads.inc("ok")
+            sync_lag_seconds.observe(time.monotonic() - dirty_since)
+            done = True
+        except Exception as e:
+            entry.attempts += 1
+            entry.last_error = str(e)
+            sync_uploads.inc("error")
+            logger.warning("Write-behind upload of %s failed (attempt %d): %s", path, entry.attempts, e)
+        finally:
+            snapshot.unlink(missing_ok=True)
+            with self._cond:
+                entry.uploading = False
+                now = time.monotonic()
+                if entry.redirtied:
+                    entry.redirtied = False
+                    entry.attempts = 0
+                    entry.last_error = None
+                    entry.dirty_since = started
+                    entry.due = now + self.config.debounce_seconds
+                elif done:
+                    self._entries.pop(str(path), None)
+                else:
+                    backoff = self.config.debounce_seconds * 2 ** (entry.attempts - 1)
+                    entry.due = now + min(max(backoff, 1.0), self.config.max_delay_seconds)
+                sync_pending.set(value=len(self._entries))
+                self._cond.notify_all()
+
+    def status(self, user_id: str, file_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Sync state of a user's local files, or of one file."""
+        with self._cond:
+            pending = {key: (entry.uploading, entry.attempts, entry.last_error, entry.dirty_since)
+                       for key, entry in self._entries.items()}
+        return local_status(self.file_manager, user_id, file_name, pending)
+
+
+def local_status(file_manager, user_id: str, file_name: Optional[str] = None,
+                 pending: Optional[Dict[str, tuple]] = None) -> List[Dict[str, Any]]:
+    """Sync state of a user's local files, or of one file.
+
+    ``pending`` maps paths to (uploading, attempts, last_error, dirty_since)
+    of scheduled uploads; without it, files are only synced or unsynced.
+    """
+    if file_name is not None:
+        paths = [file_manager.get_file_path(file_name, user_id)]
+        if not paths[0].is_file():
+            return []
+    else:
+        paths = file_manager.list_user_files(user_id)
+    pending = pending or {}
+    statuses = []
+    for path in paths:
+        record = file_manager.sync_record(path)
+        clean = file_manager.is_clean(path)
+        status = {
+            "file_name": path.name,
+            "state": "synced" if clean else "unsynced",
+            "object": record.get("object") if record else None,
+            "last_synced": (
+                datetime.fromtimestamp(record["synced_at"], timezone.utc).isoformat(timespec="seconds")
+                if record and record.get("synced_at") else None
+            ),
+        }
+        entry = pending.get(str(path))
+        if entry is not None and not clean:
+            uploading, attempts, last_error, dirty_since = entry
+            status["state"] = "syncing" if uploading else ("retrying" if attempts else "pending")
+            status["dirty_seconds"] = round(time.monotonic() - dirty_since, 1)
+            if attempts:
+                status["attempts"] = attempts
+                status["last_error"] = last_error
+        statuses.append(status)
+    return statuses
@@ -0,0 +1,192 @@
+"""
+Recording of tool calls to JSONL for load-test replay.
+
+Each sampled call is written as one line with the tool name, its
+arguments, timing, outcome and the size of the workbook before and after
+the call. By default only scalars and short strings (identifiers such as
+user IDs, file and sheet names and cell references) are kept; lists, dicts
+and long strings are reduced to their shape, so cell data never reaches
+the trace. ``verbatim_args`` keeps small payloads as-is for more faithful
+replays. ``benchmarks/replay.py`` re-issues these traces against a server.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .config import TraceConfig
+from .metrics import tool_outcome
+from .redaction import MAX_ARG_CHARS, REDACTED, is_secret
+
+logger = logging.getLogger("excel-mcp")
+
+# Key marking a value that was reduced to its shape
+SHAPE_KEY = "__shape__"
+
+# With verbatim_args, arguments larger than this (approximate JSON characters) are recorded as shapes
+MAX_VERBATIM_CHARS = 4096
+
+
+def _fits(value: Any, budget: int) -> int:
+    """Remaining budget after serializing ``value``, or -1 once it is exceeded."""
+    if budget < 0:
+        return -1
+    if isinstance(value, str):
+        return budget - len(value) - 2
+    if isinstance(value, (list, tuple)):
+        budget -= 2
+        for item in value:
+            budget = _fits(item, budget - 1)
+            if budget < 0:
+                return -1
+        return budget
+    if isinstance(value, dict):
+        budget -= 2
+        for key, item in value.items():
+            budget = _fits(item, budget - len(str(key)) - 4)
+            if budget < 0:
+                return -1
+        return budget
+    return budget - 8
+
+
+def shape_of(value: Any, verbatim: bool = False) -> Any:
+    """Describe a value by type and size; lists keep the shape of their first item.
+
+    Nested values are shapes too, except small ones with ``verbatim``.
+    """
+    nested = record_value if verbatim else shape_of
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (list, tuple)):
+        shape = {SHAPE_KEY: "list", "len": len(value)}
+        if value:
+            shape["item"] = nested(value[0])
+        return shape
+    if isinstance(value, dict):
+        return {SHAPE_KEY: "dict", "items": {str(key): nested(item) for key, item in value.items()}}
+    if isinstance(value, str):
+        return {SHAPE_KEY: "str", "len": len(value)}
+    return {SHAPE_KEY: type(value).__name__}
+
+
+def record_value(value: Any) -> Any:
+    """Keep small JSON values verbatim and reduce large ones to their shape."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (str, list, tuple, dict)) and _fits(value, MAX_VERBATIM_CHARS) >= 0:
+        return list(value) if isinstance(value, tuple) else value
+    return shape_of(value, verbatim=True)
+
+
+def record_argument(value: Any, verbatim: bool = False) -> Any:
+    """Keep scalars and short strings, reduce payloads to their shape.
+
+    With ``verbatim``, payloads up to ``MAX_VERBATIM_CHARS`` are kept as well.
+    """
+    if verbatim:
+        return record_value(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str) and len(value) <= MAX_ARG_CHARS:
+        return value
+    return shape_of(value)
+
+
+def expand_value(value: Any, index: int = 0) -> Any:
+    """Rebuild a payload from a recorded shape (the inverse of ``record_value``)."""
+    if isinstance(value, dict):
+        kind = value.get(SHAPE_KEY)
+        if kind == "list":
+            item = value.get("item")
+            return [expand_value(item, position) for position in range(value["len"])] if "item" in value else []
+        if kind == "dict":
+            return {key: expand_value(item, index) for key, item in value["items"].items()}
+        if kind == "str":
+            return ("x" * value["len"]) if value["len"] else ""
+        if kind in ("int", "float"):
+            return index
+        if kind is not None:
+            return None
+        return {key: expand_value(item, index) for key, item in value.items()}
+    if isinstance(value, list):
+        return [expand_value(item, index) for item in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and index:
+        # Vary numbers across synthesized rows so writes are not all identical
+        return value + index
+    return value
+
+
+class TraceRecorder:
+    """Append sampled tool calls to a JSONL file."""
+
+    def __init__(self, config: TraceConfig, file_manager):
+        self.path = Path(config.path)
+        self.sample_rate = config.sample_rate
+        self.max_bytes = int(config.max_mb * 1024 * 1024)
+        self.verbatim_args = config.verbatim_args
+        self.file_manager = file_manager
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._full = False
+
+    def _file_size(self, arguments: Dict[str, Any], name: str = "file_name") -> Optional[int]:
+        file_name, user_id = arguments.get(name), arguments.get("user_id")
+        if not isinstance(file_name, str) or not isinstance(user_id, str):
+            return None
+        try:
+            return self.file_manager.get_file_path(file_name, user_id).stat().st_size
+        except OSError:
+            return None
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Wrap a tool function so sampled calls are written to the trace."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if self._full or (self.sample_rate < 1.0 and random.random() >= self.sample_rate):
+                return func(*args, **kwargs)
+            size_before = self._file_size(kwargs)
+            started = time.time()
+            start = time.perf_counter()
+            outcome = "exception"
+            try:
+                result = func(*args, **kwargs)
+                outcome = tool_outcome(result)
+                return result
+            finally:
+                entry = {
+                    "ts": round(started, 6),
+                    "tool": name,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                    "outcome": outcome,
+                    "file_bytes": size_before,
+                    "file_bytes_after": self._file_size(kwargs),
+                    "args": {
+                        key: REDACTED if is_secret(key) else record_argument(value, self.verbatim_args)
+                        for key, value in kwargs.items()
+                    },
+                }
+                self._write(entry)
+        return wrapper
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, default=str, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._full:
+                return
+            if self._file.tell() + len(line) > self.max_bytes:
+                self._full = True
+                logger.warning("Trace file %s reached %d bytes; recording stopped", self.path, self.max_bytes)
+                return
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
@@ -1,16 +1,29 @@
 import logging
 import json
-from typing import Optional
-from openpyxl import load_workbook
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, Optional, List, Union
+from fastmcp.utilities.types import Image
 from ..core.file_manager import get_safe_file_name
-from ..utils.data import read_excel_range_with_metadata
-from ..utils.validation import validate_formula_in_cell_operation as validate_formula_impl
-from ..utils.validation import validate_range_in_sheet_operation as validate_range_impl
-from ..utils.calculations import CalculationError
-from ..utils.cell_validation import get_all_validation_ranges
-from ..utils.sheet import get_merged_ranges
-from ..utils.workbook import get_workbook_info
-from ..utils.exceptions import ValidationError, SheetError, WorkbookError
+from ..core.lazy_imports import lazy
+from ..utils.exceptions import ValidationError, SheetError, WorkbookError, DataError, ChartError, CalculationError
+from .minio_tools import _get_minio_client, _get_unique_file_name
+
+# Implementations import openpyxl; they load on first use or during warm-up
+load_workbook = lazy("openpyxl", "load_workbook")
+read_excel_range_with_metadata = lazy("..utils.data", "read_excel_range_with_metadata", __package__)
+describe_range_impl = lazy("..utils.statistics", "describe_range", __package__)
+export_range_impl = lazy("..utils.delimited", "export_range", __package__)
+diff_workbooks_impl = lazy("..utils.diff", "diff_workbooks", __package__)
+render_chart_preview_impl = lazy("..utils.chart_render", "render_chart_preview", __package__)
+query_table_impl = lazy("..utils.tables", "query_table", __package__)
+list_tables_impl = lazy("..utils.tables", "list_tables", __package__)
+validate_formula_impl = lazy("..utils.validation", "validate_formula_in_cell_operation", __package__)
+validate_range_impl = lazy("..utils.validation", "validate_range_in_sheet_operation", __package__)
+get_all_validation_ranges = lazy("..utils.cell_validation", "get_all_validation_ranges", __package__)
+get_merged_ranges = lazy("..utils.sheet", "get_merged_ranges", __package__)
+get_workbook_info = lazy("..utils.workbook", "get_workbook_info", __package__)
 
 logger = logging.getLogger("excel-mcp")
 
@@ -58,6 +71,210 @@ def register_excel_read_tools(mcp_server):
         except Exception as e:
             logger.error(f"Error reading data: {e}")
             raise
+
+    @mcp_server.tool(tags={"excel", "read"})
+    def describe_range(
+        user_id: str,
+        file_name: str,
+        sheet_name: str,
+        start_cell: Optional[str] = None,
+        end_cell: Optional[str] = None,
+        has_header: bool = True,
+        percentiles: Optional[List[float]] = None
+    ) -> str:
+        """
+        Compute per-column summary statistics for a range server-side.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the Excel file
+            sheet_name: Name of worksheet
+            start_cell: Starting cell. Defaults to 'A1'.
+            end_cell: Ending cell. Defaults to the last used cell of the sheet.
+            has_header: Whether the first row of the range contains column names
+            percentiles: Percentiles to compute as fractions (e.g. [0.5, 0.95]).
+                Defaults to [0.25, 0.5, 0.75].
+        
+        Returns:
+            JSON string with count, nulls, distinct count, type counts and, for numeric
+            columns, sum, mean, std, min, max and percentiles. Distinct counts and
+            percentiles are approximate for very large columns and flagged as such.
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        try:
+            with mcp_server.file_manager.lock_file(file_path):
+                result = describe_range_impl(
+                    str(file_path),
+                    sheet_name,
+                    start_cell,
+                    end_cell,
+                    has_header=has_header,
+                    percentiles=percentiles
+                )
+                return json.dumps(result, indent=2, default=str)
+        except DataError as e:
+            safe_error = str(e).replace(str(file_path), safe_file_name)
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error describing range: {e}")
+            raise
+
+    @mcp_server.tool(tags={"excel", "read"})
+    def list_tables(user_id: str, file_name: str, sheet_name: Optional[str] = None) -> str:
+        """
+        List the Excel tables in a workbook without reading cell data.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the Excel file
+            sheet_name: Only list tables on this worksheet. Defaults to all sheets.
+        
+        Returns:
+            JSON string with each table's name, sheet, ref, columns and row count
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        try:
+            with mcp_server.file_manager.lock_file(file_path):
+                result = list_tables_impl(str(file_path), sheet_name)
+                return json.dumps(result, indent=2, default=str)
+        except DataError as e:
+            safe_error = str(e).replace(str(file_path), safe_file_name)
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error listing tables: {e}")
+            raise
+
+    @mcp_server.tool(tags={"excel", "read"})
+    def query_table(
+        user_id: str,
+        file_name: str,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: int = 100
+    ) -> str:
+        """
+        Query an Excel table by name with column projection, filters, sort and limit.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the Excel file
+            table_name: Name of the table
+            columns: Columns to return. Defaults to all table columns.
+            filters: Conditions that must all match, each {"column", "op", "value"}.
+                Operators: =, !=, >, >=, <, <=, contains, startswith (case-insensitive),
+                in (list value), is_null, not_null.
+            order_by: Column to sort by
+            descending: Sort in descending order
+            limit: Maximum number of rows to return. Defaults to 100.
+        
+        Returns:
+            JSON string with the selected columns, matching rows, rows scanned and
+            whether more rows matched than were returned
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        try:
+            with mcp_server.file_manager.lock_file(file_path):
+                result = query_table_impl(
+                    str(file_path),
+                    table_name,
+                    columns=columns,
+                    filters=filters,
+                    order_by=order_by,
+                    descending=descending,
+                    limit=limit
+                )
+                return json.dumps(result, indent=2, default=str)
+        except DataError as e:
+            safe_error = str(e).replace(str(file_path), safe_file_name)
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error querying table: {e}")
+            raise
+
+    @mcp_server.tool(tags={"excel", "read"})
+    def export_range(
+        user_id: str,
+        file_name: str,
+        sheet_name: str,
+        file_format: str = "csv",
+        output_file: Optional[str] = None,
+        start_cell: Optional[str] = None,
+        end_cell: Optional[str] = None,
+        has_header: bool = True,
+        to_minio: bool = False
+    ) -> str:
+        """
+        Export a sheet or range to CSV, TSV, JSONL or Parquet.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the Excel file
+            sheet_name: Name of worksheet
+            file_format: Output format: 'csv', 'tsv', 'jsonl' or 'parquet'. Defaults to 'csv'.
+            output_file: Name of the output file. Defaults to '<workbook>_<sheet>.<format>'.
+            start_cell: Starting cell. Defaults to 'A1'.
+            end_cell: Ending cell. Defaults to the last used cell of the sheet.
+            has_header: Whether the first row holds column names (JSONL keys / Parquet columns)
+            to_minio: Upload the export to the user's MinIO storage instead of keeping it locally
+        
+        Returns:
+            Success message with the exported row count and output file_name
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        fmt = (file_format or "").lower()
+        safe_output_name = get_safe_file_name(
+            output_file or f"{Path(safe_file_name).stem}_{sheet_name}.{fmt}"
+        )
+        output_path = mcp_server.file_manager.get_file_path(safe_output_name, user_id)
+        try:
+            if to_minio:
+                with tempfile.TemporaryDirectory(prefix="excel-mcp-export-") as export_dir:
+                    # Staged outside the user's directory, so no local file is replaced
+                    staged_path = Path(export_dir) / safe_output_name
+                    with mcp_server.file_manager.lock_file(file_path):
+                        result = export_range_impl(
+                            str(file_path),
+                            sheet_name,
+                            staged_path,
+                            file_format=fmt,
+                            start_cell=start_cell,
+                            end_cell=end_cell,
+                            has_header=has_header
+                        )
+                    client = _get_minio_client(mcp_server.config)
+                    bucket_name = mcp_server.config.minio.bucket
+                    object_file_name = _get_unique_file_name(client, bucket_name, user_id, safe_output_name)
+                    client.fput_object(bucket_name, f"private/{user_id}/{object_file_name}", str(staged_path))
+                mcp_server.listing_cache.invalidate(user_id)
+                logger.info("Uploaded export %s to MinIO for user %s", object_file_name, user_id)
+                return f"Exported {result['rows']} rows to MinIO as '{object_file_name}'"
+            with ExitStack() as locks:
+                # Source and output are locked, always in the same order
+                for path in sorted({file_path, output_path}):
+                    locks.enter_context(mcp_server.file_manager.lock_file(path))
+                result = export_range_impl(
+                    str(file_path),
+                    sheet_name,
+                    output_path,
+                    file_format=fmt,
+                    start_cell=start_cell,
+                    end_cell=end_cell,
+                    has_header=has_header
+                )
+            return f"Exported {result['rows']} rows to '{safe_output_name}'"
+        except DataError as e:
+            safe_error = str(e).replace(str(file_path), safe_file_name)
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error exporting range: {e}")
+            raise
         
     @mcp_server.tool(tags={"excel", "read"})
     def validate_formula_syntax(
@@ -85,7 +302,13 @@ def register_excel_read_tools(mcp_server):
         try:
             with mcp_server.file_manager.lock_file(file_path):
                 result = validate_formula_impl(str(file_path), sheet_name, cell, formula)
-                safe_result = result["message"].replace(str(file_path), safe_file_name)
+                message = result["message"]
+                dependencies = result.get("dependencies", {})
+                if dependencies.get("ranges"):
+                    message += f". Reads: {', '.join(dependencies['ranges'])}"
+                if dependencies.get("unresolved"):
+                    message += f". Unresolved references: {', '.join(dependencies['unresolved'])}"
+                safe_result = message.replace(str(file_path), safe_file_name)
                 return safe_result
         except (ValidationError, CalculationError) as e:
             safe_error = str(e).replace(str(file_path), safe_file_name)
@@ -233,4 +456,140 @@ def register_excel_read_tools(mcp_server):
             return f"Error: {safe_error}"
         except Exception as e:
             logger.error(f"Error getting workbook metadata: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    @mcp_server.tool(tags={"excel", "read"})
+    def diff_workbooks(
+        user_id: str,
+        file_name: str,
+        other_file_name: Optional[str] = None,
+        compare_with_minio: bool = False,
+        band_size: int = 256,
+        max_changes: int = 200
+    ) -> str:
+        """
+        Report what changed between two versions of a workbook.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the local Excel file (the new version)
+            other_file_name: Name of the baseline file. With compare_with_minio it names
+                the MinIO object and defaults to file_name.
+            compare_with_minio: Compare against the copy stored in the user's MinIO storage
+            band_size: Number of rows per fingerprinted band
+            max_changes: Maximum number of cell changes to list
+            
+        Returns:
+            JSON string with added/removed sheets, per-sheet change counts and
+            cell-level changes (old/new value, or "style" for formatting-only changes)
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        if not other_file_name and not compare_with_minio:
+            return "Error: Provide other_file_name or set compare_with_minio"
+        safe_other_name = get_safe_file_name(other_file_name or safe_file_name)
+        other_path = mcp_server.file_manager.get_file_path(safe_other_name, user_id)
+        try:
+            with ExitStack() as stack:
+                if compare_with_minio:
+                    # Downloaded outside the user's directory, so sync, status and the
+                    # janitor never see it as a user file
+                    download_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="excel-mcp-diff-"))
+                    other_path = Path(download_dir) / safe_other_name
+                    client = _get_minio_client(mcp_server.config)
+                    client.fget_object(
+                        mcp_server.config.minio.bucket,
+                        f"private/{user_id}/{safe_other_name}",
+                        str(other_path)
+                    )
+                with mcp_server.file_manager.lock_file(file_path):
+                    result = diff_workbooks_impl(
+                        other_path,
+                        file_path,
+                        band_size=band_size,
+                        max_changes=max_changes
+                    )
+            result["file_name"] = safe_file_name
+            result["compared_with"] = f"minio:{safe_other_name}" if compare_with_minio else safe_other_name
+            return json.dumps(result, indent=2, default=str)
+        except WorkbookError as e:
+            safe_error = (
+                str(e)
+                .replace(str(file_path), safe_file_name)
+                .replace(str(other_path), safe_other_name)
+            )
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error diffing workbooks: {e}")
+            raise
+
+    # Chart related tools
+    @mcp_server.tool(tags={"excel", "read"})
+    def render_chart_preview(
+        user_id: str,
+        file_name: str,
+        sheet_name: str,
+        data_range: Optional[str] = None,
+        chart_type: str = "line",
+        title: str = "",
+        x_axis: str = "",
+        y_axis: str = "",
+        width: float = 15,
+        height: float = 7.5,
+        chart_index: Optional[int] = None,
+        dpi: int = 100
+    ) -> Union[Image, str]:
+        """
+        Render a chart to a PNG image without opening the workbook in Excel.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the Excel file
+            sheet_name: Name of worksheet
+            data_range: Range of data to chart, as for create_chart. Leave empty to
+                preview an existing chart on the sheet instead.
+            chart_type: Type of chart (line, bar, pie, scatter, area). Defaults to 'line'.
+            title: Title for the chart
+            x_axis: X-axis title
+            y_axis: Y-axis title
+            width: Chart width in centimetres. Defaults to 15.
+            height: Chart height in centimetres. Defaults to 7.5.
+            chart_index: Index of the existing chart on the sheet (0 for the first),
+                used when no data_range is given
+            dpi: Image resolution. Defaults to 100.
+        
+        Returns:
+            PNG image of the chart
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        chart = None
+        if data_range:
+            chart = {
+                "chart_type": chart_type,
+                "data_range": data_range,
+                "title": title,
+                "x_axis": x_axis,
+                "y_axis": y_axis,
+                "width": width,
+                "height": height,
+            }
+        elif chart_index is None:
+            chart_index = 0
+        try:
+            with mcp_server.file_manager.lock_file(file_path):
+                result = render_chart_preview_impl(
+                    str(file_path),
+                    mcp_server.file_manager.get_user_directory(user_id) / ".chart_previews",
+                    sheet_name,
+                    chart=chart,
+                    chart_index=chart_index,
+                    dpi=dpi
+                )
+            return Image(path=result["path"])
+        except (ValidationError, ChartError) as e:
+            safe_error = str(e).replace(str(file_path), safe_file_name)
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error rendering chart preview: {e}")
+            raise
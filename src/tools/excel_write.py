@@ -1,28 +1,12 @@
 import logging
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
 from typing import Optional, List, Dict, Any
 from ..core.file_manager import get_safe_file_name
-from ..utils.chart import create_chart_in_sheet as create_chart_impl
-from ..utils.pivot import create_pivot_table as create_pivot_table_impl
-from ..utils.tables import create_excel_table as create_table_impl
-from ..utils.data import write_data
-from ..utils.validation import validate_formula_in_cell_operation as validate_formula_impl
-from ..utils.calculations import apply_formula as apply_formula_impl, CalculationError
-from ..utils.formatting import format_range as format_range_func
-from ..utils.sheet import (
-    copy_range_operation,
-    delete_range_operation,
-    copy_sheet,
-    delete_sheet,
-    rename_sheet,
-    merge_range,
-    unmerge_range,
-    insert_row,
-    insert_cols,
-    delete_rows,
-    delete_cols,
-)
-from ..utils.workbook import create_workbook as create_workbook_impl, create_sheet
+from ..core.lazy_imports import lazy
 from ..utils.exceptions import (
+    CalculationError,
     ChartError,
     PivotError,
     DataError,
@@ -31,6 +15,34 @@ from ..utils.exceptions import (
     SheetError,
     WorkbookError,
 )
+from .minio_tools import _get_minio_client
+
+# Implementations import openpyxl; they load on first use or during warm-up
+create_chart_impl = lazy("..utils.chart", "create_chart_in_sheet", __package__)
+create_charts_impl = lazy("..utils.chart", "create_charts", __package__)
+create_pivot_table_impl = lazy("..utils.pivot", "create_pivot_table", __package__)
+refresh_pivot_table_impl = lazy("..utils.pivot", "refresh_pivot_table", __package__)
+create_table_impl = lazy("..utils.tables", "create_excel_table", __package__)
+write_data = lazy("..utils.data", "write_data", __package__)
+import_delimited_impl = lazy("..utils.delimited", "import_delimited", __package__)
+apply_formula_impl = lazy("..utils.calculations", "apply_formula", __package__)
+apply_formulas_impl = lazy("..utils.calculations", "apply_formulas", __package__)
+format_range_func = lazy("..utils.formatting", "format_range", __package__)
+copy_range_operation = lazy("..utils.sheet", "copy_range_operation", __package__)
+delete_range_operation = lazy("..utils.sheet", "delete_range_operation", __package__)
+copy_sheet = lazy("..utils.sheet", "copy_sheet", __package__)
+delete_sheet = lazy("..utils.sheet", "delete_sheet", __package__)
+rename_sheet = lazy("..utils.sheet", "rename_sheet", __package__)
+merge_range = lazy("..utils.sheet", "merge_range", __package__)
+unmerge_range = lazy("..utils.sheet", "unmerge_range", __package__)
+merge_ranges = lazy("..utils.sheet", "merge_ranges", __package__)
+unmerge_ranges = lazy("..utils.sheet", "unmerge_ranges", __package__)
+insert_row = lazy("..utils.sheet", "insert_row", __package__)
+insert_cols = lazy("..utils.sheet", "insert_cols", __package__)
+delete_rows = lazy("..utils.sheet", "delete_rows", __package__)
+delete_cols = lazy("..utils.sheet", "delete_cols", __package__)
+create_workbook_impl = lazy("..utils.workbook", "create_workbook", __package__)
+create_sheet = lazy("..utils.workbook", "create_sheet", __package__)
 
 logger = logging.getLogger("excel-mcp")
 
@@ -48,7 +60,11 @@ def register_excel_write_tools(mcp_server):
         target_cell: str,
         title: str = "",
         x_axis: str = "",
-        y_axis: str = ""
+        y_axis: str = "",
+        width: float = 15,
+        height: float = 7.5,
+        downsample: Optional[str] = None,
+        target_points: int = 1000
     ) -> str:
         """
         Create a chart in the Excel worksheet.
@@ -63,6 +79,11 @@ def register_excel_write_tools(mcp_server):
             title (str, optional): Title for the chart. Defaults to "".
             x_axis (str, optional): X-axis title. Defaults to "".
             y_axis (str, optional): Y-axis title. Defaults to "".
+            width (float, optional): Chart width in centimetres. Defaults to 15.
+            height (float, optional): Chart height in centimetres. Defaults to 7.5.
+            downsample (str, optional): 'lttb' or 'minmax' to chart a reduced copy of
+                large ranges (kept on a hidden sheet). Defaults to None.
+            target_points (int, optional): Approximate points kept when downsampling. Defaults to 1000.
             
         Returns:
             str: Success message with file_name
@@ -79,7 +100,11 @@ def register_excel_write_tools(mcp_server):
                     target_cell=target_cell,
                     title=title,
                     x_axis=x_axis,
-                    y_axis=y_axis
+                    y_axis=y_axis,
+                    width=width,
+                    height=height,
+                    downsample=downsample,
+                    target_points=target_points
                 )
                 safe_result = result["message"].replace(str(file_path), safe_file_name)
                 return safe_result
@@ -90,6 +115,51 @@ def register_excel_write_tools(mcp_server):
             logger.error(f"Error creating chart: {e}")
             raise
 
+    @mcp_server.tool(tags={"excel", "write"})
+    def create_charts(
+        user_id: str,
+        file_name: str,
+        charts: List[Dict[str, Any]]
+    ) -> str:
+        """
+        Create several charts in one operation. All specs are validated before any chart is written.
+        
+        Args:
+            user_id (str): User ID for file organization
+            file_name (str): Name of the Excel file
+            charts (List[Dict[str, Any]]): Chart specs, each with:
+                - sheet_name (str): Worksheet to place the chart on
+                - chart_type (str): line, bar, pie, scatter or area
+                - target_cell (str): Position to place chart (e.g., 'E2')
+                - data_range (str): Range of data to chart (e.g., 'A1:C10' or 'Data!A1:C10'),
+                  first column as categories / x values and first row as series titles
+                - series (List[Dict], optional): Explicit series instead of data_range, each with
+                  'values' range, optional 'categories' range (x values for scatter) and optional
+                  'title' (otherwise the first cell of 'values' is the title)
+                - title, x_axis, y_axis (str, optional): Chart and axis titles
+                - width, height (float, optional): Size in centimetres (default 15 x 7.5)
+                - style (Dict, optional): show_legend, legend_position, show_data_labels,
+                  data_label_options, grid_lines, style_id
+                - downsample (str, optional): 'lttb' or 'minmax' to chart a reduced copy of a
+                  large data_range, kept on a hidden sheet
+                - target_points (int, optional): Approximate points kept when downsampling (default 1000)
+            
+        Returns:
+            str: Success message with the number of charts created
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        try:
+            with mcp_server.file_manager.lock_file(file_path):
+                result = create_charts_impl(filepath=str(file_path), charts=charts)
+                return result["message"].replace(str(file_path), safe_file_name)
+        except (ValidationError, ChartError) as e:
+            safe_error = str(e).replace(str(file_path), safe_file_name)
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error creating charts: {e}")
+            raise
+
     @mcp_server.tool(tags={"excel", "write"})
     def create_pivot_table(
         user_id: str,
@@ -99,7 +169,8 @@ def register_excel_write_tools(mcp_server):
         rows: List[str],
         values: List[str],
         columns: Optional[List[str]] = None,
-        agg_func: str = "sum"
+        agg_func: str = "sum",
+        native: bool = False
     ) -> str:
         """
         Create a pivot table from data range.
@@ -111,8 +182,11 @@ def register_excel_write_tools(mcp_server):
             data_range (str): Data range for pivot table (e.g., 'A1:D100')
             rows (List[str]): List of field names for row area
             values (List[str]): List of field names for values area
-            columns (Optional[List[str]], optional): List of field names for column area. Defaults to None.
+            columns (Optional[List[str]], optional): List of field names for column area; not laid out,
+                and not supported with native. Defaults to None.
             agg_func (str, optional): Aggregation function (sum, count, average, max, min). Defaults to "sum".
+            native (bool, optional): Write a native Excel pivot table backed by a pivot cache,
+                which Excel can re-slice and refresh itself. Defaults to False (styled summary table).
             
         Returns:
             str: Success message with file_name
@@ -128,7 +202,8 @@ def register_excel_write_tools(mcp_server):
                     rows=rows,
                     values=values,
                     columns=columns or [],
-                    agg_func=agg_func
+                    agg_func=agg_func,
+                    native=native
                 )
                 safe_result = result["message"].replace(str(file_path), safe_file_name)
                 return safe_result
@@ -139,6 +214,51 @@ def register_excel_write_tools(mcp_server):
             logger.error(f"Error creating pivot table: {e}")
             raise
 
+    @mcp_server.tool(tags={"excel", "write"})
+    def refresh_pivot(
+        user_id: str,
+        file_name: str,
+        pivot_sheet: str,
+        data_range: Optional[str] = None
+    ) -> str:
+        """
+        Refresh a pivot table created by create_pivot_table after its source data changed.
+        Only changed or appended source rows are re-aggregated.
+
+        Args:
+            user_id (str): User ID for file organization
+            file_name (str): Name of the Excel file
+            pivot_sheet (str): Name of the pivot sheet (e.g., 'Sheet1_pivot')
+            data_range (Optional[str], optional): New source data range. Defaults to the stored range,
+                extended to the end of the data when it originally covered all rows.
+
+        Returns:
+            str: Success message with refresh details
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        try:
+            with mcp_server.file_manager.lock_file(file_path):
+                result = refresh_pivot_table_impl(
+                    filepath=str(file_path),
+                    pivot_sheet=pivot_sheet,
+                    data_range=data_range
+                )
+                details = result["details"]
+                summary = f"{result['message']}: {details['groups']} groups from {details['source_range']}"
+                if details["native"]:
+                    return f"{summary}, pivot cache rebuilt"
+                return (
+                    f"{summary}, {details['bands_recomputed']} of {details['bands']} source bands recomputed"
+                    f"{' (full rebuild)' if details['full_rebuild'] else ''}"
+                )
+        except (PivotError, ValidationError) as e:
+            safe_error = str(e).replace(str(file_path), safe_file_name)
+            return f"Pivot Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error refreshing pivot table: {e}")
+            raise
+
     @mcp_server.tool(tags={"excel", "write"})
     def create_table(
         user_id: str,
@@ -218,6 +338,72 @@ def register_excel_write_tools(mcp_server):
             logger.error(f"Error writing data: {e}")
             raise
 
+    @mcp_server.tool(tags={"excel", "write"})
+    def import_delimited(
+        user_id: str,
+        file_name: str,
+        source_file: str,
+        sheet_name: str = "Sheet1",
+        file_format: Optional[str] = None,
+        delimiter: Optional[str] = None,
+        has_header: bool = True,
+        start_cell: str = "A1",
+        from_minio: bool = False
+    ) -> str:
+        """
+        Stream a CSV, TSV or JSONL file into a worksheet.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the target Excel file (created if it does not exist)
+            source_file: Name of the CSV/TSV/JSONL file in the user's directory or in MinIO
+            sheet_name: Target worksheet, created if missing. Defaults to "Sheet1".
+            file_format: 'csv', 'tsv' or 'jsonl'. Inferred from the source extension if omitted.
+            delimiter: Field delimiter for csv/tsv. Defaults to ',' for csv and tab for tsv.
+            has_header: Whether the first row of the source is a header row (for JSONL objects, whether to write their keys)
+            start_cell: Cell to start writing to, default is "A1"
+            from_minio: Read source_file from the user's MinIO storage instead of the local directory
+        
+        Returns:
+            Success message with imported row count and inferred column types
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        safe_source_name = get_safe_file_name(source_file)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        source_path = mcp_server.file_manager.get_file_path(safe_source_name, user_id)
+        try:
+            with ExitStack() as stack:
+                if from_minio:
+                    # Downloaded outside the user's directory, so sync, status and the
+                    # janitor never see it as a user file
+                    download_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="excel-mcp-import-"))
+                    source_path = Path(download_dir) / safe_source_name
+                    client = _get_minio_client(mcp_server.config)
+                    client.fget_object(
+                        mcp_server.config.minio.bucket,
+                        f"private/{user_id}/{safe_source_name}",
+                        str(source_path)
+                    )
+
+                with mcp_server.file_manager.lock_file(file_path):
+                    result = import_delimited_impl(
+                        filepath=str(file_path),
+                        source_path=source_path,
+                        sheet_name=sheet_name,
+                        file_format=file_format,
+                        delimiter=delimiter,
+                        has_header=has_header,
+                        start_cell=start_cell
+                    )
+                    types = ", ".join(result["column_types"])
+                    return f"{result['message']} in '{safe_file_name}' (column types: {types})"
+        except (ValidationError, DataError) as e:
+            safe_error = str(e).replace(str(file_path), safe_file_name).replace(str(source_path), safe_source_name)
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error importing delimited file: {e}")
+            raise
+
     @mcp_server.tool(tags={"excel", "write"})
     def apply_formula(
         user_id: str,
@@ -229,6 +415,8 @@ def register_excel_write_tools(mcp_server):
         """
         Apply Excel formula to cell.
         
+        The formula is validated and written over a single load of the workbook.
+        
         Args:
             user_id: User ID for file organization
             file_name: Name of the Excel file
@@ -243,11 +431,6 @@ def register_excel_write_tools(mcp_server):
         file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
         try:
             with mcp_server.file_manager.lock_file(file_path):
-                validation = validate_formula_impl(str(file_path), sheet_name, cell, formula)
-                if isinstance(validation, dict) and "error" in validation:
-                    safe_error = validation["error"].replace(str(file_path), safe_file_name)
-                    return f"Error: {safe_error}"
-                # then apply the formula
                 result = apply_formula_impl(str(file_path), sheet_name, cell, formula)
                 safe_result = result["message"].replace(str(file_path), safe_file_name)
                 return safe_result
@@ -258,6 +441,42 @@ def register_excel_write_tools(mcp_server):
             logger.error(f"Error applying formula: {e}")
             raise
 
+    @mcp_server.tool(tags={"excel", "write"})
+    def apply_formulas(
+        user_id: str,
+        file_name: str,
+        sheet_name: str,
+        formulas: List[Dict[str, str]],
+    ) -> str:
+        """
+        Apply many Excel formulas in one call.
+        
+        All formulas are validated before the workbook is opened; the workbook
+        is then loaded and saved once.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the Excel file
+            sheet_name: Name of worksheet
+            formulas: List of {"cell": "A1", "formula": "=SUM(B1:B10)"} entries
+            
+        Returns:
+            Success message with file_name
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        try:
+            with mcp_server.file_manager.lock_file(file_path):
+                result = apply_formulas_impl(str(file_path), sheet_name, formulas)
+                safe_result = result["message"].replace(str(file_path), safe_file_name)
+                return safe_result
+        except (ValidationError, CalculationError) as e:
+            safe_error = str(e).replace(str(file_path), safe_file_name)
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error applying formulas: {e}")
+            raise
+
 # Formatting tools
 
     @mcp_server.tool(tags={"excel", "write"})
@@ -435,28 +654,49 @@ def register_excel_write_tools(mcp_server):
         
     # Sheet related tools
     @mcp_server.tool(tags={"excel", "write"})
-    def copy_worksheet(user_id: str, file_name: str, source_sheet: str, target_sheet: str) -> str:
+    def copy_worksheet(
+        user_id: str,
+        file_name: str,
+        source_sheet: str,
+        target_sheet: str,
+        source_file_name: Optional[str] = None
+    ) -> str:
         """
-        Copy a worksheet within the same workbook.
+        Copy a worksheet within the same workbook, or from another workbook in the user's directory.
         
         Args:
             user_id (str): User ID for file organization. This parameter is required.
             file_name (str): Name of the Excel file. This parameter is required.
             source_sheet (str): Name of source worksheet to copy. This parameter is required.
             target_sheet (str): Name for the new copied worksheet. This parameter is required.
+            source_file_name (str, optional): Workbook to copy the sheet from. Defaults to file_name.
             
         Returns:
             str: Success message with file_name.
         """
         safe_file_name = get_safe_file_name(file_name)
         file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        safe_source_name = get_safe_file_name(source_file_name) if source_file_name else None
+        source_path = (
+            mcp_server.file_manager.get_file_path(safe_source_name, user_id) if safe_source_name else None
+        )
         try:
-            with mcp_server.file_manager.lock_file(file_path):
-                result = copy_sheet(str(file_path), source_sheet, target_sheet)
+            with ExitStack() as locks:
+                # Both workbooks are locked, always in the same order
+                for path in sorted({file_path, source_path or file_path}):
+                    locks.enter_context(mcp_server.file_manager.lock_file(path))
+                result = copy_sheet(
+                    str(file_path),
+                    source_sheet,
+                    target_sheet,
+                    source_filepath=str(source_path) if source_path else None
+                )
                 safe_result = result["message"].replace(str(file_path), f"'{safe_file_name}'")
                 return safe_result
         except (ValidationError, SheetError) as e:
             safe_error = str(e).replace(str(file_path), f"'{safe_file_name}'")
+            if source_path is not None:
+                safe_error = safe_error.replace(str(source_path), f"'{safe_source_name}'")
             return f"Error: {safe_error}"
         except Exception as e:
             logger.error(f"Error copying worksheet: {e}")
@@ -573,6 +813,67 @@ def register_excel_write_tools(mcp_server):
             logger.error(f"Error unmerging cells: {e}")
             raise
 
+    @mcp_server.tool(tags={"excel", "write"})
+    def merge_cell_ranges(user_id: str, file_name: str, sheet_name: str, ranges: List[str]) -> str:
+        """
+        Merge many cell ranges in one call.
+        
+        All ranges are checked against existing merged ranges and each other
+        before any change is made; the workbook is loaded and saved once.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the Excel file
+            sheet_name: Name of worksheet
+            ranges: Ranges to merge (e.g., ['A1:C1', 'A2:C2'])
+            
+        Returns:
+            Success message with file_name
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        try:
+            with mcp_server.file_manager.lock_file(file_path):
+                result = merge_ranges(str(file_path), sheet_name, ranges)
+                safe_result = result["message"].replace(str(file_path), f"'{safe_file_name}'")
+                return safe_result
+        except (ValidationError, SheetError) as e:
+            safe_error = str(e).replace(str(file_path), f"'{safe_file_name}'")
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error merging cell ranges: {e}")
+            raise
+
+    @mcp_server.tool(tags={"excel", "write"})
+    def unmerge_cell_ranges(user_id: str, file_name: str, sheet_name: str, ranges: List[str]) -> str:
+        """
+        Unmerge many cell ranges in one call.
+        
+        Every range must currently be merged; the workbook is loaded and saved once.
+        
+        Args:
+            user_id: User ID for file organization
+            file_name: Name of the Excel file
+            sheet_name: Name of worksheet
+            ranges: Merged ranges to unmerge (e.g., ['A1:C1', 'A2:C2'])
+            
+        Returns:
+            Success message with file_name
+        """
+        safe_file_name = get_safe_file_name(file_name)
+        file_path = mcp_server.file_manager.get_file_path(safe_file_name, user_id)
+        try:
+            with mcp_server.file_manager.lock_file(file_path):
+                result = unmerge_ranges(str(file_path), sheet_name, ranges)
+                safe_result = result["message"].replace(str(file_path), f"'{safe_file_name}'")
+                return safe_result
+        except (ValidationError, SheetError) as e:
+            safe_error = str(e).replace(str(file_path), f"'{safe_file_name}'")
+            return f"Error: {safe_error}"
+        except Exception as e:
+            logger.error(f"Error unmerging cell ranges: {e}")
+            raise
+
     @mcp_server.tool(tags={"excel", "write"})
     def insert_rows(user_id: str, file_name: str, sheet_name: str, start_row: int, count: int = 1) -> str:
         """
@@ -707,7 +1008,7 @@ def register_excel_write_tools(mcp_server):
             with mcp_server.file_manager.lock_file(file_path):
                 # Create new workbook
                 result = create_workbook_impl(str(file_path))
-                logger.info(f"Created workbook: {safe_file_name} for user {user_id}")
+                logger.info("Created workbook: %s for user %s", safe_file_name, user_id)
                 safe_result = result["message"].replace(str(file_path), f"'{safe_file_name}'")
                 return safe_result
         except WorkbookError as e:
@@ -735,7 +1036,7 @@ def register_excel_write_tools(mcp_server):
         try:
             with mcp_server.file_manager.lock_file(file_path):
                     result = create_sheet(str(file_path), sheet_name)
-                    logger.info(f"Created worksheet '{sheet_name}' in {safe_file_name} for user {user_id}")
+                    logger.info("Created worksheet '%s' in %s for user %s", sheet_name, safe_file_name, user_id)
                     safe_result = result["message"].replace(sheet_name, f"'{sheet_name}'")
                     return safe_result
         except (ValidationError, WorkbookError) as e:
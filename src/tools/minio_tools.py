@@ -2,17 +2,35 @@
 MinIO storage tools for Excel MCP server.
 """
 
+import base64
+import heapq
 import logging
 import json
-from typing import List, Dict, Any
-from minio import Minio
-from minio.error import S3Error
+from fnmatch import fnmatchcase
+from typing import List, Dict, Any, Iterator, Optional
 from ..core.file_manager import get_safe_file_name
+from ..core.lazy_imports import lazy
+from ..core.listing_cache import ListingEntry
+from ..core.logging_setup import ItemSampler
+from ..core.sync import local_status
 from ..utils.exceptions import DataError
 from fastmcp.exceptions import ToolError
 
 logger = logging.getLogger("excel-mcp")
 
+# The MinIO client loads on first use or during warm-up
+Minio = lazy("minio", "Minio")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Sort orders of list_minio_files; ties are broken by object key, so page tokens stay stable
+LIST_SORT_KEYS = {
+    "name": lambda entry: (entry[0],),
+    "size": lambda entry: (entry[1], entry[0]),
+    "last_modified": lambda entry: (entry[2] or "", entry[0]),
+}
+
 
 def _get_minio_client(config):
     """Helper function to create MinIO client."""
@@ -29,6 +47,43 @@ def _get_minio_client(config):
     )
 
 
+def _list_entries(client, bucket_name: str, base: str, prefix: str = "",
+                  start_after: Optional[str] = None) -> Iterator[ListingEntry]:
+    """A user's objects under ``base`` in key order, as listing cache entries."""
+    objects = client.list_objects(bucket_name, prefix=base + prefix, recursive=True, start_after=start_after)
+    for obj in objects:
+        key = obj.object_name[len(base):]
+        if not key or key.endswith("/"):
+            # Folder placeholder
+            continue
+        yield key, obj.size, obj.last_modified.isoformat() if obj.last_modified else None
+
+
+def _entry_file_name(entry: ListingEntry) -> str:
+    # Return only the file_name to avoid path confusion
+    return entry[0].split('/')[-1]
+
+
+def _encode_page_token(sort_by: str, descending: bool, key: tuple) -> str:
+    raw = json.dumps([sort_by, descending, list(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_page_token(page_token: str, sort_by: str, descending: bool) -> tuple:
+    """Sort key of the last file on the previous page."""
+    try:
+        raw = base64.urlsafe_b64decode(page_token + "=" * (-len(page_token) % 4))
+        token_sort_by, token_descending, key = json.loads(raw)
+        key = tuple(key)
+    except (ValueError, TypeError) as e:
+        raise DataError("Invalid page_token") from e
+    if token_sort_by != sort_by or token_descending != descending:
+        raise DataError("page_token was issued for a different sort_by or descending")
+    if len(key) != len(LIST_SORT_KEYS[sort_by](("", 0, None))) or not isinstance(key[-1], str):
+        raise DataError("Invalid page_token")
+    return key
+
+
 def _get_unique_file_name(client, bucket_name, user_id, base_file_name):
     """Generate a unique file_name by checking existing files in MinIO."""
     # First check if the base file_name exists
@@ -70,38 +125,100 @@ def register_minio_tools(mcp_server):
     """Register all MinIO-related tools with the MCP server."""
     
     @mcp_server.tool(tags={"minio", "read"})
-    def list_minio_files(user_id: str) -> str:
+    def list_minio_files(
+        user_id: str,
+        prefix: Optional[str] = None,
+        pattern: Optional[str] = None,
+        sort_by: str = "name",
+        descending: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None,
+    ) -> str:
         """
-        List all files in the MinIO bucket for a specific user.
+        List files in the MinIO bucket for a specific user, one page at a time.
         
         Args:
             user_id (str): User ID for accessing user-specific files. This parameter is required.
+            prefix (str, optional): Only files whose name starts with this.
+            pattern (str, optional): Only files whose name matches this glob, e.g. "*.xlsx".
+            sort_by (str): "name" (default), "size" or "last_modified".
+            descending (bool): Sort in descending order.
+            page_size (int): Files per page, 1 to 1000 (default 100).
+            page_token (str, optional): next_page_token of the previous page, to get the next one.
+                Pass the same sort_by and descending as for that page.
             
         Returns:
-            str: JSON string of file info objects. Each object contains:
-            - file_name (str)
-            - size (int)
-            - last_modified (str | null)
+            str: JSON object with:
+            - files (list): file info objects, each with file_name (str), size (int)
+              and last_modified (str | null)
+            - next_page_token (str | null): token for the next page, or null on the last page
         """
+        from minio.error import S3Error
+
         try:
-            client = _get_minio_client(mcp_server.config)
-            bucket_name = mcp_server.config.minio.bucket
-            prefix = f"private/{user_id}/"
-            
-            objects = client.list_objects(bucket_name, prefix=prefix, recursive=True)
+            if sort_by not in LIST_SORT_KEYS:
+                raise DataError(f"sort_by must be one of {', '.join(LIST_SORT_KEYS)}")
+            if not 1 <= page_size <= MAX_PAGE_SIZE:
+                raise DataError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+            after = _decode_page_token(page_token, sort_by, descending) if page_token else None
+            prefix = prefix or ""
+
+            def matches(entry):
+                return entry[0].startswith(prefix) and (not pattern or fnmatchcase(_entry_file_name(entry), pattern))
+
+            cache = mcp_server.listing_cache
+            base = f"private/{user_id}/"
+            entries = cache.get(user_id)
+            if entries is None and sort_by == "name" and not descending:
+                # MinIO lists in key order, so read only up to the end of this page
+                generation = cache.generation(user_id)
+                client = _get_minio_client(mcp_server.config)
+                page, seen, more = [], [], False
+                listed = _list_entries(
+                    client, mcp_server.config.minio.bucket, base, prefix, base + after[0] if after else None
+                )
+                for entry in listed:
+                    seen.append(entry)
+                    if matches(entry):
+                        if len(page) == page_size:
+                            more = True
+                            break
+                        page.append(entry)
+                if not more and after is None and not prefix:
+                    cache.put(user_id, seen, generation)
+            else:
+                if entries is None:
+                    generation = cache.generation(user_id)
+                    client = _get_minio_client(mcp_server.config)
+                    entries = list(_list_entries(client, mcp_server.config.minio.bucket, base))
+                    cache.put(user_id, entries, generation)
+                sort_key = LIST_SORT_KEYS[sort_by]
+                if after is None:
+                    selected = [entry for entry in entries if matches(entry)]
+                elif descending:
+                    selected = [entry for entry in entries if matches(entry) and sort_key(entry) < after]
+                else:
+                    selected = [entry for entry in entries if matches(entry) and sort_key(entry) > after]
+                # Only the page and one more entry need ordering
+                pick = heapq.nlargest if descending else heapq.nsmallest
+                page = pick(page_size + 1, selected, key=sort_key)
+                more = len(page) > page_size
+                page = page[:page_size]
+
             file_list = []
-            
-            for obj in objects:
-                # Extract just the file_name from the object path
-                file_name = obj.object_name.split('/')[-1]
-                file_info = {
-                    "file_name": file_name,  # Return only file_name to avoid path confusion
-                    "size": obj.size,
-                    "last_modified": obj.last_modified.isoformat() if obj.last_modified else None
-                }
-                file_list.append(file_info)
-                logger.info(f"Found file: {file_name} for user {user_id}")
-            return json.dumps(file_list, indent=2, default=str)
+            found = ItemSampler(logger)
+            for entry in page:
+                file_name = _entry_file_name(entry)
+                file_list.append({"file_name": file_name, "size": entry[1], "last_modified": entry[2]})
+                found.log("Found file: %s for user %s", file_name, user_id)
+            found.finish("files")
+            next_page_token = _encode_page_token(sort_by, descending, LIST_SORT_KEYS[sort_by](page[-1])) if more else None
+            logger.info("Listed %d files for user %s", len(file_list), user_id)
+            return json.dumps(
+                {"files": file_list, "next_page_token": next_page_token}, separators=(",", ":"), default=str
+            )
+        except DataError as e:
+            return f"Error: {str(e)}"
         except S3Error as e:
             logger.error(f"Error listing MinIO files: {e}")
             raise ToolError("Failed to list files from storage.")
@@ -121,6 +238,8 @@ def register_minio_tools(mcp_server):
         Returns:
             str: Success message with the file_name (not full path).
         """
+        from minio.error import S3Error
+
         try:
             safe_file_name = get_safe_file_name(file_name)
             client = _get_minio_client(mcp_server.config)
@@ -136,7 +255,9 @@ def register_minio_tools(mcp_server):
             with mcp_server.file_manager.lock_file(local_file_path):
                 # Download the file from MinIO
                 client.fget_object(bucket_name, object_name, str(local_file_path))
-                logger.info(f"Successfully pulled file {safe_file_name} from MinIO for user {user_id}")
+                mcp_server.file_manager.mark_synced(local_file_path, object_name)
+                mcp_server.listing_cache.invalidate(user_id)
+                logger.info("Successfully pulled file %s from MinIO for user %s", safe_file_name, user_id)
                 
                 return f"File '{safe_file_name}' downloaded successfully from MinIO"
                 
@@ -152,6 +273,8 @@ def register_minio_tools(mcp_server):
         """
         Upload a local Excel file to MinIO, then remove the local copy.
         The uploaded file gets a unique name to differentiate from originals.
+        With write-behind sync enabled, the local copy is kept and later
+        edits are uploaded to the same object.
 
         Args:
             user_id (str): User ID for accessing user-specific files. This parameter is required.
@@ -160,6 +283,8 @@ def register_minio_tools(mcp_server):
         Returns:
             str: Success message with the uploaded file_name.
         """
+        from minio.error import S3Error
+
         try:
             safe_file_name = get_safe_file_name(file_name)
             client = _get_minio_client(mcp_server.config)
@@ -180,11 +305,21 @@ def register_minio_tools(mcp_server):
                 try:
                     # Upload the file to MinIO
                     client.fput_object(bucket_name, object_name, str(local_file_path))
-                    logger.info(f"Successfully pushed file {safe_file_name} to MinIO as {unique_file_name}")
+                    mcp_server.listing_cache.invalidate(user_id)
+                    logger.info("Successfully pushed file %s to MinIO as %s", safe_file_name, unique_file_name)
+                    
+                    if mcp_server.sync is not None:
+                        # Keep the local copy hot; later edits are written back to this object
+                        mcp_server.file_manager.mark_synced(local_file_path, object_name)
+                        return (
+                            f"File uploaded to MinIO as '{unique_file_name}', local copy {safe_file_name} "
+                            "is kept and later edits are synced to it"
+                        )
                     
                     # Remove the local file after successful upload
                     local_file_path.unlink()
-                    logger.info(f"Removed local file: {safe_file_name}")
+                    mcp_server.file_manager.clear_sync_record(local_file_path)
+                    logger.info("Removed local file: %s", safe_file_name)
                     
                     return f"File uploaded to MinIO as '{unique_file_name}', local copy {safe_file_name} has been removed"
                     
@@ -194,4 +329,32 @@ def register_minio_tools(mcp_server):
                 
         except Exception as e:
             logger.error(f"Error in push_minio_file: {e}")
-            raise ToolError("An unexpected error occurred while uploading the file.")
\ No newline at end of file
+            raise ToolError("An unexpected error occurred while uploading the file.")
+
+    @mcp_server.tool(tags={"minio", "read"})
+    def get_sync_status(user_id: str, file_name: Optional[str] = None) -> str:
+        """
+        Show whether local files have been saved to MinIO.
+
+        Args:
+            user_id (str): User ID for accessing user-specific files. This parameter is required.
+            file_name (str, optional): Only report this local file.
+
+        Returns:
+            str: JSON object with:
+            - write_behind (bool): whether edits are uploaded in the background
+            - files (list): per local file, file_name, state (synced, pending,
+              syncing, retrying or unsynced), object and last_synced
+        """
+        try:
+            safe_file_name = get_safe_file_name(file_name) if file_name else None
+            if mcp_server.sync is not None:
+                files = mcp_server.sync.status(user_id, safe_file_name)
+            else:
+                files = local_status(mcp_server.file_manager, user_id, safe_file_name)
+            if safe_file_name and not files:
+                return f"Error: File not found: {safe_file_name}"
+            return json.dumps({"write_behind": mcp_server.sync is not None, "files": files}, default=str)
+        except Exception as e:
+            logger.error(f"Error getting sync status: {e}")
+            raise ToolError("An unexpected error occurred while reading sync status.")
@@ -1,60 +1,94 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
 import logging
 
 from .workbook import get_or_create_workbook
 from .cell_utils import validate_cell_reference
 from .exceptions import ValidationError, CalculationError
-from .validation import validate_formula
+from .validation import check_formula
 
 logger = logging.getLogger(__name__)
 
-def apply_formula(
+def _prepare_formula(cell: str, formula: str) -> str:
+    """Validate a cell/formula pair without touching the workbook."""
+    if not validate_cell_reference(cell):
+        raise ValidationError(f"Invalid cell reference: {cell}")
+
+    # Ensure formula starts with =
+    if not formula.startswith('='):
+        formula = f'={formula}'
+
+    check_formula(formula)
+    return formula
+
+def apply_formulas(
     filepath: str,
     sheet_name: str,
-    cell: str,
-    formula: str
+    formulas: List[Dict[str, str]]
 ) -> Dict[str, Any]:
-    """Apply any Excel formula to a cell."""
+    """Validate and apply many formulas with a single load and save.
+
+    Every formula is validated before the workbook is opened, so an invalid
+    entry leaves the file untouched.
+
+    Args:
+        filepath: Path to Excel file
+        sheet_name: Name of worksheet
+        formulas: List of {"cell": ..., "formula": ...} entries
+
+    Returns:
+        Dictionary with a message and the applied cell/formula pairs
+    """
     try:
-        if not validate_cell_reference(cell):
-            raise ValidationError(f"Invalid cell reference: {cell}")
-            
+        if not formulas:
+            raise ValidationError("No formulas provided")
+
+        prepared = []
+        for entry in formulas:
+            if not isinstance(entry, dict) or "cell" not in entry or "formula" not in entry:
+                raise ValidationError("Each formula entry must have 'cell' and 'formula' keys")
+            cell = entry["cell"]
+            prepared.append((cell, _prepare_formula(cell, str(entry["formula"]))))
+
         wb = get_or_create_workbook(filepath)
         if sheet_name not in wb.sheetnames:
             raise ValidationError(f"Sheet '{sheet_name}' not found")
-            
+
         sheet = wb[sheet_name]
-        
-        # Ensure formula starts with =
-        if not formula.startswith('='):
-            formula = f'={formula}'
-            
-        # Validate formula syntax
-        is_valid, message = validate_formula(formula)
-        if not is_valid:
-            raise CalculationError(f"Invalid formula syntax: {message}")
-            
-        try:
-            # Apply formula to the cell
-            cell_obj = sheet[cell]
-            cell_obj.value = formula
-        except Exception as e:
-            raise CalculationError(f"Failed to apply formula to cell: {str(e)}")
-            
+
+        for cell, formula in prepared:
+            try:
+                sheet[cell].value = formula
+            except Exception as e:
+                raise CalculationError(f"Failed to apply formula to cell {cell}: {str(e)}")
+
         try:
             wb.save(filepath)
         except Exception as e:
             raise CalculationError(f"Failed to save workbook after applying formula: {str(e)}")
-        
+
         return {
-            "message": f"Applied formula '{formula}' to cell {cell}",
-            "cell": cell,
-            "formula": formula
+            "message": f"Applied {len(prepared)} formula(s) to sheet '{sheet_name}'",
+            "formulas": [{"cell": cell, "formula": formula} for cell, formula in prepared]
         }
-        
+
     except (ValidationError, CalculationError) as e:
         logger.error(str(e))
         raise
     except Exception as e:
-        logger.error(f"Failed to apply formula: {e}")
-        raise CalculationError(str(e))
\ No newline at end of file
+        logger.error(f"Failed to apply formulas: {e}")
+        raise CalculationError(str(e))
+
+def apply_formula(
+    filepath: str,
+    sheet_name: str,
+    cell: str,
+    formula: str
+) -> Dict[str, Any]:
+    """Apply any Excel formula to a cell."""
+    result = apply_formulas(filepath, sheet_name, [{"cell": cell, "formula": formula}])
+    applied = result["formulas"][0]["formula"]
+    return {
+        "message": f"Applied formula '{applied}' to cell {cell}",
+        "cell": cell,
+        "formula": applied
+    }
@@ -4,6 +4,8 @@ from typing import Any, Dict, List, Optional
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
 
+from .references import resolver_for
+
 logger = logging.getLogger(__name__)
 
 def get_data_validation_for_cell(worksheet: Worksheet, cell_address: str) -> Optional[Dict[str, Any]]:
@@ -30,7 +32,7 @@ def get_data_validation_for_cell(worksheet: Worksheet, cell_address: str) -> Opt
         return None
         
     except Exception as e:
-        logger.warning(f"Failed to get validation for cell {cell_address}: {e}")
+        logger.warning("Failed to get validation for cell %s: %s", cell_address, e)
         return None
 
 def _cell_in_validation_range(row: int, col: int, data_validation) -> bool:
@@ -43,7 +45,10 @@ def _cell_in_validation_range(row: int, col: int, data_validation) -> bool:
                 return True
         return False
     except Exception as e:
-        logger.warning(f"Error checking if cell ({row}, {col}) is in validation range for DV sqref '{getattr(data_validation, 'sqref', 'N/A')}': {e}")
+        logger.warning(
+            "Error checking if cell (%s, %s) is in validation range for DV sqref '%s': %s",
+            row, col, getattr(data_validation, 'sqref', 'N/A'), e
+        )
         return False
 
 def _extract_validation_metadata(data_validation, cell_address: str, worksheet: Optional[Worksheet] = None) -> Dict[str, Any]:
@@ -84,7 +89,7 @@ def _extract_validation_metadata(data_validation, cell_address: str, worksheet:
         return validation_info
         
     except Exception as e:
-        logger.warning(f"Failed to extract validation metadata: {e}")
+        logger.warning("Failed to extract validation metadata: %s", e)
         return {
             "cell": cell_address,
             "has_validation": True,
@@ -93,10 +98,19 @@ def _extract_validation_metadata(data_validation, cell_address: str, worksheet:
         }
 
 def _extract_list_values(formula: str, worksheet: Optional[Worksheet] = None) -> List[str]:
-    """Extract allowed values from a list validation formula."""
+    """Extract allowed values from a list validation formula.
+    
+    Range references, defined names and table structured references are
+    resolved through the loaded workbook's reference resolver, which caches
+    them for as long as that workbook is loaded, so a list shared by many
+    validated cells is read once per call rather than once per cell.
+    """
     try:
-        # Remove quotes if present
-        formula = formula.strip('"')
+        # Quoted formulas are literal lists ("Yes,No")
+        if formula.startswith('"'):
+            formula = formula.strip('"')
+            values = [val.strip().strip('"') for val in formula.split(',')]
+            return [val for val in values if val]  # Remove empty values
         
         # Handle comma-separated list
         if ',' in formula:
@@ -104,52 +118,31 @@ def _extract_list_values(formula: str, worksheet: Optional[Worksheet] = None) ->
             values = [val.strip().strip('"') for val in formula.split(',')]
             return [val for val in values if val]  # Remove empty values
             
-        # Handle range reference (e.g., "$A$1:$A$5" or "Sheet1!$A$1:$A$5")
-        elif (':' in formula or formula.startswith('$')) and worksheet:
+        # Handle range reference (e.g., "$A$1:$A$5" or "Sheet1!$A$1:$A$5"), defined
+        # names (e.g., "Options") and structured references (e.g., "Table1[Status]")
+        if worksheet is not None:
             try:
-                # Remove potential leading '=' if it's a formula like '=Sheet1!$A$1:$A$5'
-                range_ref = formula
-                if formula.startswith('='):
-                    range_ref = formula[1:]
-                
-                actual_values = []
-                # worksheet[range_ref] can resolve ranges like "A1:A5" or "SheetName!A1:A5"
-                # It returns a tuple of tuples of cells for ranges, or a single cell
-                range_cells = worksheet[range_ref]
-                
-                # Handle single cell or range
-                if hasattr(range_cells, 'value'):  # Single cell
-                    if range_cells.value is not None:
-                        actual_values.append(str(range_cells.value))
-                else:  # Range of cells
-                    for row_of_cells in range_cells:
-                        # Handle case where row_of_cells might be a single cell
-                        if hasattr(row_of_cells, 'value'):
-                            if row_of_cells.value is not None:
-                                actual_values.append(str(row_of_cells.value))
-                        else:
-                            for cell in row_of_cells:
-                                if cell.value is not None:
-                                    actual_values.append(str(cell.value))
-                
+                resolved = resolver_for(worksheet.parent).resolve_values(formula, worksheet.title)
+            except Exception as e:
+                logger.warning("Could not resolve range '%s' for list validation: %s", formula, e)
+                return [f"Range: {formula} (resolution error)"]
+            if resolved is not None:
+                actual_values = [str(value) for value in resolved if value is not None]
                 if actual_values:
                     return actual_values
                 return [f"Range: {formula} (empty or unresolvable)"]
-                
-            except Exception as e:
-                logger.warning(f"Could not resolve range '{formula}' for list validation: {e}")
-                return [f"Range: {formula} (resolution error)"]
+            if ':' in formula or formula.startswith('$'):
+                return [f"Range: {formula} (empty or unresolvable)"]
                 
         # Handle range reference when worksheet not available
         elif ':' in formula or formula.startswith('$'):
             return [f"Range: {formula}"]
             
         # Single value
-        else:
-            return [formula.strip('"')]
+        return [formula.strip('"')]
             
     except Exception as e:
-        logger.warning(f"Failed to parse list formula '{formula}': {e}")
+        logger.warning("Failed to parse list formula '%s': %s", formula, e)
         return [formula]  # Return original formula if parsing fails
 
 def get_all_validation_ranges(worksheet: Worksheet) -> List[Dict[str, Any]]:
@@ -174,6 +167,6 @@ def get_all_validation_ranges(worksheet: Worksheet) -> List[Dict[str, Any]]:
             validations.append(validation_info)
             
     except Exception as e:
-        logger.warning(f"Failed to get validation ranges: {e}")
+        logger.warning("Failed to get validation ranges: %s", e)
         
     return validations 
\ No newline at end of file
@@ -1,4 +1,5 @@
-from typing import Any, Optional, Dict
+from typing import Any, Iterator, List, Optional, Dict, Set, Tuple
+from datetime import date, datetime
 import logging
 from enum import Enum
 import re
@@ -8,16 +9,18 @@ from openpyxl.chart import (
     BarChart, LineChart, PieChart, ScatterChart, 
     AreaChart, Reference, Series
 )
+from openpyxl.chart.data_source import AxDataSource, NumRef
 from openpyxl.chart.label import DataLabelList
 from openpyxl.chart.legend import Legend
 from openpyxl.chart.axis import ChartLines
-from openpyxl.drawing.spreadsheet_drawing import (
-    AnchorMarker, OneCellAnchor, SpreadsheetDrawing
-)
-from openpyxl.utils import column_index_from_string
+from openpyxl.utils import get_column_letter, range_to_tuple
+from openpyxl.utils.datetime import to_excel
+from openpyxl.workbook.workbook import Workbook
 
 from .cell_utils import parse_cell_range
+from .downsample import DOWNSAMPLE_METHODS, select_rows
 from .exceptions import ValidationError, ChartError
+from .internal_sheets import CHART_DATA_SHEET
 
 logger = logging.getLogger(__name__)
 
@@ -55,205 +58,458 @@ class ChartStyle:
         self.grid_lines = grid_lines
         self.style_id = style_id
 
-def create_chart_in_sheet(
-    filepath: str,
-    sheet_name: str,
-    data_range: str,
-    chart_type: str,
-    target_cell: str,
-    title: str = "",
-    x_axis: str = "",
-    y_axis: str = "",
-    style: Optional[Dict] = None
-) -> Dict[str, Any]:
-    """Create chart in sheet with enhanced styling options"""
-    # Ensure style dict exists and defaults to showing data labels
-    if style is None:
-        style = {"show_data_labels": True}
+CHART_CLASSES = {
+    "line": LineChart,
+    "bar": BarChart,
+    "pie": PieChart,
+    "scatter": ScatterChart,
+    "area": AreaChart
+}
+
+# Default chart size in centimetres
+DEFAULT_CHART_WIDTH = 15
+DEFAULT_CHART_HEIGHT = 7.5
+
+DEFAULT_TARGET_POINTS = 1000
+
+# (sheet title, min_row, min_col, max_row, max_col)
+Bounds = Tuple[str, int, int, int, int]
+
+
+def _parse_chart_range(wb: Workbook, data_range: str, default_sheet: str) -> Bounds:
+    """Parse "A1:C10" or "Sheet!A1:C10" into bounds on an existing sheet."""
+    if "!" in data_range:
+        range_sheet_name, cell_range = data_range.rsplit("!", 1)
+        range_sheet_name = range_sheet_name.strip("'")
+        if range_sheet_name not in wb.sheetnames:
+            raise ValidationError(f"Sheet '{range_sheet_name}' referenced in data range not found")
     else:
-        # If caller omitted the flag, default to True
-        style.setdefault("show_data_labels", True)
+        range_sheet_name, cell_range = default_sheet, data_range
+
     try:
-        wb = load_workbook(filepath)
-        if sheet_name not in wb.sheetnames:
-            logger.error(f"Sheet '{sheet_name}' not found")
-            raise ValidationError(f"Sheet '{sheet_name}' not found")
-
-        worksheet = wb[sheet_name]
-
-        # Initialize collections if they don't exist
-        if not hasattr(worksheet, '_drawings'):
-            worksheet._drawings = []
-        if not hasattr(worksheet, '_charts'):
-            worksheet._charts = []
-
-        # Parse the data range
-        if "!" in data_range:
-            range_sheet_name, cell_range = data_range.split("!")
-            if range_sheet_name not in wb.sheetnames:
-                logger.error(f"Sheet '{range_sheet_name}' referenced in data range not found")
-                raise ValidationError(f"Sheet '{range_sheet_name}' referenced in data range not found")
-        else:
-            cell_range = data_range
+        start_cell, end_cell = cell_range.split(":")
+        start_row, start_col, end_row, end_col = parse_cell_range(start_cell, end_cell)
+    except ValueError as e:
+        raise ValidationError(f"Invalid data range format: {str(e)}")
+    return (range_sheet_name, start_row, start_col, end_row, end_col)
 
-        try:
-            start_cell, end_cell = cell_range.split(":")
-            start_row, start_col, end_row, end_col = parse_cell_range(start_cell, end_cell)
-        except ValueError as e:
-            logger.error(f"Invalid data range format: {e}")
-            raise ValidationError(f"Invalid data range format: {str(e)}")
-
-        # Validate chart type
-        chart_classes = {
-            "line": LineChart,
-            "bar": BarChart,
-            "pie": PieChart,
-            "scatter": ScatterChart,
-            "area": AreaChart
-        }
-        
-        chart_type_lower = chart_type.lower()
-        ChartClass = chart_classes.get(chart_type_lower)
-        if not ChartClass:
-            logger.error(f"Unsupported chart type: {chart_type}")
+
+def _validate_chart_spec(wb: Workbook, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Check one chart spec against the workbook and return it normalized.
+
+    Raises:
+        ValidationError: If the sheet, ranges, chart type, anchor, size or series mapping is invalid
+    """
+    if not isinstance(spec, dict):
+        raise ValidationError("Chart spec must be an object")
+    sheet_name = spec.get("sheet_name")
+    if sheet_name not in wb.sheetnames:
+        raise ValidationError(f"Sheet '{sheet_name}' not found")
+
+    chart_type = str(spec.get("chart_type", "")).lower()
+    if chart_type not in CHART_CLASSES:
+        raise ValidationError(
+            f"Unsupported chart type: {spec.get('chart_type')}. "
+            f"Supported types: {', '.join(CHART_CLASSES.keys())}"
+        )
+
+    # Multi-letter columns like 'AA10' are supported
+    target_cell = str(spec.get("target_cell", ""))
+    if not re.match(r"^[A-Za-z]+\d+$", target_cell):
+        raise ValidationError(f"Invalid target cell format: {target_cell}")
+
+    size = {}
+    for key, default in (("width", DEFAULT_CHART_WIDTH), ("height", DEFAULT_CHART_HEIGHT)):
+        value = spec.get(key)
+        value = default if value is None else value
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValidationError(f"Chart {key} must be a positive number of centimetres")
+        size[key] = value
+
+    # Data labels are shown unless the caller turns them off
+    style = dict(spec.get("style") or {})
+    style.setdefault("show_data_labels", True)
+
+    series = []
+    for index, entry in enumerate(spec.get("series") or []):
+        if not isinstance(entry, dict) or not entry.get("values"):
+            raise ValidationError(f"Series {index + 1} must have a 'values' range")
+        categories = entry.get("categories")
+        series.append({
+            "values": _parse_chart_range(wb, entry["values"], sheet_name),
+            "categories": _parse_chart_range(wb, categories, sheet_name) if categories else None,
+            "title": entry.get("title"),
+        })
+    if chart_type == "scatter" and any(entry["categories"] is None for entry in series):
+        raise ValidationError("Scatter chart series need 'categories' (x values)")
+
+    data_range = spec.get("data_range")
+    if not data_range and not series:
+        raise ValidationError("Chart needs a data_range or a series mapping")
+
+    downsample = spec.get("downsample")
+    if downsample:
+        downsample = str(downsample).lower()
+        if downsample not in DOWNSAMPLE_METHODS:
             raise ValidationError(
-                f"Unsupported chart type: {chart_type}. "
-                f"Supported types: {', '.join(chart_classes.keys())}"
+                f"Unsupported downsample method: {spec.get('downsample')}. "
+                f"Supported methods: {', '.join(DOWNSAMPLE_METHODS)}"
             )
-            
-        chart = ChartClass()
-        
-        # Basic chart settings
-        chart.title = title
+        if series:
+            raise ValidationError("Downsampling needs a data_range, not a series mapping")
+    target_points = spec.get("target_points")
+    target_points = DEFAULT_TARGET_POINTS if target_points is None else target_points
+    if isinstance(target_points, bool) or not isinstance(target_points, int) or target_points < 10:
+        raise ValidationError("target_points must be an integer of at least 10")
+
+    return {
+        "sheet_name": sheet_name,
+        "chart_type": chart_type,
+        "target_cell": target_cell.upper(),
+        "data_range": data_range,
+        "source": _parse_chart_range(wb, data_range, sheet_name) if data_range else None,
+        "series": series,
+        "title": spec.get("title") or "",
+        "x_axis": spec.get("x_axis") or "",
+        "y_axis": spec.get("y_axis") or "",
+        "width": size["width"],
+        "height": size["height"],
+        "style": style,
+        "downsample": downsample or None,
+        "target_points": target_points,
+    }
+
+
+def _plot_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return float(to_excel(value))
+    return None
+
+
+def _series_formulas(chart) -> Iterator[str]:
+    """Range formulas of every series of a chart, including combined charts."""
+    for part in getattr(chart, "_charts", [chart]):
+        for series in part.series:
+            for source in (series.tx, series.cat, series.val, series.xVal, series.yVal):
+                for ref in (getattr(source, "numRef", None), getattr(source, "strRef", None)):
+                    if ref is not None and ref.f:
+                        yield ref.f
+
+
+def _prune_chart_data(wb: Workbook) -> Set[int]:
+    """Clear chart data columns no chart refers to any more.
+
+    Blocks are left behind when their charts are removed, for example with
+    the sheet holding them.
+
+    Returns:
+        The chart data columns still in use
+    """
+    used: Set[int] = set()
+    if CHART_DATA_SHEET not in wb.sheetnames:
+        return used
+    for ws in wb.worksheets:
+        for chart in ws._charts:
+            for formula in _series_formulas(chart):
+                try:
+                    sheet_name, (min_col, _, max_col, _) = range_to_tuple(formula)
+                except ValueError:
+                    continue
+                if sheet_name == CHART_DATA_SHEET:
+                    used.update(range(min_col, max_col + 1))
+    helper = wb[CHART_DATA_SHEET]
+    for key in [key for key in helper._cells if key[1] not in used]:
+        del helper._cells[key]
+    return used
+
+
+def _free_block(used: Set[int], width: int) -> int:
+    """First column of a gap of ``width`` columns with a blank column on each side."""
+    first_col = 1
+    while any(col in used for col in range(first_col - 1, first_col + width + 1)):
+        first_col += 1
+    return first_col
+
+
+def _downsample_source(wb: Workbook, spec: Dict[str, Any], used: Set[int]) -> Optional[Dict[str, Any]]:
+    """Copy a reduced set of the source rows to the chart data sheet and point the spec at it.
+
+    The first column (categories / x values) and all series columns are copied
+    for every kept row, so the chart is built from the copy exactly as it
+    would be from the source. The block goes into the first gap between the
+    ``used`` chart data columns, which are updated.
+
+    Returns:
+        Downsampling details, or None if the source is already small enough
+    """
+    sheet_name, start_row, start_col, end_row, end_col = spec["source"]
+    rows = list(wb[sheet_name].iter_rows(
+        min_row=start_row, max_row=end_row, min_col=start_col, max_col=end_col, values_only=True
+    ))
+    header, data = rows[0], rows[1:]
+    if len(header) < 2 or len(data) <= spec["target_points"]:
+        return None
+
+    xs = [_plot_number(row[0]) for row in data]
+    series = [[_plot_number(row[col]) for row in data] for col in range(1, len(header))]
+    keep = select_rows(
+        spec["downsample"], xs if None not in xs else None, series, spec["target_points"]
+    )
+
+    if CHART_DATA_SHEET in wb.sheetnames:
+        helper = wb[CHART_DATA_SHEET]
+    else:
+        helper = wb.create_sheet(CHART_DATA_SHEET)
+        helper.sheet_state = "veryHidden"
+    # Each downsampled chart gets its own block of columns
+    first_col = _free_block(used, len(header))
+    used.update(range(first_col, first_col + len(header)))
+    for offset, row in enumerate([header] + [data[i] for i in keep]):
+        for col, value in enumerate(row):
+            helper.cell(row=offset + 1, column=first_col + col, value=value)
+
+    last_col = first_col + len(header) - 1
+    spec["source"] = (CHART_DATA_SHEET, 1, first_col, len(keep) + 1, last_col)
+    return {
+        "method": spec["downsample"],
+        "source_rows": len(data),
+        "points": len(keep),
+        "helper_range": (
+            f"{CHART_DATA_SHEET}!{get_column_letter(first_col)}1:"
+            f"{get_column_letter(last_col)}{len(keep) + 1}"
+        ),
+    }
+
+
+class _ReferenceCache:
+    """Hands out one Reference per distinct range across all charts of a build."""
+
+    def __init__(self, wb: Workbook):
+        self.wb = wb
+        self._references: Dict[Bounds, Reference] = {}
+
+    def get(self, sheet_name: str, min_row: int, min_col: int, max_row: int, max_col: int) -> Reference:
+        key = (sheet_name, min_row, min_col, max_row, max_col)
+        reference = self._references.get(key)
+        if reference is None:
+            reference = Reference(
+                self.wb[sheet_name], min_col=min_col, min_row=min_row, max_col=max_col, max_row=max_row
+            )
+            self._references[key] = reference
+        return reference
+
+    def of(self, bounds: Bounds) -> Reference:
+        return self.get(*bounds)
+
+
+def _add_series(chart, spec: Dict[str, Any], references: _ReferenceCache) -> None:
+    # Series are built from the reference strings: the series factory pops the
+    # title cell off a Reference it is given, which would corrupt shared ones
+    if spec["series"]:
+        for entry in spec["series"]:
+            values = str(references.of(entry["values"]))
+            title_from_data = entry["title"] is None
+            if spec["chart_type"] == "scatter":
+                series = Series(
+                    values, str(references.of(entry["categories"])),
+                    title=entry["title"], title_from_data=title_from_data
+                )
+            else:
+                series = Series(values, title=entry["title"], title_from_data=title_from_data)
+                if entry["categories"] is not None:
+                    series.cat = AxDataSource(numRef=NumRef(f=str(references.of(entry["categories"]))))
+            chart.series.append(series)
+        return
+
+    sheet_name, start_row, start_col, end_row, end_col = spec["source"]
+    if spec["chart_type"] == "scatter":
+        # For scatter charts, the first column holds the x values for every other column
+        x_values = str(references.get(sheet_name, start_row + 1, start_col, end_row, start_col))
+        for col in range(start_col + 1, end_col + 1):
+            y_values = str(references.get(sheet_name, start_row, col, end_row, col))
+            chart.series.append(Series(y_values, x_values, title_from_data=True))
+    else:
+        data = references.get(sheet_name, start_row, start_col + 1, end_row, end_col)
+        cats = references.get(sheet_name, start_row + 1, start_col, end_row, start_col)
+        chart.add_data(data, titles_from_data=True)
+        chart.set_categories(cats)
+
+
+def _apply_style(chart, style: Dict[str, Any]) -> None:
+    if style.get("show_legend", True):
+        chart.legend = Legend()
+        chart.legend.position = style.get("legend_position", "r")
+    else:
+        chart.legend = None
+
+    if style.get("show_data_labels", False):
+        data_labels = DataLabelList()
+        # Gather optional overrides
+        dlo = style.get("data_label_options", {}) if isinstance(style.get("data_label_options", {}), dict) else {}
+
+        # Helper to read bool with fallback
+        def _opt(name: str, default: bool) -> bool:
+            return bool(dlo.get(name, default))
+
+        # Apply options – Excel will concatenate any that are set to True
+        data_labels.showVal = _opt("show_val", True)
+        data_labels.showCatName = _opt("show_cat_name", False)
+        data_labels.showSerName = _opt("show_ser_name", False)
+        data_labels.showLegendKey = _opt("show_legend_key", False)
+        data_labels.showPercent = _opt("show_percent", False)
+        data_labels.showBubbleSize = _opt("show_bubble_size", False)
+
+        chart.dataLabels = data_labels
+
+    if style.get("grid_lines", False):
         if hasattr(chart, "x_axis"):
-            chart.x_axis.title = x_axis
+            chart.x_axis.majorGridlines = ChartLines()
         if hasattr(chart, "y_axis"):
-            chart.y_axis.title = y_axis
+            chart.y_axis.majorGridlines = ChartLines()
 
-        try:
-            # Create data references
-            if chart_type_lower == "scatter":
-                # For scatter charts, create series for each pair of columns
-                for col in range(start_col + 1, end_col + 1):
-                    x_values = Reference(
-                        worksheet,
-                        min_row=start_row + 1,
-                        max_row=end_row,
-                        min_col=start_col
-                    )
-                    y_values = Reference(
-                        worksheet,
-                        min_row=start_row + 1,
-                        max_row=end_row,
-                        min_col=col
-                    )
-                    series = Series(y_values, x_values, title_from_data=True)
-                    chart.series.append(series)
-            else:
-                # For other chart types
-                data = Reference(
-                    worksheet,
-                    min_row=start_row,
-                    max_row=end_row,
-                    min_col=start_col + 1,
-                    max_col=end_col
-                )
-                cats = Reference(
-                    worksheet,
-                    min_row=start_row + 1,
-                    max_row=end_row,
-                    min_col=start_col
-                )
-                chart.add_data(data, titles_from_data=True)
-                chart.set_categories(cats)
-        except Exception as e:
-            logger.error(f"Failed to create chart data references: {e}")
-            raise ChartError(f"Failed to create chart data references: {str(e)}")
+    if style.get("style_id") is not None:
+        chart.style = style["style_id"]
 
-        # Apply style if provided
-        try:
-            if style.get("show_legend", True):
-                chart.legend = Legend()
-                chart.legend.position = style.get("legend_position", "r")
-            else:
-                chart.legend = None
-
-            if style.get("show_data_labels", False):
-                data_labels = DataLabelList()
-                # Gather optional overrides
-                dlo = style.get("data_label_options", {}) if isinstance(style.get("data_label_options", {}), dict) else {}
-
-                # Helper to read bool with fallback
-                def _opt(name: str, default: bool) -> bool:
-                    return bool(dlo.get(name, default))
-
-                # Apply options – Excel will concatenate any that are set to True
-                data_labels.showVal = _opt("show_val", True)
-                data_labels.showCatName = _opt("show_cat_name", False)
-                data_labels.showSerName = _opt("show_ser_name", False)
-                data_labels.showLegendKey = _opt("show_legend_key", False)
-                data_labels.showPercent = _opt("show_percent", False)
-                data_labels.showBubbleSize = _opt("show_bubble_size", False)
-
-                chart.dataLabels = data_labels
-
-            if style.get("grid_lines", False):
-                if hasattr(chart, "x_axis"):
-                    chart.x_axis.majorGridlines = ChartLines()
-                if hasattr(chart, "y_axis"):
-                    chart.y_axis.majorGridlines = ChartLines()
-        except Exception as e:
-            logger.error(f"Failed to apply chart style: {e}")
-            raise ChartError(f"Failed to apply chart style: {str(e)}")
 
-        # Set chart size
-        chart.width = 15
-        chart.height = 7.5
+def _build_chart(spec: Dict[str, Any], references: _ReferenceCache):
+    chart = CHART_CLASSES[spec["chart_type"]]()
 
-        # Create drawing and anchor
-        try:
-            drawing = SpreadsheetDrawing()
-            drawing.chart = chart
-
-            # Parse and validate target cell (supports multi-char columns like 'AA10')
-            match = re.match(r"^([A-Za-z]+)(\d+)$", target_cell)
-            if not match:
-                raise ValidationError(f"Invalid target cell format: {target_cell}")
-            col_letters, row_str = match.groups()
-            col = column_index_from_string(col_letters) - 1
-            row = int(row_str) - 1
-
-            anchor = OneCellAnchor()
-            anchor._from = AnchorMarker(col=col, row=row)
-            drawing.anchor = anchor
-
-            # Add to worksheet
-            worksheet._drawings.append(drawing)
-            worksheet._charts.append(chart)
-        except ValueError as e:
-            logger.error(f"Invalid target cell: {e}")
-            raise ValidationError(f"Invalid target cell: {str(e)}")
-        except Exception as e:
-            logger.error(f"Failed to create chart drawing: {e}")
-            raise ChartError(f"Failed to create chart drawing: {str(e)}")
+    # Basic chart settings; an empty title would be written as the text "None"
+    chart.title = spec["title"] or None
+    if hasattr(chart, "x_axis"):
+        chart.x_axis.title = spec["x_axis"] or None
+    if hasattr(chart, "y_axis"):
+        chart.y_axis.title = spec["y_axis"] or None
+
+    try:
+        _add_series(chart, spec, references)
+    except Exception as e:
+        raise ChartError(f"Failed to create chart data references: {str(e)}")
+
+    try:
+        _apply_style(chart, spec["style"])
+    except Exception as e:
+        raise ChartError(f"Failed to apply chart style: {str(e)}")
+
+    # The anchor cell and size in cm become the drawing's one-cell anchor
+    chart.width = spec["width"]
+    chart.height = spec["height"]
+    chart.anchor = spec["target_cell"]
+    return chart
+
+
+def create_charts(filepath: str, charts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create several charts with a single workbook load and save.
+
+    Every spec is validated before any chart is added, so an invalid spec
+    leaves the workbook untouched. Ranges used by several charts (e.g. a
+    shared category column) are resolved once.
+
+    Args:
+        filepath: Path to Excel file
+        charts: Chart specs, each with sheet_name, chart_type, target_cell and
+            either data_range or series (list of {"values", "categories",
+            "title"}), plus optional title, x_axis, y_axis, width, height (cm),
+            style, and downsample ("lttb" or "minmax") with target_points
+
+    Returns:
+        Dictionary with status message and the created charts' details
+    """
+    try:
+        if not charts:
+            raise ValidationError("No charts given")
+        wb = load_workbook(filepath)
+
+        specs = []
+        for index, chart_spec in enumerate(charts):
+            try:
+                specs.append(_validate_chart_spec(wb, chart_spec))
+            except ValidationError as e:
+                if len(charts) == 1:
+                    raise
+                raise ValidationError(f"Chart {index + 1}: {e}")
+
+        references = _ReferenceCache(wb)
+        chart_data_columns = _prune_chart_data(wb)
+        details = []
+        for spec in specs:
+            downsampled = _downsample_source(wb, spec, chart_data_columns) if spec["downsample"] else None
+            wb[spec["sheet_name"]].add_chart(_build_chart(spec, references))
+            details.append({
+                "type": spec["chart_type"],
+                "sheet_name": spec["sheet_name"],
+                "location": spec["target_cell"],
+                "data_range": spec["data_range"],
+                "width": spec["width"],
+                "height": spec["height"],
+                "downsampled": downsampled,
+            })
 
         try:
             wb.save(filepath)
         except Exception as e:
-            logger.error(f"Failed to save workbook: {e}")
             raise ChartError(f"Failed to save workbook with chart: {str(e)}")
 
         return {
-            "message": f"{chart_type.capitalize()} chart created successfully",
-            "details": {
-                "type": chart_type,
-                "location": target_cell,
-                "data_range": data_range
-            }
+            "message": f"Created {len(specs)} chart{'s' if len(specs) != 1 else ''}",
+            "details": details
         }
-        
-    except (ValidationError, ChartError):
+
+    except (ValidationError, ChartError) as e:
+        logger.error(str(e))
         raise
     except Exception as e:
         logger.error(f"Unexpected error creating chart: {e}")
         raise ChartError(f"Unexpected error creating chart: {str(e)}")
+
+
+def create_chart_in_sheet(
+    filepath: str,
+    sheet_name: str,
+    data_range: str,
+    chart_type: str,
+    target_cell: str,
+    title: str = "",
+    x_axis: str = "",
+    y_axis: str = "",
+    style: Optional[Dict] = None,
+    width: float = DEFAULT_CHART_WIDTH,
+    height: float = DEFAULT_CHART_HEIGHT,
+    downsample: Optional[str] = None,
+    target_points: int = DEFAULT_TARGET_POINTS
+) -> Dict[str, Any]:
+    """Create chart in sheet with enhanced styling options
+
+    With ``downsample`` ("lttb" or "minmax"), sources longer than
+    ``target_points`` rows are charted from a reduced copy on a very hidden
+    sheet instead of the raw range.
+    """
+    spec = {
+        "sheet_name": sheet_name,
+        "data_range": data_range,
+        "chart_type": chart_type,
+        "target_cell": target_cell,
+        "title": title,
+        "x_axis": x_axis,
+        "y_axis": y_axis,
+        "style": style,
+        "width": width,
+        "height": height,
+        "downsample": downsample,
+        "target_points": target_points,
+    }
+    result = create_charts(filepath, [spec])
+
+    return {
+        "message": f"{chart_type.capitalize()} chart created successfully",
+        "details": {
+            "type": chart_type,
+            "location": target_cell,
+            "data_range": data_range,
+            "downsampled": result["details"][0]["downsampled"]
+        }
+    }
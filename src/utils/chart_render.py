@@ -0,0 +1,342 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import range_to_tuple
+from openpyxl.workbook.workbook import Workbook
+
+from .chart import CHART_CLASSES, Bounds, _validate_chart_spec
+from .exceptions import ValidationError, ChartError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREVIEW_DPI = 100
+EMU_PER_CM = 360000
+PREVIEW_INDEX_SIZE = 256
+
+# Markers and data labels are only drawn on short series; on long ones they are noise
+MAX_MARKED_POINTS = 50
+
+# Preview keys by file identity and request, so asking again for a preview of
+# an unchanged workbook neither loads nor renders anything.
+_preview_index: "OrderedDict[tuple, str]" = OrderedDict()
+_preview_lock = threading.Lock()
+
+
+def _request_key(filepath: str, request: Dict[str, Any]) -> tuple:
+    path = Path(filepath)
+    stat = path.stat()
+    return (
+        str(path.resolve()), stat.st_size, stat.st_mtime_ns,
+        json.dumps(request, sort_keys=True, default=str),
+    )
+
+
+def _indexed_preview(request_key: tuple) -> Optional[str]:
+    with _preview_lock:
+        key = _preview_index.get(request_key)
+        if key is not None:
+            _preview_index.move_to_end(request_key)
+        return key
+
+
+def _index_preview(request_key: tuple, key: str) -> None:
+    with _preview_lock:
+        _preview_index[request_key] = key
+        _preview_index.move_to_end(request_key)
+        while len(_preview_index) > PREVIEW_INDEX_SIZE:
+            _preview_index.popitem(last=False)
+
+
+def _plain_ref(formula: str) -> str:
+    """Turn a chart reference like "'Data'!$B$2:$B$10" into a chart range string."""
+    sheet_name, (min_col, min_row, max_col, max_row) = range_to_tuple(formula)
+    return (
+        f"'{sheet_name}'!{get_column_letter(min_col)}{min_row}:"
+        f"{get_column_letter(max_col)}{max_row}"
+    )
+
+
+def _text(title) -> str:
+    """Plain text of an openpyxl chart or axis title."""
+    if title is None or title.tx is None or title.tx.rich is None:
+        return ""
+    return "".join(
+        run.t or "" for paragraph in title.tx.rich.paragraphs for run in (paragraph.r or [])
+    )
+
+
+def _series_ref(source) -> Optional[str]:
+    if source is None:
+        return None
+    ref = source.numRef or getattr(source, "strRef", None)
+    return _plain_ref(ref.f) if ref is not None and ref.f else None
+
+
+def _existing_chart_spec(wb: Workbook, sheet_name: str, chart_index: int) -> Dict[str, Any]:
+    """Describe an existing chart as a create_charts spec with an explicit series mapping."""
+    if sheet_name not in wb.sheetnames:
+        raise ValidationError(f"Sheet '{sheet_name}' not found")
+    charts = wb[sheet_name]._charts
+    if not 0 <= chart_index < len(charts):
+        raise ValidationError(
+            f"Chart index {chart_index} out of range; sheet '{sheet_name}' has {len(charts)} charts"
+        )
+    chart = charts[chart_index]
+    chart_type = next(
+        (name for name, cls in CHART_CLASSES.items() if type(chart) is cls), None
+    )
+    if chart_type is None:
+        raise ChartError(f"Cannot preview {type(chart).__name__} charts")
+
+    series = []
+    for entry in chart.series:
+        if chart_type == "scatter":
+            values, categories = _series_ref(entry.yVal), _series_ref(entry.xVal)
+        else:
+            values, categories = _series_ref(entry.val), _series_ref(entry.cat)
+        if values is None:
+            continue
+        title = ""
+        if entry.tx is not None:
+            if entry.tx.strRef is not None and entry.tx.strRef.f:
+                title_sheet, (col, row, _, _) = range_to_tuple(entry.tx.strRef.f)
+                if title_sheet in wb.sheetnames:
+                    title = wb[title_sheet].cell(row=row, column=col).value
+            elif entry.tx.v is not None:
+                title = entry.tx.v
+        series.append({"values": values, "categories": categories, "title": str(title or "")})
+    if not series:
+        raise ChartError("Chart has no series to preview")
+
+    # Loaded charts keep their size in the anchor (EMU) rather than width/height
+    width, height = chart.width, chart.height
+    extent = getattr(chart.anchor, "ext", None)
+    if extent is not None and extent.cx and extent.cy:
+        width, height = extent.cx / EMU_PER_CM, extent.cy / EMU_PER_CM
+
+    return {
+        "sheet_name": sheet_name,
+        "chart_type": chart_type,
+        "target_cell": "A1",
+        "series": series,
+        "title": _text(chart.title),
+        "x_axis": _text(getattr(chart.x_axis, "title", None)) if chart_type != "pie" else "",
+        "y_axis": _text(getattr(chart.y_axis, "title", None)) if chart_type != "pie" else "",
+        "width": width,
+        "height": height,
+        "style": {
+            "show_legend": chart.legend is not None,
+            "show_data_labels": bool(chart.dataLabels is not None and chart.dataLabels.showVal),
+            "grid_lines": chart_type != "pie" and chart.y_axis.majorGridlines is not None,
+        },
+    }
+
+
+def _plot_value(value: Any) -> Any:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, datetime, date)):
+        return value
+    return None
+
+
+def _cells(wb: Workbook, bounds: Bounds) -> List[Any]:
+    """Values of a range in row-major order."""
+    sheet_name, min_row, min_col, max_row, max_col = bounds
+    return [
+        value
+        for row in wb[sheet_name].iter_rows(
+            min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True
+        )
+        for value in row
+    ]
+
+
+def _plot_data(wb: Workbook, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Read the values a chart plots: shared categories plus one entry per series."""
+    if spec["series"]:
+        categories = None
+        series = []
+        for entry in spec["series"]:
+            values = _cells(wb, entry["values"])
+            title = entry["title"]
+            if title is None:
+                title, values = values[0] if values else None, values[1:]
+            x = _cells(wb, entry["categories"]) if entry["categories"] else None
+            if categories is None and x is not None:
+                categories = x
+            series.append({"title": str(title or ""), "x": x, "values": [_plot_value(v) for v in values]})
+        return {"categories": categories, "series": series}
+
+    sheet_name, min_row, min_col, max_row, max_col = spec["source"]
+    rows = list(wb[sheet_name].iter_rows(
+        min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True
+    ))
+    if not rows:
+        return {"categories": [], "series": []}
+    header, data = rows[0], rows[1:]
+    categories = [row[0] for row in data]
+    return {
+        "categories": categories,
+        "series": [
+            {
+                "title": str(header[col] if header[col] is not None else f"Series {col}"),
+                "x": categories if spec["chart_type"] == "scatter" else None,
+                "values": [_plot_value(row[col]) for row in data],
+            }
+            for col in range(1, len(header))
+        ],
+    }
+
+
+def _render(spec: Dict[str, Any], data: Dict[str, Any], dpi: int, output: Path) -> None:
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        from matplotlib.figure import Figure
+    except ImportError:
+        raise ChartError("Chart previews require the 'matplotlib' package to be installed")
+
+    figure = Figure(figsize=(spec["width"] / 2.54, spec["height"] / 2.54), dpi=dpi)
+    ax = figure.add_subplot()
+    style = spec["style"]
+    chart_type = spec["chart_type"]
+    series = data["series"]
+    categories = data["categories"] or []
+    labels = [str(c) if c is not None else "" for c in categories]
+
+    if chart_type == "pie":
+        if series:
+            pairs = [(label, v) for label, v in zip(labels, series[0]["values"]) if v]
+            if pairs:
+                names, sizes = zip(*pairs)
+                ax.pie(
+                    [float(size) for size in sizes], labels=names,
+                    autopct="%1.1f%%" if style.get("show_data_labels") else None,
+                )
+        ax.set_aspect("equal")
+    else:
+        positions = list(range(len(labels)))
+        width = 0.8 / max(len(series), 1)
+        for index, entry in enumerate(series):
+            values = [v if v is not None else float("nan") for v in entry["values"]]
+            if chart_type == "scatter":
+                x = [_plot_value(v) for v in (entry["x"] or [])][:len(values)]
+                marker = "o" if len(x) <= MAX_MARKED_POINTS else None
+                ax.plot(x, values[:len(x)], marker=marker, linestyle="-", label=entry["title"])
+                continue
+            xs = positions[:len(values)]
+            if chart_type == "bar":
+                offset = (index - (len(series) - 1) / 2) * width
+                ax.bar([x + offset for x in xs], values[:len(xs)], width=width, label=entry["title"])
+            elif chart_type == "area":
+                ax.fill_between(xs, values[:len(xs)], alpha=0.5, label=entry["title"])
+            else:
+                ax.plot(xs, values[:len(xs)], label=entry["title"])
+            if style.get("show_data_labels") and len(xs) <= MAX_MARKED_POINTS:
+                for x, value in zip(xs, values):
+                    if value == value:
+                        ax.annotate(f"{value:g}", (x, value), ha="center", va="bottom", fontsize=7)
+        if chart_type != "scatter" and labels:
+            # Thin out category labels so long axes stay readable
+            step = max(1, len(labels) // 12)
+            ax.set_xticks(positions[::step])
+            ax.set_xticklabels(labels[::step], rotation=30, ha="right", fontsize=8)
+        ax.set_xlabel(spec["x_axis"])
+        ax.set_ylabel(spec["y_axis"])
+        if style.get("grid_lines"):
+            ax.grid(True, alpha=0.3)
+
+    if spec["title"]:
+        ax.set_title(spec["title"])
+    if style.get("show_legend", True) and series and chart_type != "pie":
+        ax.legend(fontsize=8)
+    figure.tight_layout()
+
+    temp = output.with_suffix(".tmp")
+    figure.savefig(temp, format="png")
+    os.replace(temp, output)
+
+
+def render_chart_preview(
+    filepath: str,
+    cache_dir: str,
+    sheet_name: str,
+    chart: Optional[Dict[str, Any]] = None,
+    chart_index: Optional[int] = None,
+    dpi: int = DEFAULT_PREVIEW_DPI
+) -> Dict[str, Any]:
+    """Render a chart to PNG without Excel, reusing earlier renders.
+
+    Renders are stored in ``cache_dir`` under a hash of the chart spec and
+    the values it plots, so an unchanged chart is never drawn twice. Repeat
+    requests against an unchanged file skip loading the workbook as well.
+
+    Args:
+        filepath: Path to the workbook
+        cache_dir: Directory holding rendered previews
+        sheet_name: Sheet the chart is on (or the default sheet for its ranges)
+        chart: Chart spec as accepted by create_charts (without sheet_name)
+        chart_index: Index of an existing chart on the sheet, used if no spec is given
+        dpi: Image resolution
+
+    Returns:
+        Dict with message, path of the PNG and whether it came from the cache
+    """
+    try:
+        if chart is None and chart_index is None:
+            raise ValidationError("Give either a chart spec or the index of an existing chart")
+        if isinstance(dpi, bool) or not isinstance(dpi, int) or not 20 <= dpi <= 600:
+            raise ValidationError("dpi must be an integer between 20 and 600")
+
+        request = {"sheet_name": sheet_name, "chart": chart, "chart_index": chart_index, "dpi": dpi}
+        request_key = _request_key(filepath, request)
+        cache = Path(cache_dir)
+        key = _indexed_preview(request_key)
+        if key is not None and (cache / f"{key}.png").exists():
+            return {"message": "Chart preview (cached)", "path": str(cache / f"{key}.png"), "cached": True}
+
+        # Existing charts are only available from a full load
+        wb = load_workbook(filepath, read_only=chart is not None)
+        try:
+            if chart is not None:
+                spec = _validate_chart_spec(wb, {"target_cell": "A1", **chart, "sheet_name": sheet_name})
+            else:
+                spec = _validate_chart_spec(wb, _existing_chart_spec(wb, sheet_name, chart_index))
+            data = _plot_data(wb, spec)
+        finally:
+            wb.close()
+
+        rendered = {
+            key: spec[key]
+            for key in ("chart_type", "title", "x_axis", "y_axis", "width", "height", "style")
+        }
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps([rendered, data, dpi], sort_keys=True, default=str).encode("utf-8"))
+        key = digest.hexdigest()
+        output = cache / f"{key}.png"
+        cached = output.exists()
+        if not cached:
+            cache.mkdir(parents=True, exist_ok=True)
+            _render(spec, data, dpi, output)
+        _index_preview(request_key, key)
+        return {
+            "message": "Chart preview (cached)" if cached else "Chart preview rendered",
+            "path": str(output),
+            "cached": cached,
+        }
+    except (ValidationError, ChartError) as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to render chart preview: {e}")
+        raise ChartError(str(e))
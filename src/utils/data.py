@@ -9,6 +9,7 @@ from openpyxl.utils import get_column_letter
 from .exceptions import DataError
 from .cell_utils import parse_cell_range
 from .cell_validation import get_data_validation_for_cell
+from .merged import MergedRangeIndex
 
 logger = logging.getLogger(__name__)
 
@@ -54,9 +55,8 @@ def read_excel_range(
             # This case can happen if start_cell is outside the used area on a sheet with data
             # or on a completely empty sheet.
             logger.warning(
-                f"Start cell {start_cell} is outside the sheet's data boundary "
-                f"({get_column_letter(ws.min_column)}{ws.min_row}:{get_column_letter(ws.max_column)}{ws.max_row}). "
-                f"No data will be read."
+                "Start cell %s is outside the sheet's data boundary (%s%s:%s%s). No data will be read.",
+                start_cell, get_column_letter(ws.min_column), ws.min_row, get_column_letter(ws.max_column), ws.max_row
             )
             return []
 
@@ -206,9 +206,8 @@ def read_excel_range_with_metadata(
             # This case can happen if start_cell is outside the used area on a sheet with data
             # or on a completely empty sheet.
             logger.warning(
-                f"Start cell {start_cell} is outside the sheet's data boundary "
-                f"({get_column_letter(ws.min_column)}{ws.min_row}:{get_column_letter(ws.max_column)}{ws.max_row}). "
-                f"No data will be read."
+                "Start cell %s is outside the sheet's data boundary (%s%s:%s%s). No data will be read.",
+                start_cell, get_column_letter(ws.min_column), ws.min_row, get_column_letter(ws.max_column), ws.max_row
             )
             return {"range": f"{start_cell}:", "sheet_name": sheet_name, "cells": []}
 
@@ -219,6 +218,7 @@ def read_excel_range_with_metadata(
             "sheet_name": sheet_name,
             "cells": []
         }
+        merged_index = MergedRangeIndex.from_worksheet(ws)
         
         for row in range(start_row, end_row + 1):
             for col in range(start_col, end_col + 1):
@@ -231,6 +231,10 @@ def read_excel_range_with_metadata(
                     "row": row,
                     "column": col
                 }
+
+                merged_range = merged_index.find(row, col)
+                if merged_range:
+                    cell_data["merged_range"] = merged_range
                 
                 # Add validation metadata if requested
                 if include_validation:
@@ -0,0 +1,600 @@
+import csv
+import json
+import logging
+import re
+import tempfile
+from datetime import date, datetime, time
+from io import BytesIO
+from itertools import chain, islice
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+
+from .cell_utils import parse_cell_range
+from .exceptions import DataError
+from .package import CT_WORKSHEET, Package, row_xml
+
+logger = logging.getLogger(__name__)
+
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_COLUMNS = 16384
+SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+SUPPORTED_IMPORT_FORMATS = {"csv", "tsv", "jsonl"}
+_FORMAT_BY_SUFFIX = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".tab": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+_BOOL_VALUES = {"true": True, "false": False}
+
+# Stricter than int()/float(): keeps identifiers such as "007" or "1_000" as text
+_INT_RE = re.compile(r"^[+-]?(0|[1-9][0-9]*)$")
+_FLOAT_RE = re.compile(r"^[+-]?((0|[1-9][0-9]*)(\.[0-9]*)?|\.[0-9]+)([eE][+-]?[0-9]+)?$")
+
+
+def _detect_format(path: Path, file_format: Optional[str]) -> str:
+    """Resolve the input format from the explicit argument or the file suffix."""
+    if file_format:
+        fmt = file_format.lower()
+    else:
+        fmt = _FORMAT_BY_SUFFIX.get(path.suffix.lower(), "csv")
+    if fmt not in SUPPORTED_IMPORT_FORMATS:
+        raise DataError(
+            f"Unsupported format: {file_format}. "
+            f"Supported formats: {', '.join(sorted(SUPPORTED_IMPORT_FORMATS))}"
+        )
+    return fmt
+
+
+def _iter_delimited_rows(handle, delimiter: str) -> Iterator[List[Any]]:
+    for row in csv.reader(handle, delimiter=delimiter):
+        yield [value if value != "" else None for value in row]
+
+
+def _iter_jsonl_rows(handle, sample_rows: int) -> tuple[Optional[List[str]], Iterator[List[Any]]]:
+    """Read JSONL records as rows; returns (header, rows).
+
+    Objects are laid out by the keys seen in the first ``sample_rows``
+    records, which also form the header. A later object with any other key
+    is rejected rather than losing the value. Arrays and scalars are laid
+    out by position and have no header.
+    """
+    records = (json.loads(line) for line in handle if line.strip())
+    sample = list(islice(records, sample_rows))
+
+    keys: List[str] = []
+    for record in sample:
+        if isinstance(record, dict):
+            keys.extend(key for key in record if key not in keys)
+    known = set(keys)
+
+    def rows() -> Iterator[List[Any]]:
+        for number, record in enumerate(chain(sample, records), start=1):
+            if isinstance(record, dict):
+                unseen = [key for key in record if key not in known]
+                if unseen:
+                    raise DataError(
+                        f"JSONL record {number} has keys not present in the first {len(sample)} records: "
+                        f"{', '.join(unseen)}"
+                    )
+                yield [_json_cell(record.get(key)) for key in keys]
+            elif isinstance(record, list):
+                yield [_json_cell(value) for value in record]
+            else:
+                yield [_json_cell(record)]
+
+    return (list(keys) if keys else None), rows()
+
+
+def _json_cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def _parse_int(value: str) -> int:
+    if not _INT_RE.match(value):
+        raise ValueError(f"Not an integer: {value}")
+    return int(value)
+
+
+def _parse_float(value: str) -> float:
+    if not _FLOAT_RE.match(value):
+        raise ValueError(f"Not a number: {value}")
+    return float(value)
+
+
+def _parse_bool(value: str) -> bool:
+    return _BOOL_VALUES[value.strip().lower()]
+
+
+def _infer_converter(values: Iterable[Any]) -> tuple[str, Optional[Callable[[str], Any]]]:
+    """Pick the narrowest type that parses every non-empty sampled string."""
+    samples = [v for v in values if isinstance(v, str)]
+    if not samples:
+        return "auto", None
+    for type_name, converter in (
+        ("int", _parse_int),
+        ("float", _parse_float),
+        ("bool", _parse_bool),
+        ("datetime", datetime.fromisoformat),
+    ):
+        try:
+            for value in samples:
+                converter(value)
+        except (ValueError, KeyError):
+            continue
+        return type_name, converter
+    return "text", None
+
+
+def _clean_text(value: Any) -> Any:
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    return value
+
+
+def import_delimited(
+    filepath: str,
+    source_path: Path | str,
+    sheet_name: str,
+    file_format: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    has_header: bool = True,
+    start_cell: str = "A1",
+    sample_rows: int = 1000,
+    encoding: str = "utf-8",
+) -> Dict[str, Any]:
+    """Stream a CSV, TSV or JSONL file into a worksheet.
+
+    Column types are inferred from the first ``sample_rows`` data rows and
+    every later value is converted with the inferred type, falling back to
+    the raw text when it does not parse. New workbooks and new sheets are
+    streamed into the package, so the input is never fully materialized.
+    Text values are always written as strings, never as formulas.
+
+    Args:
+        filepath: Path to the target Excel file (created if missing)
+        source_path: Path to the delimited input file
+        sheet_name: Target worksheet; created if it does not exist
+        file_format: 'csv', 'tsv' or 'jsonl'. Inferred from the suffix if omitted.
+        delimiter: Field delimiter for csv/tsv. Defaults to ',' or tab.
+        has_header: Whether the first input row is a header row
+        start_cell: Top-left cell where the data is written
+        sample_rows: Number of rows used for type inference
+        encoding: Text encoding of the input file
+
+    Returns:
+        Dictionary with status message, row/column counts and inferred types
+    """
+    try:
+        source = Path(source_path)
+        if not source.is_file():
+            raise DataError(f"Source file not found: {source.name}")
+
+        fmt = _detect_format(source, file_format)
+        if delimiter is None:
+            delimiter = "\t" if fmt == "tsv" else ","
+        if len(delimiter) != 1:
+            raise DataError("Delimiter must be a single character")
+        if sample_rows < 1:
+            raise DataError("Sample rows must be 1 or greater")
+
+        try:
+            start_row, start_col, _, _ = parse_cell_range(start_cell)
+        except ValueError as e:
+            raise DataError(f"Invalid start cell format: {str(e)}")
+
+        target = Path(filepath)
+        with open(source, "r", encoding=encoding, newline="") as handle:
+            if fmt == "jsonl":
+                # Column names come from object keys, never from a data record
+                keys, rows = _iter_jsonl_rows(handle, sample_rows)
+                header = keys if has_header else None
+            else:
+                rows = _iter_delimited_rows(handle, delimiter)
+                header = next(rows, None) if has_header else None
+            sample = list(islice(rows, sample_rows))
+            width = max([len(r) for r in sample] + [len(header or [])], default=0)
+            if start_col + width - 1 > EXCEL_MAX_COLUMNS:
+                raise DataError(f"Input has {width} columns, which exceeds the Excel column limit")
+
+            inferred = [
+                _infer_converter(row[i] for row in sample if i < len(row))
+                for i in range(width)
+            ]
+            converters = [converter for _, converter in inferred]
+
+            def convert(row: List[Any]) -> List[Any]:
+                converted = []
+                for i, value in enumerate(row):
+                    converter = converters[i] if i < len(converters) else None
+                    if converter is not None and isinstance(value, str):
+                        try:
+                            value = converter(value)
+                        except (ValueError, KeyError):
+                            pass
+                    converted.append(_clean_text(value))
+                return converted
+
+            body = (convert(row) for row in chain(sample, rows))
+            if header is not None:
+                body = chain([[_clean_text(v) for v in header]], body)
+
+            if target.exists():
+                written = _append_to_existing(target, sheet_name, body, start_row, start_col)
+            else:
+                written = _write_new_workbook(target, sheet_name, body, start_row, start_col)
+            data_rows = written - (1 if header is not None else 0)
+
+        return {
+            "message": f"Imported {data_rows} rows from {source.name} into sheet '{sheet_name}'",
+            "rows": data_rows,
+            "columns": width,
+            "column_types": [type_name for type_name, _ in inferred],
+        }
+    except DataError as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to import delimited file: {e}")
+        raise DataError(str(e))
+
+
+def _check_row_limit(start_row: int, written: int) -> None:
+    if start_row + written - 1 > EXCEL_MAX_ROWS:
+        raise DataError("Input exceeds the Excel row limit of 1,048,576 rows")
+
+
+def _spool_rows(
+    rows: Iterable[List[Any]],
+    start_row: int,
+    start_col: int,
+    spool: IO[str],
+    date_style: Callable[[], int],
+) -> tuple[int, str]:
+    """Serialize rows as sheetData rows into ``spool``; returns (rows written, dimension).
+
+    ``date_style`` is only called once a date or time value is seen.
+    """
+    letters: List[str] = []
+    written = 0
+    max_width = 0
+    style = None
+    for offset, row in enumerate(rows):
+        written += 1
+        _check_row_limit(start_row, written)
+        while len(letters) < len(row):
+            letters.append(get_column_letter(start_col + len(letters)))
+        max_width = max(max_width, len(row))
+        if style is None and any(isinstance(value, (datetime, date, time)) for value in row):
+            style = date_style()
+        spool.write(row_xml(start_row + offset, row, letters, style))
+
+    last_row = max(start_row + written - 1, start_row)
+    last_col = start_col + max(max_width, 1) - 1
+    dimension = (
+        f"{get_column_letter(start_col)}{start_row}:"
+        f"{get_column_letter(last_col)}{last_row}"
+    )
+    return written, dimension
+
+
+def _write_sheet_part(out: IO[bytes], spool: IO[str], dimension: str) -> None:
+    out.write(
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<worksheet xmlns="{SHEET_MAIN_NS}">'
+        f'<dimension ref="{dimension}"/><sheetData>'.encode("utf-8")
+    )
+    spool.seek(0)
+    while chunk := spool.read(1 << 20):
+        out.write(chunk.encode("utf-8"))
+    out.write(b"</sheetData></worksheet>")
+
+
+def _write_new_workbook(
+    target: Path,
+    sheet_name: str,
+    rows: Iterable[List[Any]],
+    start_row: int,
+    start_col: int,
+) -> int:
+    """Write rows into a new workbook, streaming the sheet XML into the package.
+
+    openpyxl still produces the package skeleton (workbook part, styles and
+    content types) from a write-only workbook; only the worksheet part is
+    generated here, which avoids per-cell object and serializer overhead.
+    Rows are spooled to a temporary file so the dimension can be written up
+    front without holding the sheet in memory.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    # A single datetime cell makes openpyxl register a date format in styles.xml
+    ws.append([datetime(1900, 1, 1)])
+    skeleton = BytesIO()
+    wb.save(skeleton)
+
+    with ZipFile(skeleton) as skeleton_zip:
+        sheet_part = next(n for n in skeleton_zip.namelist() if n.startswith("xl/worksheets/sheet"))
+        date_style = _find_date_style(skeleton_zip.read(sheet_part))
+
+        with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as spool:
+            written, dimension = _spool_rows(rows, start_row, start_col, spool, lambda: date_style)
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with ZipFile(str(target), "w", ZIP_DEFLATED) as out:
+                for info in skeleton_zip.infolist():
+                    if info.filename != sheet_part:
+                        out.writestr(info, skeleton_zip.read(info.filename))
+                with out.open(sheet_part, "w", force_zip64=True) as sheet:
+                    _write_sheet_part(sheet, spool, dimension)
+    return written
+
+
+def _find_date_style(sheet_xml: bytes) -> int:
+    """Return the style index openpyxl assigned to the skeleton's datetime cell."""
+    match = re.search(rb'<c r="A1" s="([0-9]+)"', sheet_xml)
+    return int(match.group(1)) if match else 0
+
+
+def _add_sheet_to_package(
+    target: Path,
+    sheet_name: str,
+    rows: Iterable[List[Any]],
+    start_row: int,
+    start_col: int,
+) -> int:
+    """Add a new sheet to an existing workbook at the package level.
+
+    The other parts are copied through unchanged. The sheet is spooled and
+    staged in an uncompressed single-part zip, from which ``Package.save``
+    streams it, so neither the workbook nor the import is held in memory.
+    """
+    with Package(target) as package, tempfile.TemporaryDirectory(prefix="excel-mcp-import-") as staging:
+        staged = Path(staging) / "sheet.zip"
+        with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as spool:
+            # Built-in format 22: date and time
+            written, dimension = _spool_rows(
+                rows, start_row, start_col, spool, lambda: package.cell_style(num_fmt_id=22)
+            )
+            with ZipFile(staged, "w", ZIP_STORED) as staged_zip:
+                with staged_zip.open("sheet.xml", "w", force_zip64=True) as sheet:
+                    _write_sheet_part(sheet, spool, dimension)
+        with Package(staged) as staged_package:
+            part = package.unused_part("xl/worksheets/sheet{}.xml")
+            package.register_sheet(sheet_name, part)
+            package.copy_part(part, staged_package, "sheet.xml", CT_WORKSHEET)
+            package.save()
+    return written
+
+
+def _append_to_existing(
+    target: Path,
+    sheet_name: str,
+    rows: Iterable[List[Any]],
+    start_row: int,
+    start_col: int,
+) -> int:
+    """Write rows into an existing workbook, creating the sheet if needed."""
+    with Package(target) as package:
+        is_new_sheet = package.sheet_part(sheet_name) is None
+    if is_new_sheet:
+        return _add_sheet_to_package(target, sheet_name, rows, start_row, start_col)
+
+    wb = load_workbook(str(target))
+    ws = wb[sheet_name]
+    written = 0
+    for i, row in enumerate(rows):
+        written += 1
+        _check_row_limit(start_row, written)
+        for j, value in enumerate(row):
+            if value is not None:
+                cell = ws.cell(row=start_row + i, column=start_col + j, value=value)
+                if isinstance(value, str):
+                    # Imported text is data, as in new sheets: never a formula
+                    cell.data_type = "s"
+
+    wb.save(str(target))
+    wb.close()
+    return written
+
+
+SUPPORTED_EXPORT_FORMATS = {"csv", "tsv", "jsonl", "parquet"}
+PARQUET_BATCH_ROWS = 10000
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def export_range(
+    filepath: Path | str,
+    sheet_name: str,
+    output_path: Path | str,
+    file_format: str = "csv",
+    start_cell: Optional[str] = None,
+    end_cell: Optional[str] = None,
+    has_header: bool = True,
+    delimiter: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Stream a sheet or range to a CSV, TSV, JSONL or Parquet file.
+
+    Rows are read from a read-only worksheet iterator and written as they
+    arrive, so memory use does not depend on the sheet size. Cached formula
+    results are exported rather than formula strings.
+
+    Args:
+        filepath: Path to Excel file
+        sheet_name: Name of worksheet
+        output_path: Path of the file to write
+        file_format: 'csv', 'tsv', 'jsonl' or 'parquet' (requires pyarrow)
+        start_cell: Starting cell of the range. Defaults to the sheet's first cell.
+        end_cell: Ending cell of the range. Defaults to the sheet's last used cell.
+        has_header: Whether the first row holds column names (used as JSONL keys
+            and Parquet column names)
+        delimiter: Field delimiter for csv/tsv. Defaults to ',' or tab.
+
+    Returns:
+        Dictionary with status message and exported row count
+    """
+    try:
+        fmt = (file_format or "").lower()
+        if fmt not in SUPPORTED_EXPORT_FORMATS:
+            raise DataError(
+                f"Unsupported format: {file_format}. "
+                f"Supported formats: {', '.join(sorted(SUPPORTED_EXPORT_FORMATS))}"
+            )
+        if delimiter is None:
+            delimiter = "\t" if fmt == "tsv" else ","
+        output = Path(output_path)
+        if output.resolve() == Path(filepath).resolve():
+            raise DataError("Output file must differ from the source workbook")
+
+        try:
+            start_row, start_col, end_row, end_col = parse_cell_range(start_cell or "A1", end_cell)
+        except ValueError as e:
+            raise DataError(f"Invalid range: {str(e)}")
+
+        wb = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            if sheet_name not in wb.sheetnames:
+                raise DataError(f"Sheet '{sheet_name}' not found")
+            ws = wb[sheet_name]
+            rows = ws.iter_rows(
+                min_row=start_row,
+                max_row=end_row,
+                min_col=start_col,
+                max_col=end_col,
+                values_only=True,
+            )
+
+            output.parent.mkdir(parents=True, exist_ok=True)
+            if fmt == "parquet":
+                written = _export_parquet(rows, output, has_header, start_col)
+            elif fmt == "jsonl":
+                written = _export_jsonl(rows, output, has_header, start_col)
+            else:
+                written = _export_delimited(rows, output, delimiter)
+        finally:
+            wb.close()
+
+        return {
+            "message": f"Exported {written} rows from sheet '{sheet_name}' to {output.name}",
+            "rows": written,
+            "format": fmt,
+        }
+    except DataError as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to export range: {e}")
+        raise DataError(str(e))
+
+
+def _export_delimited(rows: Iterable[tuple], output: Path, delimiter: str) -> int:
+    written = 0
+    with open(output, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle, delimiter=delimiter)
+        for row in rows:
+            writer.writerow(
+                value.isoformat() if isinstance(value, (datetime, date, time)) else value
+                for value in row
+            )
+            written += 1
+    return written
+
+
+def _export_jsonl(rows: Iterable[tuple], output: Path, has_header: bool, start_col: int = 1) -> int:
+    rows = iter(rows)
+    keys = None
+    if has_header:
+        header = next(rows, None)
+        if header is not None:
+            keys = [
+                str(name) if name is not None else get_column_letter(start_col + i)
+                for i, name in enumerate(header)
+            ]
+
+    written = 0
+    with open(output, "w", encoding="utf-8") as handle:
+        for row in rows:
+            record = dict(zip(keys, row)) if keys is not None else list(row)
+            handle.write(json.dumps(record, default=_json_default, ensure_ascii=False))
+            handle.write("\n")
+            written += 1
+    return written
+
+
+def _parquet_type(values: List[Any]):
+    import pyarrow as pa
+
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, bool) for v in present):
+        return pa.bool_()
+    if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return pa.int64()
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return pa.float64()
+    if present and all(isinstance(v, datetime) for v in present):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _export_parquet(rows: Iterable[tuple], output: Path, has_header: bool, start_col: int = 1) -> int:
+    """Write rows to Parquet in fixed-size record batches.
+
+    Column types are taken from the first batch; later values that do not
+    fit a numeric column abort the export rather than being silently dropped.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise DataError("Parquet export requires the 'pyarrow' package to be installed")
+
+    rows = iter(rows)
+    header = next(rows, None) if has_header else None
+    batch = [list(r) for r in islice(rows, PARQUET_BATCH_ROWS)]
+    width = max([len(r) for r in batch] + [len(header or [])], default=0)
+    names = [
+        str(header[i]) if header and i < len(header) and header[i] is not None else get_column_letter(start_col + i)
+        for i in range(width)
+    ]
+    schema = pa.schema([
+        (name, _parquet_type([r[i] if i < len(r) else None for r in batch]))
+        for i, name in enumerate(names)
+    ])
+
+    def to_record_batch(chunk: List[List[Any]]):
+        arrays = []
+        for i, field in enumerate(schema):
+            column = [r[i] if i < len(r) else None for r in chunk]
+            if pa.types.is_string(field.type):
+                column = [
+                    None if v is None else v.isoformat() if isinstance(v, (datetime, date, time)) else str(v)
+                    for v in column
+                ]
+            try:
+                arrays.append(pa.array(column, type=field.type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise DataError(
+                    f"Column '{field.name}' has values that do not match its {field.type} type: {e}"
+                )
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    written = 0
+    with pq.ParquetWriter(str(output), schema) as writer:
+        while batch:
+            writer.write_batch(to_record_batch(batch))
+            written += len(batch)
+            batch = [list(r) for r in islice(rows, PARQUET_BATCH_ROWS)]
+    return written
@@ -0,0 +1,344 @@
+import hashlib
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from .exceptions import WorkbookError
+from .internal_sheets import user_sheet_names
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BAND_SIZE = 256
+FINGERPRINT_CACHE_SIZE = 32
+
+# (row, column) -> (normalized value, style digest, value)
+BandCells = Dict[Tuple[int, int], Tuple[Any, str, Any]]
+
+
+class SheetFingerprint:
+    """Row-band hashes and structural info for one worksheet."""
+
+    def __init__(self, dimension: Optional[str], bands: Dict[int, str]):
+        self.dimension = dimension
+        self.bands = bands
+
+
+# Fingerprints keyed by content digest and band size, so comparing against
+# an unchanged file never re-hashes it, wherever that copy is stored (a
+# baseline downloaded to a new temporary file each time still hits).
+_fingerprint_cache: "OrderedDict[tuple, Dict[str, SheetFingerprint]]" = OrderedDict()
+# Content digests keyed by file identity (path, size, mtime)
+_digest_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_fingerprint_lock = threading.Lock()
+
+
+def _cached_fingerprints(key: tuple) -> Optional[Dict[str, SheetFingerprint]]:
+    with _fingerprint_lock:
+        fingerprints = _fingerprint_cache.get(key)
+        if fingerprints is not None:
+            _fingerprint_cache.move_to_end(key)
+        return fingerprints
+
+
+def _store_fingerprints(key: tuple, fingerprints: Dict[str, SheetFingerprint]) -> None:
+    with _fingerprint_lock:
+        _fingerprint_cache[key] = fingerprints
+        _fingerprint_cache.move_to_end(key)
+        while len(_fingerprint_cache) > FINGERPRINT_CACHE_SIZE:
+            _fingerprint_cache.popitem(last=False)
+
+
+def _file_digest(path: Path) -> str:
+    stat = path.stat()
+    identity = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _fingerprint_lock:
+        cached = _digest_cache.get(identity)
+    if cached is not None:
+        return cached
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        while chunk := handle.read(1 << 20):
+            digest.update(chunk)
+    with _fingerprint_lock:
+        _digest_cache[identity] = digest.hexdigest()
+        while len(_digest_cache) > FINGERPRINT_CACHE_SIZE:
+            _digest_cache.popitem(last=False)
+    return digest.hexdigest()
+
+
+class _StyleDigests:
+    """Resolve a workbook's style ids to content digests comparable across files."""
+
+    def __init__(self):
+        self._digests: Dict[int, str] = {}
+
+    def __call__(self, cell) -> str:
+        style_id = cell._style_id
+        digest = self._digests.get(style_id)
+        if digest is None:
+            if style_id == 0:
+                digest = ""
+            else:
+                parts = (cell.font, cell.fill, cell.border, cell.alignment, cell.protection, cell.number_format)
+                digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).hexdigest()
+            self._digests[style_id] = digest
+        return digest
+
+
+def _iter_bands(
+    ws,
+    band_size: int,
+    wanted: Optional[Set[int]] = None,
+) -> Iterator[Tuple[int, BandCells]]:
+    """Yield (band index, cells) for each non-empty row band of a read-only sheet.
+
+    When ``wanted`` is given only those bands are materialized and iteration
+    stops after the last one.
+    """
+    style_digest = _StyleDigests()
+    last_wanted = max(wanted) if wanted else None
+    current_band = None
+    cells: BandCells = {}
+
+    for row in ws.iter_rows():
+        if not row:
+            continue
+        row_index = next((c.row for c in row if hasattr(c, "row")), None)
+        if row_index is None:
+            continue
+        band = (row_index - 1) // band_size
+        if band != current_band:
+            if cells:
+                yield current_band, cells
+            cells = {}
+            current_band = band
+            if last_wanted is not None and band > last_wanted:
+                return
+        if wanted is not None and band not in wanted:
+            continue
+        for cell in row:
+            if cell.value is None and not getattr(cell, "has_style", False):
+                continue
+            value = cell.value
+            cells[(cell.row, cell.column)] = (_normalize(value), style_digest(cell), value)
+    if cells:
+        yield current_band, cells
+
+
+def _normalize(value: Any) -> Any:
+    """Make values that openpyxl may round-trip as int or float hash alike."""
+    if isinstance(value, bool):
+        return ("bool", value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    return value
+
+
+def _dimension(ws) -> Optional[str]:
+    try:
+        return ws.calculate_dimension()
+    except ValueError:
+        return None
+
+
+def _band_hash(cells: BandCells) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for key, (normalized, style, _) in cells.items():
+        digest.update(repr((key, normalized, style)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _same_band(old: BandCells, new: BandCells) -> bool:
+    if old.keys() != new.keys():
+        return False
+    return all(old[key][:2] == new[key][:2] for key in old)
+
+
+def _merge_bands(
+    left: Iterator[Tuple[int, BandCells]],
+    right: Iterator[Tuple[int, BandCells]],
+) -> Iterator[Tuple[int, BandCells, BandCells]]:
+    """Join two ascending band streams on band index."""
+    def tagged(stream, side):
+        for band, cells in stream:
+            yield band, side, cells
+
+    streams = [tagged(left, 0), tagged(right, 1)]
+    current = None
+    pair: List[BandCells] = [{}, {}]
+    for band, side, cells in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+        if band != current:
+            if current is not None:
+                yield current, pair[0], pair[1]
+            current = band
+            pair = [{}, {}]
+        pair[side] = cells
+    if current is not None:
+        yield current, pair[0], pair[1]
+
+
+def _cell_changes(sheet: str, old: BandCells, new: BandCells) -> Iterator[Dict[str, Any]]:
+    for key in sorted(set(old) | set(new)):
+        before = old.get(key)
+        after = new.get(key)
+        if before is not None and after is not None and before[:2] == after[:2]:
+            continue
+        address = f"{get_column_letter(key[1])}{key[0]}"
+        change: Dict[str, Any] = {"sheet": sheet, "cell": address}
+        old_value = before[2] if before else None
+        new_value = after[2] if after else None
+        if before and after and before[0] == after[0]:
+            change["change"] = "style"
+        elif old_value is None:
+            change["change"] = "added"
+        elif new_value is None:
+            change["change"] = "removed"
+        else:
+            change["change"] = "modified"
+        change["old"] = old_value
+        change["new"] = new_value
+        yield change
+
+
+def diff_workbooks(
+    old_path: Path | str,
+    new_path: Path | str,
+    band_size: int = DEFAULT_BAND_SIZE,
+    max_changes: int = 200,
+) -> Dict[str, Any]:
+    """Compare two workbooks cell by cell, skipping unchanged row bands.
+
+    Each sheet is fingerprinted in bands of ``band_size`` rows, hashing cell
+    values (formulas, not cached results) and resolved styles. Cell-level
+    changes are only computed for bands whose hashes differ. Fingerprints
+    are cached per file content, so once a file has been seen only the sheets
+    that differ are parsed again, and only up to their last differing band.
+
+    Args:
+        old_path: Path to the baseline workbook
+        new_path: Path to the workbook to compare against the baseline
+        band_size: Number of rows per fingerprinted band
+        max_changes: Maximum number of cell changes to list
+
+    Returns:
+        Dictionary with structural differences, per-sheet change counts and
+        the first ``max_changes`` cell changes
+    """
+    try:
+        if band_size < 1:
+            raise WorkbookError("Band size must be 1 or greater")
+        old_path, new_path = Path(old_path), Path(new_path)
+        for path in (old_path, new_path):
+            if not path.is_file():
+                raise WorkbookError(f"File not found: {path}")
+
+        old_digest, new_digest = _file_digest(old_path), _file_digest(new_path)
+        if old_digest == new_digest:
+            return {
+                "identical": True,
+                "sheets_added": [],
+                "sheets_removed": [],
+                "sheets": {},
+                "changes": [],
+                "total_changes": 0,
+                "truncated": False,
+            }
+
+        old_key, new_key = (old_digest, band_size), (new_digest, band_size)
+        old_fp, new_fp = _cached_fingerprints(old_key), _cached_fingerprints(new_key)
+        build_fingerprints = old_fp is None or new_fp is None
+        old_fp_built: Dict[str, SheetFingerprint] = {}
+        new_fp_built: Dict[str, SheetFingerprint] = {}
+
+        old_wb = load_workbook(old_path, read_only=True)
+        new_wb = load_workbook(new_path, read_only=True)
+        try:
+            old_sheets, new_sheets = user_sheet_names(old_wb.sheetnames), user_sheet_names(new_wb.sheetnames)
+            common = [name for name in new_sheets if name in old_sheets]
+            result: Dict[str, Any] = {
+                "identical": False,
+                "sheets_added": [name for name in new_sheets if name not in old_sheets],
+                "sheets_removed": [name for name in old_sheets if name not in new_sheets],
+                "sheet_order_changed": [n for n in old_sheets if n in common] != common,
+                "sheets": {},
+                "changes": [],
+            }
+            total_changes = 0
+
+            for name in (old_sheets if build_fingerprints else common):
+                old_ws = old_wb[name]
+                new_ws = new_wb[name] if name in new_sheets else None
+                old_dim = _dimension(old_ws)
+                new_dim = _dimension(new_ws) if new_ws is not None else None
+
+                wanted: Optional[Set[int]] = None
+                if not build_fingerprints:
+                    old_bands, new_bands = old_fp[name].bands, new_fp[name].bands
+                    wanted = {
+                        band for band in set(old_bands) | set(new_bands)
+                        if old_bands.get(band) != new_bands.get(band)
+                    }
+                    if not wanted and old_dim == new_dim:
+                        continue
+
+                sheet_info = {"bands_compared": 0, "bands_changed": 0, "cells_changed": 0}
+                if old_dim != new_dim:
+                    sheet_info["dimension"] = {"old": old_dim, "new": new_dim}
+                old_hashes: Dict[int, str] = {}
+                new_hashes: Dict[int, str] = {}
+
+                old_stream = _iter_bands(old_ws, band_size, wanted)
+                new_stream = _iter_bands(new_ws, band_size, wanted) if new_ws is not None else iter(())
+                if wanted == set():
+                    old_stream, new_stream = iter(()), iter(())
+                for band, old_cells, new_cells in _merge_bands(old_stream, new_stream):
+                    sheet_info["bands_compared"] += 1
+                    if build_fingerprints:
+                        if old_cells:
+                            old_hashes[band] = _band_hash(old_cells)
+                        if new_cells:
+                            new_hashes[band] = _band_hash(new_cells)
+                    if new_ws is None or _same_band(old_cells, new_cells):
+                        continue
+                    sheet_info["bands_changed"] += 1
+                    for change in _cell_changes(name, old_cells, new_cells):
+                        sheet_info["cells_changed"] += 1
+                        total_changes += 1
+                        if len(result["changes"]) < max_changes:
+                            result["changes"].append(change)
+
+                if build_fingerprints:
+                    old_fp_built[name] = SheetFingerprint(old_dim, old_hashes)
+                    if new_ws is not None:
+                        new_fp_built[name] = SheetFingerprint(new_dim, new_hashes)
+                if new_ws is not None and (sheet_info["bands_changed"] or "dimension" in sheet_info):
+                    result["sheets"][name] = sheet_info
+
+            if build_fingerprints:
+                # Sheets that only exist in the new workbook still need fingerprints
+                for name in result["sheets_added"]:
+                    ws = new_wb[name]
+                    new_fp_built[name] = SheetFingerprint(
+                        _dimension(ws), {band: _band_hash(cells) for band, cells in _iter_bands(ws, band_size)}
+                    )
+                _store_fingerprints(old_key, old_fp_built)
+                _store_fingerprints(new_key, new_fp_built)
+        finally:
+            old_wb.close()
+            new_wb.close()
+
+        result["total_changes"] = total_changes
+        result["truncated"] = total_changes > len(result["changes"])
+        return result
+    except WorkbookError as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to diff workbooks: {e}")
+        raise WorkbookError(str(e))
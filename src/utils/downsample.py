@@ -0,0 +1,97 @@
+from typing import List, Optional, Sequence
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Largest-Triangle-Three-Buckets: pick ``threshold`` points preserving the visual shape."""
+    n = len(ys)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        count = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / count
+        avg_y = sum(ys[avg_start:avg_end]) / count
+
+        ax, ay = xs[a], ys[a]
+        best_area = -1.0
+        best = int(i * every) + 1
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def minmax_indices(ys: Sequence[float], threshold: int) -> List[int]:
+    """Keep the minimum and maximum of each of ``threshold // 2`` equal buckets."""
+    n = len(ys)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return list(range(n))
+
+    selected = {0, n - 1}
+    size = n / buckets
+    for bucket in range(buckets):
+        start, end = int(bucket * size), int((bucket + 1) * size)
+        if start >= end:
+            continue
+        low = high = start
+        for j in range(start + 1, end):
+            if ys[j] < ys[low]:
+                low = j
+            elif ys[j] > ys[high]:
+                high = j
+        selected.update((low, high))
+    return sorted(selected)
+
+
+def select_rows(
+    method: str,
+    xs: Optional[Sequence[float]],
+    series: List[List[Optional[float]]],
+    target_points: int,
+) -> List[int]:
+    """Choose the rows to keep when ``series`` share one x axis.
+
+    Each series gets an equal share of the point budget over the rows where
+    it has a value; the union of the picks is returned, always including the
+    first and last row, so the rows can be copied with all their columns.
+
+    Args:
+        method: "lttb" or "minmax"
+        xs: Numeric x values (None to use the row position)
+        series: Values per series, None where a row has no numeric value
+        target_points: Approximate number of rows to keep
+
+    Returns:
+        Sorted row indices
+    """
+    rows = len(series[0]) if series else 0
+    if rows <= target_points:
+        return list(range(rows))
+    share = max(target_points // max(len(series), 1), 3)
+    selected = {0, rows - 1}
+    for values in series:
+        present = [i for i, value in enumerate(values) if value is not None]
+        if not present:
+            continue
+        ys = [values[i] for i in present]
+        if method == "lttb":
+            px = [xs[i] if xs is not None else float(i) for i in present]
+            picks = lttb_indices(px, ys, share)
+        else:
+            picks = minmax_indices(ys, share)
+        selected.update(present[p] for p in picks)
+    return sorted(selected)
@@ -0,0 +1,26 @@
+from functools import wraps
+from typing import Callable, Iterable, List
+
+# Very hidden sheets where the server keeps its own state; they are not user data
+PIVOT_STATE_SHEET = "_pivot_state"
+CHART_DATA_SHEET = "_chart_data"
+INTERNAL_SHEETS = frozenset((PIVOT_STATE_SHEET, CHART_DATA_SHEET))
+
+# Tool arguments naming a sheet that the tool writes, renames, deletes or copies
+SHEET_ARGUMENTS = ("sheet_name", "source_sheet", "target_sheet", "pivot_sheet", "old_name", "new_name")
+
+
+def user_sheet_names(names: Iterable[str]) -> List[str]:
+    """Sheet names without the server's internal helper sheets."""
+    return [name for name in names if name not in INTERNAL_SHEETS]
+
+
+def guard_internal_sheets(func: Callable) -> Callable:
+    """Wrap a write tool so it refuses to touch internal helper sheets."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for argument in SHEET_ARGUMENTS:
+            if kwargs.get(argument) in INTERNAL_SHEETS:
+                return f"Error: Sheet '{kwargs[argument]}' is internal to the server and cannot be modified"
+        return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,180 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.merge import MergedCellRange
+from openpyxl.worksheet.worksheet import Worksheet
+
+logger = logging.getLogger(__name__)
+
+# (min_row, min_col, max_row, max_col)
+Bounds = Tuple[int, int, int, int]
+
+NODE_CAPACITY = 16
+
+
+def _intersects(a: Bounds, b: Bounds) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _enclosing(bounds: Iterable[Bounds]) -> Bounds:
+    bounds = list(bounds)
+    return (
+        min(b[0] for b in bounds),
+        min(b[1] for b in bounds),
+        max(b[2] for b in bounds),
+        max(b[3] for b in bounds),
+    )
+
+
+class _Node:
+    __slots__ = ("bounds", "children", "entries")
+
+    def __init__(self, bounds: Bounds, children=None, entries=None):
+        self.bounds = bounds
+        self.children: Optional[List["_Node"]] = children
+        self.entries: Optional[List[Tuple[Bounds, str]]] = entries
+
+
+def _pack(items: List, key_bounds, make_node) -> List[_Node]:
+    """Sort-Tile-Recursive packing of items into nodes of NODE_CAPACITY."""
+    node_count = -(-len(items) // NODE_CAPACITY)
+    slab_count = max(1, int(node_count ** 0.5 + 0.999))
+    slab_size = slab_count * NODE_CAPACITY
+
+    by_col = sorted(items, key=lambda item: key_bounds(item)[1] + key_bounds(item)[3])
+    nodes = []
+    for s in range(0, len(by_col), slab_size):
+        slab = sorted(by_col[s:s + slab_size], key=lambda item: key_bounds(item)[0] + key_bounds(item)[2])
+        for n in range(0, len(slab), NODE_CAPACITY):
+            nodes.append(make_node(slab[n:n + NODE_CAPACITY]))
+    return nodes
+
+
+class MergedRangeIndex:
+    """Spatial index over a worksheet's merged ranges.
+
+    Ranges are packed into a static R-tree (Sort-Tile-Recursive), giving
+    logarithmic point and overlap queries. Additions go to a small pending
+    list and removals to a tombstone set; both are folded back into the tree
+    once they grow past a fraction of the index size.
+    """
+
+    def __init__(self, ranges: Iterable[str] = ()):
+        self._bounds: Dict[str, Bounds] = {}
+        self._pending: List[Tuple[Bounds, str]] = []
+        self._removed: set = set()
+        self._root: Optional[_Node] = None
+        for coord in ranges:
+            cr = CellRange(coord)
+            self._bounds[cr.coord] = (cr.min_row, cr.min_col, cr.max_row, cr.max_col)
+        self._rebuild()
+
+    @classmethod
+    def from_worksheet(cls, worksheet: Worksheet) -> "MergedRangeIndex":
+        return cls(mcr.coord for mcr in worksheet.merged_cells.ranges)
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def __contains__(self, coord: str) -> bool:
+        return CellRange(coord).coord in self._bounds
+
+    def _rebuild(self) -> None:
+        entries = [(bounds, coord) for coord, bounds in self._bounds.items()]
+        self._pending = []
+        self._removed = set()
+        if not entries:
+            self._root = None
+            return
+        nodes = _pack(
+            entries,
+            lambda entry: entry[0],
+            lambda chunk: _Node(_enclosing(b for b, _ in chunk), entries=chunk),
+        )
+        while len(nodes) > 1:
+            nodes = _pack(
+                nodes,
+                lambda node: node.bounds,
+                lambda chunk: _Node(_enclosing(n.bounds for n in chunk), children=chunk),
+            )
+        self._root = nodes[0]
+
+    def _maybe_rebuild(self) -> None:
+        threshold = max(32, len(self._bounds) // 8)
+        if len(self._pending) > threshold or len(self._removed) > threshold:
+            self._rebuild()
+
+    def add(self, coord: str) -> str:
+        cr = CellRange(coord)
+        bounds = (cr.min_row, cr.min_col, cr.max_row, cr.max_col)
+        self._bounds[cr.coord] = bounds
+        self._removed.discard(cr.coord)
+        self._pending.append((bounds, cr.coord))
+        self._maybe_rebuild()
+        return cr.coord
+
+    def remove(self, coord: str) -> None:
+        key = CellRange(coord).coord
+        if self._bounds.pop(key, None) is None:
+            raise KeyError(key)
+        self._removed.add(key)
+        self._maybe_rebuild()
+
+    def _query(self, bounds: Bounds) -> List[str]:
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if not _intersects(node.bounds, bounds):
+                continue
+            if node.children is not None:
+                stack.extend(node.children)
+            else:
+                found.extend(
+                    coord for entry_bounds, coord in node.entries
+                    if coord not in self._removed and _intersects(entry_bounds, bounds)
+                )
+        found.extend(
+            coord for entry_bounds, coord in self._pending
+            if coord in self._bounds and _intersects(entry_bounds, bounds)
+        )
+        # A coordinate can be both in the tree and pending if it was removed and re-added
+        return list(dict.fromkeys(found))
+
+    def overlapping(self, min_row: int, min_col: int, max_row: int, max_col: int) -> List[str]:
+        """Return the merged ranges intersecting the given rectangle."""
+        return self._query((min_row, min_col, max_row, max_col))
+
+    def find(self, row: int, col: int) -> Optional[str]:
+        """Return the merged range containing the cell, if any."""
+        found = self._query((row, col, row, col))
+        return found[0] if found else None
+
+
+def merge_into(worksheet: Worksheet, index: MergedRangeIndex, coord: str) -> str:
+    """Merge a range already validated against the index.
+
+    Mirrors ``Worksheet.merge_cells`` but skips openpyxl's linear duplicate
+    check, which makes bulk merges quadratic.
+    """
+    coord = index.add(coord)
+    mcr = MergedCellRange(worksheet, coord)
+    worksheet.merged_cells.ranges.add(mcr)
+    worksheet._clean_merge_range(mcr)
+    return coord
+
+
+def unmerge_from(worksheet: Worksheet, index: MergedRangeIndex, coord: str) -> str:
+    """Unmerge a range known to be in the index.
+
+    Mirrors ``Worksheet.unmerge_cells`` without its linear membership check.
+    """
+    cr = CellRange(coord)
+    index.remove(cr.coord)
+    worksheet.merged_cells.ranges.remove(cr)
+    cells = cr.cells
+    next(cells)  # the top-left cell keeps its value
+    for row, col in cells:
+        worksheet._cells.pop((row, col), None)
+    return cr.coord
@@ -0,0 +1,639 @@
+import html
+import logging
+import math
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, time
+from io import BytesIO
+from pathlib import Path
+from time import localtime
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from xml.sax.saxutils import escape, quoteattr
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import column_index_from_string
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, to_excel
+
+logger = logging.getLogger(__name__)
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+REL_WORKSHEET = f"{NS_REL}/worksheet"
+REL_TABLE = f"{NS_REL}/table"
+REL_PIVOT_TABLE = f"{NS_REL}/pivotTable"
+REL_PIVOT_CACHE = f"{NS_REL}/pivotCacheDefinition"
+REL_PIVOT_RECORDS = f"{NS_REL}/pivotCacheRecords"
+CT_WORKSHEET = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+CT_TABLE = "application/vnd.openxmlformats-officedocument.spreadsheetml.table+xml"
+CT_PIVOT_TABLE = "application/vnd.openxmlformats-officedocument.spreadsheetml.pivotTable+xml"
+CT_PIVOT_CACHE = "application/vnd.openxmlformats-officedocument.spreadsheetml.pivotCacheDefinition+xml"
+CT_PIVOT_RECORDS = "application/vnd.openxmlformats-officedocument.spreadsheetml.pivotCacheRecords+xml"
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+COPY_CHUNK_SIZE = 1 << 20
+
+# Rewrites a part's bytes chunk by chunk while it is copied
+ChunkRewriter = Callable[[Iterator[bytes]], Iterator[bytes]]
+
+_ROW_RE = re.compile(rb"<(?:\w+:)?row\b([^>]*?)(?:/>|>(.*?)</(?:\w+:)?row>)", re.S)
+_CELL_RE = re.compile(rb"<(?:\w+:)?c\b([^>]*?)(?:/>|>(.*?)</(?:\w+:)?c>)", re.S)
+_ATTR_RE = re.compile(rb'(?:^|\s)([\w:]+)="([^"]*)"')
+_VALUE_RE = re.compile(rb"<(?:\w+:)?v>(.*?)</(?:\w+:)?v>", re.S)
+_TEXT_RE = re.compile(rb"<(?:\w+:)?t(?:\s[^>]*)?>(.*?)</(?:\w+:)?t>", re.S)
+_PHONETIC_RE = re.compile(rb"<(?:\w+:)?rPh\b.*?</(?:\w+:)?rPh>", re.S)
+_SHARED_REF_RE = re.compile(rb'<(?:\w+:)?c\b[^>]*\bt="s"[^>]*>\s*<(?:\w+:)?v>(\d+)</(?:\w+:)?v>')
+_SHEET_DATA_RE = re.compile(rb"<sheetData\s*/>|<sheetData>.*?</sheetData>", re.S)
+_DIMENSION_RE = re.compile(rb"<dimension\b[^>]*/>")
+_AFTER_PIVOT_CACHES = (
+    b"<smartTagPr", b"<smartTagTypes", b"<webPublishing", b"<fileRecoveryPr",
+    b"<webPublishObjects", b"<extLst", b"</workbook>",
+)
+
+
+class PackageError(Exception):
+    """Raised when a package part uses markup the part-level helpers cannot handle."""
+
+
+def _attrs(raw: bytes) -> Dict[bytes, bytes]:
+    return dict(_ATTR_RE.findall(raw))
+
+
+def _text(raw: bytes) -> str:
+    text = raw.decode("utf-8")
+    return html.unescape(text) if "&" in text else text
+
+
+class Package:
+    """An .xlsx package opened for part-level reads and writes.
+
+    openpyxl materializes every cell of every sheet on load and re-serializes
+    them all on save; operations that only touch a few parts (one sheet's
+    data, a table or pivot definition) can read and rewrite just those parts.
+    Modified and added parts are kept in memory until ``save``, which writes
+    a new package next to the original and swaps it in atomically. Parts
+    added with ``copy_part`` are streamed from their source during ``save``
+    instead, so copying a large part never holds it in memory.
+    """
+
+    def __init__(self, filepath: Path | str):
+        self.path = Path(filepath)
+        self._zip = ZipFile(self.path)
+        self._names = self._zip.namelist()
+        self._written: Dict[str, bytes] = {}
+        self._copied: Dict[str, Tuple[ZipFile, str, Optional[ChunkRewriter]]] = {}
+        self._removed: Set[str] = set()
+        self._shared_strings: Optional[List[str]] = None
+        self._date_styles: Optional[Set[int]] = None
+        self._epoch: Optional[datetime] = None
+
+    def __enter__(self) -> "Package":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    # Parts and relationships
+
+    def has(self, part: str) -> bool:
+        return (
+            part in self._written
+            or part in self._copied
+            or (part in self._names and part not in self._removed)
+        )
+
+    def parts(self) -> List[str]:
+        return [name for name in self._names if name not in self._removed] + [
+            name for name in (*self._written, *self._copied) if name not in self._names
+        ]
+
+    def unused_part(self, template: str) -> str:
+        """Return the first of template.format(1), template.format(2), ... not in the package."""
+        index = 1
+        while self.has(template.format(index)):
+            index += 1
+        return template.format(index)
+
+    def read(self, part: str) -> bytes:
+        if part in self._written:
+            return self._written[part]
+        if part in self._copied:
+            source_zip, source_part, rewrite = self._copied[part]
+            data = source_zip.read(source_part)
+            return b"".join(rewrite(iter([data]))) if rewrite else data
+        return self._zip.read(part)
+
+    def _add_override(self, part: str, content_type: Optional[str]) -> None:
+        if content_type is not None and not self.has(part):
+            types = self.read("[Content_Types].xml")
+            override = f'<Override PartName="/{part}" ContentType="{content_type}"/>'.encode("utf-8")
+            self._written["[Content_Types].xml"] = types.replace(b"</Types>", override + b"</Types>")
+
+    def write(self, part: str, data: bytes, content_type: Optional[str] = None) -> None:
+        self._add_override(part, content_type)
+        self._removed.discard(part)
+        self._copied.pop(part, None)
+        self._written[part] = data
+
+    def copy_part(
+        self,
+        part: str,
+        source: "Package",
+        source_part: str,
+        content_type: Optional[str] = None,
+        rewrite: Optional[ChunkRewriter] = None,
+    ) -> None:
+        """Add ``part`` as a copy of ``source_part`` from ``source`` (which may be this package).
+
+        The data is streamed from the source on ``save``, passing through
+        ``rewrite`` if given, so ``source`` must stay open until then.
+        """
+        if source_part in source._written or source_part in source._copied:
+            data = source.read(source_part)
+            self.write(part, b"".join(rewrite(iter([data]))) if rewrite else data, content_type)
+            return
+        self._add_override(part, content_type)
+        self._removed.discard(part)
+        self._written.pop(part, None)
+        self._copied[part] = (source._zip, source_part, rewrite)
+
+    def open(self, part: str) -> IO[bytes]:
+        """Open a part for streaming reads."""
+        if part in self._written or part in self._copied:
+            return BytesIO(self.read(part))
+        return self._zip.open(part)
+
+    def content_type(self, part: str) -> Optional[str]:
+        """Content type of a part, from its override or the default for its extension."""
+        types = self.read("[Content_Types].xml")
+        override = re.search(
+            rb'<Override\b[^>]*\bPartName="/' + re.escape(part.encode("utf-8")) + rb'"[^>]*/>', types
+        )
+        if override is None:
+            extension = posixpath.splitext(part)[1].lstrip(".").encode("utf-8")
+            override = re.search(
+                rb'<Default\b[^>]*\bExtension="' + re.escape(extension) + rb'"[^>]*/>', types, re.I
+            )
+        if override is None:
+            return None
+        return _attrs(override.group(0)).get(b"ContentType", b"").decode("utf-8") or None
+
+    def remove(self, part: str) -> None:
+        """Drop a part, its content type override and its own relationships part."""
+        types = self.read("[Content_Types].xml")
+        override = re.compile(rb'<Override\b[^>]*\bPartName="/' + re.escape(part.encode("utf-8")) + rb'"[^>]*/>')
+        self._written["[Content_Types].xml"] = override.sub(b"", types)
+        for name in (part, self.rels_part(part)):
+            self._written.pop(name, None)
+            self._copied.pop(name, None)
+            self._removed.add(name)
+
+    @staticmethod
+    def rels_part(part: str) -> str:
+        folder, filename = posixpath.split(part)
+        return posixpath.join(folder, "_rels", f"{filename}.rels")
+
+    def relationships(self, part: str) -> Dict[str, Tuple[str, str]]:
+        """Map relationship ids of a part to (type, absolute target part)."""
+        rels_part = self.rels_part(part)
+        if not self.has(rels_part):
+            return {}
+        folder = posixpath.dirname(part)
+        rels = {}
+        for rel in ET.fromstring(self.read(rels_part)).iter(f"{{{NS_PKG_REL}}}Relationship"):
+            target = rel.get("Target", "")
+            if rel.get("TargetMode") == "External":
+                continue
+            if target.startswith("/"):
+                target = target.lstrip("/")
+            else:
+                target = posixpath.normpath(posixpath.join(folder, target))
+            rels[rel.get("Id")] = (rel.get("Type", ""), target)
+        return rels
+
+    def add_relationship(self, part: str, rel_type: str, target: str) -> str:
+        """Add a relationship from ``part`` to ``target`` and return its id."""
+        rels_part = self.rels_part(part)
+        existing = self.read(rels_part) if self.has(rels_part) else (
+            f'{XML_DECLARATION}<Relationships xmlns="{NS_PKG_REL}"></Relationships>'.encode("utf-8")
+        )
+        ids = {int(n) for n in re.findall(rb'Id="rId(\d+)"', existing)}
+        rel_id = f"rId{max(ids, default=0) + 1}"
+        relative = posixpath.relpath(target, posixpath.dirname(part))
+        rel = f'<Relationship Id="{rel_id}" Type="{rel_type}" Target="{relative}"/>'.encode("utf-8")
+        if existing.rstrip().endswith(b"/>") and b"</Relationships>" not in existing:
+            existing = re.sub(rb"<Relationships([^>]*)/>", rb"<Relationships\1></Relationships>", existing)
+        self._written[rels_part] = existing.replace(b"</Relationships>", rel + b"</Relationships>")
+        return rel_id
+
+    def remove_relationship(self, part: str, rel_id: str) -> None:
+        rels_part = self.rels_part(part)
+        pattern = rb'<Relationship\b[^>]*\bId="' + re.escape(rel_id.encode("ascii")) + rb'"[^>]*/>'
+        self._written[rels_part] = re.sub(pattern, b"", self.read(rels_part))
+
+    def sheets(self) -> List[Tuple[str, str]]:
+        """Return (sheet name, part) pairs in workbook order."""
+        rels = self.relationships("xl/workbook.xml")
+        result = []
+        for sheet in ET.fromstring(self.read("xl/workbook.xml")).iter(f"{{{NS_MAIN}}}sheet"):
+            _, part = rels.get(sheet.get(f"{{{NS_REL}}}id"), ("", ""))
+            if part:
+                result.append((sheet.get("name"), part))
+        return result
+
+    def sheet_part(self, sheet_name: str) -> Optional[str]:
+        return dict(self.sheets()).get(sheet_name)
+
+    def add_sheet(self, sheet_name: str, sheet_xml: bytes, state: Optional[str] = None) -> str:
+        """Append a worksheet part to the workbook and return its part name."""
+        part = self.unused_part("xl/worksheets/sheet{}.xml")
+        self.register_sheet(sheet_name, part, state)
+        self.write(part, sheet_xml, CT_WORKSHEET)
+        return part
+
+    def register_sheet(self, sheet_name: str, part: str, state: Optional[str] = None) -> None:
+        """List a worksheet part in the workbook, after the existing sheets."""
+        workbook = self.read("xl/workbook.xml")
+        if b"</sheets>" not in workbook:
+            raise PackageError("Unsupported workbook markup")
+        rel_id = self.add_relationship("xl/workbook.xml", REL_WORKSHEET, part)
+
+        sheet_ids = [int(n) for n in re.findall(rb'<sheet\b[^>]*\bsheetId="(\d+)"', workbook)]
+        state_attr = f' state="{state}"' if state else ""
+        element = (
+            f"<sheet xmlns:r=\"{NS_REL}\" name={quoteattr(sheet_name)} sheetId=\"{max(sheet_ids, default=0) + 1}\""
+            f"{state_attr} r:id=\"{rel_id}\"/>"
+        ).encode("utf-8")
+        self._written["xl/workbook.xml"] = workbook.replace(b"</sheets>", element + b"</sheets>")
+
+    def add_pivot_cache(self, cache_part: str) -> int:
+        """Register a pivot cache definition part in the workbook and return its cache id."""
+        rel_id = self.add_relationship("xl/workbook.xml", REL_PIVOT_CACHE, cache_part)
+        workbook = self.read("xl/workbook.xml").replace(b"<pivotCaches/>", b"<pivotCaches></pivotCaches>")
+        cache_ids = [int(n) for n in re.findall(rb'<pivotCache\b[^>]*\bcacheId="(\d+)"', workbook)]
+        cache_id = max(cache_ids, default=0) + 1
+        element = f'<pivotCache xmlns:r="{NS_REL}" cacheId="{cache_id}" r:id="{rel_id}"/>'.encode("utf-8")
+        if b"</pivotCaches>" in workbook:
+            workbook = workbook.replace(b"</pivotCaches>", element + b"</pivotCaches>", 1)
+        else:
+            # pivotCaches precedes these elements in the workbook schema
+            anchor = next(tag for tag in _AFTER_PIVOT_CACHES if tag in workbook)
+            index = workbook.index(anchor)
+            workbook = workbook[:index] + b"<pivotCaches>" + element + b"</pivotCaches>" + workbook[index:]
+        self._written["xl/workbook.xml"] = workbook
+        return cache_id
+
+    def remove_pivot_cache(self, cache_part: str) -> None:
+        """Unregister a pivot cache and drop its definition and records parts."""
+        for rel_id, (rel_type, target) in self.relationships("xl/workbook.xml").items():
+            if rel_type == REL_PIVOT_CACHE and target == cache_part:
+                workbook = re.sub(
+                    rb'<pivotCache\b[^>]*\br:id="' + rel_id.encode("ascii") + rb'"[^>]*/>',
+                    b"",
+                    self.read("xl/workbook.xml"),
+                )
+                self._written["xl/workbook.xml"] = re.sub(rb"<pivotCaches>\s*</pivotCaches>|<pivotCaches/>", b"", workbook)
+                self.remove_relationship("xl/workbook.xml", rel_id)
+        for rel_type, target in self.relationships(cache_part).values():
+            if rel_type == REL_PIVOT_RECORDS:
+                self.remove(target)
+        self.remove(cache_part)
+
+    # Cell values
+
+    def shared_strings(self) -> List[str]:
+        if self._shared_strings is None:
+            strings: List[str] = []
+            part = next(
+                (target for rel_type, target in self.relationships("xl/workbook.xml").values()
+                 if rel_type.endswith("/sharedStrings")),
+                None,
+            )
+            if part and self.has(part):
+                for item in ET.fromstring(self.read(part)).iter(f"{{{NS_MAIN}}}si"):
+                    # Plain text or rich-text runs; phonetic hints (rPh) are not part of the value
+                    parts = [child.text or "" for child in item if child.tag == f"{{{NS_MAIN}}}t"]
+                    for run in item.iter(f"{{{NS_MAIN}}}r"):
+                        parts.extend(t.text or "" for t in run.iter(f"{{{NS_MAIN}}}t"))
+                    strings.append("".join(parts))
+            self._shared_strings = strings
+        return self._shared_strings
+
+    def styles_part(self) -> Optional[str]:
+        return next(
+            (target for rel_type, target in self.relationships("xl/workbook.xml").values()
+             if rel_type.endswith("/styles")),
+            None,
+        )
+
+    def date_styles(self) -> Set[int]:
+        """Indices of cell formats (cellXfs) that display numbers as dates."""
+        if self._date_styles is None:
+            date_styles: Set[int] = set()
+            part = self.styles_part()
+            if part and self.has(part):
+                root = ET.fromstring(self.read(part))
+                custom = {
+                    int(fmt.get("numFmtId")): fmt.get("formatCode", "")
+                    for fmt in root.iter(f"{{{NS_MAIN}}}numFmt")
+                }
+                cell_xfs = root.find(f"{{{NS_MAIN}}}cellXfs")
+                for index, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+                    fmt_id = int(xf.get("numFmtId", 0))
+                    code = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id, "General"))
+                    if is_date_format(code):
+                        date_styles.add(index)
+            self._date_styles = date_styles
+        return self._date_styles
+
+    def epoch(self) -> datetime:
+        if self._epoch is None:
+            pr = re.search(rb"<workbookPr\b[^>]*>", self.read("xl/workbook.xml"))
+            uses_1904 = pr is not None and re.search(rb'date1904="(1|true)"', pr.group(0)) is not None
+            self._epoch = CALENDAR_MAC_1904 if uses_1904 else CALENDAR_WINDOWS_1900
+        return self._epoch
+
+    def cell_style(self, bold: bool = False, num_fmt_id: int = 0) -> int:
+        """Return the index of a plain cell format, optionally bold and/or with a built-in number format.
+
+        An existing matching format is reused so repeated writes do not grow styles.xml.
+        """
+        part = self.styles_part()
+        if not part or not self.has(part):
+            raise PackageError("Workbook has no styles part")
+        root = ET.fromstring(self.read(part))
+        fonts = root.find(f"{{{NS_MAIN}}}fonts")
+        bold_fonts = set()
+        for index, font in enumerate(fonts if fonts is not None else []):
+            weight = font.find(f"{{{NS_MAIN}}}b")
+            if weight is not None and weight.get("val", "1") in ("1", "true"):
+                bold_fonts.add(index)
+        cell_xfs = root.find(f"{{{NS_MAIN}}}cellXfs")
+        for index, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+            font_id = int(xf.get("fontId", 0))
+            if (
+                int(xf.get("numFmtId", 0)) == num_fmt_id
+                and xf.get("fillId", "0") == "0"
+                and xf.get("borderId", "0") == "0"
+                and len(xf) == 0
+                and (font_id in bold_fonts if bold else font_id == 0)
+            ):
+                return index
+        return self._add_cell_style(part, bold, num_fmt_id)
+
+    def _add_cell_style(self, part: str, bold: bool, num_fmt_id: int) -> int:
+        styles = self.read(part)
+        font_id = 0
+        if bold:
+            fonts = re.search(rb"<fonts\b[^>]*>(.*?)</fonts>", styles, re.S)
+            first_font = re.search(rb"<font\b[^>]*?(?:/>|>.*?</font>)", fonts.group(1), re.S) if fonts else None
+            if first_font is None:
+                raise PackageError("Unsupported styles markup")
+            font = first_font.group(0)
+            if font.endswith(b"/>") and b"</font>" not in font:
+                bold_font = font[:-2] + b"><b/></font>"
+            else:
+                bold_font = re.sub(rb"^(<font\b[^>]*>)", rb"\1<b/>", font)
+            font_id = len(re.findall(rb"<font\b", fonts.group(1)))
+            styles = styles.replace(b"</fonts>", bold_font + b"</fonts>", 1)
+            styles = re.sub(rb'(<fonts\b[^>]*count=")\d+', lambda m: m.group(1) + str(font_id + 1).encode(), styles, 1)
+
+        cell_xfs = re.search(rb"<cellXfs\b[^>]*>(.*?)</cellXfs>", styles, re.S)
+        if cell_xfs is None:
+            raise PackageError("Unsupported styles markup")
+        xf_id = len(re.findall(rb"<xf\b", cell_xfs.group(1)))
+        apply = (' applyFont="1"' if bold else "") + (' applyNumberFormat="1"' if num_fmt_id else "")
+        xf = (
+            f'<xf numFmtId="{num_fmt_id}" fontId="{font_id}" fillId="0" borderId="0" xfId="0"{apply}/>'
+        ).encode("utf-8")
+        styles = styles.replace(b"</cellXfs>", xf + b"</cellXfs>", 1)
+        styles = re.sub(rb'(<cellXfs\b[^>]*count=")\d+', lambda m: m.group(1) + str(xf_id + 1).encode(), styles, 1)
+        self._written[part] = styles
+        if num_fmt_id and is_date_format(BUILTIN_FORMATS.get(num_fmt_id, "General")):
+            self.date_styles().add(xf_id)
+        return xf_id
+
+    def save(self) -> None:
+        """Write the package with all modified parts and swap it in place of the original."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            with ZipFile(tmp_name, "w", ZIP_DEFLATED) as out:
+                for info in self._zip.infolist():
+                    if info.filename in self._copied:
+                        continue
+                    data = self._written.get(info.filename)
+                    if data is not None:
+                        out.writestr(info, data)
+                    elif info.filename not in self._removed:
+                        # Unchanged parts are streamed too; a sheet part can be hundreds of MB
+                        with self._zip.open(info) as src, out.open(info, "w", force_zip64=info.file_size > 1 << 30) as dst:
+                            shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+                for part, data in self._written.items():
+                    if part not in self._names:
+                        out.writestr(part, data)
+                for part, (source_zip, source_part, rewrite) in self._copied.items():
+                    # Parts over 1 GB may end up past the 4 GB zip limit once rewritten
+                    large = source_zip.getinfo(source_part).file_size > 1 << 30
+                    info = ZipInfo(part, date_time=localtime()[:6])
+                    info.compress_type = ZIP_DEFLATED
+                    with source_zip.open(source_part) as src, out.open(info, "w", force_zip64=large) as dst:
+                        chunks = iter(lambda: src.read(COPY_CHUNK_SIZE), b"")
+                        for chunk in (rewrite(chunks) if rewrite else chunks):
+                            dst.write(chunk)
+            self._zip.close()
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        finally:
+            self._zip = ZipFile(self.path)
+            self._names = self._zip.namelist()
+            self._written = {}
+            self._copied = {}
+            self._removed = set()
+
+
+class SheetRows:
+    """Row-level view of a worksheet part's raw XML.
+
+    Rows are located with a regex over the part's bytes; cells are decoded
+    only for the rows a caller asks about.
+    """
+
+    def __init__(self, package: Package, part: str):
+        self.package = package
+        self.xml = package.read(part)
+        if re.search(rb"<\w+:sheetData\b", self.xml):
+            raise PackageError("Prefixed worksheet markup is not supported")
+        match = _SHEET_DATA_RE.search(self.xml)
+        self._start, self._end = (match.start(), match.end()) if match else (0, 0)
+        self._columns: Dict[bytes, int] = {}
+
+    def iter_rows(self, min_row: int = 1) -> Iterator[Tuple[int, bytes, bytes]]:
+        """Yield (row number, raw row element, row body) in document order."""
+        current = 0
+        for match in _ROW_RE.finditer(self.xml, self._start, self._end):
+            number = _attrs(match.group(1)).get(b"r")
+            current = int(number) if number else current + 1
+            if current >= min_row:
+                yield current, match.group(0), match.group(2) or b""
+
+    def shared_string_refs(self, row_xml: bytes) -> List[str]:
+        """Resolve the shared strings a raw row references (for content hashing)."""
+        strings = self.package.shared_strings()
+        return [strings[int(i)] for i in _SHARED_REF_RE.findall(row_xml)]
+
+    def _column(self, ref: bytes) -> int:
+        column = self._columns.get(ref)
+        if column is None:
+            column = column_index_from_string(ref.rstrip(b"0123456789").decode("ascii"))
+            self._columns[ref] = column
+        return column
+
+    def row_values(self, body: bytes, min_col: int, max_col: int) -> List[Any]:
+        """Decode a row body into values for columns min_col..max_col (cached results, not formulas)."""
+        values: List[Any] = [None] * (max_col - min_col + 1)
+        position = 0
+        date_styles = self.package.date_styles()
+        for match in _CELL_RE.finditer(body):
+            attrs = _attrs(match.group(1))
+            ref = attrs.get(b"r")
+            position = self._column(ref) if ref else position + 1
+            if not min_col <= position <= max_col:
+                continue
+            inner = match.group(2)
+            if not inner:
+                continue
+            cell_type = attrs.get(b"t", b"n")
+            if cell_type == b"inlineStr":
+                values[position - min_col] = "".join(
+                    _text(t) for t in _TEXT_RE.findall(_PHONETIC_RE.sub(b"", inner))
+                )
+                continue
+            raw = _VALUE_RE.search(inner)
+            if raw is None:
+                continue
+            raw = raw.group(1)
+            if not raw:
+                # Formulas saved without a cached result (openpyxl writes <v></v>)
+                continue
+            if cell_type == b"s":
+                value: Any = self.package.shared_strings()[int(raw)]
+            elif cell_type == b"b":
+                value = raw.strip() in (b"1", b"true")
+            elif cell_type in (b"str", b"e"):
+                value = _text(raw)
+            elif cell_type == b"d":
+                value = datetime.fromisoformat(raw.decode("ascii"))
+            else:
+                text = raw.decode("ascii")
+                value = float(text) if ("." in text or "E" in text or "e" in text) else int(text)
+                style = attrs.get(b"s")
+                if style is not None and int(style) in date_styles:
+                    value = from_excel(value, self.package.epoch())
+            values[position - min_col] = value
+        return values
+
+    def replace_data(self, sheet_data: bytes, dimension: str) -> bytes:
+        """Return the part's XML with new sheetData and dimension, keeping everything else."""
+        xml = self.xml[:self._start] + sheet_data + self.xml[self._end:] if self._end else self.xml
+        if _DIMENSION_RE.search(xml):
+            xml = _DIMENSION_RE.sub(f'<dimension ref="{dimension}"/>'.encode("utf-8"), xml, 1)
+        return xml
+
+
+def cell_xml(ref: str, value: Any, style: Optional[int] = None, date_style: Optional[int] = None) -> str:
+    """Serialize one cell; strings are written inline so the shared string table is untouched."""
+    style_attr = f' s="{style}"' if style else ""
+    if value is None:
+        return f'<c r="{ref}"{style_attr}/>' if style else ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return f'<c r="{ref}"{style_attr}><v>{value!r}</v></c>'
+    if isinstance(value, (datetime, date, time)) and date_style is not None:
+        return f'<c r="{ref}" s="{style or date_style}"><v>{to_excel(value)!r}</v></c>'
+    return (
+        f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">'
+        f'{escape(str(value))}</t></is></c>'
+    )
+
+
+def row_xml(
+    row_index: int,
+    row: Sequence[Any],
+    letters: Sequence[str],
+    date_style: Optional[int] = None,
+    style: Optional[int] = None,
+) -> str:
+    """Serialize a row whose values start at the column of ``letters[0]``."""
+    cells = "".join(
+        cell_xml(f"{letters[i]}{row_index}", value, style, date_style)
+        for i, value in enumerate(row)
+    )
+    return f'<row r="{row_index}">{cells}</row>'
+
+
+def column_letters(start_col: int, count: int) -> List[str]:
+    return [get_column_letter(start_col + i) for i in range(count)]
+
+
+def new_sheet_xml(sheet_data: bytes, dimension: str, table_rel_ids: Sequence[str] = ()) -> bytes:
+    """Build a minimal worksheet part around the given sheetData."""
+    table_parts = ""
+    if table_rel_ids:
+        table_parts = f'<tableParts count="{len(table_rel_ids)}">' + "".join(
+            f'<tablePart r:id="{rel_id}"/>' for rel_id in table_rel_ids
+        ) + "</tableParts>"
+    return (
+        f'{XML_DECLARATION}<worksheet xmlns="{NS_MAIN}" xmlns:r="{NS_REL}">'
+        f'<dimension ref="{dimension}"/><sheetViews><sheetView workbookViewId="0"/></sheetViews>'
+        f'<sheetFormatPr defaultRowHeight="15"/>'
+    ).encode("utf-8") + sheet_data + (
+        '<pageMargins left="0.75" right="0.75" top="1" bottom="1" header="0.5" footer="0.5"/>'
+        f"{table_parts}</worksheet>"
+    ).encode("utf-8")
+
+
+def next_table_id(package: Package) -> int:
+    """Return an id not used by any table part in the package."""
+    ids = [0]
+    for name in package.parts():
+        if name.startswith("xl/tables/") and name.endswith(".xml"):
+            match = re.search(rb'<table\b[^>]*\sid="(\d+)"', package.read(name))
+            if match:
+                ids.append(int(match.group(1)))
+    return max(ids) + 1
+
+
+def table_xml(
+    table_id: int,
+    name: str,
+    ref: str,
+    columns: Sequence[str],
+    style: str = "TableStyleMedium9",
+    show_column_stripes: bool = False,
+) -> bytes:
+    column_xml = "".join(
+        f"<tableColumn id=\"{i + 1}\" name={quoteattr(str(column))}/>" for i, column in enumerate(columns)
+    )
+    return (
+        f'{XML_DECLARATION}<table xmlns="{NS_MAIN}" id="{table_id}" name={quoteattr(name)} '
+        f'displayName={quoteattr(name)} ref="{ref}"><autoFilter ref="{ref}"/>'
+        f'<tableColumns count="{len(columns)}">{column_xml}</tableColumns>'
+        f'<tableStyleInfo name={quoteattr(style)} showFirstColumn="0" showLastColumn="0" '
+        f'showRowStripes="1" showColumnStripes="{int(show_column_stripes)}"/></table>'
+    ).encode("utf-8")
+
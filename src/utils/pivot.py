@@ -1,18 +1,846 @@
-from typing import Any, List, Dict, Optional
-import uuid
+from typing import Any, List, Dict, Optional, Tuple
+from datetime import date, datetime, time
+import hashlib
+import json
 import logging
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
 
-from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.table import Table, TableStyleInfo
-from openpyxl.styles import Font
+from openpyxl.utils.datetime import to_excel
 
-from .data import read_excel_range
 from .cell_utils import parse_cell_range
 from .exceptions import ValidationError, PivotError
+from .internal_sheets import PIVOT_STATE_SHEET
+from .package import (
+    CT_PIVOT_CACHE,
+    CT_PIVOT_RECORDS,
+    CT_PIVOT_TABLE,
+    CT_TABLE,
+    NS_MAIN,
+    NS_REL,
+    REL_PIVOT_CACHE,
+    REL_PIVOT_RECORDS,
+    REL_PIVOT_TABLE,
+    REL_TABLE,
+    XML_DECLARATION,
+    Package,
+    SheetRows,
+    cell_xml,
+    column_letters,
+    new_sheet_xml,
+    next_table_id,
+    row_xml,
+    table_xml,
+)
+from .tables import TableInfo, _sort_key, table_registry, unique_table_name
 
 logger = logging.getLogger(__name__)
 
+AGG_FUNCS = ["sum", "average", "count", "min", "max"]
+
+# Source rows are summarized in fixed-size bands; a refresh re-reads only bands whose content changed
+PIVOT_BAND_ROWS = 4096
+
+_STATE_CHUNK = 32000  # stay under Excel's 32,767 characters per cell
+_STATE_VERSION = 1
+
+
+def _clean_field_name(field: str) -> str:
+    """Strip an aggregation suffix such as " (sum)" from a field name."""
+    field = str(field).strip()
+    for suffix in [" (sum)", " (average)", " (count)", " (min)", " (max)"]:
+        if field.lower().endswith(suffix):
+            return field[:-len(suffix)]
+    return field
+
+
+def _field_indices(fields: List[str], headers: List[str], field_type: str) -> List[int]:
+    """Map requested field names to header offsets (case-insensitive)."""
+    available = {_clean_field_name(header).lower(): i for i, header in enumerate(headers)}
+    indices = []
+    for field in fields:
+        index = available.get(_clean_field_name(field).lower())
+        if index is None:
+            raise ValidationError(
+                f"Invalid {field_type} field '{field}'. "
+                f"Available fields: {', '.join(sorted(headers))}"
+            )
+        indices.append(index)
+    return indices
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, time):
+        return {"time": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        (kind, text), = value.items()
+        return {"datetime": datetime, "date": date, "time": time}[kind].fromisoformat(text)
+    return value
+
+
+def _accumulate(
+    groups: Dict[tuple, List[list]],
+    values: List[Any],
+    row_fields: List[int],
+    value_fields: List[int],
+) -> None:
+    """Add one source row to the group key -> [count, sum, min, max] per value field partials."""
+    key = tuple(values[i] for i in row_fields)
+    partial = groups.get(key)
+    if partial is None:
+        partial = groups[key] = [[0, 0, None, None] for _ in value_fields]
+    for stats, i in zip(partial, value_fields):
+        value = values[i]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        stats[0] += 1
+        stats[1] += value
+        if stats[2] is None or value < stats[2]:
+            stats[2] = value
+        if stats[3] is None or value > stats[3]:
+            stats[3] = value
+
+
+def _band_partials(
+    sheet_rows: SheetRows,
+    bodies: List[bytes],
+    min_col: int,
+    max_col: int,
+    row_fields: List[int],
+    value_fields: List[int],
+) -> Dict[tuple, List[list]]:
+    """Aggregate one band of source rows."""
+    groups: Dict[tuple, List[list]] = {}
+    for body in bodies:
+        values = sheet_rows.row_values(body, min_col, max_col)
+        if any(value is not None for value in values):
+            _accumulate(groups, values, row_fields, value_fields)
+    return groups
+
+
+def _merge_partials(totals: Dict[tuple, List[list]], groups: Dict[tuple, List[list]]) -> None:
+    for key, partial in groups.items():
+        total = totals.get(key)
+        if total is None:
+            totals[key] = [list(stats) for stats in partial]
+            continue
+        for stats, other in zip(total, partial):
+            stats[0] += other[0]
+            stats[1] += other[1]
+            if other[2] is not None and (stats[2] is None or other[2] < stats[2]):
+                stats[2] = other[2]
+            if other[3] is not None and (stats[3] is None or other[3] > stats[3]):
+                stats[3] = other[3]
+
+
+def _aggregate(stats: list, agg_func: str) -> Any:
+    count, total, minimum, maximum = stats
+    if not count:
+        return 0
+    if agg_func == "count":
+        return count
+    if agg_func == "average":
+        return total / count
+    if agg_func == "min":
+        return minimum
+    if agg_func == "max":
+        return maximum
+    return total
+
+
+def _scan_bands(
+    sheet_rows: SheetRows,
+    first_row: int,
+    last_row: int,
+    min_col: int,
+    max_col: int,
+    row_fields: List[int],
+    value_fields: List[int],
+    band_rows: int,
+    previous: Dict[str, Dict[tuple, List[list]]],
+) -> Tuple[List[Tuple[str, Dict[tuple, List[list]]]], int]:
+    """Split the data rows into bands, reusing the partials of bands whose content hash is unchanged.
+
+    Returns:
+        List of (band hash, partials) and the number of bands that were re-aggregated
+    """
+    bands: List[Tuple[str, Dict[tuple, List[list]]]] = []
+    recomputed = 0
+    current = None
+    hasher = None
+    bodies: List[bytes] = []
+
+    def flush() -> None:
+        nonlocal recomputed
+        if current is None:
+            return
+        digest = hasher.hexdigest()
+        groups = previous.get(digest)
+        if groups is None:
+            groups = _band_partials(sheet_rows, bodies, min_col, max_col, row_fields, value_fields)
+            recomputed += 1
+        bands.append((digest, groups))
+
+    for number, raw, body in sheet_rows.iter_rows(first_row):
+        if number > last_row:
+            break
+        band = (number - first_row) // band_rows
+        if band != current:
+            flush()
+            current = band
+            hasher = hashlib.blake2b(f"{band}:".encode("ascii"), digest_size=16)
+            bodies = []
+        # Shared string indices can be renumbered by other writers, so hash the text they point at too
+        hasher.update(raw)
+        for text in sheet_rows.shared_string_refs(raw):
+            hasher.update(text.encode("utf-8"))
+            hasher.update(b"\0")
+        bodies.append(body)
+    flush()
+    return bands, recomputed
+
+
+def _last_data_row(sheet_rows: SheetRows, first_row: int) -> int:
+    last = first_row - 1
+    for number, _, body in sheet_rows.iter_rows(first_row):
+        if body:
+            last = number
+    return last
+
+
+def _read_states(package: Package) -> Dict[str, str]:
+    """Return the stored state JSON of every pivot in the workbook, keyed by pivot sheet."""
+    part = package.sheet_part(PIVOT_STATE_SHEET)
+    if part is None:
+        return {}
+    sheet_rows = SheetRows(package, part)
+    chunks: Dict[str, List[str]] = {}
+    for _, _, body in sheet_rows.iter_rows():
+        pivot_sheet, chunk = sheet_rows.row_values(body, 1, 2)
+        if pivot_sheet is not None:
+            chunks.setdefault(str(pivot_sheet), []).append(str(chunk or ""))
+    return {pivot_sheet: "".join(parts) for pivot_sheet, parts in chunks.items()}
+
+
+def _write_states(package: Package, states: Dict[str, str]) -> None:
+    rows = []
+    for pivot_sheet, text in states.items():
+        for offset in range(0, max(len(text), 1), _STATE_CHUNK):
+            rows.append([pivot_sheet, text[offset:offset + _STATE_CHUNK]])
+    letters = column_letters(1, 2)
+    sheet_data = (
+        "<sheetData>" + "".join(row_xml(i + 1, row, letters) for i, row in enumerate(rows)) + "</sheetData>"
+    ).encode("utf-8")
+    dimension = f"A1:B{max(len(rows), 1)}"
+
+    part = package.sheet_part(PIVOT_STATE_SHEET)
+    if part is None:
+        package.add_sheet(PIVOT_STATE_SHEET, new_sheet_xml(sheet_data, dimension), state="veryHidden")
+    else:
+        package.write(part, SheetRows(package, part).replace_data(sheet_data, dimension))
+
+
+def pivot_sources(filepath: str) -> Dict[str, str]:
+    """Return the source sheet of every stored pivot, keyed by pivot sheet."""
+    with Package(filepath) as package:
+        states = _read_states(package)
+    sources = {}
+    for pivot_sheet, text in states.items():
+        try:
+            sources[pivot_sheet] = json.loads(text)["source_sheet"]
+        except (ValueError, KeyError, TypeError):
+            continue
+    return sources
+
+
+def rename_pivot_sheets(filepath: str, old_name: str, new_name: str) -> None:
+    """Point stored pivot definitions at a renamed source or pivot sheet.
+
+    The source sheet is part of each definition's fingerprint, so the next
+    refresh of a pivot whose source was renamed rebuilds it from scratch.
+    """
+    with Package(filepath) as package:
+        states = _read_states(package)
+        renamed: Dict[str, str] = {}
+        for pivot_sheet, text in states.items():
+            try:
+                state = json.loads(text)
+            except ValueError:
+                state = None
+            if isinstance(state, dict) and state.get("source_sheet") == old_name:
+                state["source_sheet"] = new_name
+                text = json.dumps(state, separators=(",", ":"))
+            renamed[new_name if pivot_sheet == old_name else pivot_sheet] = text
+        if renamed != states:
+            _write_states(package, renamed)
+            package.save()
+
+
+def drop_pivot_definitions(filepath: str, sheet_name: str) -> None:
+    """Forget the pivots stored for a deleted sheet, as pivot sheet or as source."""
+    sources = pivot_sources(filepath)
+    with Package(filepath) as package:
+        states = _read_states(package)
+        kept = {
+            pivot_sheet: text for pivot_sheet, text in states.items()
+            if pivot_sheet != sheet_name and sources.get(pivot_sheet) != sheet_name
+        }
+        if kept != states:
+            _write_states(package, kept)
+            package.save()
+
+
+def _write_pivot_sheet(
+    package: Package,
+    pivot_sheet: str,
+    headers: List[str],
+    rows: List[List[Any]],
+    registered: Dict[str, TableInfo],
+    native: Optional["_PivotCache"] = None,
+) -> Tuple[str, Optional[TableInfo]]:
+    """Write the summary rows, replacing the pivot sheet's previous data.
+
+    The rows are laid out under a styled table, or, with ``native``, under a
+    pivot table backed by the given cache (the cells then only serve readers
+    that do not refresh pivots).
+
+    Returns:
+        The name of the table or pivot table, and the table's info (None for native pivots)
+    """
+    header_style = package.cell_style(bold=True)
+    date_styles: Dict[int, int] = {}
+    letters = column_letters(1, len(headers))
+
+    def date_style(value: Any) -> Optional[int]:
+        # Built-in formats: 14 = date, 22 = date and time, 21 = time
+        if isinstance(value, datetime):
+            num_fmt_id = 14 if value.time() == time() else 22
+        elif isinstance(value, date):
+            num_fmt_id = 14
+        elif isinstance(value, time):
+            num_fmt_id = 21
+        else:
+            return None
+        if num_fmt_id not in date_styles:
+            date_styles[num_fmt_id] = package.cell_style(num_fmt_id=num_fmt_id)
+        return date_styles[num_fmt_id]
+
+    parts = ["<sheetData>", row_xml(1, headers, letters, style=header_style)]
+    for offset, row in enumerate(rows, start=2):
+        cells = "".join(
+            cell_xml(f"{letter}{offset}", value, date_style=date_style(value))
+            for letter, value in zip(letters, row)
+        )
+        parts.append(f'<row r="{offset}">{cells}</row>')
+    parts.append("</sheetData>")
+    sheet_data = "".join(parts).encode("utf-8")
+    ref = f"A1:{letters[-1]}{len(rows) + 1}"
+
+    sheet_part = package.sheet_part(pivot_sheet)
+    if sheet_part is None:
+        sheet_part = package.add_sheet(pivot_sheet, new_sheet_xml(sheet_data, ref))
+        sheet_xml = package.read(sheet_part)
+    else:
+        sheet_xml = _TABLE_PARTS_RE.sub(b"", SheetRows(package, sheet_part).replace_data(sheet_data, ref))
+
+    # The sheet holds either one table or one native pivot; drop whatever the new output replaces
+    existing_table = None
+    for rel_id, (rel_type, target) in package.relationships(sheet_part).items():
+        if rel_type == REL_PIVOT_TABLE:
+            _remove_native_pivot(package, sheet_part, rel_id, target)
+        elif rel_type == REL_TABLE:
+            if native is None and existing_table is None:
+                existing_table = (rel_id, target)
+                continue
+            package.remove_relationship(sheet_part, rel_id)
+            package.remove(target)
+
+    # Tables on a replaced pivot sheet are gone, so their names may be reused
+    remaining = [info.name for info in registered.values() if info.sheet_name != pivot_sheet]
+    if native is not None:
+        name = unique_table_name(remaining, "PivotTable")
+        _add_native_pivot(package, sheet_part, native, name, ref)
+        package.write(sheet_part, sheet_xml)
+        return name, None
+
+    if existing_table is not None:
+        # Keep the existing table's id and name; only its range and columns change
+        rel_id, table_part = existing_table
+        table = ET.fromstring(package.read(table_part))
+        name = table.get("displayName") or table.get("name")
+        package.write(table_part, table_xml(int(table.get("id")), name, ref, headers, show_column_stripes=True))
+    else:
+        name = unique_table_name(remaining, "PivotTable")
+        table_part = package.unused_part("xl/tables/table{}.xml")
+        package.write(
+            table_part,
+            table_xml(next_table_id(package), name, ref, headers, show_column_stripes=True),
+            CT_TABLE,
+        )
+        rel_id = package.add_relationship(sheet_part, REL_TABLE, table_part)
+    table_parts = (
+        f'<tableParts count="1"><tablePart xmlns:r="{NS_REL}" r:id="{rel_id}"/></tableParts>'
+    ).encode("utf-8")
+    anchor = b"<extLst" if b"<extLst" in sheet_xml else b"</worksheet>"
+    package.write(sheet_part, sheet_xml.replace(anchor, table_parts + anchor, 1))
+    return name, TableInfo(name, pivot_sheet, ref, [str(header) for header in headers])
+
+
+# Native pivot tables (pivotCacheDefinition / pivotCacheRecords / pivotTableDefinition parts)
+
+_TABLE_PARTS_RE = re.compile(rb"<tableParts\b[^>]*/>|<tableParts\b.*?</tableParts>", re.S)
+
+_DATA_FIELD_SUBTOTALS = {"sum": "sum", "average": "average", "count": "countNums", "min": "min", "max": "max"}
+
+
+def _number(value: Any) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+class _CacheField:
+    """One pivot cache field: a summary of its value types and, for axis fields, its distinct items."""
+
+    def __init__(self, name: str, indexed: bool):
+        self.name = name
+        self.indexed = indexed
+        self.items: Dict[tuple, int] = {}
+        self.values: List[Any] = []
+        self.has_string = self.has_number = self.has_date = self.has_bool = self.has_blank = False
+        self.integers_only = True
+        self.min_value = self.max_value = None
+        self.min_date = self.max_date = None
+
+    def _element(self, value: Any) -> str:
+        if value is None:
+            self.has_blank = True
+            return "<m/>"
+        if isinstance(value, bool):
+            self.has_bool = True
+            return f'<b v="{int(value)}"/>'
+        if isinstance(value, (int, float)):
+            self.has_number = True
+            self.integers_only = self.integers_only and (isinstance(value, int) or float(value).is_integer())
+            self.min_value = value if self.min_value is None else min(self.min_value, value)
+            self.max_value = value if self.max_value is None else max(self.max_value, value)
+            return f'<n v="{_number(value)}"/>'
+        if isinstance(value, datetime):
+            self.has_date = True
+            self.min_date = value if self.min_date is None else min(self.min_date, value)
+            self.max_date = value if self.max_date is None else max(self.max_date, value)
+            return f'<d v="{value.replace(microsecond=0).isoformat()}"/>'
+        self.has_string = True
+        return f"<s v={quoteattr(str(value))}/>"
+
+    def record(self, value: Any) -> str:
+        """Add one source value and return its element for pivotCacheRecords."""
+        if isinstance(value, date) and not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        elif isinstance(value, time):
+            value = value.isoformat()
+        if not self.indexed:
+            return self._element(value)
+        key = (type(value).__name__, value)
+        index = self.items.get(key)
+        if index is None:
+            index = self.items[key] = len(self.values)
+            self.values.append(value)
+        return f'<x v="{index}"/>'
+
+    def xml(self) -> str:
+        # Serializing the items records their types for the flags below
+        items = "".join(self._element(value) for value in self.values)
+        attributes = []
+        if not (self.has_string or self.has_blank or self.has_bool):
+            attributes.append('containsSemiMixedTypes="0"')
+        if self.has_date and not (self.has_string or self.has_number or self.has_bool):
+            attributes.append('containsNonDate="0"')
+        if self.has_date:
+            attributes.append('containsDate="1"')
+        if not self.has_string:
+            attributes.append('containsString="0"')
+        if self.has_blank:
+            attributes.append('containsBlank="1"')
+        if sum([self.has_string, self.has_number, self.has_date, self.has_bool]) > 1:
+            attributes.append('containsMixedTypes="1"')
+        if self.has_number:
+            attributes.append('containsNumber="1"')
+            if self.integers_only:
+                attributes.append('containsInteger="1"')
+            attributes.append(f'minValue="{_number(self.min_value)}" maxValue="{_number(self.max_value)}"')
+        if self.has_date:
+            attributes.append(
+                f'minDate="{self.min_date.replace(microsecond=0).isoformat()}" '
+                f'maxDate="{self.max_date.replace(microsecond=0).isoformat()}"'
+            )
+        if not self.indexed:
+            return f"<sharedItems {' '.join(attributes)}/>"
+        attributes.append(f'count="{len(self.values)}"')
+        return f"<sharedItems {' '.join(attributes)}>{items}</sharedItems>"
+
+    def sorted_items(self) -> List[int]:
+        """Item indices in display order."""
+        return sorted(range(len(self.values)), key=lambda i: _sort_key(self.values[i]))
+
+
+class _PivotCache:
+    """Everything a native pivot needs from one pass over the source rows."""
+
+    def __init__(
+        self,
+        source_sheet: str,
+        source_range: str,
+        fields: List[_CacheField],
+        records: List[str],
+        row_fields: List[int],
+        value_fields: List[int],
+        value_names: List[str],
+        agg_func: str,
+    ):
+        self.source_sheet = source_sheet
+        self.source_range = source_range
+        self.fields = fields
+        self.records = records
+        self.row_fields = row_fields
+        self.value_fields = value_fields
+        self.value_names = value_names
+        self.agg_func = agg_func
+
+    def definition_xml(self, records_rel_id: str) -> bytes:
+        fields = "".join(
+            f'<cacheField name={quoteattr(field.name)} numFmtId="{14 if field.has_date else 0}">'
+            f"{field.xml()}</cacheField>"
+            for field in self.fields
+        )
+        return (
+            f'{XML_DECLARATION}<pivotCacheDefinition xmlns="{NS_MAIN}" xmlns:r="{NS_REL}" '
+            f'r:id="{records_rel_id}" refreshOnLoad="1" refreshedBy="excel-mcp" '
+            f'refreshedDate="{to_excel(datetime.now())!r}" createdVersion="6" refreshedVersion="6" '
+            f'minRefreshableVersion="3" recordCount="{len(self.records)}">'
+            f"<cacheSource type=\"worksheet\"><worksheetSource ref=\"{self.source_range}\" "
+            f"sheet={quoteattr(self.source_sheet)}/></cacheSource>"
+            f'<cacheFields count="{len(self.fields)}">{fields}</cacheFields></pivotCacheDefinition>'
+        ).encode("utf-8")
+
+    def records_xml(self) -> bytes:
+        return (
+            f'{XML_DECLARATION}<pivotCacheRecords xmlns="{NS_MAIN}" xmlns:r="{NS_REL}" '
+            f'count="{len(self.records)}">{"".join(self.records)}</pivotCacheRecords>'
+        ).encode("utf-8")
+
+    def table_xml(self, name: str, cache_id: int, ref: str) -> bytes:
+        pivot_fields = []
+        for index, field in enumerate(self.fields):
+            attributes = 'compact="0" outline="0" showAll="0"'
+            if index in self.value_fields:
+                attributes = f'dataField="1" {attributes}'
+            if index not in self.row_fields:
+                pivot_fields.append(f"<pivotField {attributes}/>")
+                continue
+            items = "".join(f'<item x="{i}"/>' for i in field.sorted_items())
+            pivot_fields.append(
+                f'<pivotField axis="axisRow" {attributes} defaultSubtotal="0">'
+                f'<items count="{len(field.values)}">{items}</items></pivotField>'
+            )
+
+        def field_list(tag: str, indices: List[int]) -> str:
+            if not indices:
+                return ""
+            fields = "".join(f'<field x="{i}"/>' for i in indices)
+            return f'<{tag} count="{len(indices)}">{fields}</{tag}>'
+
+        # Several data fields are shown side by side through the special "Values" field (-2)
+        column_fields = [-2] if len(self.value_fields) > 1 else []
+        subtotal = _DATA_FIELD_SUBTOTALS[self.agg_func]
+        data_fields = "".join(
+            f'<dataField name={quoteattr(f"{value_name} ({self.agg_func})")} fld="{index}" '
+            f'subtotal="{subtotal}" baseField="0" baseItem="0"/>'
+            for index, value_name in zip(self.value_fields, self.value_names)
+        )
+        return (
+            f'{XML_DECLARATION}<pivotTableDefinition xmlns="{NS_MAIN}" name={quoteattr(name)} '
+            f'cacheId="{cache_id}" applyNumberFormats="0" applyBorderFormats="0" applyFontFormats="0" '
+            f'applyPatternFormats="0" applyAlignmentFormats="0" applyWidthHeightFormats="1" '
+            f'dataCaption="Values" updatedVersion="6" minRefreshableVersion="3" useAutoFormatting="1" '
+            f'itemPrintTitles="1" createdVersion="6" indent="0" compact="0" compactData="0" '
+            f'outline="1" outlineData="1" rowGrandTotals="0" colGrandTotals="0" multipleFieldFilters="0">'
+            f'<location ref="{ref}" firstHeaderRow="1" firstDataRow="1" firstDataCol="{len(self.row_fields)}"/>'
+            f'<pivotFields count="{len(self.fields)}">{"".join(pivot_fields)}</pivotFields>'
+            f'{field_list("rowFields", self.row_fields)}{field_list("colFields", column_fields)}'
+            f'<dataFields count="{len(self.value_fields)}">{data_fields}</dataFields>'
+            f'<pivotTableStyleInfo name="PivotStyleMedium9" showRowHeaders="1" showColHeaders="1" '
+            f'showRowStripes="0" showColStripes="0" showLastColumn="1"/></pivotTableDefinition>'
+        ).encode("utf-8")
+
+
+def _add_native_pivot(package: Package, sheet_part: str, cache: _PivotCache, name: str, ref: str) -> None:
+    cache_part = package.unused_part("xl/pivotCache/pivotCacheDefinition{}.xml")
+    records_part = package.unused_part("xl/pivotCache/pivotCacheRecords{}.xml")
+    package.write(records_part, cache.records_xml(), CT_PIVOT_RECORDS)
+    records_rel_id = package.add_relationship(cache_part, REL_PIVOT_RECORDS, records_part)
+    package.write(cache_part, cache.definition_xml(records_rel_id), CT_PIVOT_CACHE)
+    cache_id = package.add_pivot_cache(cache_part)
+
+    pivot_part = package.unused_part("xl/pivotTables/pivotTable{}.xml")
+    package.write(pivot_part, cache.table_xml(name, cache_id, ref), CT_PIVOT_TABLE)
+    package.add_relationship(pivot_part, REL_PIVOT_CACHE, cache_part)
+    package.add_relationship(sheet_part, REL_PIVOT_TABLE, pivot_part)
+
+
+def _remove_native_pivot(package: Package, sheet_part: str, rel_id: str, pivot_part: str) -> None:
+    for rel_type, target in package.relationships(pivot_part).values():
+        if rel_type == REL_PIVOT_CACHE:
+            package.remove_pivot_cache(target)
+    package.remove(pivot_part)
+    package.remove_relationship(sheet_part, rel_id)
+
+
+def _scan_cache(
+    sheet_rows: SheetRows,
+    first_row: int,
+    last_row: int,
+    min_col: int,
+    max_col: int,
+    headers: List[str],
+    row_fields: List[int],
+    value_fields: List[int],
+) -> Tuple[List[_CacheField], List[str], Dict[tuple, List[list]]]:
+    """Read the source rows once, building the cache fields and records and the summary totals."""
+    names: List[str] = []
+    for index, header in enumerate(headers):
+        name = header or f"Column{index + 1}"
+        while name.lower() in {taken.lower() for taken in names}:
+            name = f"{name}_{index + 1}"
+        names.append(name)
+    fields = [_CacheField(name, index in row_fields) for index, name in enumerate(names)]
+    records: List[str] = []
+    totals: Dict[tuple, List[list]] = {}
+    for number, _, body in sheet_rows.iter_rows(first_row):
+        if number > last_row:
+            break
+        values = sheet_rows.row_values(body, min_col, max_col)
+        if all(value is None for value in values):
+            continue
+        records.append("<r>" + "".join(field.record(value) for field, value in zip(fields, values)) + "</r>")
+        _accumulate(totals, values, row_fields, value_fields)
+    return fields, records, totals
+
+
+def _definition_fingerprint(package: Package, definition: Dict[str, Any], headers: List[str]) -> str:
+    """Hash everything that makes stored band partials reusable."""
+    payload = json.dumps(
+        [
+            definition["source_sheet"],
+            definition["min_row"],
+            definition["min_col"],
+            definition["max_col"],
+            headers,
+            definition["row_fields"],
+            definition["value_fields"],
+            definition["band_rows"],
+            sorted(package.date_styles()),
+        ],
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _build_pivot(
+    package: Package,
+    registered: Dict[str, TableInfo],
+    states: Dict[str, str],
+    sheet_name: str,
+    data_range: str,
+    rows: List[str],
+    values: List[str],
+    columns: Optional[List[str]],
+    agg_func: str,
+    follow_data: Optional[bool] = None,
+    native: bool = False,
+    pivot_sheet: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Optional[TableInfo]]:
+    """Aggregate the source range into the pivot sheet, reusing stored partials of unchanged bands.
+
+    Args:
+        follow_data: Whether the range grows and shrinks with the source data;
+            by default it does when it covers all of the sheet's data rows
+        native: Emit a native pivot table and cache built in one pass over
+            the source instead of a styled table
+        pivot_sheet: Sheet the pivot is written to; "<sheet_name>_pivot" by default
+
+    Returns:
+        Pivot details and the pivot's table (None for native pivots)
+    """
+    source_part = package.sheet_part(sheet_name)
+    if source_part is None:
+        raise ValidationError(f"Sheet '{sheet_name}' not found")
+
+    if ':' not in data_range:
+        raise ValidationError("Data range must be in format 'A1:B2'")
+    try:
+        start_cell, end_cell = data_range.split(':')
+        start_row, start_col, end_row, end_col = parse_cell_range(start_cell, end_cell)
+    except ValueError as e:
+        raise ValidationError(f"Invalid data range format: {str(e)}")
+    if end_row is None or end_col is None:
+        raise ValidationError("Invalid data range format: missing end coordinates")
+
+    if agg_func.lower() not in AGG_FUNCS:
+        raise ValidationError(
+            f"Invalid aggregation function. Must be one of: {', '.join(AGG_FUNCS)}"
+        )
+    agg_func = agg_func.lower()
+
+    sheet_rows = SheetRows(package, source_part)
+    last_data_row = _last_data_row(sheet_rows, start_row + 1)
+    if follow_data is None:
+        follow_data = end_row >= last_data_row
+    if follow_data:
+        end_row = max(last_data_row, start_row)
+    if end_row <= start_row:
+        raise PivotError("Source data must have a header row and at least one data row.")
+
+    header_body = next((body for number, _, body in sheet_rows.iter_rows(start_row) if number == start_row), b"")
+    headers = [
+        "" if header is None else str(header)
+        for header in sheet_rows.row_values(header_body, start_col, end_col)
+    ]
+    row_fields = _field_indices(rows, headers, "row")
+    value_fields = _field_indices(values, headers, "value")
+    _field_indices(columns or [], headers, "column")
+    if native and columns:
+        # The native layout (location, body and item lists) is built from row fields only
+        raise ValidationError("Column fields are not supported with native pivot tables")
+
+    pivot_sheet_name = pivot_sheet or f"{sheet_name}_pivot"
+    definition = {
+        "source_sheet": sheet_name,
+        "min_row": start_row,
+        "min_col": start_col,
+        "max_col": end_col,
+        "row_fields": row_fields,
+        "value_fields": value_fields,
+        "band_rows": PIVOT_BAND_ROWS,
+    }
+    fingerprint = _definition_fingerprint(package, definition, headers)
+
+    source_range = f"{get_column_letter(start_col)}{start_row}:{get_column_letter(end_col)}{end_row}"
+    previous: Dict[str, Dict[tuple, List[list]]] = {}
+    cache = None
+    totals: Dict[tuple, List[list]] = {}
+    if native:
+        # The cache records need every source row, so there is nothing to reuse
+        fields, records, totals = _scan_cache(
+            sheet_rows, start_row + 1, end_row, start_col, end_col,
+            headers, row_fields, value_fields,
+        )
+        bands, recomputed = [], 0
+        value_names = [headers[i] for i in value_fields]
+        cache = _PivotCache(
+            sheet_name, source_range, fields, records,
+            row_fields, value_fields, value_names, agg_func,
+        )
+    else:
+        try:
+            state = json.loads(states.get(pivot_sheet_name) or "null")
+        except ValueError:
+            logger.warning("Discarding unreadable pivot state for '%s'", pivot_sheet_name)
+            state = None
+        if (
+            state and state.get("version") == _STATE_VERSION
+            and state.get("fingerprint") == fingerprint and not state.get("native")
+        ):
+            previous = {
+                digest: {tuple(_decode_value(v) for v in key): partial for key, partial in groups}
+                for digest, groups in state["bands"]
+            }
+        bands, recomputed = _scan_bands(
+            sheet_rows, start_row + 1, end_row, start_col, end_col,
+            row_fields, value_fields, PIVOT_BAND_ROWS, previous,
+        )
+        for _, groups in bands:
+            _merge_partials(totals, groups)
+    if not totals:
+        raise PivotError("No data rows found after header.")
+
+    # Only observed combinations are listed, ordered by their typed values
+    row_names = [headers[i] for i in row_fields]
+    value_names = [headers[i] for i in value_fields]
+    pivot_rows = [
+        list(key) + [_aggregate(stats, agg_func) for stats in totals[key]]
+        for key in sorted(totals, key=lambda key: tuple(_sort_key(v) for v in key))
+    ]
+    pivot_headers = row_names + [f"{field} ({agg_func})" for field in value_names]
+    name, table = _write_pivot_sheet(package, pivot_sheet_name, pivot_headers, pivot_rows, registered, cache)
+
+    states[pivot_sheet_name] = json.dumps(
+        {
+            "version": _STATE_VERSION,
+            "fingerprint": fingerprint,
+            "source_sheet": sheet_name,
+            "data_range": source_range,
+            "follow_data": follow_data,
+            "rows": row_names,
+            "values": value_names,
+            "columns": columns or [],
+            "agg_func": agg_func,
+            "native": native,
+            "bands": [
+                [digest, [[[_encode_value(v) for v in key], partial] for key, partial in groups.items()]]
+                for digest, groups in bands
+            ],
+        },
+        separators=(",", ":"),
+    )
+    _write_states(package, states)
+
+    details = {
+        "source_range": source_range,
+        "pivot_sheet": pivot_sheet_name,
+        "rows": row_names,
+        "columns": columns or [],
+        "values": value_names,
+        "aggregation": agg_func,
+        "table_name": name,
+        "native": native,
+        "groups": len(pivot_rows),
+        "bands": len(bands),
+        "bands_recomputed": recomputed,
+        "full_rebuild": not previous,
+    }
+    return details, table
+
+
+def _save_pivot(
+    filepath: str,
+    package: Package,
+    stamp: Tuple[int, int],
+    pivot_sheet: str,
+    table: Optional[TableInfo],
+) -> None:
+    try:
+        package.save()
+    except Exception as e:
+        raise PivotError(f"Failed to save workbook: {str(e)}")
+
+    def change(tables: Dict[str, TableInfo]) -> Dict[str, TableInfo]:
+        tables = {key: info for key, info in tables.items() if info.sheet_name != pivot_sheet}
+        if table is not None:
+            tables[table.name.lower()] = table
+        return tables
+
+    table_registry.update(filepath, stamp, change)
+
+
 def create_pivot_table(
     filepath: str,
     sheet_name: str,
@@ -20,197 +848,49 @@ def create_pivot_table(
     rows: List[str],
     values: List[str],
     columns: Optional[List[str]] = None,
-    agg_func: str = "sum"
+    agg_func: str = "sum",
+    native: bool = False
 ) -> Dict[str, Any]:
     """Create pivot table in sheet using Excel table functionality
-    
+
+    The summary is written to "<sheet_name>_pivot" and its definition is kept
+    in the workbook so ``refresh_pivot_table`` can update it later. Source
+    rows are aggregated in bands; when the same pivot is rebuilt, bands whose
+    rows did not change are not read again.
+
+    With ``native`` the sheet gets a real pivot table instead: a pivot cache
+    (definition and records) built in one pass over the source, so Excel can
+    re-slice and refresh it without the server. The summary cells are still
+    written for readers that do not evaluate pivots.
+
     Args:
         filepath: Path to Excel file
         sheet_name: Name of worksheet containing source data
         data_range: Source data range reference
-        target_cell: Cell reference for pivot table position
         rows: Fields for row labels
         values: Fields for values
-        columns: Optional fields for column labels
+        columns: Optional fields for column labels; recorded with the pivot but
+            not laid out, and rejected with ``native``
         agg_func: Aggregation function (sum, count, average, max, min)
-        
+        native: Write a native pivot table and pivot cache
+
     Returns:
         Dictionary with status message and pivot table dimensions
     """
     try:
-        wb = load_workbook(filepath)
-        if sheet_name not in wb.sheetnames:
-            raise ValidationError(f"Sheet '{sheet_name}' not found")
-        
-        # Parse ranges
-        if ':' not in data_range:
-            raise ValidationError("Data range must be in format 'A1:B2'")
-            
-        try:
-            start_cell, end_cell = data_range.split(':')
-            start_row, start_col, end_row, end_col = parse_cell_range(start_cell, end_cell)
-        except ValueError as e:
-            raise ValidationError(f"Invalid data range format: {str(e)}")
-            
-        if end_row is None or end_col is None:
-            raise ValidationError("Invalid data range format: missing end coordinates")
-            
-        # Create range string
-        data_range_str = f"{get_column_letter(start_col)}{start_row}:{get_column_letter(end_col)}{end_row}"
-        
-        # Clean up field names by removing aggregation suffixes
-        def clean_field_name(field: str) -> str:
-            field = str(field).strip()
-            for suffix in [" (sum)", " (average)", " (count)", " (min)", " (max)"]:
-                if field.lower().endswith(suffix):
-                    return field[:-len(suffix)]
-            return field
-
-        # Read source data and convert to list of dicts
-        try:
-            # Call read_excel_range with separate start_cell and end_cell parameters
-            data_as_list = read_excel_range(filepath, sheet_name, start_cell, end_cell)
-            if not data_as_list or len(data_as_list) < 2:
-                raise PivotError("Source data must have a header row and at least one data row.")
-            
-            headers = [str(h) for h in data_as_list[0]]
-            data = [dict(zip(headers, row)) for row in data_as_list[1:]]
-
-            if not data:
-                raise PivotError("No data rows found after header.")
-
-        except Exception as e:
-            raise PivotError(f"Failed to read or process source data: {str(e)}")
-
-        # Validate aggregation function
-        valid_agg_funcs = ["sum", "average", "count", "min", "max"]
-        if agg_func.lower() not in valid_agg_funcs:
-            raise ValidationError(
-                f"Invalid aggregation function. Must be one of: {', '.join(valid_agg_funcs)}"
+        stamp, registered = table_registry.snapshot(filepath)
+        with Package(filepath) as package:
+            details, table = _build_pivot(
+                package, registered, _read_states(package),
+                sheet_name, data_range, rows, values, columns, agg_func, native=native,
             )
+            _save_pivot(filepath, package, stamp, details["pivot_sheet"], table)
 
-        # Validate field names exist in data
-        if data:
-            available_fields_raw = data[0].keys()
-            available_fields = {clean_field_name(str(header)).lower() for header in available_fields_raw}
-            
-            for field_list, field_type in [(rows, "row"), (values, "value")]:
-                for field in field_list:
-                    if clean_field_name(str(field)).lower() not in available_fields:
-                        raise ValidationError(
-                            f"Invalid {field_type} field '{field}'. "
-                            f"Available fields: {', '.join(sorted(available_fields_raw))}"
-                        )
-
-            if columns:
-                for field in columns:
-                    if clean_field_name(str(field)).lower() not in available_fields:
-                        raise ValidationError(
-                            f"Invalid column field '{field}'. "
-                            f"Available fields: {', '.join(sorted(available_fields_raw))}"
-                        )
-
-        # Clean up row and value field names
-        cleaned_rows = [clean_field_name(field) for field in rows]
-        cleaned_values = [clean_field_name(field) for field in values]
-
-        # Create pivot sheet
-        pivot_sheet_name = f"{sheet_name}_pivot"
-        if pivot_sheet_name in wb.sheetnames:
-            wb.remove(wb[pivot_sheet_name])
-        pivot_ws = wb.create_sheet(pivot_sheet_name)
-
-        # Write headers
-        current_row = 1
-        current_col = 1
-        
-        # Write row field headers
-        for field in cleaned_rows:
-            cell = pivot_ws.cell(row=current_row, column=current_col, value=field)
-            cell.font = Font(bold=True)
-            current_col += 1
-            
-        # Write value field headers
-        for field in cleaned_values:
-            cell = pivot_ws.cell(row=current_row, column=current_col, value=f"{field} ({agg_func})")
-            cell.font = Font(bold=True)
-            current_col += 1
-
-        # Get unique values for each row field
-        field_values = {}
-        for field in cleaned_rows:
-            all_values = []
-            for record in data:
-                value = str(record.get(field, ''))
-                all_values.append(value)
-            field_values[field] = sorted(set(all_values))
-
-        # Generate all combinations of row field values
-        row_combinations = _get_combinations(field_values)
-
-        # Calculate table dimensions for formatting
-        total_rows = len(row_combinations) + 1  # +1 for header
-        total_cols = len(cleaned_rows) + len(cleaned_values)
-        
-        # Write data rows
-        current_row = 2
-        for combo in row_combinations:
-            # Write row field values
-            col = 1
-            for field in cleaned_rows:
-                pivot_ws.cell(row=current_row, column=col, value=combo[field])
-                col += 1
-            
-            # Filter data for current combination
-            filtered_data = _filter_data(data, combo, {})
-            
-            # Calculate and write aggregated values
-            for value_field in cleaned_values:
-                try:
-                    value = _aggregate_values(filtered_data, value_field, agg_func)
-                    pivot_ws.cell(row=current_row, column=col, value=value)
-                except Exception as e:
-                    raise PivotError(f"Failed to aggregate values for field '{value_field}': {str(e)}")
-                col += 1
-                
-            current_row += 1
-
-        # Create a table for the pivot data
-        try:
-            pivot_range = f"A1:{get_column_letter(total_cols)}{total_rows}"
-            pivot_table = Table(
-                displayName=f"PivotTable_{uuid.uuid4().hex[:8]}", 
-                ref=pivot_range
-            )
-            style = TableStyleInfo(
-                name="TableStyleMedium9",
-                showFirstColumn=False,
-                showLastColumn=False,
-                showRowStripes=True,
-                showColumnStripes=True
-            )
-            pivot_table.tableStyleInfo = style
-            pivot_ws.add_table(pivot_table)
-        except Exception as e:
-            raise PivotError(f"Failed to create pivot table formatting: {str(e)}")
-
-        try:
-            wb.save(filepath)
-        except Exception as e:
-            raise PivotError(f"Failed to save workbook: {str(e)}")
-        
         return {
             "message": "Summary table created successfully",
-            "details": {
-                "source_range": data_range_str,
-                "pivot_sheet": pivot_sheet_name,
-                "rows": cleaned_rows,
-                "columns": columns or [],
-                "values": cleaned_values,
-                "aggregation": agg_func
-            }
+            "details": details
         }
-        
+
     except (ValidationError, PivotError) as e:
         logger.error(str(e))
         raise
@@ -219,53 +899,60 @@ def create_pivot_table(
         raise PivotError(str(e))
 
 
-def _get_combinations(field_values: Dict[str, set]) -> List[Dict]:
-    """Get all combinations of field values."""
-    result = [{}]
-    for field, values in list(field_values.items()):  # Convert to list to avoid runtime changes
-        new_result = []
-        for combo in result:
-            for value in sorted(values):  # Sort for consistent ordering
-                new_combo = combo.copy()
-                new_combo[field] = value
-                new_result.append(new_combo)
-        result = new_result
-    return result
-
-
-def _filter_data(data: List[Dict], row_filters: Dict, col_filters: Dict) -> List[Dict]:
-    """Filter data based on row and column filters."""
-    result = []
-    for record in data:
-        matches = True
-        for field, value in row_filters.items():
-            if record.get(field) != value:
-                matches = False
-                break
-        for field, value in col_filters.items():
-            if record.get(field) != value:
-                matches = False
-                break
-        if matches:
-            result.append(record)
-    return result
-
-
-def _aggregate_values(data: List[Dict], field: str, agg_func: str) -> float:
-    """Aggregate values using the specified function."""
-    values = [record[field] for record in data if field in record and isinstance(record[field], (int, float))]
-    if not values:
-        return 0
-        
-    if agg_func == "sum":
-        return sum(values)
-    elif agg_func == "average":
-        return sum(values) / len(values)
-    elif agg_func == "count":
-        return len(values)
-    elif agg_func == "min":
-        return min(values)
-    elif agg_func == "max":
-        return max(values)
-    else:
-        return sum(values)  # Default to sum
+def refresh_pivot_table(
+    filepath: str,
+    pivot_sheet: str,
+    data_range: Optional[str] = None
+) -> Dict[str, Any]:
+    """Recompute a pivot created by ``create_pivot_table`` from its stored definition.
+
+    Only bands of source rows that changed or were appended since the last
+    build are aggregated again; the rest come from the stored partials. The
+    pivot is rebuilt from scratch when the source header, fields or number
+    formats changed. Native pivots get a new cache built from all rows.
+
+    Args:
+        filepath: Path to Excel file
+        pivot_sheet: Name of the pivot's sheet (e.g. "Sales_pivot")
+        data_range: Optional new source range; by default the stored range,
+            extended to the end of the data if it originally covered all rows
+
+    Returns:
+        Dictionary with status message, pivot details and how many bands were recomputed
+    """
+    try:
+        stamp, registered = table_registry.snapshot(filepath)
+        with Package(filepath) as package:
+            states = _read_states(package)
+            try:
+                state = json.loads(states.get(pivot_sheet) or "null")
+            except ValueError:
+                state = None
+            if not state:
+                raise PivotError(f"No pivot definition stored for sheet '{pivot_sheet}'")
+
+            details, table = _build_pivot(
+                package, registered, states,
+                state["source_sheet"],
+                data_range or state["data_range"],
+                state["rows"],
+                state["values"],
+                state["columns"],
+                state["agg_func"],
+                follow_data=None if data_range else state["follow_data"],
+                native=state.get("native", False),
+                pivot_sheet=pivot_sheet,
+            )
+            _save_pivot(filepath, package, stamp, pivot_sheet, table)
+
+        return {
+            "message": "Summary table refreshed successfully",
+            "details": details
+        }
+
+    except (ValidationError, PivotError) as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to refresh pivot table: {e}")
+        raise PivotError(str(e))
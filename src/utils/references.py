@@ -0,0 +1,264 @@
+import logging
+import re
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from openpyxl.formula import Tokenizer
+from openpyxl.formula.tokenizer import Token
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.workbook.workbook import Workbook
+
+logger = logging.getLogger(__name__)
+
+# (sheet title, "A1:B10")
+Area = Tuple[str, str]
+
+_STRUCTURED_REF = re.compile(r"^([A-Za-z_\\][\w.]*)\[(.*)\]$")
+_BRACKETED = re.compile(r"\[([^\]]*)\]")
+
+
+def _split_sheet(reference: str) -> Tuple[Optional[str], str]:
+    """Split "'My Sheet'!$A$1:$B$2" into ("My Sheet", "$A$1:$B$2")."""
+    if "!" not in reference:
+        return None, reference
+    sheet, _, coord = reference.rpartition("!")
+    if sheet.startswith("'") and sheet.endswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    return sheet, coord
+
+
+class ReferenceResolver:
+    """Resolve range references, defined names and table structured references.
+
+    One resolver belongs to one loaded workbook (see ``resolver_for``) and
+    caches resolved areas, area values and formula dependencies for as long
+    as that workbook is loaded, so repeated lookups of the same reference
+    (e.g. a dropdown list shared by thousands of validated cells) walk the
+    cells only once. Tools load a fresh workbook per call and only read
+    through a resolver, so the caches never outlive a write; code that
+    modifies a workbook must not resolve references in it afterwards.
+    """
+
+    def __init__(self, workbook: Workbook):
+        self._workbook = weakref.ref(workbook)
+        self._areas: Dict[Tuple[str, Optional[str]], Optional[List[Area]]] = {}
+        self._values: Dict[Area, List[Any]] = {}
+        self._dependencies: Dict[Tuple[str, Optional[str]], Dict[str, List[str]]] = {}
+        self._tables: Optional[Dict[str, Tuple[str, Any]]] = None
+
+    @property
+    def workbook(self) -> Workbook:
+        workbook = self._workbook()
+        if workbook is None:
+            raise ReferenceError("Workbook is no longer available")
+        return workbook
+
+    def _table_index(self) -> Dict[str, Tuple[str, Any]]:
+        if self._tables is None:
+            self._tables = {}
+            for ws in self.workbook.worksheets:
+                # TableList.items() yields (name, ref); the values are the tables
+                for table in getattr(ws, "tables", {}).values():
+                    self._tables[table.displayName.lower()] = (ws.title, table)
+        return self._tables
+
+    def _table_areas(self, table_name: str, spec: str) -> Optional[List[Area]]:
+        entry = self._table_index().get(table_name.lower())
+        if entry is None:
+            return None
+        sheet_title, table = entry
+        min_col, min_row, max_col, max_row = range_boundaries(table.ref)
+        header_rows = 1 if table.headerRowCount is None else table.headerRowCount
+        totals_rows = table.totalsRowCount or 0
+
+        items = _BRACKETED.findall(spec) if spec.startswith("[") else ([spec] if spec else [])
+        specials = {item.strip().lower() for item in items if item.strip().startswith("#")}
+        columns = [item.strip() for item in items if not item.strip().startswith("#")]
+
+        if "#this row" in specials:
+            return None
+        if "#all" in specials:
+            first_row, last_row = min_row, max_row
+        elif specials == {"#headers"}:
+            first_row = last_row = min_row
+        elif specials == {"#totals"}:
+            if not totals_rows:
+                return None
+            first_row = last_row = max_row
+        else:
+            first_row = min_row + header_rows
+            last_row = max_row if "#totals" in specials else max_row - totals_rows
+            if "#headers" in specials:
+                first_row = min_row
+
+        if columns:
+            names = [col.name.lower() for col in table.tableColumns]
+            if not names:
+                ws = self.workbook[sheet_title]
+                names = [
+                    str(ws.cell(row=min_row, column=c).value or "").lower()
+                    for c in range(min_col, max_col + 1)
+                ]
+            try:
+                offsets = [names.index(col.lower()) for col in (columns[0], columns[-1])]
+            except ValueError:
+                return None
+            first_col, last_col = min_col + min(offsets), min_col + max(offsets)
+        else:
+            first_col, last_col = min_col, max_col
+
+        if last_row < first_row:
+            return []
+        coord = f"{get_column_letter(first_col)}{first_row}:{get_column_letter(last_col)}{last_row}"
+        return [(sheet_title, coord)]
+
+    def _name_areas(self, name: str, sheet_title: Optional[str]) -> Optional[List[Area]]:
+        defined = None
+        if sheet_title is not None and sheet_title in self.workbook.sheetnames:
+            defined = self.workbook[sheet_title].defined_names.get(name)
+        if defined is None:
+            defined = self.workbook.defined_names.get(name)
+        if defined is None:
+            return None
+        areas = []
+        for dest_sheet, coord in defined.destinations:
+            if dest_sheet not in self.workbook.sheetnames:
+                return None
+            areas.append((dest_sheet, coord.replace("$", "")))
+        return areas or None
+
+    def _resolve_areas(self, reference: str, sheet_title: Optional[str]) -> Optional[List[Area]]:
+        reference = reference.strip().lstrip("=")
+        match = _STRUCTURED_REF.match(reference)
+        if match:
+            return self._table_areas(match.group(1), match.group(2).strip())
+
+        ref_sheet, coord = _split_sheet(reference)
+        coord = coord.replace("$", "")
+        try:
+            range_boundaries(coord)
+        except ValueError:
+            # Not a cell range: a defined name, or a table referenced by name
+            if ref_sheet is None and coord.lower() in self._table_index():
+                return self._table_areas(coord, "")
+            return self._name_areas(coord, ref_sheet or sheet_title)
+
+        target = ref_sheet or sheet_title
+        if target is None or target not in self.workbook.sheetnames:
+            return None
+        return [(target, coord)]
+
+    def resolve_areas(self, reference: str, sheet_title: Optional[str] = None) -> Optional[List[Area]]:
+        """Resolve a reference to the (sheet, range) areas it covers.
+
+        Args:
+            reference: A range ("$A$1:$A$5", "Sheet1!A1:B2"), defined name or
+                structured reference ("Table1[Column]")
+            sheet_title: Sheet that unqualified references and sheet-scoped
+                names are relative to
+
+        Returns:
+            List of (sheet title, range) tuples, or None if unresolvable
+        """
+        key = (reference, sheet_title)
+        if key in self._areas:
+            return self._areas[key]
+        try:
+            areas = self._resolve_areas(reference, sheet_title)
+        except Exception as e:
+            logger.warning("Could not resolve reference '%s': %s", reference, e)
+            areas = None
+        self._areas[key] = areas
+        return areas
+
+    def _area_values(self, area: Area) -> List[Any]:
+        cached = self._values.get(area)
+        if cached is not None:
+            return cached
+        sheet_title, coord = area
+
+        ws = self.workbook[sheet_title]
+        min_col, min_row, max_col, max_row = range_boundaries(coord)
+        min_col, min_row = min_col or 1, min_row or 1
+        max_col = max_col or ws.max_column
+        max_row = max_row or ws.max_row
+
+        cells = getattr(ws, "_cells", None)
+        if cells is not None:
+            # Look cells up directly so resolving never creates empty cells
+            values = []
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    cell = cells.get((row, col))
+                    values.append(cell.value if cell is not None else None)
+        else:
+            values = [
+                value
+                for row in ws.iter_rows(
+                    min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True
+                )
+                for value in row
+            ]
+        self._values[area] = values
+        return values
+
+    def resolve_values(self, reference: str, sheet_title: Optional[str] = None) -> Optional[List[Any]]:
+        """Resolve a reference to the cell values it covers, row by row.
+
+        Returns None when the reference cannot be resolved.
+        """
+        areas = self.resolve_areas(reference, sheet_title)
+        if areas is None:
+            return None
+        values: List[Any] = []
+        for area in areas:
+            values.extend(self._area_values(area))
+        return values
+
+    def formula_dependencies(self, formula: str, sheet_title: Optional[str] = None) -> Dict[str, List[str]]:
+        """List the areas a formula reads, with names and tables expanded.
+
+        Returns:
+            Dictionary with "ranges" (qualified ranges such as "Sheet1!A1:B2")
+            and "unresolved" (references that could not be resolved)
+        """
+        key = (formula, sheet_title)
+        cached = self._dependencies.get(key)
+        if cached is not None:
+            return cached
+
+        ranges: List[str] = []
+        unresolved: List[str] = []
+        try:
+            tokens = Tokenizer(formula if formula.startswith("=") else f"={formula}").items
+        except Exception as e:
+            logger.debug("Could not tokenize formula '%s': %s", formula, e)
+            tokens = []
+        for token in tokens:
+            if token.type != Token.OPERAND or token.subtype != Token.RANGE:
+                continue
+            areas = self.resolve_areas(token.value, sheet_title)
+            if areas is None:
+                unresolved.append(token.value)
+                continue
+            for area_sheet, coord in areas:
+                qualified = f"'{area_sheet}'!{coord}" if not area_sheet.isidentifier() else f"{area_sheet}!{coord}"
+                if qualified not in ranges:
+                    ranges.append(qualified)
+
+        dependencies = {"ranges": ranges, "unresolved": unresolved}
+        self._dependencies[key] = dependencies
+        return dependencies
+
+
+_resolvers: "weakref.WeakKeyDictionary[Workbook, ReferenceResolver]" = weakref.WeakKeyDictionary()
+
+
+def resolver_for(workbook: Workbook) -> ReferenceResolver:
+    """Return the reference resolver attached to a loaded workbook."""
+    resolver = _resolvers.get(workbook)
+    if resolver is None:
+        resolver = ReferenceResolver(workbook)
+        _resolvers[workbook] = resolver
+    return resolver
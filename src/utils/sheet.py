@@ -1,4 +1,5 @@
 import logging
+from pathlib import Path
 from typing import Any, Dict, Optional, List
 from copy import copy
 
@@ -9,25 +10,43 @@ from openpyxl.styles import Font, Border, PatternFill, Side
 
 from .cell_utils import parse_cell_range
 from .exceptions import SheetError, ValidationError
+from .internal_sheets import user_sheet_names
+from .merged import MergedRangeIndex, merge_into, unmerge_from
+from .package import PackageError
+from .pivot import drop_pivot_definitions, pivot_sources, rename_pivot_sheets
+from .sheet_copy import copy_sheet_part
+from .tables import table_registry
 
 logger = logging.getLogger(__name__)
 
-def copy_sheet(filepath: str, source_sheet: str, target_sheet: str) -> Dict[str, Any]:
-    """Copy a worksheet within the same workbook."""
+def copy_sheet(
+    filepath: str,
+    source_sheet: str,
+    target_sheet: str,
+    source_filepath: Optional[str] = None
+) -> Dict[str, Any]:
+    """Copy a worksheet within the same workbook, or from another workbook.
+
+    The sheet is copied at the package level, so its cells are never loaded.
+    Same-workbook copies of sheets the package-level copy cannot handle fall
+    back to openpyxl (which does not copy tables, charts or images).
+    """
     try:
-        wb = load_workbook(filepath)
-        if source_sheet not in wb.sheetnames:
-            raise SheetError(f"Source sheet '{source_sheet}' not found")
-            
-        if target_sheet in wb.sheetnames:
-            raise SheetError(f"Target sheet '{target_sheet}' already exists")
-            
-        source = wb[source_sheet]
-        target = wb.copy_worksheet(source)
-        target.title = target_sheet
-        
-        wb.save(filepath)
-        return {"message": f"Sheet '{source_sheet}' copied to '{target_sheet}'"}
+        stamp, _ = table_registry.snapshot(filepath)
+        try:
+            copied = copy_sheet_part(filepath, source_sheet, target_sheet, source_filepath)
+        except PackageError as e:
+            if source_filepath is not None:
+                raise
+            logger.info("Copying sheet with openpyxl: %s", e)
+            copied = _copy_sheet_in_workbook(filepath, source_sheet, target_sheet)
+        table_registry.update(
+            filepath,
+            stamp,
+            lambda tables: {**tables, **{info.name.lower(): info for info in copied}},
+        )
+        origin = f" from '{Path(source_filepath).name}'" if source_filepath else ""
+        return {"message": f"Sheet '{source_sheet}'{origin} copied to '{target_sheet}'"}
     except SheetError as e:
         logger.error(str(e))
         raise
@@ -35,18 +54,51 @@ def copy_sheet(filepath: str, source_sheet: str, target_sheet: str) -> Dict[str,
         logger.error(f"Failed to copy sheet: {e}")
         raise SheetError(str(e))
 
+def _copy_sheet_in_workbook(filepath: str, source_sheet: str, target_sheet: str) -> List:
+    wb = load_workbook(filepath)
+    if source_sheet not in wb.sheetnames:
+        raise SheetError(f"Source sheet '{source_sheet}' not found")
+
+    if target_sheet in wb.sheetnames:
+        raise SheetError(f"Target sheet '{target_sheet}' already exists")
+
+    source = wb[source_sheet]
+    target = wb.copy_worksheet(source)
+    target.title = target_sheet
+
+    wb.save(filepath)
+    # copy_worksheet does not copy tables, so the registered tables are unchanged
+    return []
+
 def delete_sheet(filepath: str, sheet_name: str) -> Dict[str, Any]:
     """Delete a worksheet from the workbook."""
     try:
+        stamp, _ = table_registry.snapshot(filepath)
         wb = load_workbook(filepath)
         if sheet_name not in wb.sheetnames:
             raise SheetError(f"Sheet '{sheet_name}' not found")
             
-        if len(wb.sheetnames) == 1:
+        if len(user_sheet_names(wb.sheetnames)) == 1:
             raise SheetError("Cannot delete the only sheet in workbook")
+
+        pivots = pivot_sources(filepath)
+        dependent = [
+            pivot_sheet for pivot_sheet, source in pivots.items()
+            if source == sheet_name and pivot_sheet != sheet_name and pivot_sheet in wb.sheetnames
+        ]
+        if dependent:
+            raise SheetError(
+                f"Sheet '{sheet_name}' is the source of the pivot table on '{dependent[0]}'; delete that sheet first"
+            )
             
         del wb[sheet_name]
         wb.save(filepath)
+        drop_pivot_definitions(filepath, sheet_name)
+        table_registry.update(
+            filepath,
+            stamp,
+            lambda tables: {key: info for key, info in tables.items() if info.sheet_name != sheet_name},
+        )
         return {"message": f"Sheet '{sheet_name}' deleted"}
     except SheetError as e:
         logger.error(str(e))
@@ -58,6 +110,7 @@ def delete_sheet(filepath: str, sheet_name: str) -> Dict[str, Any]:
 def rename_sheet(filepath: str, old_name: str, new_name: str) -> Dict[str, Any]:
     """Rename a worksheet."""
     try:
+        stamp, _ = table_registry.snapshot(filepath)
         wb = load_workbook(filepath)
         if old_name not in wb.sheetnames:
             raise SheetError(f"Sheet '{old_name}' not found")
@@ -67,7 +120,22 @@ def rename_sheet(filepath: str, old_name: str, new_name: str) -> Dict[str, Any]:
             
         sheet = wb[old_name]
         sheet.title = new_name
+        # Native pivot caches name their source sheet
+        for ws in wb.worksheets:
+            for pivot in ws._pivots:
+                source = pivot.cache.cacheSource.worksheetSource
+                if source is not None and source.sheet == old_name:
+                    source.sheet = new_name
         wb.save(filepath)
+        rename_pivot_sheets(filepath, old_name, new_name)
+        table_registry.update(
+            filepath,
+            stamp,
+            lambda tables: {
+                key: info.on_sheet(new_name) if info.sheet_name == old_name else info
+                for key, info in tables.items()
+            },
+        )
         return {"message": f"Sheet renamed from '{old_name}' to '{new_name}'"}
     except SheetError as e:
         logger.error(str(e))
@@ -186,6 +254,22 @@ def delete_range(worksheet: Worksheet, start_cell: str, end_cell: Optional[str]
             cell.number_format = "General"
             cell.alignment = None
 
+def _parse_merge_range(range_string: str) -> str:
+    """Normalize 'A1:C3' (or a start/end pair joined by ':') to a range string."""
+    start_cell, _, end_cell = range_string.partition(":")
+    start_row, start_col, end_row, end_col = parse_cell_range(start_cell, end_cell or None)
+    if end_row is None or end_col is None:
+        raise SheetError(f"Invalid range '{range_string}': both start and end cells must be specified")
+    if end_row < start_row or end_col < start_col:
+        raise SheetError(f"Invalid range '{range_string}': end cell must be after start cell")
+    return format_range_string(start_row, start_col, end_row, end_col)
+
+def _check_merge_overlaps(index: MergedRangeIndex, range_string: str) -> None:
+    start_row, start_col, end_row, end_col = parse_cell_range(*range_string.split(":"))
+    overlaps = index.overlapping(start_row, start_col, end_row, end_col)
+    if overlaps:
+        raise SheetError(f"Range '{range_string}' overlaps merged range '{overlaps[0]}'")
+
 def merge_range(filepath: str, sheet_name: str, start_cell: str, end_cell: str) -> Dict[str, Any]:
     """Merge a range of cells."""
     try:
@@ -200,7 +284,9 @@ def merge_range(filepath: str, sheet_name: str, start_cell: str, end_cell: str)
 
         range_string = format_range_string(start_row, start_col, end_row, end_col)
         worksheet = wb[sheet_name]
-        worksheet.merge_cells(range_string)
+        index = MergedRangeIndex.from_worksheet(worksheet)
+        _check_merge_overlaps(index, range_string)
+        merge_into(worksheet, index, range_string)
         wb.save(filepath)
         return {"message": f"Range '{range_string}' merged in sheet '{sheet_name}'"}
     except SheetError as e:
@@ -227,13 +313,11 @@ def unmerge_range(filepath: str, sheet_name: str, start_cell: str, end_cell: str
         range_string = format_range_string(start_row, start_col, end_row, end_col)
         
         # Check if range is actually merged
-        merged_ranges = worksheet.merged_cells.ranges
-        target_range = range_string.upper()
-        
-        if not any(str(merged_range).upper() == target_range for merged_range in merged_ranges):
+        index = MergedRangeIndex.from_worksheet(worksheet)
+        if range_string not in index:
             raise SheetError(f"Range '{range_string}' is not merged")
             
-        worksheet.unmerge_cells(range_string)
+        unmerge_from(worksheet, index, range_string)
         wb.save(filepath)
         return {"message": f"Range '{range_string}' unmerged successfully"}
     except SheetError as e:
@@ -243,6 +327,80 @@ def unmerge_range(filepath: str, sheet_name: str, start_cell: str, end_cell: str
         logger.error(f"Failed to unmerge range: {e}")
         raise SheetError(str(e))
 
+def merge_ranges(filepath: str, sheet_name: str, ranges: List[str]) -> Dict[str, Any]:
+    """Merge many ranges with a single load and save.
+
+    All ranges are validated against the existing merges and each other
+    before anything is changed.
+    """
+    try:
+        if not ranges:
+            raise SheetError("No ranges provided to merge")
+        wb = load_workbook(filepath)
+        if sheet_name not in wb.sheetnames:
+            raise SheetError(f"Sheet '{sheet_name}' not found")
+        worksheet = wb[sheet_name]
+
+        try:
+            range_strings = [_parse_merge_range(r) for r in ranges]
+        except ValueError as e:
+            raise SheetError(f"Invalid range: {str(e)}")
+
+        # Validate against a scratch index so a failure leaves the sheet untouched
+        index = MergedRangeIndex.from_worksheet(worksheet)
+        scratch = MergedRangeIndex.from_worksheet(worksheet)
+        for range_string in range_strings:
+            _check_merge_overlaps(scratch, range_string)
+            scratch.add(range_string)
+
+        for range_string in range_strings:
+            merge_into(worksheet, index, range_string)
+        wb.save(filepath)
+        return {
+            "message": f"Merged {len(range_strings)} range(s) in sheet '{sheet_name}'",
+            "ranges": range_strings,
+        }
+    except SheetError as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to merge ranges: {e}")
+        raise SheetError(str(e))
+
+def unmerge_ranges(filepath: str, sheet_name: str, ranges: List[str]) -> Dict[str, Any]:
+    """Unmerge many ranges with a single load and save."""
+    try:
+        if not ranges:
+            raise SheetError("No ranges provided to unmerge")
+        wb = load_workbook(filepath)
+        if sheet_name not in wb.sheetnames:
+            raise SheetError(f"Sheet '{sheet_name}' not found")
+        worksheet = wb[sheet_name]
+
+        try:
+            range_strings = list(dict.fromkeys(_parse_merge_range(r) for r in ranges))
+        except ValueError as e:
+            raise SheetError(f"Invalid range: {str(e)}")
+
+        index = MergedRangeIndex.from_worksheet(worksheet)
+        missing = [r for r in range_strings if r not in index]
+        if missing:
+            raise SheetError(f"Range(s) not merged: {', '.join(missing)}")
+
+        for range_string in range_strings:
+            unmerge_from(worksheet, index, range_string)
+        wb.save(filepath)
+        return {
+            "message": f"Unmerged {len(range_strings)} range(s) in sheet '{sheet_name}'",
+            "ranges": range_strings,
+        }
+    except SheetError as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to unmerge ranges: {e}")
+        raise SheetError(str(e))
+
 def get_merged_ranges(filepath: str, sheet_name: str) -> List[str]:
     """Get merged cells in a worksheet."""
     try:
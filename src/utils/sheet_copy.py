@@ -0,0 +1,462 @@
+import logging
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from openpyxl.workbook.child import INVALID_TITLE_REGEX
+
+from .exceptions import SheetError
+from .package import (
+    CT_WORKSHEET,
+    NS_MAIN,
+    NS_PKG_REL,
+    NS_REL,
+    REL_PIVOT_TABLE,
+    REL_TABLE,
+    ChunkRewriter,
+    Package,
+    PackageError,
+    XML_DECLARATION,
+    next_table_id,
+)
+from .tables import TableInfo, unique_table_name
+
+logger = logging.getLogger(__name__)
+
+REL_IMAGE = f"{NS_REL}/image"
+
+_SHEET_DATA_OPEN_RE = re.compile(rb"<sheetData\b[^>]*?(/?)>")
+_PREFIXED_SHEET_DATA_RE = re.compile(rb"<\w+:sheetData\b")
+_TAB_SELECTED_RE = re.compile(rb'\stabSelected="(?:1|true)"')
+_RELATIONSHIP_RE = re.compile(rb"<Relationship\b[^>]*/>")
+_ATTR_RE = re.compile(rb'(?:^|\s)([\w:]+)="([^"]*)"')
+_CELL_RE = re.compile(rb"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.S)
+_ROW_OPEN_RE = re.compile(rb"<row\b[^>]*>")
+_COL_RE = re.compile(rb"<col\b[^>]*>")
+_STYLE_ATTR_RE = re.compile(rb'(\s(?:s|style)=")(\d+)(")')
+_DXF_ATTR_RE = re.compile(rb'(\sdxfId=")(\d+)(")')
+_VALUE_RE = re.compile(rb"<v>(.*?)</v>", re.S)
+_FORMULA_RE = re.compile(rb"(<(?:\w+:)?f>)(.*?)(</(?:\w+:)?f>)", re.S)
+_TABLE_OPEN_RE = re.compile(rb"<table\b[^>]*>")
+
+# Later siblings of numFmts and dxfs in styles.xml, for inserting a missing collection
+_AFTER_NUM_FMTS = (b"<fonts",)
+_AFTER_DXFS = (b"<tableStyles", b"<colors", b"<extLst", b"</styleSheet>")
+
+
+def _attrs(raw: bytes) -> Dict[bytes, bytes]:
+    return dict(_ATTR_RE.findall(raw))
+
+
+def _set_attr(tag: bytes, name: bytes, value: bytes) -> bytes:
+    """Set an attribute on a start tag (or empty-element tag)."""
+    pattern = re.compile(rb'(\s' + re.escape(name) + rb'=")[^"]*(")')
+    if pattern.search(tag):
+        return pattern.sub(lambda m: m.group(1) + value + m.group(2), tag, 1)
+    end = len(tag) - (2 if tag.endswith(b"/>") else 1)
+    return tag[:end] + b" " + name + b'="' + value + b'"' + tag[end:]
+
+
+def _part_template(part: str) -> str:
+    """"xl/drawings/drawing1.xml" -> "xl/drawings/drawing{}.xml"."""
+    folder, name = posixpath.split(part)
+    stem, extension = posixpath.splitext(name)
+    return posixpath.join(folder, re.sub(r"\d*$", "", stem) + "{}" + extension)
+
+
+def _sheet_rewriter(
+    head: Callable[[bytes], bytes],
+    rows: Optional[Callable[[bytes], bytes]] = None,
+    tail: Optional[Callable[[bytes], bytes]] = None,
+) -> ChunkRewriter:
+    """Rewrite a worksheet part in three sections while it streams.
+
+    The markup before sheetData and after it is buffered whole (it holds
+    views, columns, merges and the like, not cells); sheetData is passed
+    through ``rows`` in runs of complete rows, so memory stays bounded by
+    the chunk size however many rows the sheet has.
+    """
+    def rewrite(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        buffer = b""
+        state = "head"
+        for chunk in chunks:
+            buffer += chunk
+            if state == "head":
+                match = _SHEET_DATA_OPEN_RE.search(buffer)
+                if match is None:
+                    continue
+                yield head(buffer[:match.start()]) + match.group(0)
+                buffer = buffer[match.end():]
+                state = "tail" if match.group(1) else "rows"
+            if state == "rows":
+                end = buffer.find(b"</sheetData>")
+                if end >= 0:
+                    yield rows(buffer[:end]) if rows else buffer[:end]
+                    buffer = buffer[end:]
+                    state = "tail"
+                else:
+                    cut = buffer.rfind(b"</row>")
+                    if cut >= 0:
+                        cut += len(b"</row>")
+                        yield rows(buffer[:cut]) if rows else buffer[:cut]
+                        buffer = buffer[cut:]
+        if state == "head":
+            yield head(buffer)
+        elif state == "rows":
+            yield rows(buffer) if rows else buffer
+        else:
+            yield tail(buffer) if tail else buffer
+    return rewrite
+
+
+def _check_sheet_markup(package: Package, part: str) -> None:
+    """Refuse worksheet parts whose sheetData the streaming rewrite would not find."""
+    with package.open(part) as handle:
+        head = b""
+        while chunk := handle.read(1 << 16):
+            head += chunk
+            if b"sheetData" in head:
+                break
+    if _PREFIXED_SHEET_DATA_RE.search(head):
+        raise PackageError("Prefixed worksheet markup is not supported")
+
+
+def _retarget_formulas(xml: bytes, source_sheet: str, target_sheet: str) -> bytes:
+    """Point chart series formulas at the copied sheet instead of the source sheet."""
+    def quoted(name: str) -> bytes:
+        return escape("'" + name.replace("'", "''") + "'").encode("utf-8")
+
+    prefix = re.compile(
+        rb"(?<![\w.'])(?:" + re.escape(quoted(source_sheet)) + rb"|"
+        + re.escape(escape(source_sheet).encode("utf-8")) + rb")!"
+    )
+    replacement = quoted(target_sheet) + b"!"
+    return _FORMULA_RE.sub(
+        lambda m: m.group(1) + prefix.sub(lambda _: replacement, m.group(2)) + m.group(3), xml
+    )
+
+
+class _Collection:
+    """One indexed collection of styles.xml (fonts, cellXfs, ...) with appended items."""
+
+    def __init__(self, xml: bytes, collection: bytes, item: bytes):
+        self.collection = collection
+        match = re.search(
+            rb"<" + collection + rb"\b[^>]*?(?:/>|>(.*?)</" + collection + rb">)", xml, re.S
+        )
+        self.present = match is not None
+        self.items: List[bytes] = re.findall(
+            rb"<" + item + rb"\b[^>]*?(?:/>|>.*?</" + item + rb">)",
+            (match.group(1) or b"") if match else b"",
+            re.S,
+        )
+        self.added: List[bytes] = []
+        self._index = {raw: i for i, raw in reversed(list(enumerate(self.items)))}
+
+    def index(self, raw: bytes) -> int:
+        """Index of an identical item, appending it if there is none."""
+        index = self._index.get(raw)
+        if index is None:
+            index = len(self.items) + len(self.added)
+            self.added.append(raw)
+            self._index[raw] = index
+        return index
+
+    def apply(self, xml: bytes, after: Tuple[bytes, ...] = ()) -> bytes:
+        if not self.added:
+            return xml
+        added = b"".join(self.added)
+        count = str(len(self.items) + len(self.added)).encode("ascii")
+        name = self.collection
+        if not self.present:
+            anchor = next(tag for tag in after if tag in xml)
+            at = xml.index(anchor)
+            return xml[:at] + b"<" + name + b' count="' + count + b'">' + added + b"</" + name + b">" + xml[at:]
+        xml = re.sub(rb"<" + name + rb"\b([^>]*?)/>", rb"<" + name + rb"\1></" + name + rb">", xml, 1)
+        xml = xml.replace(b"</" + name + b">", added + b"</" + name + b">", 1)
+        return re.sub(
+            rb"(<" + name + rb'\b[^>]*\bcount=")\d+', lambda m: m.group(1) + count, xml, 1
+        )
+
+
+class _StyleMap:
+    """Map one workbook's cell formats and differential formats into another's styles.
+
+    Every cellXfs entry of the source is appended to the target with its
+    font, fill, border and number format (identical entries are reused), so
+    cell style indices can be rewritten while the cells stream.
+    """
+
+    def __init__(self, source: Package, target: Package):
+        source_part, target_part = source.styles_part(), target.styles_part()
+        if not source_part or not target_part or not source.has(source_part) or not target.has(target_part):
+            raise PackageError("Workbook has no styles part")
+        self.target, self.target_part = target, target_part
+        src = source.read(source_part)
+        dst = target.read(target_part)
+        if re.search(rb"<\w+:styleSheet\b", src + dst):
+            raise PackageError("Prefixed styles markup is not supported")
+
+        self.collections = {
+            name: _Collection(dst, name, item)
+            for name, item in (
+                (b"numFmts", b"numFmt"), (b"fonts", b"font"), (b"fills", b"fill"),
+                (b"borders", b"border"), (b"cellXfs", b"xf"), (b"dxfs", b"dxf"),
+            )
+        }
+        source_items = {
+            name: _Collection(src, name, item).items
+            for name, item in (
+                (b"numFmts", b"numFmt"), (b"fonts", b"font"), (b"fills", b"fill"),
+                (b"borders", b"border"), (b"cellXfs", b"xf"), (b"dxfs", b"dxf"),
+            )
+        }
+
+        # Custom number formats are matched by format code; built-in ids (< 164) are shared
+        target_formats = {}
+        for raw in self.collections[b"numFmts"].items:
+            attrs = _attrs(raw)
+            target_formats.setdefault(attrs.get(b"formatCode"), int(attrs.get(b"numFmtId", 0)))
+        next_format = max([163, *target_formats.values()]) + 1
+        format_ids: Dict[int, int] = {}
+        for raw in source_items[b"numFmts"]:
+            attrs = _attrs(raw)
+            code = attrs.get(b"formatCode")
+            if code not in target_formats:
+                target_formats[code] = next_format
+                self.collections[b"numFmts"].added.append(
+                    _set_attr(raw, b"numFmtId", str(next_format).encode("ascii"))
+                )
+                next_format += 1
+            format_ids[int(attrs.get(b"numFmtId", 0))] = target_formats[code]
+
+        def mapped(collection: bytes, index: bytes) -> bytes:
+            items = source_items[collection]
+            position = int(index)
+            if position >= len(items):
+                return b"0"
+            return str(self.collections[collection].index(items[position])).encode("ascii")
+
+        self.cell_formats: Dict[int, bytes] = {}
+        for index, raw in enumerate(source_items[b"cellXfs"]):
+            attrs = _attrs(re.match(rb"<xf\b[^>]*>", raw).group(0))
+            xf = raw
+            num_fmt = int(attrs.get(b"numFmtId", 0))
+            xf = _set_attr(xf, b"numFmtId", str(format_ids.get(num_fmt, num_fmt)).encode("ascii"))
+            xf = _set_attr(xf, b"fontId", mapped(b"fonts", attrs.get(b"fontId", b"0")))
+            xf = _set_attr(xf, b"fillId", mapped(b"fills", attrs.get(b"fillId", b"0")))
+            xf = _set_attr(xf, b"borderId", mapped(b"borders", attrs.get(b"borderId", b"0")))
+            # Named cell styles are not carried over; copied formats derive from Normal
+            xf = _set_attr(xf, b"xfId", b"0")
+            self.cell_formats[index] = str(self.collections[b"cellXfs"].index(xf)).encode("ascii")
+        self.differential_formats = {
+            index: str(self.collections[b"dxfs"].index(raw)).encode("ascii")
+            for index, raw in enumerate(source_items[b"dxfs"])
+        }
+
+    def save(self) -> None:
+        xml = self.target.read(self.target_part)
+        if re.search(rb"<styleSheet\b[^>]*/>", xml):
+            raise PackageError("Unsupported styles markup")
+        xml = self.collections[b"numFmts"].apply(xml, _AFTER_NUM_FMTS)
+        for name in (b"fonts", b"fills", b"borders", b"cellXfs"):
+            if self.collections[name].added and not self.collections[name].present:
+                raise PackageError("Unsupported styles markup")
+            xml = self.collections[name].apply(xml)
+        xml = self.collections[b"dxfs"].apply(xml, _AFTER_DXFS)
+        self.target.write(self.target_part, xml)
+
+    def style(self, match: "re.Match[bytes]") -> bytes:
+        return match.group(1) + self.cell_formats.get(int(match.group(2)), b"0") + match.group(3)
+
+    def dxf(self, match: "re.Match[bytes]") -> bytes:
+        return match.group(1) + self.differential_formats.get(int(match.group(2)), b"0") + match.group(3)
+
+
+class _SheetCopy:
+    """Copy one worksheet, and the parts it owns, from a source package into a target package."""
+
+    def __init__(self, source: Package, target: Package, source_sheet: str, target_sheet: str):
+        self.source = source
+        self.target = target
+        self.source_sheet = source_sheet
+        self.target_sheet = target_sheet
+        self.same_package = source is target
+        self.clones: Dict[str, str] = {}
+        self.tables: List[TableInfo] = []
+        self.table_names = [
+            _attrs(match.group(0)).get(b"displayName", b"").decode("utf-8")
+            for name in target.parts()
+            if name.startswith("xl/tables/") and name.endswith(".xml")
+            for match in [_TABLE_OPEN_RE.search(target.read(name))]
+            if match
+        ]
+
+    def copy(self) -> str:
+        source_part = self.source.sheet_part(self.source_sheet)
+        _check_sheet_markup(self.source, source_part)
+        part = self.target.unused_part("xl/worksheets/sheet{}.xml")
+        self.clones[source_part] = part
+        self.target.register_sheet(self.target_sheet, part)
+        self.target.copy_part(part, self.source, source_part, CT_WORKSHEET, self._sheet_rewriter())
+        self._copy_relationships(source_part, part)
+        return part
+
+    def _sheet_rewriter(self) -> ChunkRewriter:
+        # The copy is added unselected, so that it is not grouped with the active sheet
+        if self.same_package:
+            return _sheet_rewriter(lambda head: _TAB_SELECTED_RE.sub(b"", head))
+
+        # From another workbook: shared strings become inline strings and
+        # style indices are translated into the target's styles
+        strings = self.source.shared_strings()
+        styles = _StyleMap(self.source, self.target)
+        styles.save()
+
+        def cell(match: "re.Match[bytes]") -> bytes:
+            attrs = _STYLE_ATTR_RE.sub(styles.style, match.group(1))
+            inner = match.group(2)
+            if inner is None:
+                return b"<c" + attrs + b"/>"
+            if b' t="s"' in attrs:
+                value = _VALUE_RE.search(inner)
+                if value is not None:
+                    text = escape(strings[int(value.group(1))]).encode("utf-8")
+                    attrs = attrs.replace(b' t="s"', b' t="inlineStr"')
+                    inner = b'<is><t xml:space="preserve">' + text + b"</t></is>"
+            return b"<c" + attrs + b">" + inner + b"</c>"
+
+        def head(xml: bytes) -> bytes:
+            xml = _TAB_SELECTED_RE.sub(b"", xml)
+            return _COL_RE.sub(lambda m: _STYLE_ATTR_RE.sub(styles.style, m.group(0)), xml)
+
+        def rows(xml: bytes) -> bytes:
+            xml = _ROW_OPEN_RE.sub(lambda m: _STYLE_ATTR_RE.sub(styles.style, m.group(0)), xml)
+            return _CELL_RE.sub(cell, xml)
+
+        def tail(xml: bytes) -> bytes:
+            return _DXF_ATTR_RE.sub(styles.dxf, xml)
+
+        return _sheet_rewriter(head, rows, tail)
+
+    def _copy_relationships(self, part: str, new_part: str) -> None:
+        """Give the copy its own relationships, cloning the parts they point at.
+
+        Pivot tables stay with the source sheet. Images are shared within a
+        workbook; everything else (tables, drawings, charts, comments) is
+        cloned so that the copy can be edited independently.
+        """
+        rels_part = Package.rels_part(part)
+        if not self.source.has(rels_part):
+            return
+        folder = posixpath.dirname(part)
+        elements = []
+        for element in _RELATIONSHIP_RE.findall(self.source.read(rels_part)):
+            attrs = _attrs(element)
+            rel_type = attrs.get(b"Type", b"").decode("utf-8")
+            if rel_type == REL_PIVOT_TABLE:
+                continue
+            if attrs.get(b"TargetMode") != b"External":
+                target = attrs.get(b"Target", b"").decode("utf-8")
+                if target.startswith("/"):
+                    target = target.lstrip("/")
+                else:
+                    target = posixpath.normpath(posixpath.join(folder, target))
+                if not (self.same_package and rel_type == REL_IMAGE):
+                    target = self._clone(target, rel_type)
+                relative = posixpath.relpath(target, posixpath.dirname(new_part))
+                element = _set_attr(element, b"Target", escape(relative).encode("utf-8"))
+            elements.append(element)
+        self.target.write(
+            Package.rels_part(new_part),
+            f'{XML_DECLARATION}<Relationships xmlns="{NS_PKG_REL}">'.encode("utf-8")
+            + b"".join(elements) + b"</Relationships>",
+        )
+
+    def _clone(self, part: str, rel_type: str) -> str:
+        if part in self.clones:
+            return self.clones[part]
+        new_part = self.target.unused_part(_part_template(part))
+        self.clones[part] = new_part
+        content_type = self.source.content_type(part)
+        if rel_type == REL_TABLE:
+            self.target.write(new_part, self._renamed_table(self.source.read(part)), content_type)
+        elif content_type and content_type.endswith("drawingml.chart+xml"):
+            chart = _retarget_formulas(self.source.read(part), self.source_sheet, self.target_sheet)
+            self.target.write(new_part, chart, content_type)
+        else:
+            self.target.copy_part(new_part, self.source, part, content_type)
+        self._copy_relationships(part, new_part)
+        return new_part
+
+    def _renamed_table(self, xml: bytes) -> bytes:
+        """Give a copied table a new id and a name unique in the target workbook."""
+        root = ET.fromstring(xml)
+        old_name = root.get("displayName") or root.get("name")
+        name = unique_table_name(self.table_names, f"{old_name}_")
+        self.table_names.append(name)
+        opening = _TABLE_OPEN_RE.search(xml)
+        tag = opening.group(0)
+        tag = _set_attr(tag, b"id", str(next_table_id(self.target)).encode("ascii"))
+        tag = _set_attr(tag, b"name", escape(name).encode("utf-8"))
+        tag = _set_attr(tag, b"displayName", escape(name).encode("utf-8"))
+        xml = xml[:opening.start()] + tag + xml[opening.end():]
+        # Calculated columns refer to their own table by name
+        xml = xml.replace(escape(old_name).encode("utf-8") + b"[", escape(name).encode("utf-8") + b"[")
+
+        self.tables.append(TableInfo(
+            name=name,
+            sheet_name=self.target_sheet,
+            ref=root.get("ref"),
+            columns=[column.get("name", "") for column in root.iter(f"{{{NS_MAIN}}}tableColumn")],
+            header_rows=int(root.get("headerRowCount", 1)),
+            totals_rows=int(root.get("totalsRowCount", 0)),
+        ))
+        return xml
+
+
+def copy_sheet_part(
+    filepath: Path | str,
+    source_sheet: str,
+    target_sheet: str,
+    source_filepath: Optional[Path | str] = None,
+) -> List[TableInfo]:
+    """Copy a worksheet inside the package, without loading any cells.
+
+    The worksheet part is streamed into a new part on save, together with
+    clones of its tables, drawings, charts and comments. With
+    ``source_filepath`` the sheet is taken from another workbook; its shared
+    strings are written inline and its cell formats are added to the
+    target's styles.
+
+    Returns:
+        The tables created on the copy
+
+    Raises:
+        SheetError: If the source sheet is missing or the target name is taken or invalid
+        PackageError: If a part uses markup the package-level copy cannot handle
+    """
+    if not target_sheet or len(target_sheet) > 31 or INVALID_TITLE_REGEX.search(target_sheet):
+        raise SheetError(f"Invalid sheet name '{target_sheet}'")
+    with Package(filepath) as target:
+        if any(name.lower() == target_sheet.lower() for name, _ in target.sheets()):
+            raise SheetError(f"Target sheet '{target_sheet}' already exists")
+        if source_filepath is None or Path(source_filepath).resolve() == Path(filepath).resolve():
+            source = target
+        elif not Path(source_filepath).exists():
+            raise SheetError(f"Source workbook {source_filepath} not found")
+        else:
+            source = Package(source_filepath)
+        try:
+            if source.sheet_part(source_sheet) is None:
+                raise SheetError(f"Source sheet '{source_sheet}' not found")
+            copy = _SheetCopy(source, target, source_sheet, target_sheet)
+            copy.copy()
+            target.save()
+        finally:
+            if source is not target:
+                source.close()
+    return copy.tables
@@ -0,0 +1,291 @@
+import hashlib
+import heapq
+import logging
+import math
+import random
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from .cell_utils import parse_cell_range
+from .exceptions import DataError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERCENTILES = [0.25, 0.5, 0.75]
+
+# Columns keep exact distinct values / quantile samples up to these sizes and
+# switch to bounded-memory sketches afterwards.
+EXACT_DISTINCT_LIMIT = 10000
+KMV_SKETCH_SIZE = 1024
+QUANTILE_SAMPLE_SIZE = 10000
+
+
+class _DistinctCounter:
+    """Distinct counter that is exact for small columns and falls back to a
+    k-minimum-values (KMV) sketch once the exact set grows too large."""
+
+    def __init__(self, exact_limit: int = EXACT_DISTINCT_LIMIT, k: int = KMV_SKETCH_SIZE):
+        self.exact_limit = exact_limit
+        self.k = k
+        self._exact: Optional[set] = set()
+        self._heap: List[int] = []  # max-heap (negated) of the k smallest hashes
+        self._members: set = set()
+
+    @staticmethod
+    def _hash(value: Any) -> int:
+        digest = hashlib.blake2b(repr(value).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def _add_hash(self, h: int) -> None:
+        if h in self._members:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -h)
+            self._members.add(h)
+        elif h < -self._heap[0]:
+            evicted = -heapq.heapreplace(self._heap, -h)
+            self._members.discard(evicted)
+            self._members.add(h)
+
+    def add(self, value: Any) -> None:
+        if self._exact is not None:
+            self._exact.add(value)
+            if len(self._exact) > self.exact_limit:
+                for item in self._exact:
+                    self._add_hash(self._hash(item))
+                self._exact = None
+            return
+        self._add_hash(self._hash(value))
+
+    @property
+    def approximate(self) -> bool:
+        return self._exact is None
+
+    def estimate(self) -> int:
+        if self._exact is not None:
+            return len(self._exact)
+        if len(self._heap) < self.k:
+            return len(self._heap)
+        kth_smallest = -self._heap[0]
+        return int(round((self.k - 1) * float(2 ** 64) / (kth_smallest + 1)))
+
+
+class _ColumnStats:
+    """Single-pass accumulator for one column.
+
+    Mean and variance use Welford's algorithm, the sum is Neumaier-compensated
+    and quantiles are computed from a fixed-size uniform reservoir sample.
+    """
+
+    def __init__(self, name: Any, column: int, sample_size: int, seed: int):
+        self.name = name
+        self.column = column
+        self.count = 0
+        self.nulls = 0
+        self.text_count = 0
+        self.bool_count = 0
+        self.date_count = 0
+        self.numeric_count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._sum = 0.0
+        self._sum_compensation = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.min_date: Any = None
+        self.max_date: Any = None
+        self.distinct = _DistinctCounter()
+        self._sample: List[float] = []
+        self._sample_size = sample_size
+        self._rng = random.Random(seed)
+
+    def add(self, value: Any) -> None:
+        if value is None or value == "":
+            self.nulls += 1
+            return
+        self.count += 1
+        self.distinct.add(value)
+
+        if isinstance(value, bool):
+            self.bool_count += 1
+        elif isinstance(value, (int, float)):
+            self._add_number(float(value))
+        elif isinstance(value, (datetime, date, time)):
+            self.date_count += 1
+            if self.min_date is None or value < self.min_date:
+                self.min_date = value
+            if self.max_date is None or value > self.max_date:
+                self.max_date = value
+        else:
+            self.text_count += 1
+
+    def _add_number(self, x: float) -> None:
+        if math.isnan(x):
+            return
+        self.numeric_count += 1
+        n = self.numeric_count
+
+        delta = x - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (x - self._mean)
+
+        t = self._sum + x
+        if abs(self._sum) >= abs(x):
+            self._sum_compensation += (self._sum - t) + x
+        else:
+            self._sum_compensation += (x - t) + self._sum
+        self._sum = t
+
+        if self.min is None or x < self.min:
+            self.min = x
+        if self.max is None or x > self.max:
+            self.max = x
+
+        if n <= self._sample_size:
+            self._sample.append(x)
+        else:
+            j = self._rng.randrange(n)
+            if j < self._sample_size:
+                self._sample[j] = x
+
+    def _quantiles(self, percentiles: List[float]) -> Dict[str, float]:
+        ordered = sorted(self._sample)
+        result = {}
+        for p in percentiles:
+            position = p * (len(ordered) - 1)
+            lower = math.floor(position)
+            upper = math.ceil(position)
+            value = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+            result[f"p{round(p * 100, 2):g}"] = value
+        return result
+
+    def to_dict(self, percentiles: List[float]) -> Dict[str, Any]:
+        info: Dict[str, Any] = {
+            "column": get_column_letter(self.column),
+            "name": self.name,
+            "count": self.count,
+            "nulls": self.nulls,
+            "distinct": self.distinct.estimate(),
+            "distinct_approximate": self.distinct.approximate,
+            "types": {
+                "numeric": self.numeric_count,
+                "text": self.text_count,
+                "bool": self.bool_count,
+                "date": self.date_count,
+            },
+        }
+        if self.numeric_count:
+            variance = self._m2 / (self.numeric_count - 1) if self.numeric_count > 1 else 0.0
+            info["numeric"] = {
+                "sum": self._sum + self._sum_compensation,
+                "mean": self._mean,
+                "std": math.sqrt(variance),
+                "min": self.min,
+                "max": self.max,
+                "percentiles": self._quantiles(percentiles),
+                "percentiles_approximate": self.numeric_count > self._sample_size,
+            }
+        if self.date_count:
+            info["dates"] = {"min": self.min_date, "max": self.max_date}
+        return info
+
+
+def describe_range(
+    filepath: Path | str,
+    sheet_name: str,
+    start_cell: Optional[str] = None,
+    end_cell: Optional[str] = None,
+    has_header: bool = True,
+    percentiles: Optional[List[float]] = None,
+    sample_size: int = QUANTILE_SAMPLE_SIZE,
+) -> Dict[str, Any]:
+    """Compute per-column summary statistics in a single streaming pass.
+
+    The worksheet is opened in read-only mode and rows are consumed one at a
+    time, so memory stays bounded regardless of the range size. Cached
+    formula results are used instead of formula strings.
+
+    Args:
+        filepath: Path to Excel file
+        sheet_name: Name of worksheet
+        start_cell: Starting cell of the range. Defaults to the sheet's first cell.
+        end_cell: Ending cell of the range. Defaults to the sheet's last used cell.
+        has_header: Whether the first row of the range holds column names
+        percentiles: Percentiles to report as fractions (e.g. [0.5, 0.9])
+        sample_size: Reservoir size used for quantiles on large columns
+
+    Returns:
+        Dictionary with the described range and a list of column statistics
+    """
+    try:
+        percentiles = DEFAULT_PERCENTILES if percentiles is None else percentiles
+        for p in percentiles:
+            if not 0 <= p <= 1:
+                raise DataError(f"Percentile {p} must be between 0 and 1")
+        if sample_size < 1:
+            raise DataError("Sample size must be 1 or greater")
+
+        try:
+            start_row, start_col, end_row, end_col = parse_cell_range(start_cell or "A1", end_cell)
+        except ValueError as e:
+            raise DataError(f"Invalid range: {str(e)}")
+
+        wb = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            if sheet_name not in wb.sheetnames:
+                raise DataError(f"Sheet '{sheet_name}' not found")
+            ws = wb[sheet_name]
+
+            if end_col is None:
+                end_col = ws.max_column or start_col
+            columns: List[_ColumnStats] = []
+            rows_scanned = 0
+
+            for row in ws.iter_rows(
+                min_row=start_row,
+                max_row=end_row,
+                min_col=start_col,
+                max_col=end_col,
+                values_only=True,
+            ):
+                if not columns:
+                    width = end_col - start_col + 1
+                    names = list(row) if has_header else [None] * width
+                    names += [None] * (width - len(names))
+                    columns = [
+                        _ColumnStats(
+                            name=str(names[i]) if names[i] is not None else get_column_letter(start_col + i),
+                            column=start_col + i,
+                            sample_size=sample_size,
+                            seed=start_col + i,
+                        )
+                        for i in range(width)
+                    ]
+                    if has_header:
+                        continue
+                rows_scanned += 1
+                for stats, value in zip(columns, row):
+                    stats.add(value)
+                # Rows shorter than the range width are padded with empty cells
+                for stats in columns[len(row):]:
+                    stats.add(None)
+        finally:
+            wb.close()
+
+        last_row = end_row if end_row is not None else start_row + rows_scanned - (0 if has_header else 1)
+        return {
+            "sheet_name": sheet_name,
+            "range": f"{get_column_letter(start_col)}{start_row}:{get_column_letter(end_col)}{max(last_row, start_row)}",
+            "rows": rows_scanned,
+            "columns": [stats.to_dict(percentiles) for stats in columns],
+        }
+    except DataError as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to describe range: {e}")
+        raise DataError(str(e))
@@ -1,9 +1,19 @@
-import uuid
+import heapq
 import logging
+import operator
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from datetime import date, datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from openpyxl import load_workbook
+from openpyxl.utils.cell import range_boundaries
 from openpyxl.worksheet.table import Table, TableStyleInfo
 from .exceptions import DataError
+from .package import NS_MAIN, REL_TABLE, Package
 
 logger = logging.getLogger(__name__)
 
@@ -27,35 +37,22 @@ def create_excel_table(
         A dictionary with a success message and table details.
     """
     try:
-        wb = load_workbook(filepath)
-        if sheet_name not in wb.sheetnames:
-            raise DataError(f"Sheet '{sheet_name}' not found.")
-            
-        ws = wb[sheet_name]
+        # Table names are unique workbook-wide; the registry answers without loading cells
+        stamp, registered = table_registry.snapshot(filepath)
 
         # If no table name is provided, generate a unique one
         if not table_name:
-            table_name = f"Table_{uuid.uuid4().hex[:8]}"
-
-        # Collect existing table names across the entire workbook to ensure global uniqueness
-        existing_table_names: set[str] = set()
+            table_name = unique_table_name(registered, "Table")
 
-        for sheet in wb.worksheets:
-            # For openpyxl ≥3.1, Worksheet.tables is a dict {name: Table}
-            if hasattr(sheet, "tables"):
-                tables_attr = sheet.tables
-                if isinstance(tables_attr, dict):
-                    existing_table_names.update(tables_attr.keys())
-                else:  # Older versions may expose a list/tuple of Table objects
-                    existing_table_names.update(tbl.displayName for tbl in tables_attr)
-
-            # Fallback: some older versions keep tables in the protected _tables list
-            if hasattr(sheet, "_tables"):
-                existing_table_names.update(tbl.displayName for tbl in sheet._tables)
-
-        if table_name in existing_table_names:
+        if table_name.lower() in registered:
             raise DataError(f"Table name '{table_name}' already exists in the workbook.")
 
+        wb = load_workbook(filepath)
+        if sheet_name not in wb.sheetnames:
+            raise DataError(f"Sheet '{sheet_name}' not found.")
+            
+        ws = wb[sheet_name]
+
         # Create the table
         table = Table(displayName=table_name, ref=data_range)
         
@@ -72,6 +69,11 @@ def create_excel_table(
         ws.add_table(table)
         
         wb.save(filepath)
+        table_registry.update(
+            filepath,
+            stamp,
+            lambda tables: {**tables, table_name.lower(): TableInfo.from_table(sheet_name, table)},
+        )
         
         return {
             "message": f"Successfully created table '{table_name}' in sheet '{sheet_name}'.",
@@ -81,4 +83,379 @@ def create_excel_table(
 
     except Exception as e:
         logger.error(f"Failed to create table: {e}")
-        raise DataError(str(e)) 
\ No newline at end of file
+        raise DataError(str(e)) 
+
+class TableInfo:
+    """Location and column layout of one Excel table."""
+
+    def __init__(
+        self,
+        name: str,
+        sheet_name: str,
+        ref: str,
+        columns: List[str],
+        header_rows: int = 1,
+        totals_rows: int = 0,
+    ):
+        self.name = name
+        self.sheet_name = sheet_name
+        self.ref = ref
+        self.columns = columns
+        self.header_rows = header_rows
+        self.totals_rows = totals_rows
+        self.min_col, self.min_row, self.max_col, self.max_row = range_boundaries(ref)
+        self._column_index = {column.lower(): i for i, column in enumerate(columns)}
+
+    @classmethod
+    def from_table(cls, sheet_name: str, table: Table) -> "TableInfo":
+        """Build from an openpyxl table (columns are filled in when it is saved)."""
+        return cls(
+            name=table.displayName,
+            sheet_name=sheet_name,
+            ref=table.ref,
+            columns=[column.name for column in table.tableColumns],
+            header_rows=1 if table.headerRowCount is None else table.headerRowCount,
+            totals_rows=table.totalsRowCount or 0,
+        )
+
+    def on_sheet(self, sheet_name: str) -> "TableInfo":
+        """Return a copy located on another (renamed) sheet."""
+        return TableInfo(self.name, sheet_name, self.ref, self.columns, self.header_rows, self.totals_rows)
+
+    @property
+    def data_rows(self) -> Tuple[int, int]:
+        """First and last row of the table body (excluding header and totals)."""
+        return self.min_row + self.header_rows, self.max_row - self.totals_rows
+
+    def column_index(self, column: str) -> int:
+        """Return the zero-based offset of a column, matched case-insensitively."""
+        try:
+            return self._column_index[str(column).lower()]
+        except KeyError:
+            raise DataError(
+                f"Column '{column}' not found in table '{self.name}'. "
+                f"Available columns: {', '.join(self.columns)}"
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        first, last = self.data_rows
+        return {
+            "name": self.name,
+            "sheet_name": self.sheet_name,
+            "ref": self.ref,
+            "columns": self.columns,
+            "rows": max(0, last - first + 1),
+            "has_totals": bool(self.totals_rows),
+        }
+
+
+TABLE_REGISTRY_SIZE = 64
+
+
+def _read_table_parts(filepath: Path) -> Dict[str, TableInfo]:
+    """Read table definitions straight from the package, without parsing any cells."""
+    tables: Dict[str, TableInfo] = {}
+    with Package(filepath) as package:
+        for sheet_name, sheet_part in package.sheets():
+            for rel_type, table_part in package.relationships(sheet_part).values():
+                if rel_type != REL_TABLE:
+                    continue
+                table_xml = ET.fromstring(package.read(table_part))
+                columns = [
+                    column.get("name", "")
+                    for column in table_xml.iter(f"{{{NS_MAIN}}}tableColumn")
+                ]
+                name = table_xml.get("displayName") or table_xml.get("name")
+                tables[name.lower()] = TableInfo(
+                    name=name,
+                    sheet_name=sheet_name,
+                    ref=table_xml.get("ref"),
+                    columns=columns,
+                    header_rows=int(table_xml.get("headerRowCount", 1)),
+                    totals_rows=int(table_xml.get("totalsRowCount", 0)),
+                )
+    return tables
+
+
+def _file_stamp(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class TableRegistry:
+    """Per-workbook table registry shared by all requests in the process.
+
+    Entries are stamped with the file's size and mtime. A stale entry is
+    rebuilt from the package's table parts (no cell data is parsed), while
+    operations that change tables in a known way (creating tables, deleting,
+    renaming or copying sheets, rebuilding pivots) apply their change to the
+    entry right after saving so the next lookup needs no re-read.
+    """
+
+    def __init__(self, max_workbooks: int = TABLE_REGISTRY_SIZE):
+        self.max_workbooks = max_workbooks
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Dict[str, TableInfo]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, key: str, stamp: Tuple[int, int], tables: Dict[str, TableInfo]) -> None:
+        self._entries[key] = (stamp, tables)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_workbooks:
+            self._entries.popitem(last=False)
+
+    def snapshot(self, filepath: Path | str) -> Tuple[Tuple[int, int], Dict[str, TableInfo]]:
+        """Return the file stamp and its tables keyed by lower-cased name."""
+        path = Path(filepath)
+        key = str(path.resolve())
+        stamp = _file_stamp(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                return entry
+        tables = _read_table_parts(path)
+        with self._lock:
+            self._store(key, stamp, tables)
+        return stamp, tables
+
+    def tables(self, filepath: Path | str) -> Dict[str, TableInfo]:
+        return self.snapshot(filepath)[1]
+
+    def update(
+        self,
+        filepath: Path | str,
+        previous_stamp: Tuple[int, int],
+        change: Callable[[Dict[str, TableInfo]], Dict[str, TableInfo]],
+    ) -> None:
+        """Apply a known change after saving a file that was at ``previous_stamp``.
+
+        If the entry no longer matches that stamp (another writer got there
+        first) it is dropped and rebuilt on the next lookup instead.
+        """
+        path = Path(filepath)
+        key = str(path.resolve())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != previous_stamp:
+                self._entries.pop(key, None)
+                return
+            self._store(key, _file_stamp(path), change(dict(entry[1])))
+
+    def invalidate(self, filepath: Path | str) -> None:
+        with self._lock:
+            self._entries.pop(str(Path(filepath).resolve()), None)
+
+
+table_registry = TableRegistry()
+
+
+def unique_table_name(existing: Iterable[str], prefix: str) -> str:
+    """Return the first of prefix1, prefix2, ... not in ``existing`` (case-insensitive)."""
+    taken = {name.lower() for name in existing}
+    index = 1
+    while f"{prefix}{index}".lower() in taken:
+        index += 1
+    return f"{prefix}{index}"
+
+
+def list_tables(filepath: Path | str, sheet_name: Optional[str] = None) -> Dict[str, Any]:
+    """List the workbook's tables from the registry without reading cell data.
+
+    Args:
+        filepath: Path to Excel file
+        sheet_name: Only list tables on this worksheet
+
+    Returns:
+        Dictionary with the tables' names, sheets, refs, columns and row counts
+    """
+    try:
+        tables = [
+            table.to_dict()
+            for table in table_registry.tables(filepath).values()
+            if sheet_name is None or table.sheet_name == sheet_name
+        ]
+        return {"tables": tables, "count": len(tables)}
+    except DataError as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to list tables: {e}")
+        raise DataError(str(e))
+
+
+_FILTER_OPERATORS = {"=", "==", "!=", ">", ">=", "<", "<=", "contains", "startswith", "in", "is_null", "not_null"}
+
+
+def _compile_filter(table: TableInfo, spec: Dict[str, Any]) -> Callable[[tuple], bool]:
+    if not isinstance(spec, dict) or "column" not in spec:
+        raise DataError("Each filter must be an object with a 'column' key")
+    index = table.column_index(spec["column"])
+    op = str(spec.get("op", "=")).lower()
+    if op not in _FILTER_OPERATORS:
+        raise DataError(f"Unsupported filter operator '{op}'. Use one of: {', '.join(sorted(_FILTER_OPERATORS))}")
+    expected = spec.get("value")
+
+    def value_of(row: tuple) -> Any:
+        return row[index] if index < len(row) else None
+
+    if op == "is_null":
+        return lambda row: value_of(row) in (None, "")
+    if op == "not_null":
+        return lambda row: value_of(row) not in (None, "")
+    if op == "in":
+        if not isinstance(expected, list):
+            raise DataError("The 'in' operator requires a list value")
+        choices = set(expected)
+        return lambda row: value_of(row) in choices
+    if op in ("contains", "startswith"):
+        needle = str(expected).lower()
+        if op == "contains":
+            return lambda row: value_of(row) is not None and needle in str(value_of(row)).lower()
+        return lambda row: value_of(row) is not None and str(value_of(row)).lower().startswith(needle)
+
+    compare = {
+        "=": operator.eq, "==": operator.eq, "!=": operator.ne,
+        ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+    }[op]
+
+    if isinstance(expected, str):
+        # Allow ISO strings when comparing against date cells
+        try:
+            expected_date: Optional[datetime] = datetime.fromisoformat(expected)
+        except ValueError:
+            expected_date = None
+    else:
+        expected_date = None
+
+    def matches(row: tuple) -> bool:
+        value = value_of(row)
+        if value is None and op not in ("=", "==", "!="):
+            return False
+        if expected_date is not None and isinstance(value, datetime):
+            return compare(value, expected_date)
+        try:
+            return compare(value, expected)
+        except TypeError:
+            # Mixed types (e.g. text vs number) never match ordering filters
+            return op == "!="
+    return matches
+
+
+def _sort_key(value: Any) -> tuple:
+    """Order numbers, dates, text and booleans consistently; empty cells sort last."""
+    if value is None or value == "":
+        return (1, 0, 0)
+    if isinstance(value, bool):
+        return (0, 3, value)
+    if isinstance(value, (int, float)):
+        return (0, 0, value)
+    if isinstance(value, datetime):
+        return (0, 1, value)
+    if isinstance(value, date):
+        return (0, 1, datetime(value.year, value.month, value.day))
+    return (0, 2, str(value))
+
+
+def query_table(
+    filepath: Path | str,
+    table_name: str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Dict[str, Any]]] = None,
+    order_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 100,
+) -> Dict[str, Any]:
+    """Query an Excel table by name with projection, filters, sort and limit.
+
+    Table locations and column layouts are read from the package's table
+    parts (cached per file version), then the table body is streamed in
+    read-only mode. Without ``order_by`` the scan stops as soon as ``limit``
+    matching rows are found; with it only the top ``limit`` rows are kept.
+
+    Args:
+        filepath: Path to Excel file
+        table_name: Name of the table (case-insensitive)
+        columns: Columns to return. Defaults to all table columns.
+        filters: Conditions that must all hold, each {"column", "op", "value"}
+        order_by: Column to sort by
+        descending: Sort in descending order
+        limit: Maximum number of rows to return
+
+    Returns:
+        Dictionary with the selected columns and matching rows
+    """
+    try:
+        if limit < 1:
+            raise DataError("Limit must be 1 or greater")
+
+        table = table_registry.tables(filepath).get(str(table_name).lower())
+        if table is None:
+            raise DataError(f"Table '{table_name}' not found")
+
+        selected = columns or table.columns
+        projection = [table.column_index(column) for column in selected]
+        predicates = [_compile_filter(table, spec) for spec in (filters or [])]
+        sort_index = table.column_index(order_by) if order_by else None
+
+        first_row, last_row = table.data_rows
+        scanned = 0
+
+        def matching_rows() -> Iterator[tuple]:
+            nonlocal scanned
+            if last_row < first_row:
+                return
+            for row in ws.iter_rows(
+                min_row=first_row,
+                max_row=last_row,
+                min_col=table.min_col,
+                max_col=table.max_col,
+                values_only=True,
+            ):
+                scanned += 1
+                if all(predicate(row) for predicate in predicates):
+                    yield row
+
+        wb = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            ws = wb[table.sheet_name]
+            if sort_index is None:
+                # Fetch one extra row to know whether the result was truncated
+                rows = list(islice(matching_rows(), limit + 1))
+                truncated = len(rows) > limit
+                rows = rows[:limit]
+            else:
+                def key(row: tuple) -> tuple:
+                    value = row[sort_index] if sort_index < len(row) else None
+                    sort_key = _sort_key(value)
+                    # Keep empty cells last in both directions
+                    return (-sort_key[0], sort_key[1:]) if descending else sort_key
+
+                matched = 0
+
+                def counted() -> Iterator[tuple]:
+                    nonlocal matched
+                    for row in matching_rows():
+                        matched += 1
+                        yield row
+
+                pick = heapq.nlargest if descending else heapq.nsmallest
+                rows = pick(limit, counted(), key=key)
+                truncated = matched > len(rows)
+        finally:
+            wb.close()
+
+        return {
+            "table": table.name,
+            "sheet_name": table.sheet_name,
+            "columns": [table.columns[i] for i in projection],
+            "rows": [[row[i] if i < len(row) else None for i in projection] for row in rows],
+            "row_count": len(rows),
+            "rows_scanned": scanned,
+            "truncated": truncated,
+        }
+    except DataError as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to query table: {e}")
+        raise DataError(str(e))
@@ -8,6 +8,7 @@ from openpyxl.worksheet.worksheet import Worksheet
 
 from .cell_utils import parse_cell_range, validate_cell_reference
 from .exceptions import ValidationError
+from .references import resolver_for
 
 logger = logging.getLogger(__name__)
 
@@ -26,21 +27,7 @@ def validate_formula_in_cell_operation(
         if not validate_cell_reference(cell):
             raise ValidationError(f"Invalid cell reference: {cell}")
 
-        # First validate the provided formula's syntax
-        is_valid, message = validate_formula(formula)
-        if not is_valid:
-            raise ValidationError(f"Invalid formula syntax: {message}")
-
-        # Additional validation for cell references in formula
-        cell_refs = re.findall(r'[A-Z]+[0-9]+(?::[A-Z]+[0-9]+)?', formula)
-        for ref in cell_refs:
-            if ':' in ref:  # Range reference
-                start, end = ref.split(':')
-                if not (validate_cell_reference(start) and validate_cell_reference(end)):
-                    raise ValidationError(f"Invalid cell range reference in formula: {ref}")
-            else:  # Single cell reference
-                if not validate_cell_reference(ref):
-                    raise ValidationError(f"Invalid cell reference in formula: {ref}")
+        check_formula(formula)
 
         # Now check if there's a formula in the cell and compare
         sheet = wb[sheet_name]
@@ -49,36 +36,26 @@ def validate_formula_in_cell_operation(
 
         # If cell has a formula (starts with =)
         if isinstance(current_formula, str) and current_formula.startswith('='):
-            if formula.startswith('='):
-                if current_formula != formula:
-                    return {
-                        "message": "Formula is valid but doesn't match cell content",
-                        "valid": True,
-                        "matches": False,
-                        "cell": cell,
-                        "provided_formula": formula,
-                        "current_formula": current_formula
-                    }
+            normalized = formula if formula.startswith('=') else f"={formula}"
+            if current_formula != normalized:
+                result = {
+                    "message": "Formula is valid but doesn't match cell content",
+                    "valid": True,
+                    "matches": False,
+                    "cell": cell,
+                    "provided_formula": formula,
+                    "current_formula": current_formula
+                }
             else:
-                if current_formula != f"={formula}":
-                    return {
-                        "message": "Formula is valid but doesn't match cell content",
-                        "valid": True,
-                        "matches": False,
-                        "cell": cell,
-                        "provided_formula": formula,
-                        "current_formula": current_formula
-                    }
-                else:
-                    return {
-                        "message": "Formula is valid and matches cell content",
-                        "valid": True,
-                        "matches": True,
-                        "cell": cell,
-                        "formula": formula
-                    }
+                result = {
+                    "message": "Formula is valid and matches cell content",
+                    "valid": True,
+                    "matches": True,
+                    "cell": cell,
+                    "formula": formula
+                }
         else:
-            return {
+            result = {
                 "message": "Formula is valid but cell contains no formula",
                 "valid": True,
                 "matches": False,
@@ -87,6 +64,10 @@ def validate_formula_in_cell_operation(
                 "current_content": str(current_formula) if current_formula else ""
             }
 
+        # Ranges the formula reads, with defined names and table references expanded
+        result["dependencies"] = resolver_for(wb).formula_dependencies(formula, sheet_name)
+        return result
+
     except ValidationError as e:
         logger.error(str(e))
         raise
@@ -162,6 +143,26 @@ def validate_range_in_sheet_operation(
         logger.error(f"Failed to validate range: {e}")
         raise ValidationError(str(e))
 
+def check_formula(formula: str) -> None:
+    """Check formula syntax and the cell references it contains.
+
+    Works on the formula text alone, so callers can validate before (or
+    without) loading a workbook. Raises ValidationError on the first problem.
+    """
+    is_valid, message = validate_formula(formula)
+    if not is_valid:
+        raise ValidationError(f"Invalid formula syntax: {message}")
+
+    cell_refs = re.findall(r'[A-Z]+[0-9]+(?::[A-Z]+[0-9]+)?', formula)
+    for ref in cell_refs:
+        if ':' in ref:  # Range reference
+            start, end = ref.split(':')
+            if not (validate_cell_reference(start) and validate_cell_reference(end)):
+                raise ValidationError(f"Invalid cell range reference in formula: {ref}")
+        else:  # Single cell reference
+            if not validate_cell_reference(ref):
+                raise ValidationError(f"Invalid cell reference in formula: {ref}")
+
 def validate_formula(formula: str) -> tuple[bool, str]:
     """Validate Excel formula syntax and safety"""
     if not formula.startswith("="):
@@ -6,6 +6,8 @@ from openpyxl import Workbook, load_workbook
 from openpyxl.utils import get_column_letter
 
 from .exceptions import WorkbookError
+from .internal_sheets import user_sheet_names
+from .tables import table_registry
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +44,7 @@ def get_or_create_workbook(filepath: str) -> Workbook:
 def create_sheet(filepath: str, sheet_name: str) -> dict:
     """Create a new worksheet in the workbook if it doesn't exist."""
     try:
+        stamp, _ = table_registry.snapshot(filepath)
         wb = load_workbook(filepath)
 
         # Check if sheet already exists
@@ -51,6 +54,7 @@ def create_sheet(filepath: str, sheet_name: str) -> dict:
         # Create new sheet
         wb.create_sheet(sheet_name)
         wb.save(filepath)
+        table_registry.update(filepath, stamp, lambda tables: tables)
         wb.close()
         return {"message": f"Sheet {sheet_name} created successfully"}
     except WorkbookError as e:
@@ -71,7 +75,7 @@ def get_workbook_info(filepath: str, include_ranges: bool = False) -> Dict[str,
         
         info = {
             "file_name": path.name,
-            "sheets": wb.sheetnames,
+            "sheets": user_sheet_names(wb.sheetnames),
             "size": path.stat().st_size,
             "modified": path.stat().st_mtime
         }
@@ -79,7 +83,7 @@ def get_workbook_info(filepath: str, include_ranges: bool = False) -> Dict[str,
         if include_ranges:
             # Add used ranges for each sheet
             ranges = {}
-            for sheet_name in wb.sheetnames:
+            for sheet_name in user_sheet_names(wb.sheetnames):
                 ws = wb[sheet_name]
                 if ws.max_row > 0 and ws.max_column > 0:
                     ranges[sheet_name] = f"A1:{get_column_letter(ws.max_column)}{ws.max_row}"